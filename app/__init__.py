@@ -1,49 +1,43 @@
-from .main import (
+from .models import (
     SourceCode,
     Table,
-    MarkdownDocument,
+    Blob,
+    MarkdownDocument
+)
+from .parsers import (
     parse_yaml_metadata,
     parse_table,
     parse_python_script,
     parse_markdown_content,
-    SourceCodePromptTemplate,
-    MarkdownDocumentPromptTemplate,
-    PythonScriptPromptTemplate,
-    agent_logic,
-    agent_executor
+    parse_markdown_file
 )
 
-import os
-from dotenv import load_dotenv
-from langchain.chat_models import ChatOpenAI
-from langsmith import traceable
-
-from minio import Minio
-from minio.error import S3Error
-
-# Load environment variables from .env file
-load_dotenv()
-
-# Set LangChain and LangSmith environment variables
-os.environ["LANGCHAIN_TRACING_V2"] = "true"
-os.environ["LANGCHAIN_ENDPOINT"] = os.getenv("LANGCHAIN_ENDPOINT")
-os.environ["LANGCHAIN_API_KEY"] = os.getenv("LANGSMITH_API_KEY")
-os.environ["LANGCHAIN_PROJECT"] = os.getenv("LANGCHAIN_PROJECT", "cda")
+# The agent layer pulls in LangChain, LangSmith and an OpenAI client, so it is
+# only imported when one of its names is first accessed (PEP 562)
+_AGENT_NAMES = {
+    "SourceCodePromptTemplate",
+    "MarkdownDocumentPromptTemplate",
+    "PythonScriptPromptTemplate",
+    "agent_logic",
+    "agent_executor"
+}
 
-# Example LangChain usage with traceable decorator
-# @traceable(run_type="llm")
-# def call_openai(data):
-#     openai_api_key = os.getenv("OPENAI_API_KEY")
-#     return ChatOpenAI(api_key=openai_api_key).predict(data)
+def __getattr__(name):
+    if name in _AGENT_NAMES:
+        from . import main
+        return getattr(main, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 __all__ = [
     "SourceCode",
     "Table",
+    "Blob",
     "MarkdownDocument",
     "parse_yaml_metadata",
     "parse_table",
     "parse_python_script",
     "parse_markdown_content",
+    "parse_markdown_file",
     "SourceCodePromptTemplate",
     "MarkdownDocumentPromptTemplate",
     "PythonScriptPromptTemplate",
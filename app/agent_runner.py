@@ -0,0 +1,257 @@
+import asyncio
+import random
+import time
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Callable, Dict, Iterable, List, Optional, Tuple, Type
+
+from .embeddings import estimate_tokens
+from .llm_cache import CacheMissError, prompt_text
+from .prompt_budget import BudgetedPrompt
+
+# Batch runner for the analysis agent. Inputs ({"filename", "content"} dicts)
+# are pulled lazily into a bounded queue and served by ``concurrency`` worker
+# tasks, each formatting the prompt and calling the LLM's ``ainvoke``. Calls go
+# through request- and token-per-minute limiters and failed calls are retried
+# with full-jitter exponential backoff. Results are yielded as they complete,
+# with errors reported inline, and RunnerMetrics keeps per-item latency and
+# queue-depth samples.
+
+@dataclass
+class AgentResult:
+    index: int
+    filename: str
+    output: Any = None
+    error: Optional[str] = None
+    attempts: int = 0
+    # Seconds spent queued before the first attempt, and from then until done
+    wait: float = 0.0
+    latency: float = 0.0
+    # Set when the prompt function returns a BudgetedPrompt
+    prompt_tokens: Optional[int] = None
+    saved_tokens: int = 0
+
+@dataclass
+class RunnerMetrics:
+    submitted: int = 0
+    completed: int = 0
+    failed: int = 0
+    retries: int = 0
+    in_flight: int = 0
+    max_in_flight: int = 0
+    throttled_seconds: float = 0.0
+    saved_tokens: int = 0
+    latencies: List[float] = field(default_factory=list)
+    queue_depths: List[int] = field(default_factory=list)
+
+    def record_depth(self, depth: int):
+        self.queue_depths.append(depth)
+
+    def percentile(self, p: float) -> float:
+        if not self.latencies:
+            return 0.0
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(round(p / 100 * (len(ordered) - 1))))]
+
+    def summary(self) -> Dict[str, float]:
+        return {
+            "submitted": self.submitted,
+            "completed": self.completed,
+            "failed": self.failed,
+            "retries": self.retries,
+            "max_in_flight": self.max_in_flight,
+            "max_queue_depth": max(self.queue_depths, default=0),
+            "throttled_seconds": round(self.throttled_seconds, 3),
+            "saved_tokens": self.saved_tokens,
+            "p50": round(self.percentile(50), 4),
+            "p95": round(self.percentile(95), 4),
+            "p99": round(self.percentile(99), 4),
+        }
+
+class RateLimiter:
+    """Token bucket refilled at ``per_minute / 60`` units per second.
+
+    ``burst`` caps what can be spent at once (one second's worth by default).
+    A reservation larger than the balance puts the bucket into debt and waits
+    for it to be repaid, so oversized requests still go through, at the right rate.
+    """
+
+    def __init__(self, per_minute: float, burst: Optional[float] = None,
+                 clock: Callable[[], float] = time.monotonic):
+        self.rate = per_minute / 60.0
+        self.capacity = burst if burst is not None else max(1.0, self.rate)
+        self.available = self.capacity
+        self.clock = clock
+        self.updated = clock()
+
+    def reserve(self, cost: float = 1.0) -> float:
+        """Spend ``cost`` units and return how long to wait before using them."""
+        now = self.clock()
+        self.available = min(self.capacity, self.available + (now - self.updated) * self.rate)
+        self.updated = now
+        self.available -= cost
+        return -self.available / self.rate if self.available < 0 else 0.0
+
+    async def acquire(self, cost: float = 1.0) -> float:
+        # reserve() never awaits, so reservations are atomic on the event loop
+        delay = self.reserve(cost)
+        if delay:
+            await asyncio.sleep(delay)
+        return delay
+
+class AgentRunner:
+    """Runs many agent inputs against ``llm`` with bounded concurrency.
+
+    ``llm`` needs ``ainvoke`` (a ``CachedLLM``, a LangChain runnable, a
+    ``FakeLLM``) or ``invoke``/``__call__``, which then runs in a thread.
+    ``prompt`` turns an input dict into the prompt; by default the input is
+    passed through. A ``BudgetedPrompt`` is sent as its text and its token
+    counts are reported on the result. Errors in ``give_up_on`` are not retried.
+    """
+
+    def __init__(self, llm, prompt: Optional[Callable[[dict], Any]] = None, concurrency: int = 8,
+                 requests_per_minute: Optional[float] = None, tokens_per_minute: Optional[float] = None,
+                 max_output_tokens: int = 256, max_retries: int = 3, backoff: float = 0.5,
+                 max_backoff: float = 30.0, timeout: Optional[float] = None,
+                 retry_on: Tuple[Type[BaseException], ...] = (Exception,),
+                 give_up_on: Tuple[Type[BaseException], ...] = (CacheMissError,),
+                 rng: Optional[random.Random] = None):
+        self.llm = llm
+        self.prompt = prompt
+        self.concurrency = max(1, concurrency)
+        self.requests = RateLimiter(requests_per_minute) if requests_per_minute else None
+        self.tokens = RateLimiter(tokens_per_minute) if tokens_per_minute else None
+        self.max_output_tokens = max_output_tokens
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.timeout = timeout
+        self.retry_on = retry_on
+        self.give_up_on = give_up_on
+        self.rng = rng or random.Random()
+        self.metrics = RunnerMetrics()
+
+    def backoff_delay(self, attempt: int) -> float:
+        # Full jitter: uniform in [0, min(max_backoff, backoff * 2**(attempt - 1))]
+        return self.rng.uniform(0, min(self.max_backoff, self.backoff * 2 ** (attempt - 1)))
+
+    async def _throttle(self, prompt) -> float:
+        waited = 0.0
+        if self.requests is not None:
+            waited += await self.requests.acquire()
+        if self.tokens is not None:
+            tokens = prompt.prompt_tokens if isinstance(prompt, BudgetedPrompt) else estimate_tokens(prompt_text(prompt))
+            waited += await self.tokens.acquire(tokens + self.max_output_tokens)
+        self.metrics.throttled_seconds += waited
+        return waited
+
+    async def _call(self, prompt):
+        if isinstance(prompt, BudgetedPrompt):
+            prompt = prompt.text
+        if hasattr(self.llm, "ainvoke"):
+            call = self.llm.ainvoke(prompt)
+        else:
+            invoke = getattr(self.llm, "invoke", self.llm)
+            call = asyncio.get_running_loop().run_in_executor(None, invoke, prompt)
+        return await (asyncio.wait_for(call, self.timeout) if self.timeout else call)
+
+    def _retryable(self, error: BaseException, attempts: int) -> bool:
+        return (attempts <= self.max_retries and isinstance(error, self.retry_on)
+                and not isinstance(error, self.give_up_on))
+
+    async def run_one(self, index: int, item: dict, queued_at: Optional[float] = None) -> AgentResult:
+        metrics = self.metrics
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        result = AgentResult(index, item.get("filename", "") if isinstance(item, dict) else "")
+        result.wait = start - queued_at if queued_at is not None else 0.0
+        try:
+            prompt = self.prompt(item) if self.prompt is not None else item
+        except Exception as e:
+            prompt, result.error = None, f"{type(e).__name__}: {e}"
+        if isinstance(prompt, BudgetedPrompt):
+            result.prompt_tokens = prompt.prompt_tokens
+            result.saved_tokens = prompt.saved_tokens
+            metrics.saved_tokens += prompt.saved_tokens
+        while result.error is None:
+            result.attempts += 1
+            await self._throttle(prompt)
+            metrics.in_flight += 1
+            metrics.max_in_flight = max(metrics.max_in_flight, metrics.in_flight)
+            try:
+                result.output = await self._call(prompt)
+                break
+            except Exception as e:
+                if not self._retryable(e, result.attempts):
+                    result.error = f"{type(e).__name__}: {e}"
+                    break
+            finally:
+                metrics.in_flight -= 1
+            metrics.retries += 1
+            await asyncio.sleep(self.backoff_delay(result.attempts))
+        result.latency = loop.time() - start
+        metrics.completed += 1
+        metrics.failed += result.error is not None
+        metrics.latencies.append(result.latency)
+        return result
+
+    async def stream(self, inputs) -> AsyncIterator[AgentResult]:
+        """Yield an ``AgentResult`` per input as soon as it completes.
+
+        ``inputs`` may be a (lazy) iterable or an async iterable; at most
+        ``concurrency * 2`` inputs are read ahead of the workers.
+        """
+        loop = asyncio.get_running_loop()
+        pending: asyncio.Queue = asyncio.Queue(maxsize=self.concurrency * 2)
+        done: asyncio.Queue = asyncio.Queue()
+
+        async def produce():
+            try:
+                index = 0
+                if hasattr(inputs, "__aiter__"):
+                    async for item in inputs:
+                        await pending.put((index, item, loop.time()))
+                        index += 1
+                        self.metrics.submitted += 1
+                else:
+                    for item in inputs:
+                        await pending.put((index, item, loop.time()))
+                        index += 1
+                        self.metrics.submitted += 1
+            finally:
+                for _ in range(self.concurrency):
+                    await pending.put(None)
+
+        async def work():
+            try:
+                while True:
+                    entry = await pending.get()
+                    if entry is None:
+                        return
+                    self.metrics.record_depth(pending.qsize())
+                    await done.put(await self.run_one(*entry))
+            finally:
+                await done.put(None)
+
+        producer = asyncio.ensure_future(produce())
+        workers = [asyncio.ensure_future(work()) for _ in range(self.concurrency)]
+        try:
+            running = len(workers)
+            while running:
+                result = await done.get()
+                if result is None:
+                    running -= 1
+                else:
+                    yield result
+            # Surface errors raised while reading the inputs
+            await producer
+        finally:
+            for task in [producer, *workers]:
+                task.cancel()
+
+    async def arun(self, inputs) -> List[AgentResult]:
+        results = [result async for result in self.stream(inputs)]
+        return sorted(results, key=lambda result: result.index)
+
+    def run(self, inputs: Iterable[dict]) -> List[AgentResult]:
+        """Run every input and return the results in input order."""
+        return asyncio.run(self.arun(inputs))
@@ -0,0 +1,376 @@
+import json
+import os
+import time
+import uuid
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional
+
+# Columnar export of parsed corpora for analytics. Parsed documents, code
+# blocks and table rows are written as Parquet (or Arrow IPC) datasets under
+# ``root``:
+#
+#   documents/run=<run>/part-00000.parquet   one row per MarkdownDocument
+#   code/run=<run>/...                       one row per SourceCode
+#   table_rows/run=<run>/...                 one row per table row
+#   objects/run=<run>/...                    every object written or deleted
+#
+# Every export is a new ``run=`` partition, so incremental runs only append.
+# Rows are buffered and flushed as row groups, so memory is bounded by the
+# row group size rather than the corpus. The schemas are fixed: front matter
+# and table cells are map<string, string> columns rather than one column per
+# key, so files from different runs always read back together. read_corpus()
+# returns the latest version of every object that has not been deleted.
+#
+# pyarrow is optional and only imported when a writer or reader is created.
+
+SCHEMA_VERSION = "1"
+DATASETS = ("documents", "code", "table_rows", "objects")
+_EXTENSIONS = {"parquet": ".parquet", "arrow": ".arrow"}
+
+def _pyarrow():
+    try:
+        import pyarrow
+    except ImportError as e:
+        raise ImportError("columnar export needs pyarrow: pip install pyarrow") from e
+    return pyarrow
+
+def corpus_schemas() -> Dict[str, Any]:
+    pa = _pyarrow()
+    strings = pa.list_(pa.string())
+    cells = pa.map_(pa.string(), pa.string())
+    metadata = {b"corpus_schema": SCHEMA_VERSION.encode()}
+    return {
+        "documents": pa.schema([
+            ("object_name", pa.string()),
+            ("metadata", cells),
+            ("tags", strings),
+            ("imports", strings),
+            ("classes", strings),
+            ("tables", pa.int32()),
+            ("code_blocks", pa.int32()),
+            ("blobs", strings),
+            ("content", pa.string()),
+        ], metadata=metadata),
+        "code": pa.schema([
+            ("object_name", pa.string()),
+            ("block", pa.int32()),
+            ("source_id", pa.string()),
+            ("syntax", pa.string()),
+            ("imports", strings),
+            ("classes", strings),
+            ("functions", strings),
+            ("error", pa.string()),
+            ("context", pa.string()),
+            ("code", pa.string()),
+        ], metadata=metadata),
+        "table_rows": pa.schema([
+            ("object_name", pa.string()),
+            ("table", pa.int32()),
+            ("row", pa.int32()),
+            ("headers", strings),
+            ("cells", cells),
+        ], metadata=metadata),
+        "objects": pa.schema([
+            ("object_name", pa.string()),
+            ("kind", pa.string()),
+            ("deleted", pa.bool_()),
+        ], metadata=metadata),
+    }
+
+def new_run_id() -> str:
+    # Sorts by time, so the latest run of an object is its largest run id
+    now = time.time()
+    return time.strftime("%Y%m%dT%H%M%S", time.gmtime(now)) + f"{int(now * 1e6) % 1000000:06d}-{uuid.uuid4().hex[:8]}"
+
+def _text(value: Any) -> Optional[str]:
+    if value is None or isinstance(value, str):
+        return value
+    return json.dumps(value, default=str, sort_keys=True)
+
+def flatten_metadata(metadata: Dict[str, Any], prefix: str = "") -> List[tuple]:
+    """Flatten nested front matter into ``(dotted key, text value)`` pairs;
+    lists and scalars become JSON unless they are strings."""
+    pairs = []
+    for key, value in (metadata or {}).items():
+        name = f"{prefix}{key}"
+        if isinstance(value, dict) and value:
+            pairs.extend(flatten_metadata(value, name + "."))
+        else:
+            pairs.append((name, _text(value)))
+    return pairs
+
+def _tags(metadata: Dict[str, Any]) -> List[str]:
+    for key in ("tags", "Tags", "TAGS"):
+        value = (metadata or {}).get(key)
+        if isinstance(value, str):
+            return [tag.strip() for tag in value.split(",") if tag.strip()]
+        if isinstance(value, list):
+            return [str(tag) for tag in value]
+    return []
+
+def _table_rows(table):
+    # Table models hold row dicts; ColumnarTable records materialize them lazily
+    return table.iter_rows() if hasattr(table, "iter_rows") else table.rows
+
+@dataclass
+class ExportStats:
+    run: str = ""
+    documents: int = 0
+    code_blocks: int = 0
+    table_rows: int = 0
+    deleted: int = 0
+    row_groups: int = 0
+    files: int = 0
+    bytes: int = 0
+    seconds: float = 0.0
+
+class _DatasetWriter:
+    def __init__(self, pa, schema, directory: str, format: str, row_group_size: int,
+                 max_rows_per_file: int, compression: str, stats: ExportStats):
+        self.pa = pa
+        self.schema = schema
+        self.directory = directory
+        self.format = format
+        self.row_group_size = row_group_size
+        self.max_rows_per_file = max_rows_per_file
+        self.compression = compression
+        self.stats = stats
+        self.columns: Dict[str, list] = {name: [] for name in schema.names}
+        self.buffered = 0
+        self.writer = None
+        self.path = None
+        self.file_rows = 0
+        self.part = 0
+
+    def append(self, row: Dict[str, Any]):
+        for name, column in self.columns.items():
+            column.append(row.get(name))
+        self.buffered += 1
+        if self.buffered >= self.row_group_size:
+            self.flush()
+
+    def _open(self):
+        os.makedirs(self.directory, exist_ok=True)
+        self.path = os.path.join(self.directory, f"part-{self.part:05d}{_EXTENSIONS[self.format]}")
+        self.part += 1
+        self.file_rows = 0
+        if self.format == "parquet":
+            import pyarrow.parquet as pq
+
+            self.writer = pq.ParquetWriter(self.path, self.schema, compression=self.compression)
+        else:
+            import pyarrow.ipc as ipc
+
+            options = ipc.IpcWriteOptions(compression=self.compression if self.compression in ("zstd", "lz4") else None)
+            self.writer = ipc.new_file(self.path, self.schema, options=options)
+        self.stats.files += 1
+
+    def _close_file(self):
+        if self.writer is not None:
+            self.writer.close()
+            self.stats.bytes += os.path.getsize(self.path)
+            self.writer = None
+
+    def flush(self):
+        if not self.buffered:
+            return
+        batch = self.pa.RecordBatch.from_arrays(
+            [self.pa.array(self.columns[field.name], type=field.type) for field in self.schema],
+            schema=self.schema,
+        )
+        for column in self.columns.values():
+            column.clear()
+        self.buffered = 0
+        if self.writer is None:
+            self._open()
+        # Each flush is one row group (Parquet) or record batch (IPC)
+        if self.format == "parquet":
+            self.writer.write_batch(batch, row_group_size=batch.num_rows)
+        else:
+            self.writer.write_batch(batch)
+        self.stats.row_groups += 1
+        self.file_rows += batch.num_rows
+        if self.file_rows >= self.max_rows_per_file:
+            self._close_file()
+
+    def close(self):
+        self.flush()
+        self._close_file()
+
+class CorpusWriter:
+    """Streams parsed objects into a new ``run=`` partition under ``root``.
+
+    ``write`` takes a ``MarkdownDocument``, ``SourceCode`` or ``Table`` (or
+    their compact records) with the object name it came from; ``write_result``
+    takes ingest ``IngestResult``s, including tombstones. ``format`` is
+    ``"parquet"`` or ``"arrow"`` (IPC files). Use as a context manager or call
+    ``close()``, which returns the ``ExportStats``.
+    """
+
+    def __init__(self, root: str, format: str = "parquet", run: Optional[str] = None,
+                 row_group_size: int = 10000, max_rows_per_file: int = 1000000,
+                 compression: str = "zstd"):
+        if format not in _EXTENSIONS:
+            raise ValueError(f"format must be one of {sorted(_EXTENSIONS)}, not {format!r}")
+        pa = _pyarrow()
+        self.root = root
+        self.format = format
+        self.run = run or new_run_id()
+        self.stats = ExportStats(run=self.run)
+        if any(os.path.exists(os.path.join(root, name, f"run={self.run}")) for name in DATASETS):
+            raise ValueError(f"run {self.run!r} already exists under {root}")
+        self._start = time.perf_counter()
+        self._writers = {
+            name: _DatasetWriter(pa, schema, os.path.join(root, name, f"run={self.run}"), format,
+                                 max(1, row_group_size), max(1, max_rows_per_file), compression, self.stats)
+            for name, schema in corpus_schemas().items()
+        }
+
+    def __enter__(self) -> "CorpusWriter":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+    def _code_row(self, object_name: str, block: int, source_code) -> Dict[str, Any]:
+        metadata = source_code.metadata or {}
+        error = metadata.get("error") if source_code.id == "error" else None
+        return {
+            "object_name": object_name,
+            "block": block,
+            "source_id": source_code.id,
+            "syntax": source_code.syntax,
+            "imports": list(source_code.imports),
+            "classes": list(source_code.classes),
+            "functions": [function["qualname"] for function in metadata.get("functions", ())],
+            "error": error,
+            "context": source_code.context,
+            "code": source_code.code,
+        }
+
+    def _write_tables(self, object_name: str, tables: Iterable):
+        rows = self._writers["table_rows"]
+        for index, table in enumerate(tables):
+            headers = [str(header) for header in table.headers]
+            for row_index, row in enumerate(_table_rows(table)):
+                rows.append({
+                    "object_name": object_name,
+                    "table": index,
+                    "row": row_index,
+                    "headers": headers,
+                    "cells": [(str(key), _text(value)) for key, value in row.items()],
+                })
+                self.stats.table_rows += 1
+
+    def write(self, item, object_name: str):
+        """Write one parsed object under ``object_name``."""
+        if hasattr(item, "code_blocks"):
+            kind = "document"
+            code_blocks = list(item.code_blocks)
+            self._writers["documents"].append({
+                "object_name": object_name,
+                "metadata": flatten_metadata(item.metadata),
+                "tags": _tags(item.metadata),
+                "imports": sorted({name for block in code_blocks for name in block.imports}),
+                "classes": sorted({name for block in code_blocks for name in block.classes}),
+                "tables": len(item.tables),
+                "code_blocks": len(code_blocks),
+                "blobs": [blob.uri for blob in item.blob_data],
+                "content": item.content,
+            })
+            self.stats.documents += 1
+            for index, block in enumerate(code_blocks):
+                self._writers["code"].append(self._code_row(object_name, index, block))
+                self.stats.code_blocks += 1
+            self._write_tables(object_name, item.tables)
+        elif hasattr(item, "imports") and hasattr(item, "code"):
+            kind = "code"
+            self._writers["code"].append(self._code_row(object_name, 0, item))
+            self.stats.code_blocks += 1
+        elif hasattr(item, "headers"):
+            kind = "table"
+            self._write_tables(object_name, [item])
+        else:
+            raise TypeError(f"cannot export {type(item).__name__}")
+        self._writers["objects"].append({"object_name": object_name, "kind": kind, "deleted": False})
+
+    def delete(self, object_name: str):
+        """Record that ``object_name`` no longer exists; readers drop its rows."""
+        self._writers["objects"].append({"object_name": object_name, "kind": None, "deleted": True})
+        self.stats.deleted += 1
+
+    def write_result(self, result):
+        """Write an ingest ``IngestResult``; failed parses are skipped."""
+        if result.deleted:
+            self.delete(result.object_name)
+        elif result.error is None and result.document is not None:
+            self.write(result.document, result.object_name)
+
+    def close(self) -> ExportStats:
+        for writer in self._writers.values():
+            writer.close()
+        self.stats.seconds = time.perf_counter() - self._start
+        return self.stats
+
+def export_bucket_results(results: Iterable, root: str, **kwargs) -> ExportStats:
+    """Export a stream of ingest results (``iter_bucket_results``) as one run."""
+    with CorpusWriter(root, **kwargs) as writer:
+        for result in results:
+            writer.write_result(result)
+    return writer.stats
+
+def corpus_dataset(root: str, name: str = "documents"):
+    """Open one dataset of an exported corpus as a ``pyarrow.dataset.Dataset``
+    (all runs, with the run as a ``run`` column)."""
+    _pyarrow()
+    import pyarrow.dataset as ds
+
+    if name not in DATASETS:
+        raise ValueError(f"unknown dataset {name!r}; expected one of {DATASETS}")
+    path = os.path.join(root, name)
+    schema = _with_run(corpus_schemas()[name])
+    if not os.path.isdir(path):
+        return ds.dataset([], schema=schema, format="parquet")
+    files = [os.path.join(dirpath, filename) for dirpath, _, filenames in os.walk(path) for filename in filenames]
+    formats = {"parquet" if filename.endswith(".parquet") else "ipc" for filename in files}
+    if len(formats) > 1:
+        raise ValueError(f"{path} mixes Parquet and Arrow files")
+    return ds.dataset(path, schema=schema, format=formats.pop() if formats else "parquet", partitioning="hive")
+
+def _with_run(schema):
+    pa = _pyarrow()
+    return schema.append(pa.field("run", pa.string()))
+
+def _keys(table):
+    import pyarrow.compute as pc
+
+    return pc.binary_join_element_wise(table["object_name"], table["run"], "\x00")
+
+def latest_versions(root: str):
+    """``(object_name, run)`` of the latest run of every object that still exists."""
+    objects = corpus_dataset(root, "objects").to_table(columns=["object_name", "run", "deleted"])
+    latest = objects.group_by("object_name").aggregate([("run", "max")]).rename_columns(["object_name", "run"])
+    # Drop objects whose latest run deleted them
+    deleted = objects.filter(objects["deleted"]).select(["object_name", "run"])
+    return latest.join(deleted, ["object_name", "run"], join_type="left anti")
+
+def read_corpus(root: str, name: str = "documents", columns: Optional[List[str]] = None,
+                filter=None, latest: bool = True):
+    """Read a dataset into a ``pyarrow.Table``.
+
+    With ``latest`` (the default) only rows from each object's most recent
+    run are returned and deleted objects are left out; otherwise every run is
+    read. ``filter`` is a ``pyarrow.dataset`` expression applied while scanning.
+    """
+    table = corpus_dataset(root, name).to_table(
+        columns=None if columns is None else list(dict.fromkeys(list(columns) + ["object_name", "run"])),
+        filter=filter,
+    )
+    if latest and name != "objects":
+        import pyarrow.compute as pc
+
+        # Filter on a composite key rather than joining, which keeps row order
+        # and works for the list and map columns
+        table = table.filter(pc.is_in(_keys(table), value_set=_keys(latest_versions(root))))
+    return table.select(list(columns)) if columns is not None else table
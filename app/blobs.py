@@ -0,0 +1,231 @@
+import base64
+import hashlib
+import mmap
+import os
+import posixpath
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Iterable, Iterator, List, Optional, Tuple, Union
+from urllib.parse import unquote, urlsplit
+
+from .models import Blob, MarkdownDocument
+
+# Lazy blob resolution. Documents only carry ``Blob`` references (uri, hash,
+# size, object key), never the media bytes. Resolving a blob streams it once
+# from wherever the uri points (a local file, an object in the bucket, a data:
+# uri or, if allowed, an http(s) url), hashing it on the way through; local
+# files are memory-mapped and hashed through memoryview slices without being
+# copied. Bytes are only read again when a blob is uploaded to a BlobStore.
+
+BLOB_PREFIX = "blobs"
+
+Chunk = Union[bytes, memoryview]
+
+def blob_object_key(sha256: str, prefix: str = BLOB_PREFIX) -> str:
+    return f"{prefix}/{sha256[:2]}/{sha256}"
+
+def _iter_view(view: memoryview, chunk_size: int) -> Iterator[memoryview]:
+    for start in range(0, len(view), chunk_size):
+        yield view[start:start + chunk_size]
+
+def _iter_data_uri(uri: str, chunk_size: int) -> Iterator[bytes]:
+    header, _, payload = uri.partition(",")
+    if not header.endswith(";base64"):
+        yield unquote(payload).encode("utf-8")
+        return
+    # Decode in multiples of 4 characters so the decoded pieces line up
+    step = max(4, chunk_size // 3 * 4)
+    for start in range(0, len(payload), step):
+        yield base64.b64decode(payload[start:start + step])
+
+def _digest(chunks: Iterator[Chunk]) -> Tuple[str, int]:
+    digest = hashlib.sha256()
+    size = 0
+    for chunk in chunks:
+        digest.update(chunk)
+        size += len(chunk)
+    return digest.hexdigest(), size
+
+class BlobResolver:
+    """Finds and streams the bytes behind a ``Blob`` uri.
+
+    Relative uris are resolved against ``base_dir`` on disk and against
+    ``base_key`` (the object name of the referencing document) in
+    ``bucket_name``; uris that lead outside ``base_dir`` or the bucket are
+    not resolved. Remote http(s) uris are only fetched with ``allow_remote``
+    and ``file:`` uris, which may name any local file, only with
+    ``allow_file_uris``.
+    """
+
+    def __init__(self, base_dir: Optional[str] = None, client=None, bucket_name: Optional[str] = None,
+                 base_key: str = "", allow_remote: bool = False, chunk_size: int = 1024 * 1024,
+                 allow_file_uris: bool = False):
+        self.base_dir = base_dir
+        self.client = client
+        self.bucket_name = bucket_name
+        self.base_key = base_key
+        self.allow_remote = allow_remote
+        self.chunk_size = chunk_size
+        self.allow_file_uris = allow_file_uris
+
+    def relative_to(self, object_name: str) -> "BlobResolver":
+        return BlobResolver(self.base_dir, self.client, self.bucket_name, object_name,
+                            self.allow_remote, self.chunk_size, self.allow_file_uris)
+
+    def _local_path(self, path: str) -> Optional[str]:
+        # Documents come from the bucket, so their uris are untrusted: resolve
+        # symlinks and ".." and refuse anything that leaves base_dir
+        root = os.path.realpath(self.base_dir)
+        if path.startswith("/"):
+            local = os.path.join(root, path.lstrip("/"))
+        else:
+            local = os.path.join(root, os.path.dirname(self.base_key), path)
+        local = os.path.realpath(local)
+        if os.path.commonpath([root, local]) != root or not os.path.isfile(local):
+            return None
+        return local
+
+    def locate(self, uri: str) -> Optional[Tuple[str, str]]:
+        """Return ``(kind, location)`` with kind one of data, http, file or object."""
+        if uri.startswith("data:"):
+            return "data", uri
+        parts = urlsplit(uri)
+        if parts.scheme in ("http", "https"):
+            return ("http", uri) if self.allow_remote else None
+        if parts.scheme == "file":
+            return ("file", unquote(parts.path)) if self.allow_file_uris else None
+        if parts.scheme or not parts.path:
+            # Other schemes and in-document anchors (notebook output pointers)
+            return None
+        path = unquote(parts.path)
+        if self.base_dir is not None:
+            local = self._local_path(path)
+            if local is not None:
+                return "file", local
+        if self.client is not None and self.bucket_name:
+            key = path.lstrip("/") if path.startswith("/") else \
+                posixpath.join(posixpath.dirname(self.base_key), path)
+            key = posixpath.normpath(key)
+            if key != ".." and not key.startswith("../"):
+                return "object", key
+        return None
+
+    @contextmanager
+    def open(self, blob: Blob) -> Iterator[Iterator[Chunk]]:
+        """Yield an iterator over the blob's bytes in chunks of about ``chunk_size``.
+
+        Local files are mapped, so their chunks are zero-copy ``memoryview``
+        slices that are only valid inside the ``with`` block.
+        """
+        location = self.locate(blob.uri)
+        if location is None:
+            raise FileNotFoundError(f"cannot resolve blob {blob.uri!r}")
+        kind, target = location
+        if kind == "data":
+            yield _iter_data_uri(target, self.chunk_size)
+        elif kind == "file":
+            with open(target, "rb") as f:
+                if os.fstat(f.fileno()).st_size == 0:
+                    yield iter(())
+                    return
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                    view = memoryview(mapped)
+                    try:
+                        yield _iter_view(view, self.chunk_size)
+                    finally:
+                        view.release()
+        elif kind == "object":
+            response = self.client.get_object(self.bucket_name, target)
+            try:
+                yield response.stream(self.chunk_size)
+            finally:
+                response.close()
+                response.release_conn()
+        else:
+            from urllib.request import urlopen
+
+            with urlopen(target) as response:
+                yield iter(lambda: response.read(self.chunk_size), b"")
+
+    def resolve(self, blob: Blob) -> Blob:
+        """Return a copy of ``blob`` with ``sha256``, ``size`` and ``object_key``
+        filled in. Blobs that cannot be found are returned unchanged."""
+        if blob.sha256 and blob.size is not None:
+            return blob.copy(update={"object_key": blob.object_key or blob_object_key(blob.sha256)})
+        try:
+            with self.open(blob) as chunks:
+                sha256, size = _digest(chunks)
+        except (OSError, ValueError):
+            return blob
+        update = {"sha256": sha256, "size": size, "object_key": blob_object_key(sha256)}
+        if blob.uri.startswith("data:"):
+            # Don't keep inlined media in the document; point at where a
+            # BlobStore keeps the bytes instead
+            update["uri"] = update["object_key"]
+        return blob.copy(update=update)
+
+    def resolve_all(self, blobs: Iterable[Blob], workers: int = 4) -> List[Blob]:
+        blobs = list(blobs)
+        if workers <= 1 or len(blobs) <= 1:
+            return [self.resolve(blob) for blob in blobs]
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(self.resolve, blobs))
+
+def resolve_document_blobs(document: MarkdownDocument, resolver: BlobResolver, workers: int = 4) -> MarkdownDocument:
+    """Return ``document`` with every blob reference resolved (hashed, sized and keyed)."""
+    if not document.blob_data:
+        return document
+    return document.copy(update={"blob_data": resolver.resolve_all(document.blob_data, workers)})
+
+class _ChunkReader:
+    # Adapts a chunk iterator to the ``read(n)`` interface put_object expects
+    def __init__(self, chunks: Iterator[Chunk]):
+        self._chunks = chunks
+        self._current = memoryview(b"")
+
+    def read(self, size: int = -1) -> bytes:
+        parts = []
+        while size != 0:
+            if not len(self._current):
+                chunk = next(self._chunks, None)
+                if chunk is None:
+                    break
+                self._current = memoryview(chunk)
+            take = len(self._current) if size < 0 else min(size, len(self._current))
+            parts.append(self._current[:take])
+            self._current = self._current[take:]
+            if size > 0:
+                size -= take
+        data = b"".join(parts)
+        if not len(self._current):
+            # Drop the last view so a memory-mapped source can be closed
+            self._current = memoryview(b"")
+        return data
+
+class BlobStore:
+    """Content-addressed blob storage in a bucket. A blob is uploaded at most
+    once per hash: ``put`` skips blobs whose object key already exists."""
+
+    def __init__(self, client, bucket_name: str, prefix: str = BLOB_PREFIX):
+        self.client = client
+        self.bucket_name = bucket_name
+        self.prefix = prefix
+
+    def exists(self, object_key: str) -> bool:
+        try:
+            self.client.stat_object(self.bucket_name, object_key)
+            return True
+        except Exception:
+            return False
+
+    def put(self, blob: Blob, resolver: BlobResolver) -> Blob:
+        resolved = resolver.resolve(blob)
+        if not resolved.sha256:
+            return resolved
+        object_key = blob_object_key(resolved.sha256, self.prefix)
+        resolved = resolved.copy(update={"object_key": object_key})
+        if not self.exists(object_key):
+            # Open the original reference; a resolved data: uri no longer carries the bytes
+            with resolver.open(blob) as chunks:
+                self.client.put_object(self.bucket_name, object_key, _ChunkReader(chunks), resolved.size)
+        return resolved
@@ -0,0 +1,346 @@
+import hashlib
+import sqlite3
+import threading
+from typing import Iterable, Iterator, List, Optional, Set, Tuple
+
+from pydantic import BaseModel, Field
+
+from .metrics import timed
+from .models import MarkdownDocument, SourceCode, Table
+from .markdown_stream import CodeBlock, MarkdownDocumentBuilder, TableBlock, TextChunk, iter_markdown_events
+
+# Splits parsed documents into stable, content-addressed chunks for embedding
+# and vector-store ingest. A chunk's id depends only on its kind and text, so
+# the same paragraph, table or snippet in many documents is one chunk, and an
+# edit only produces new ids for the chunks that actually changed.
+
+class Chunk(BaseModel):
+    id: str = Field(description="Content hash of the chunk kind and text.")
+    document_id: str = Field(description="Identifier of the document the chunk was taken from.")
+    kind: str = Field(description="What the chunk holds: text, table or code.")
+    section: List[str] = Field(default_factory=list, description="Heading path the chunk sits under.")
+    text: str = Field(description="The chunk text as it will be embedded.")
+    index: int = Field(description="Position of the chunk within its document.")
+
+def chunk_id(kind: str, text: str) -> str:
+    return hashlib.sha256(f"{kind}\x00{text}".encode("utf-8")).hexdigest()[:32]
+
+def split_text(text: str, max_chars: int = 1500, overlap: int = 200) -> List[str]:
+    """Split ``text`` into pieces of at most ``max_chars``, preferring paragraph
+    and line boundaries. Consecutive pieces share up to ``overlap`` characters."""
+    text = text.strip()
+    if len(text) <= max_chars:
+        return [text] if text else []
+    overlap = max(0, min(overlap, max_chars // 2))
+    pieces = []
+    start = 0
+    while start < len(text):
+        end = min(start + max_chars, len(text))
+        if end < len(text):
+            # Prefer a paragraph break, then a line break, then a space
+            for separator in ("\n\n", "\n", " "):
+                cut = text.rfind(separator, start + overlap + 1, end)
+                if cut != -1:
+                    end = cut
+                    break
+        piece = text[start:end].strip()
+        if piece:
+            pieces.append(piece)
+        if end >= len(text):
+            break
+        start = max(end - overlap, start + 1)
+    return pieces
+
+def render_table(table: Table) -> str:
+    lines = ["| " + " | ".join(table.headers) + " |", "|" + "---|" * len(table.headers)]
+    for row in table.rows:
+        lines.append("| " + " | ".join("" if row.get(h) is None else str(row.get(h)) for h in table.headers) + " |")
+    return "\n".join(lines)
+
+def _table_pieces(table: Table, max_chars: int) -> Iterator[str]:
+    # Large tables are split by rows, repeating the header in every piece
+    header = render_table(Table(headers=table.headers, rows=[]))
+    rows = render_table(table).split("\n")[2:]
+    piece = []
+    size = len(header)
+    for row in rows:
+        if piece and size + len(row) + 1 > max_chars:
+            yield header + "\n" + "\n".join(piece)
+            piece, size = [], len(header)
+        piece.append(row)
+        size += len(row) + 1
+    if piece or not rows:
+        yield header + ("\n" + "\n".join(piece) if piece else "")
+
+class _Chunker:
+    def __init__(self, document_id: str, max_chars: int, overlap: int):
+        self.document_id = document_id
+        self.max_chars = max_chars
+        self.overlap = overlap
+        self.index = 0
+
+    def make(self, kind: str, text: str, section: List[str]) -> Chunk:
+        chunk = Chunk(id=chunk_id(kind, text), document_id=self.document_id, kind=kind,
+                      section=list(section), text=text, index=self.index)
+        self.index += 1
+        return chunk
+
+    def text(self, text: str, section: List[str] = ()) -> Iterator[Chunk]:
+        for piece in split_text(text, self.max_chars, self.overlap):
+            yield self.make("text", piece, section)
+
+    def table(self, table: Table, section: List[str] = ()) -> Iterator[Chunk]:
+        for piece in _table_pieces(table, self.max_chars):
+            yield self.make("table", piece, section)
+
+    def code(self, source_code: SourceCode, section: List[str] = ()) -> Iterator[Chunk]:
+        for piece in split_text(source_code.code, self.max_chars, self.overlap):
+            yield self.make("code", piece, section)
+
+def document_key(document: MarkdownDocument) -> str:
+    return hashlib.sha256(document.json().encode("utf-8")).hexdigest()[:32]
+
+def chunk_markdown_document(document: MarkdownDocument, document_id: Optional[str] = None,
+                            max_chars: int = 1500, overlap: int = 200) -> List[Chunk]:
+    """Chunk an already-built document: content at paragraph and size
+    boundaries, then one or more chunks per table and per code block."""
+    chunker = _Chunker(document_id or document_key(document), max_chars, overlap)
+    # Documents from the Unstructured loader join elements with a literal "\n"
+    content = document.content.replace("\\n", "\n")
+    chunks = list(chunker.text(content))
+    for table in document.tables:
+        chunks.extend(chunker.table(table))
+    for source_code in document.code_blocks:
+        chunks.extend(chunker.code(source_code))
+    return chunks
+
+def chunk_markdown_events(events: Iterable, document_id: str, max_chars: int = 1500,
+                          overlap: int = 200) -> Iterator[Chunk]:
+    """Chunk a Markdown event stream so chunks never span a heading and carry
+    the heading path they belong to."""
+    chunker = _Chunker(document_id, max_chars, overlap)
+    section = []
+    pending = []
+
+    def flush():
+        if pending:
+            yield from chunker.text("\n\n".join(pending), section)
+            pending.clear()
+
+    for event in events:
+        if isinstance(event, TextChunk):
+            if event.heading:
+                yield from flush()
+                section = event.section
+            else:
+                pending.append(event.text)
+        elif isinstance(event, TableBlock):
+            yield from flush()
+            yield from chunker.table(event.table, section)
+        elif isinstance(event, CodeBlock):
+            yield from flush()
+            if event.source_code is not None:
+                yield from chunker.code(event.source_code, section)
+            else:
+                yield from chunker.text(event.text, section)
+    yield from flush()
+
+def chunk_markdown(source, document_id: str, max_chars: int = 1500, overlap: int = 200) -> Iterator[Chunk]:
+    """Chunk Markdown from a string, bytes or file object (see ``chunk_markdown_events``)."""
+    return chunk_markdown_events(iter_markdown_events(source), document_id, max_chars, overlap)
+
+class ChunkedMarkdown(BaseModel):
+    document: MarkdownDocument
+    chunks: List[Chunk]
+
+@timed("markdown")
+def parse_markdown_chunks(source, max_chars: int = 1500, overlap: int = 200) -> ChunkedMarkdown:
+    """Build the ``MarkdownDocument`` and its heading-aware chunks in one pass
+    over the events. The built document no longer knows where its headings
+    were, so ingest chunks here rather than from the document. Chunks have an
+    empty ``document_id`` until ``changed_chunks`` assigns the object name."""
+    builder = MarkdownDocumentBuilder()
+
+    def events():
+        for event in iter_markdown_events(source):
+            builder.add(event)
+            yield event
+
+    chunks = list(chunk_markdown_events(events(), "", max_chars, overlap))
+    return ChunkedMarkdown(document=builder.build(), chunks=chunks)
+
+def parse_markdown_chunks_bytes(data: bytes):
+    """Bucket pipeline parser (see ``ingest.iter_bucket_results``) that also
+    chunks each document, so ``changed_chunks`` gets heading-aware chunks."""
+    from .ingest import Parsed
+    from .parse_cache import default_cache
+
+    parsed = default_cache.get_or_parse("markdown-chunks", data.decode("utf-8"), ChunkedMarkdown,
+                                        parse_markdown_chunks)
+    return Parsed(document=parsed.document, chunks=parsed.chunks)
+
+def changed_chunks(results: Iterable, store: "ChunkStore", max_chars: int = 1500,
+                   overlap: int = 200) -> Iterator[Tuple[str, List[Chunk], List[str], List[Tuple[str, str]]]]:
+    """Turn ingest results into ``(object name, new chunks, removed chunk ids,
+    moved chunks)`` updates; see ``ChunkStore.change`` for ``moved``. The
+    updates are only staged: ``store.commit()`` them once they are ingested.
+
+    Results parsed with ``parse_markdown_chunks_bytes`` carry their chunks;
+    others are chunked from the built document, without section paths.
+    """
+    for result in results:
+        if result.deleted:
+            yield (result.object_name,) + store.change(result.object_name, [])
+        elif result.error is None:
+            if getattr(result, "chunks", None) is not None:
+                chunks = [chunk.copy(update={"document_id": result.object_name}) for chunk in result.chunks]
+            else:
+                chunks = chunk_markdown_document(result.document, result.object_name, max_chars, overlap)
+            yield (result.object_name,) + store.change(result.object_name, chunks)
+
+class ChunkStore:
+    """Tracks which chunk ids each document currently has.
+
+    ``update`` returns only the chunks that are new to the store (so only they
+    go on to embedding and ingest) and the ids that are no longer referenced by
+    any document (so they can be purged downstream).
+
+    A shared chunk is stored once downstream with the ``document_id`` of the
+    document it was first sent for, its owner. When the owner drops the chunk
+    while other documents still contain it, ``change`` reports it as moved to
+    one of those documents so the stored reference can be updated.
+
+    ``change`` only stages a document's new chunk ids; ``commit`` persists
+    them once the updates have been ingested, leaving out failed documents.
+    """
+
+    def __init__(self, path: str = ":memory:"):
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS document_chunks (
+                document_id TEXT NOT NULL,
+                chunk_id TEXT NOT NULL,
+                PRIMARY KEY (document_id, chunk_id)
+            );
+            CREATE INDEX IF NOT EXISTS document_chunks_chunk ON document_chunks (chunk_id);
+            CREATE TABLE IF NOT EXISTS chunk_owners (
+                chunk_id TEXT PRIMARY KEY,
+                document_id TEXT NOT NULL
+            );
+        """)
+        self._conn.commit()
+        self._staged: List[Tuple[str, List[Chunk], Set[str]]] = []
+
+    def _known(self, chunk_id: str) -> bool:
+        return self._conn.execute(
+            "SELECT 1 FROM document_chunks WHERE chunk_id = ? LIMIT 1", (chunk_id,)
+        ).fetchone() is not None
+
+    def _apply(self, document_id: str, chunks: List[Chunk]):
+        # Writes the change into the open transaction; the caller holds the lock
+        old_ids = {row[0] for row in self._conn.execute(
+            "SELECT chunk_id FROM document_chunks WHERE document_id = ?", (document_id,)
+        )}
+        new_chunks = []
+        seen = set()
+        for chunk in chunks:
+            if chunk.id in seen:
+                continue
+            seen.add(chunk.id)
+            if chunk.id not in old_ids and not self._known(chunk.id):
+                new_chunks.append(chunk)
+        self._conn.execute("DELETE FROM document_chunks WHERE document_id = ?", (document_id,))
+        self._conn.executemany(
+            "INSERT INTO document_chunks VALUES (?, ?)", ((document_id, chunk_id) for chunk_id in seen)
+        )
+        self._conn.executemany(
+            "INSERT OR REPLACE INTO chunk_owners VALUES (?, ?)", ((chunk.id, document_id) for chunk in new_chunks)
+        )
+        removed, moved = [], []
+        for chunk_id in sorted(old_ids - seen):
+            holder = self._conn.execute(
+                "SELECT document_id FROM document_chunks WHERE chunk_id = ? ORDER BY document_id LIMIT 1",
+                (chunk_id,)
+            ).fetchone()
+            if holder is None:
+                removed.append(chunk_id)
+                self._conn.execute("DELETE FROM chunk_owners WHERE chunk_id = ?", (chunk_id,))
+                continue
+            owner = self._conn.execute(
+                "SELECT document_id FROM chunk_owners WHERE chunk_id = ?", (chunk_id,)
+            ).fetchone()
+            # Stores written before owners were tracked have no row; move
+            # those too so the downstream reference is known to be live
+            if owner is None or owner[0] == document_id:
+                self._conn.execute("INSERT OR REPLACE INTO chunk_owners VALUES (?, ?)", (chunk_id, holder[0]))
+                moved.append((chunk_id, holder[0]))
+        return new_chunks, removed, moved, old_ids | seen
+
+    def change(self, document_id: str, chunks: Iterable[Chunk]) -> Tuple[List[Chunk], List[str], List[Tuple[str, str]]]:
+        """Stage replacing the chunks of ``document_id`` and return ``(new
+        chunks, removed chunk ids, [(moved chunk id, new owner document id)])``.
+
+        Later changes see the staged ones, but nothing is persisted until
+        ``commit``, so call that once the update has been ingested.
+        """
+        chunks = list(chunks)
+        with self._lock:
+            new_chunks, removed, moved, touched = self._apply(document_id, chunks)
+            self._staged.append((document_id, chunks, touched))
+        return new_chunks, removed, moved
+
+    def commit(self, failed: Iterable[str] = ()) -> Set[str]:
+        """Persist the staged changes except those of the ``failed`` documents.
+
+        A staged document sharing a chunk with a left-out one was diffed
+        against state that is being dropped, so it is left out as well.
+        Returns the documents left out; they should be ingested again.
+        """
+        with self._lock:
+            dropped = set(failed)
+            dropped_ids = set()
+            grown = True
+            while grown:
+                grown = False
+                for document_id, _, touched in self._staged:
+                    if document_id in dropped and not touched <= dropped_ids:
+                        dropped_ids |= touched
+                        grown = True
+                    elif document_id not in dropped and touched & dropped_ids:
+                        dropped.add(document_id)
+                        grown = True
+            if any(document_id in dropped for document_id, _, _ in self._staged):
+                self._conn.rollback()
+                for document_id, chunks, _ in self._staged:
+                    if document_id not in dropped:
+                        self._apply(document_id, chunks)
+            self._conn.commit()
+            self._staged = []
+        return dropped
+
+    def rollback(self):
+        with self._lock:
+            self._conn.rollback()
+            self._staged = []
+
+    def update(self, document_id: str, chunks: Iterable[Chunk]) -> Tuple[List[Chunk], List[str]]:
+        # change and commit in one step, for callers with nothing to wait on
+        change = self.change(document_id, chunks)[:2]
+        self.commit()
+        return change
+
+    def remove(self, document_id: str) -> List[str]:
+        return self.update(document_id, [])[1]
+
+    def owner(self, chunk_id: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute("SELECT document_id FROM chunk_owners WHERE chunk_id = ?", (chunk_id,)).fetchone()
+        return row[0] if row else None
+
+    def __contains__(self, chunk_id: str) -> bool:
+        with self._lock:
+            return self._known(chunk_id)
+
+    def close(self):
+        self._conn.close()
@@ -0,0 +1,221 @@
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import time
+from array import array
+from dataclasses import dataclass
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from .metrics import metrics
+
+# Embedding stage between chunking and vector-store ingest. Texts are batched
+# up to an item and token budget before they reach the embedder, and vectors
+# are cached on disk keyed by (model name, content hash), so re-ingesting an
+# unchanged bucket embeds nothing. The cache keeps vectors as raw float32 in
+# one append-only file with a SQLite index of offsets, about a quarter of the
+# size of JSON lists and readable without parsing.
+
+_TOKEN = re.compile(r"\w+")
+
+def content_key(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+def estimate_tokens(text: str) -> int:
+    # Roughly four characters per token for English text and code
+    return max(1, len(text) // 4)
+
+class HashingEmbedder:
+    """Deterministic, offline embedder: signed feature hashing of word tokens,
+    L2-normalised. Useful for tests and as a stand-in when no model is configured."""
+
+    def __init__(self, dimension: int = 256):
+        self.dimension = dimension
+        self.model_name = f"hashing-{dimension}"
+
+    def embed_one(self, text: str) -> array:
+        vector = array("f", bytes(4 * self.dimension))
+        for token in _TOKEN.findall(text.lower()):
+            h = int.from_bytes(hashlib.blake2b(token.encode("utf-8"), digest_size=8).digest(), "little")
+            vector[h % self.dimension] += 1.0 if (h >> 63) else -1.0
+        norm = sum(value * value for value in vector) ** 0.5
+        if norm:
+            for i, value in enumerate(vector):
+                vector[i] = value / norm
+        return vector
+
+    def embed(self, texts: List[str]) -> List[array]:
+        return [self.embed_one(text) for text in texts]
+
+class OpenAIEmbedder:
+    """Embeds through the OpenAI embeddings API; the client is created on first use."""
+
+    def __init__(self, model_name: str = "text-embedding-3-small", api_key: Optional[str] = None):
+        self.model_name = model_name
+        self.api_key = api_key
+        self._client = None
+
+    def embed(self, texts: List[str]) -> List[List[float]]:
+        if self._client is None:
+            from openai import OpenAI
+
+            self._client = OpenAI(api_key=self.api_key or os.environ.get("OPENAI_API_KEY"))
+        response = self._client.embeddings.create(model=self.model_name, input=texts)
+        return [item.embedding for item in sorted(response.data, key=lambda item: item.index)]
+
+def get_embedder(model_name: Optional[str] = None):
+    """``hashing-<dimension>`` gives a HashingEmbedder, anything else an OpenAIEmbedder."""
+    model_name = model_name or os.environ.get("EMBEDDING_MODEL") or "hashing-256"
+    if model_name.startswith("hashing"):
+        _, _, dimension = model_name.partition("-")
+        return HashingEmbedder(int(dimension) if dimension else 256)
+    return OpenAIEmbedder(model_name)
+
+class EmbeddingCache:
+    """On-disk vector cache: ``vectors.f32`` holds the float32 values back to back
+    and ``index.sqlite`` maps (model, content key) to an offset and dimension."""
+
+    def __init__(self, directory: str):
+        os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._vectors = open(os.path.join(directory, "vectors.f32"), "a+b")
+        self._conn = sqlite3.connect(os.path.join(directory, "index.sqlite"), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS vectors (
+                model TEXT NOT NULL,
+                key TEXT NOT NULL,
+                offset INTEGER NOT NULL,
+                dimension INTEGER NOT NULL,
+                PRIMARY KEY (model, key)
+            )
+        """)
+        self._conn.commit()
+
+    def get_many(self, model_name: str, keys: Sequence[str]) -> Dict[str, array]:
+        found = {}
+        keys = list(keys)
+        with self._lock:
+            for start in range(0, len(keys), 500):
+                batch = keys[start:start + 500]
+                rows = self._conn.execute(
+                    f"SELECT key, offset, dimension FROM vectors WHERE model = ? AND key IN ({','.join('?' * len(batch))})",
+                    [model_name, *batch],
+                ).fetchall()
+                for key, offset, dimension in sorted(rows, key=lambda row: row[1]):
+                    self._vectors.seek(offset)
+                    vector = array("f")
+                    vector.frombytes(self._vectors.read(4 * dimension))
+                    found[key] = vector
+        return found
+
+    def put_many(self, model_name: str, vectors: Dict[str, Sequence[float]]):
+        with self._lock:
+            self._vectors.seek(0, os.SEEK_END)
+            rows = []
+            for key, values in vectors.items():
+                vector = values if isinstance(values, array) and values.typecode == "f" else array("f", values)
+                rows.append((model_name, key, self._vectors.tell(), len(vector)))
+                vector.tofile(self._vectors)
+            self._vectors.flush()
+            self._conn.executemany("INSERT OR REPLACE INTO vectors VALUES (?, ?, ?, ?)", rows)
+            self._conn.commit()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM vectors").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._vectors.close()
+            self._conn.close()
+
+@dataclass
+class EmbeddingStats:
+    texts: int = 0
+    hits: int = 0
+    misses: int = 0
+    batches: int = 0
+    seconds: float = 0.0
+
+    @property
+    def hit_rate(self) -> float:
+        return self.hits / self.texts if self.texts else 0.0
+
+class EmbeddingStage:
+    """Embeds texts through ``embedder`` with caching and batching.
+
+    A batch sent to the embedder holds at most ``max_batch_items`` texts and
+    about ``max_batch_tokens`` tokens; duplicate texts are embedded once.
+    """
+
+    def __init__(self, embedder, cache: Optional[EmbeddingCache] = None,
+                 max_batch_items: int = 64, max_batch_tokens: int = 8000):
+        self.embedder = embedder
+        self.cache = cache
+        self.max_batch_items = max_batch_items
+        self.max_batch_tokens = max_batch_tokens
+        self.dimension: Optional[int] = None
+        self.stats = EmbeddingStats()
+
+    def _batches(self, items: List[Tuple[str, str]]) -> Iterator[List[Tuple[str, str]]]:
+        batch, tokens = [], 0
+        for key, text in items:
+            size = estimate_tokens(text)
+            if batch and (len(batch) >= self.max_batch_items or tokens + size > self.max_batch_tokens):
+                yield batch
+                batch, tokens = [], 0
+            batch.append((key, text))
+            tokens += size
+        if batch:
+            yield batch
+
+    def embed(self, texts: Sequence[str]) -> List[array]:
+        keys = [content_key(text) for text in texts]
+        model_name = self.embedder.model_name
+        vectors = self.cache.get_many(model_name, set(keys)) if self.cache is not None else {}
+        missing = {}
+        for key, text in zip(keys, texts):
+            if key not in vectors:
+                missing.setdefault(key, text)
+        self.stats.texts += len(texts)
+        self.stats.misses += len(missing)
+        self.stats.hits += len(texts) - len(missing)
+        metrics.inc("cache_requests_total", len(texts) - len(missing), cache="embedding", result="hit")
+        metrics.inc("cache_requests_total", len(missing), cache="embedding", result="miss")
+
+        for batch in self._batches(list(missing.items())):
+            start = time.perf_counter()
+            embedded = self.embedder.embed([text for _, text in batch])
+            elapsed = time.perf_counter() - start
+            self.stats.seconds += elapsed
+            metrics.observe("stage_seconds", elapsed, stage="embed")
+            self.stats.batches += 1
+            new_vectors = {}
+            for (key, _), values in zip(batch, embedded):
+                vector = values if isinstance(values, array) else array("f", values)
+                if self.dimension is None:
+                    self.dimension = len(vector)
+                elif len(vector) != self.dimension:
+                    raise ValueError(f"{model_name} returned a {len(vector)}-dimensional vector, expected {self.dimension}")
+                new_vectors[key] = vector
+            if self.cache is not None:
+                self.cache.put_many(model_name, new_vectors)
+            vectors.update(new_vectors)
+        return [vectors[key] for key in keys]
+
+    def embed_chunks(self, chunks: Iterable, window: int = 256) -> Iterator[Tuple[object, array]]:
+        """Yield ``(chunk, vector)`` pairs, embedding ``window`` chunks at a time."""
+        chunks = iter(chunks)
+        while True:
+            batch = list(islice(chunks, window))
+            if not batch:
+                return
+            yield from zip(batch, self.embed([chunk.text for chunk in batch]))
+
+    def embed_chunk_updates(self, updates: Iterable) -> Iterator[Tuple]:
+        """Attach vectors to the new chunks of ``chunking.changed_chunks`` updates."""
+        for object_name, new_chunks, removed, *moved in updates:
+            yield (object_name, list(self.embed_chunks(new_chunks)), removed, *moved)
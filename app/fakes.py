@@ -0,0 +1,233 @@
+import asyncio
+import hashlib
+import os
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Iterator, Optional
+
+# Local stand-ins for the remote services used by the ingest scripts, so the
+# pipeline can be exercised and benchmarked without a running MinIO server.
+
+@dataclass
+class FakeObject:
+    bucket_name: str
+    object_name: str
+    etag: str
+    size: int
+    last_modified: datetime
+    is_dir: bool = False
+
+class FakeResponse:
+    def __init__(self, path: str):
+        self._file = open(path, "rb")
+
+    def read(self, amt: Optional[int] = None) -> bytes:
+        return self._file.read() if amt is None else self._file.read(amt)
+
+    def stream(self, amt: int = 64 * 1024) -> Iterator[bytes]:
+        while True:
+            chunk = self.read(amt)
+            if not chunk:
+                break
+            yield chunk
+
+    def close(self):
+        self._file.close()
+
+    def release_conn(self):
+        pass
+
+class FilesystemMinioClient:
+    """A filesystem-backed client exposing the subset of the ``minio.Minio`` API we use.
+
+    Each bucket is a directory under ``root``; object names are paths relative
+    to the bucket directory. ``latency`` adds a per-request delay to simulate
+    network round trips.
+    """
+
+    def __init__(self, root: str, latency: float = 0.0):
+        self.root = root
+        self.latency = latency
+
+    def _bucket_path(self, bucket_name: str) -> str:
+        return os.path.join(self.root, bucket_name)
+
+    def _object_path(self, bucket_name: str, object_name: str) -> str:
+        return os.path.join(self._bucket_path(bucket_name), *object_name.split("/"))
+
+    def _stat(self, bucket_name: str, object_name: str) -> FakeObject:
+        path = self._object_path(bucket_name, object_name)
+        st = os.stat(path)
+        # Real ETags are content MD5s for single-part uploads; derive one from
+        # size and mtime so listing stays cheap on large trees.
+        etag = hashlib.md5(f"{st.st_size}:{st.st_mtime_ns}".encode()).hexdigest()
+        return FakeObject(
+            bucket_name=bucket_name,
+            object_name=object_name,
+            etag=etag,
+            size=st.st_size,
+            last_modified=datetime.fromtimestamp(st.st_mtime, tz=timezone.utc),
+        )
+
+    def bucket_exists(self, bucket_name: str) -> bool:
+        return os.path.isdir(self._bucket_path(bucket_name))
+
+    def list_objects(self, bucket_name: str, prefix: Optional[str] = None, recursive: bool = False) -> Iterator[FakeObject]:
+        bucket_path = self._bucket_path(bucket_name)
+        for root, dirs, files in os.walk(bucket_path):
+            dirs.sort()
+            rel_root = os.path.relpath(root, bucket_path)
+            rel_root = "" if rel_root == "." else rel_root.replace(os.sep, "/") + "/"
+            for name in sorted(files):
+                object_name = rel_root + name
+                if prefix and not object_name.startswith(prefix):
+                    continue
+                yield self._stat(bucket_name, object_name)
+            if not recursive:
+                for name in dirs:
+                    yield FakeObject(bucket_name, rel_root + name + "/", "", 0, None, is_dir=True)
+                break
+
+    def stat_object(self, bucket_name: str, object_name: str) -> FakeObject:
+        return self._stat(bucket_name, object_name)
+
+    def get_object(self, bucket_name: str, object_name: str) -> FakeResponse:
+        if self.latency:
+            time.sleep(self.latency)
+        return FakeResponse(self._object_path(bucket_name, object_name))
+
+    def put_object(self, bucket_name: str, object_name: str, data, length: int,
+                   content_type: str = "application/octet-stream", part_size: int = 0):
+        if self.latency:
+            time.sleep(self.latency)
+        path = self._object_path(bucket_name, object_name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as f:
+            while True:
+                chunk = data.read(64 * 1024)
+                if not chunk:
+                    break
+                f.write(chunk)
+        return self._stat(bucket_name, object_name)
+
+class _InMemorySchema:
+    def __init__(self):
+        self.classes = {}
+
+    def exists(self, class_name: str) -> bool:
+        return class_name in self.classes
+
+    def create_class(self, class_definition: dict):
+        self.classes[class_definition["class"]] = class_definition
+
+    def get(self, class_name: Optional[str] = None) -> dict:
+        if class_name is not None:
+            return self.classes[class_name]
+        return {"classes": list(self.classes.values())}
+
+class _InMemoryBatch:
+    def __init__(self, client: "InMemoryWeaviateClient"):
+        self._client = client
+        self._queue = []
+
+    def configure(self, **kwargs):
+        return self
+
+    def add_data_object(self, data_object: dict, class_name: str, uuid: Optional[str] = None, vector=None):
+        self._queue.append((data_object, class_name, uuid, vector))
+
+    def create_objects(self) -> list:
+        queue, self._queue = self._queue, []
+        client = self._client
+        client.batches.append(len(queue))
+        if client.latency:
+            time.sleep(client.latency * len(queue))
+        results = []
+        for data_object, class_name, uuid, vector in queue:
+            result = {"id": uuid, "class": class_name, "properties": data_object, "result": {}}
+            remaining = client.failures.get(uuid, 0)
+            if remaining:
+                client.failures[uuid] = remaining - 1
+                result["result"] = {"errors": {"error": [{"message": "injected failure"}]}}
+            elif class_name not in client.schema.classes:
+                result["result"] = {"errors": {"error": [{"message": f"class {class_name} not found"}]}}
+            else:
+                client.objects.setdefault(class_name, {})[uuid] = {"properties": data_object, "vector": vector}
+            results.append(result)
+        return results
+
+class _InMemoryDataObject:
+    def __init__(self, client: "InMemoryWeaviateClient"):
+        self._client = client
+
+    def get_by_id(self, uuid: str, class_name: Optional[str] = None) -> Optional[dict]:
+        for name, objects in self._client.objects.items():
+            if (class_name is None or name == class_name) and uuid in objects:
+                return objects[uuid]
+        return None
+
+    def update(self, data_object: dict, class_name: str, uuid: str):
+        # Merges properties into an existing object, like a PATCH
+        stored = self._client.objects.get(class_name, {}).get(uuid)
+        if stored is None:
+            raise KeyError(uuid)
+        stored["properties"] = dict(stored["properties"], **data_object)
+
+    def delete(self, uuid: str, class_name: Optional[str] = None):
+        for name, objects in self._client.objects.items():
+            if class_name is None or name == class_name:
+                objects.pop(uuid, None)
+
+class InMemoryWeaviateClient:
+    """An in-memory stand-in for ``weaviate.Client`` implementing the schema,
+    batch and data object calls used by the Weaviate sink.
+
+    ``failures`` maps object UUIDs to the number of times their insert should
+    fail; ``latency`` adds a per-object delay to every batch request.
+    """
+
+    def __init__(self, latency: float = 0.0, failures: Optional[dict] = None):
+        self.latency = latency
+        self.failures = dict(failures or {})
+        self.objects = {}
+        self.batches = []
+        self.schema = _InMemorySchema()
+        self.batch = _InMemoryBatch(self)
+        self.data_object = _InMemoryDataObject(self)
+
+class FakeLLM:
+    """A deterministic stand-in for an LLM: answers from ``responses`` (a dict
+    of prompt -> answer, or a callable) or echoes a digest of the prompt."""
+
+    def __init__(self, responses=None, latency: float = 0.0, model_name: str = "fake-llm"):
+        self.responses = responses
+        self.latency = latency
+        self.model_name = model_name
+        self.prompts = []
+        self._lock = threading.Lock()
+
+    def _answer(self, prompt) -> str:
+        text = prompt if isinstance(prompt, str) else str(prompt)
+        with self._lock:
+            self.prompts.append(text)
+        if callable(self.responses):
+            return self.responses(text)
+        if self.responses is not None and text in self.responses:
+            return self.responses[text]
+        return "response:" + hashlib.sha256(text.encode("utf-8")).hexdigest()[:12]
+
+    def invoke(self, prompt, **kwargs) -> str:
+        if self.latency:
+            time.sleep(self.latency)
+        return self._answer(prompt)
+
+    async def ainvoke(self, prompt, **kwargs) -> str:
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return self._answer(prompt)
+
+    @property
+    def calls(self) -> int:
+        return len(self.prompts)
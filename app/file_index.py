@@ -0,0 +1,115 @@
+import os
+from typing import Dict, List, Optional, Tuple
+
+# Filename index over a bucket mirror, so resolving a table row to its note is
+# a dict lookup instead of an os.walk of the whole tree.
+
+class FileIndex:
+    """Maps file names to their paths under ``root``.
+
+    ``refresh`` only re-lists directories whose mtime changed since the last
+    scan (adding, removing or renaming an entry updates the parent directory's
+    mtime), so keeping the index current costs one ``stat`` per directory.
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+        self._by_name: Dict[str, List[str]] = {}
+        self._by_lower: Dict[str, List[str]] = {}
+        # directory -> (mtime_ns, file names, subdirectories)
+        self._dirs: Dict[str, Tuple[int, List[str], List[str]]] = {}
+        self.refresh()
+
+    def _add(self, directory: str, name: str):
+        path = os.path.join(directory, name)
+        self._by_name.setdefault(name, []).append(path)
+        self._by_lower.setdefault(name.lower(), []).append(path)
+
+    def _discard(self, directory: str, name: str):
+        path = os.path.join(directory, name)
+        for index, key in ((self._by_name, name), (self._by_lower, name.lower())):
+            paths = index.get(key)
+            if paths is None:
+                continue
+            try:
+                paths.remove(path)
+            except ValueError:
+                pass
+            if not paths:
+                del index[key]
+
+    def _forget(self, directory: str):
+        _, files, _ = self._dirs.pop(directory)
+        for name in files:
+            self._discard(directory, name)
+
+    def _scan(self, directory: str, mtime_ns: int) -> List[str]:
+        files, subdirs = [], []
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        subdirs.append(entry.path)
+                    elif entry.is_file():
+                        files.append(entry.name)
+        except OSError:
+            return []
+        if directory in self._dirs:
+            self._forget(directory)
+        for name in files:
+            self._add(directory, name)
+        self._dirs[directory] = (mtime_ns, files, subdirs)
+        return subdirs
+
+    def refresh(self) -> "FileIndex":
+        visited = set()
+        stack = [self.root]
+        while stack:
+            directory = stack.pop()
+            visited.add(directory)
+            try:
+                mtime_ns = os.stat(directory).st_mtime_ns
+            except OSError:
+                continue
+            cached = self._dirs.get(directory)
+            if cached is not None and cached[0] == mtime_ns:
+                stack.extend(cached[2])
+            else:
+                stack.extend(self._scan(directory, mtime_ns))
+        for directory in [d for d in self._dirs if d not in visited]:
+            self._forget(directory)
+        for paths in self._by_name.values():
+            paths.sort()
+        for paths in self._by_lower.values():
+            paths.sort()
+        return self
+
+    def lookup_all(self, name: str, case_sensitive: bool = True) -> List[str]:
+        if case_sensitive:
+            return list(self._by_name.get(name, ()))
+        return list(self._by_lower.get(name.lower(), ()))
+
+    def lookup(self, name: str, case_sensitive: bool = True) -> Optional[str]:
+        paths = self._by_name.get(name) if case_sensitive else self._by_lower.get(name.lower())
+        return paths[0] if paths else None
+
+    def duplicates(self, case_sensitive: bool = True) -> Dict[str, List[str]]:
+        index = self._by_name if case_sensitive else self._by_lower
+        return {name: list(paths) for name, paths in index.items() if len(paths) > 1}
+
+    def __len__(self) -> int:
+        return sum(len(paths) for paths in self._by_name.values())
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._by_name
+
+_indexes: Dict[str, FileIndex] = {}
+
+def get_file_index(root: str, refresh: bool = False) -> FileIndex:
+    """Return the shared index for ``root``, building it on first use."""
+    index = _indexes.get(root)
+    if index is None:
+        index = _indexes[root] = FileIndex(root)
+    elif refresh:
+        index.refresh()
+    return index
@@ -0,0 +1,290 @@
+import queue
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, Iterator, Optional
+
+from .metrics import metrics
+
+# Bucket ingest pipeline: list -> fetch -> parse -> sink.
+#
+# Listing runs on one thread, fetching on ``fetch_workers`` threads (the number
+# of in-flight GET requests), and parsing on a process pool because the
+# YAML/AST/table work is CPU bound. Stages are joined by bounded queues so the
+# number of objects held in memory never exceeds roughly
+# ``queue_size * 3 + fetch_workers`` regardless of the bucket size.
+#
+# With an ``ObjectManifest`` the listing stage skips objects whose ETag, size
+# and last-modified time are unchanged since the last run, and objects that
+# disappeared from the bucket are reported as tombstones (``deleted=True``).
+# The pipeline never records anything itself: the sink acknowledges each
+# result once it has it (``ObjectManifest.acknowledge``), so results that are
+# buffered, batched or fail downstream are fetched again on the next run.
+
+_DONE = object()
+
+@dataclass
+class IngestResult:
+    object_name: str
+    etag: Optional[str] = None
+    size: int = 0
+    last_modified: Any = None
+    document: Any = None
+    error: Optional[str] = None
+    deleted: bool = False
+    chunks: Any = None
+
+@dataclass
+class Parsed:
+    # A parser may return this instead of a bare document to hand derived
+    # data (currently chunks, see chunking.parse_markdown_chunks_bytes) to
+    # the consumer alongside it
+    document: Any
+    chunks: Any = None
+
+def parse_markdown_bytes(data: bytes):
+    # Imported here so worker processes only pay for the parser on first use.
+    # Each worker keeps its own in-memory cache tier; the disk tier is shared.
+    from .parse_cache import cached_parse_markdown_content
+    return cached_parse_markdown_content(data.decode("utf-8"))
+
+def parse_markdown_record_bytes(data: bytes):
+    # parse_markdown_bytes returning a compact DocumentRecord (see records.py),
+    # for callers that hold many documents at once. Built without the models,
+    # so it bypasses the parse cache, which stores serialized models
+    from .records import parse_markdown_record
+    return parse_markdown_record(data)
+
+def _timed_parse(parser: Callable[[bytes], Any], data: bytes):
+    # Runs in the worker process; the duration travels back with the document
+    # so the parse stage is recorded in the parent's metrics
+    start = time.perf_counter()
+    return parser(data), time.perf_counter() - start
+
+def _put(q: queue.Queue, item, stop: threading.Event) -> bool:
+    while not stop.is_set():
+        try:
+            q.put(item, timeout=0.1)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+def _get(q: queue.Queue, stop: threading.Event):
+    while not stop.is_set():
+        try:
+            return q.get(timeout=0.1)
+        except queue.Empty:
+            continue
+    return _DONE
+
+def _list_stage(client, bucket_name: str, prefix: Optional[str], object_filter: Optional[Callable],
+                manifest, listed: queue.Queue, fetch_workers: int, stop: threading.Event, errors: list):
+    try:
+        for obj in client.list_objects(bucket_name, prefix=prefix, recursive=True):
+            if getattr(obj, "is_dir", False):
+                continue
+            if object_filter is not None and not object_filter(obj):
+                continue
+            if manifest is not None:
+                manifest.mark_seen(bucket_name, obj.object_name)
+                if manifest.is_current(bucket_name, obj):
+                    continue
+            if not _put(listed, obj, stop):
+                return
+    except Exception as e:
+        errors.append(e)
+    finally:
+        for _ in range(fetch_workers):
+            _put(listed, _DONE, stop)
+
+def _fetch_stage(client, bucket_name: str, listed: queue.Queue, fetched: queue.Queue, stop: threading.Event):
+    while True:
+        obj = _get(listed, stop)
+        if obj is _DONE:
+            break
+        result = IngestResult(
+            object_name=obj.object_name,
+            etag=getattr(obj, "etag", None),
+            size=getattr(obj, "size", 0) or 0,
+            last_modified=getattr(obj, "last_modified", None),
+        )
+        data = None
+        try:
+            with metrics.stage("fetch"):
+                response = client.get_object(bucket_name, obj.object_name)
+                try:
+                    data = response.read()
+                finally:
+                    response.close()
+                    response.release_conn()
+            metrics.inc("bytes_total", len(data), stage="fetch")
+        except Exception as e:
+            result.error = f"fetch failed: {e}"
+            metrics.inc("errors_total", stage="fetch")
+        if not _put(fetched, (result, data), stop):
+            break
+    _put(fetched, _DONE, stop)
+
+def _parse_stage(parser: Callable, executor: Optional[ProcessPoolExecutor], fetch_workers: int,
+                 fetched: queue.Queue, parsed: queue.Queue, stop: threading.Event):
+    remaining = fetch_workers
+    while remaining:
+        item = _get(fetched, stop)
+        if item is _DONE:
+            if stop.is_set():
+                return
+            remaining -= 1
+            continue
+        result, data = item
+        if result.error is not None:
+            future = Future()
+            future.set_result(None)
+        elif executor is not None:
+            try:
+                future = executor.submit(_timed_parse, parser, data)
+            except Exception as e:
+                future = Future()
+                future.set_exception(e)
+        else:
+            future = Future()
+            try:
+                future.set_result(_timed_parse(parser, data))
+            except Exception as e:
+                future.set_exception(e)
+        # Queueing the future rather than its result bounds the number of
+        # parses in flight to the queue size.
+        if not _put(parsed, (result, future), stop):
+            return
+    _put(parsed, _DONE, stop)
+
+def iter_bucket_results(
+    client,
+    bucket_name: str,
+    parser: Callable[[bytes], Any] = parse_markdown_bytes,
+    fetch_workers: int = 8,
+    parse_workers: Optional[int] = None,
+    queue_size: int = 64,
+    prefix: Optional[str] = None,
+    object_filter: Optional[Callable[[Any], bool]] = None,
+    manifest=None,
+    term_index=None,
+    executor: Optional[ProcessPoolExecutor] = None,
+) -> Iterator[IngestResult]:
+    """Yield an ``IngestResult`` for every object in the bucket as it is parsed.
+
+    ``parser`` must be a picklable top-level function when ``parse_workers`` is
+    not 0. ``parse_workers=None`` uses one process per CPU; ``0`` parses on the
+    pipeline thread, which is useful for cheap parsers and tests. A long-lived
+    ``executor`` is used instead of starting a pool, and is left running.
+
+    When ``manifest`` is given only new or changed objects are fetched, and
+    after a complete listing a ``deleted=True`` result is yielded for every
+    recorded object that is no longer in the bucket. The consumer calls
+    ``manifest.acknowledge(bucket_name, result)`` once its sink has confirmed
+    a result; unacknowledged objects and tombstones come back next run.
+
+    When ``term_index`` (a ``TermIndex``) is given, each parsed document is
+    indexed and each tombstone removed from it as the consumer takes them.
+    """
+    fetch_workers = max(1, fetch_workers)
+    stop = threading.Event()
+    listed = queue.Queue(maxsize=queue_size)
+    fetched = queue.Queue(maxsize=queue_size)
+    parsed = queue.Queue(maxsize=queue_size)
+    list_errors = []
+
+    owns_executor = executor is None and parse_workers != 0
+    if owns_executor:
+        executor = ProcessPoolExecutor(max_workers=parse_workers)
+    threads = [threading.Thread(
+        target=_list_stage,
+        args=(client, bucket_name, prefix, object_filter, manifest, listed, fetch_workers, stop, list_errors),
+        daemon=True,
+    )]
+    threads += [
+        threading.Thread(target=_fetch_stage, args=(client, bucket_name, listed, fetched, stop), daemon=True)
+        for _ in range(fetch_workers)
+    ]
+    threads.append(threading.Thread(
+        target=_parse_stage,
+        args=(parser, executor, fetch_workers, fetched, parsed, stop),
+        daemon=True,
+    ))
+    if manifest is not None:
+        manifest.reset_seen(bucket_name)
+    for thread in threads:
+        thread.start()
+
+    try:
+        while True:
+            item = parsed.get()
+            if item is _DONE:
+                break
+            result, future = item
+            if result.error is None:
+                try:
+                    result.document, seconds = future.result()
+                    if isinstance(result.document, Parsed):
+                        result.chunks = result.document.chunks
+                        result.document = result.document.document
+                    metrics.observe("stage_seconds", seconds, stage="parse")
+                    metrics.inc("documents_total", stage="parse")
+                except Exception as e:
+                    result.error = f"parse failed: {e}"
+                    metrics.inc("errors_total", stage="parse")
+            if metrics.enabled:
+                for name, q in (("listed", listed), ("fetched", fetched), ("parsed", parsed)):
+                    metrics.set_gauge("queue_depth", q.qsize(), queue=name)
+            yield result
+            if term_index is not None:
+                term_index.index_result(result)
+        if list_errors:
+            raise list_errors[0]
+        if manifest is not None:
+            for object_name in manifest.unseen(bucket_name, prefix):
+                yield IngestResult(object_name=object_name, deleted=True)
+                if term_index is not None:
+                    term_index.remove(object_name)
+    finally:
+        if manifest is not None:
+            manifest.commit()
+        if term_index is not None:
+            term_index.commit()
+        stop.set()
+        for thread in threads:
+            thread.join()
+        if owns_executor:
+            executor.shutdown(wait=True)
+
+def iter_bucket_documents(client, bucket_name: str, on_delete: Optional[Callable[[str], None]] = None,
+                          **kwargs) -> Iterator[Any]:
+    """Yield the parsed ``MarkdownDocument`` of every object, skipping failures.
+
+    Tombstones are passed to ``on_delete`` by object name. With a ``manifest``
+    a document is acknowledged when the consumer asks for the next one, so
+    only use this where each document is fully handled before that.
+    """
+    manifest = kwargs.get("manifest")
+    for result in iter_bucket_results(client, bucket_name, **kwargs):
+        if result.deleted:
+            if on_delete is not None:
+                on_delete(result.object_name)
+        elif result.error is None:
+            yield result.document
+        if manifest is not None:
+            manifest.acknowledge(bucket_name, result)
+
+def ingest_bucket(client, bucket_name: str, sink: Callable[[IngestResult], None], **kwargs) -> int:
+    """Drive the pipeline into ``sink`` and return the number of objects handled.
+
+    With a ``manifest`` each result is acknowledged once ``sink`` returns."""
+    manifest = kwargs.get("manifest")
+    count = 0
+    for result in iter_bucket_results(client, bucket_name, **kwargs):
+        sink(result)
+        if manifest is not None:
+            manifest.acknowledge(bucket_name, result)
+        count += 1
+    return count
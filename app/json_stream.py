@@ -0,0 +1,205 @@
+import codecs
+import io
+import json
+import os
+import re
+from typing import Callable, Iterator, Optional
+
+# Incremental JSON reader over a sliding text buffer. Containers are walked
+# key by key / item by item, small values are decoded with ``raw_decode`` and
+# strings are scanned in pieces, so a single multi-megabyte string (say a
+# base64 image in a notebook output) can be hashed or skipped without ever
+# being held in memory in one piece.
+
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+# A \uXXXX escape for the first half of a surrogate pair, at the end of a piece
+_HIGH_SURROGATE_ESCAPE = re.compile(r"\\u[dD][89abAB][0-9a-fA-F]{2}$")
+_NUMBER_TAIL = re.compile(r"[0-9.eE+-]*")
+_decoder = json.JSONDecoder(strict=False)
+
+def _open_text(source):
+    if isinstance(source, (bytes, bytearray)):
+        return io.StringIO(bytes(source).decode("utf-8"))
+    if isinstance(source, str) and source.lstrip()[:1] in ("{", "["):
+        return io.StringIO(source)
+    if isinstance(source, (str, os.PathLike)):
+        return open(source, encoding="utf-8")
+    if isinstance(source.read(0), bytes):
+        return codecs.getreader("utf-8")(source)
+    return source
+
+def _safe_cut(piece: str) -> int:
+    # Where a string piece can be split without cutting an escape sequence (or
+    # a surrogate pair of escapes) in half: before the run of backslashes that
+    # starts the last escape if one is near the end
+    cut = len(piece)
+    backslash = piece.find("\\", max(0, cut - 12))
+    if backslash != -1:
+        cut = backslash
+        while cut and piece[cut - 1] == "\\":
+            cut -= 1
+        if _HIGH_SURROGATE_ESCAPE.search(piece, 0, cut):
+            cut -= 6
+    return cut
+
+class JsonStream:
+    """Pull reader for a JSON document from a path, a JSON string, bytes or a
+    (binary) file object.
+
+    ``iter_object`` yields each key and ``iter_array`` each index; the caller
+    must consume the value (``read_value``, ``read_string``, ``skip_value`` or
+    a nested iteration) before resuming the iterator.
+    """
+
+    def __init__(self, source, chunk_size: int = 64 * 1024):
+        self._file = _open_text(source)
+        self._owns_file = isinstance(source, (str, os.PathLike)) and not isinstance(self._file, io.StringIO)
+        self.chunk_size = chunk_size
+        self._buffer = ""
+        self._pos = 0
+        self._eof = False
+
+    def close(self):
+        if self._owns_file:
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _fill(self) -> bool:
+        if self._eof:
+            return False
+        chunk = self._file.read(self.chunk_size)
+        if not chunk:
+            self._eof = True
+            return False
+        self._buffer = self._buffer[self._pos:] + chunk
+        self._pos = 0
+        return True
+
+    def _error(self, message: str) -> ValueError:
+        return ValueError(f"{message} near {self._buffer[self._pos:self._pos + 40]!r}")
+
+    def peek(self) -> str:
+        """Return the next non-whitespace character without consuming it ('' at the end)."""
+        while True:
+            self._pos = _WHITESPACE.match(self._buffer, self._pos).end()
+            if self._pos < len(self._buffer):
+                return self._buffer[self._pos]
+            if not self._fill():
+                return ""
+
+    def expect(self, char: str):
+        if self.peek() != char:
+            raise self._error(f"expected {char!r}")
+        self._pos += 1
+
+    def iter_object(self) -> Iterator[str]:
+        self.expect("{")
+        if self.peek() == "}":
+            self._pos += 1
+            return
+        while True:
+            key = self.read_string()
+            self.expect(":")
+            yield key
+            char = self.peek()
+            self._pos += 1
+            if char == "}":
+                return
+            if char != ",":
+                self._pos -= 1
+                raise self._error("expected ',' or '}'")
+
+    def iter_array(self) -> Iterator[int]:
+        self.expect("[")
+        if self.peek() == "]":
+            self._pos += 1
+            return
+        index = 0
+        while True:
+            yield index
+            index += 1
+            char = self.peek()
+            self._pos += 1
+            if char == "]":
+                return
+            if char != ",":
+                self._pos -= 1
+                raise self._error("expected ',' or ']'")
+
+    def read_string(self, sink: Optional[Callable[[str], None]] = None, keep: Optional[int] = None) -> Optional[str]:
+        """Read a string value piece by piece.
+
+        Every decoded piece is passed to ``sink``. The string is returned if it
+        is at most ``keep`` characters long (always when ``keep`` is None),
+        otherwise ``None`` is returned and it is never held in full.
+        """
+        self.expect('"')
+        kept = []
+        length = 0
+        while True:
+            buffer = self._buffer
+            quote = buffer.find('"', self._pos)
+            while quote != -1:
+                backslashes = 0
+                while quote - 1 - backslashes >= self._pos and buffer[quote - 1 - backslashes] == "\\":
+                    backslashes += 1
+                if backslashes % 2 == 0:
+                    break
+                quote = buffer.find('"', quote + 1)
+            if quote != -1:
+                end, next_pos = quote, quote + 1
+            else:
+                end = self._pos + _safe_cut(buffer[self._pos:])
+                next_pos = end
+            raw = buffer[self._pos:end]
+            self._pos = next_pos
+            if raw:
+                piece = _decoder.decode('"' + raw + '"') if "\\" in raw else raw
+                length += len(piece)
+                if sink is not None:
+                    sink(piece)
+                if kept is not None:
+                    if keep is None or length <= keep:
+                        kept.append(piece)
+                    else:
+                        kept = None
+            if quote != -1:
+                return "".join(kept) if kept is not None else None
+            if not self._fill():
+                raise self._error("unterminated string")
+
+    def read_value(self):
+        """Decode the next value in full. Only use this for values known to be small."""
+        if self.peek() == '"':
+            return self.read_string()
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self._buffer, self._pos)
+            except json.JSONDecodeError:
+                if self._fill():
+                    continue
+                raise self._error("invalid JSON value")
+            # A number running up to the end of the buffer may continue in the next chunk
+            if (isinstance(value, (int, float)) and _NUMBER_TAIL.fullmatch(self._buffer, end)
+                    and self._fill()):
+                continue
+            self._pos = end
+            return value
+
+    def skip_value(self):
+        char = self.peek()
+        if char == "{":
+            for _ in self.iter_object():
+                self.skip_value()
+        elif char == "[":
+            for _ in self.iter_array():
+                self.skip_value()
+        elif char == '"':
+            self.read_string(keep=0)
+        else:
+            self.read_value()
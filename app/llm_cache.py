@@ -0,0 +1,235 @@
+import asyncio
+import hashlib
+import json
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+
+# Prompt-level response cache for the agent's LLM calls. Responses are keyed
+# by (model, prompt hash, tool set), expire after ``ttl`` seconds and are
+# evicted least-recently-used first beyond ``max_entries``/``max_bytes``.
+# Concurrent calls for the same key are coalesced into one model call, and in
+# offline mode only cached responses are served.
+
+_MISSING = object()
+
+class CacheMissError(KeyError):
+    """Raised in offline mode when a prompt has no cached response."""
+
+def tool_signature(tools: Iterable) -> str:
+    # Tools change what the model may answer, so they are part of the key
+    names = []
+    for tool in tools or ():
+        if isinstance(tool, dict):
+            names.append(f"{tool.get('name', '')}:{tool.get('description', '')}")
+        else:
+            names.append(f"{getattr(tool, 'name', tool)}:{getattr(tool, 'description', '')}")
+    return "\n".join(sorted(names))
+
+def prompt_text(prompt) -> str:
+    if isinstance(prompt, str):
+        return prompt
+    if hasattr(prompt, "to_string"):
+        return prompt.to_string()
+    return json.dumps(prompt, sort_keys=True, default=str)
+
+def prompt_key(model_name: str, prompt, tools: str = "") -> str:
+    digest = hashlib.sha256()
+    for part in (model_name, tools, prompt_text(prompt)):
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\x00")
+    return digest.hexdigest()
+
+class PromptCache:
+    """SQLite-backed response cache; ``path=":memory:"`` keeps it in process."""
+
+    def __init__(self, path: str = ":memory:", ttl: Optional[float] = 7 * 24 * 3600,
+                 max_entries: int = 10000, max_bytes: int = 256 * 1024 * 1024,
+                 clock: Callable[[], float] = time.time):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.clock = clock
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                kind TEXT NOT NULL,
+                value BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                created REAL NOT NULL,
+                last_used REAL NOT NULL
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS responses_last_used ON responses (last_used)")
+        self._conn.commit()
+
+    @staticmethod
+    def _dump(value) -> Tuple[str, bytes]:
+        if isinstance(value, str):
+            return "text", value.encode("utf-8")
+        # Chat models return message objects rather than text
+        return "pickle", pickle.dumps(value)
+
+    @staticmethod
+    def _load(kind: str, raw: bytes):
+        return raw.decode("utf-8") if kind == "text" else pickle.loads(raw)
+
+    def get(self, key: str, default=None):
+        now = self.clock()
+        with self._lock:
+            row = self._conn.execute("SELECT kind, value, created FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is not None and self.ttl is not None and row[2] + self.ttl < now:
+                self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self._conn.commit()
+                self.expired += 1
+                row = None
+            if row is None:
+                self.misses += 1
+                return default
+            self._conn.execute("UPDATE responses SET last_used = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            self.hits += 1
+        return self._load(row[0], row[1])
+
+    def put(self, key: str, value):
+        kind, raw = self._dump(value)
+        now = self.clock()
+        with self._lock:
+            self._conn.execute("INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?)",
+                               (key, kind, raw, len(raw), now, now))
+            self._evict()
+            self._conn.commit()
+
+    def _evict(self):
+        count, total = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses").fetchone()
+        if count <= self.max_entries and total <= self.max_bytes:
+            return
+        doomed = []
+        for key, size in self._conn.execute("SELECT key, size FROM responses ORDER BY last_used"):
+            if count <= self.max_entries and total <= self.max_bytes:
+                break
+            doomed.append((key,))
+            count -= 1
+            total -= size
+        self._conn.executemany("DELETE FROM responses WHERE key = ?", doomed)
+        self.evictions += len(doomed)
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM responses")
+            self._conn.commit()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "expired": self.expired,
+            "evictions": self.evictions,
+            "entries": len(self),
+        }
+
+    def close(self):
+        self._conn.close()
+
+class CachedLLM:
+    """Wraps an LLM (anything with ``invoke``, or a plain callable) with a
+    ``PromptCache`` and request coalescing. Usable directly or as a step in a
+    LangChain pipeline."""
+
+    def __init__(self, llm, cache: Optional[PromptCache] = None, model_name: Optional[str] = None,
+                 tools: Iterable = (), offline: Optional[bool] = None):
+        self.llm = llm
+        self.cache = cache if cache is not None else PromptCache()
+        self.model_name = model_name or getattr(llm, "model_name", None) or type(llm).__name__
+        self.tools = tool_signature(tools)
+        self.offline = offline if offline is not None else os.getenv("LLM_OFFLINE", "").lower() in ("1", "true", "yes")
+        self.calls = 0
+        self.coalesced = 0
+        self._lock = threading.Lock()
+        self._in_flight: Dict[str, Future] = {}
+
+    def key(self, prompt) -> str:
+        return prompt_key(self.model_name, prompt, self.tools)
+
+    def _lookup(self, key: str) -> Tuple[Any, Optional[Future], bool]:
+        # Returns (cached value, future to wait on or to complete, whether we own it)
+        value = self.cache.get(key, _MISSING)
+        if value is not _MISSING:
+            return value, None, False
+        if self.offline:
+            raise CacheMissError(key)
+        with self._lock:
+            future = self._in_flight.get(key)
+            if future is not None:
+                self.coalesced += 1
+                return _MISSING, future, False
+            future = self._in_flight[key] = Future()
+            self.calls += 1
+            return _MISSING, future, True
+
+    def _finish(self, key: str, future: Future, value=_MISSING, error: Optional[BaseException] = None):
+        if error is None:
+            self.cache.put(key, value)
+            future.set_result(value)
+        else:
+            future.set_exception(error)
+        with self._lock:
+            self._in_flight.pop(key, None)
+
+    def invoke(self, prompt, **kwargs):
+        key = self.key(prompt)
+        value, future, owner = self._lookup(key)
+        if future is None:
+            return value
+        if not owner:
+            return future.result()
+        try:
+            value = self.invoke_uncached(prompt, **kwargs)
+        except Exception as e:
+            self._finish(key, future, error=e)
+            raise
+        self._finish(key, future, value)
+        return value
+
+    __call__ = invoke
+
+    async def ainvoke(self, prompt, **kwargs):
+        key = self.key(prompt)
+        value, future, owner = self._lookup(key)
+        if future is None:
+            return value
+        if not owner:
+            return await asyncio.wrap_future(future)
+        try:
+            if hasattr(self.llm, "ainvoke"):
+                value = await self.llm.ainvoke(prompt, **kwargs)
+            else:
+                loop = asyncio.get_running_loop()
+                value = await loop.run_in_executor(None, lambda: self.invoke_uncached(prompt, **kwargs))
+        except Exception as e:
+            self._finish(key, future, error=e)
+            raise
+        self._finish(key, future, value)
+        return value
+
+    def invoke_uncached(self, prompt, **kwargs):
+        return self.llm.invoke(prompt, **kwargs) if hasattr(self.llm, "invoke") else self.llm(prompt, **kwargs)
+
+    def stats(self) -> Dict[str, int]:
+        stats = self.cache.stats()
+        stats.update(calls=self.calls, coalesced=self.coalesced)
+        return stats
@@ -1,143 +1,71 @@
-from pydantic import BaseModel, Field
-from typing import List, Dict, Any
-import pandas as pd
-import ast
 import os
-import yaml
-import markdown2
-import re
-from langsmith.run_helpers import traceable
-from langchain.agents import AgentExecutor, tool
-from langchain.llms import OpenAI
-from langchain.schema.runnable import Object, Text
-from langchain.runners import Document
+from typing import Optional
+from dotenv import load_dotenv
+from langchain.agents import AgentExecutor, Tool
 from langchain.prompts import StringPromptTemplate
-from langchain.document_loaders import UnstructuredMarkdownLoader
-
-class SourceCode(BaseModel):
-    id: str = Field(description="Unique identifier for the source code object.")
-    imports: List[str] = Field(description="List of extracted required packages.")
-    classes: List[str] = Field(description="List of extracted classes from the code.")
-    code: str = Field(description="Source code snippets.")
-    syntax: str = Field(description="The programming language syntax/extension (e.g., Python).")
-    context: str = Field(description="Any extracted text, markdown, comments, or docstrings.")
-    metadata: dict = Field(description="Extracted or generated metadata tags for top-level cataloging and code object management.")
-
-class Table(BaseModel):
-    headers: List[str] = Field(description="Headers of the table")
-    rows: List[Dict[str, Any]] = Field(description="Rows of the table, each row being a dictionary")
-
-class MarkdownDocument(BaseModel):
-    metadata: Dict[str, Any] = Field(description="Metadata of the document")
-    tables: List[Table] = Field(description="List of tables in the document")
-    code_blocks: List[SourceCode] = Field(description="List of code blocks in the document")
-    content: str = Field(description="The textual content of the document")
-    blob_data: List[blob] = Field(description="The image or video content of the document")
-    
-@traceable(run_type="chain")
-@tool
-def parse_yaml_metadata(yaml_content: str) -> dict:
-    try:
-        return yaml.safe_load(yaml_content) or {}
-    except yaml.YAMLError:
-        return {}
-
-@traceable(run_type="chain")
-@tool
-def parse_table(table_content: str) -> Table:
-    # Assuming table_content is in a format that pandas can read directly
-    df = pd.read_html("<table>" + table_content + "</table>")[0]
-    return Table(headers=df.columns.tolist(), rows=df.to_dict(orient="records"))
-
-@traceable(run_type="chain")
-@tool
-def parse_python_script(script: str) -> SourceCode:
-    extracted_imports = []
-    extracted_classes = []
-    extracted_context = ""
-    extracted_metadata = {}
-
-    try:
-        tree = ast.parse(script)
-    except SyntaxError as e:
-        return SourceCode(
-            id="error",
-            imports=[],
-            classes=[],
-            code=script,
-            syntax="Python",
-            context="Syntax error in provided script",
-            metadata={"error": str(e)}
-        )
-
-    for node in ast.walk(tree):
-        if isinstance(node, ast.Import):
-            extracted_imports.extend(alias.name for alias in node.names)
-        elif isinstance(node, ast.ImportFrom):
-            extracted_imports.append(node.module)
-        elif isinstance(node, ast.ClassDef):
-            extracted_classes.append(node.name)
-
-    return SourceCode(
-        id="generated_id",
-        imports=extracted_imports,
-        classes=extracted_classes,
-        code=script,
-        syntax="Python",
-        context=extracted_context,
-        metadata=extracted_metadata
-    )
-
-@traceable(run_type="llm")
-@tool
-def parse_markdown_content(markdown_path: str) -> MarkdownDocument:
-    loader = UnstructuredMarkdownLoader(markdown_path, mode="elements")
-    markdown_elements = loader.load()
-
-    extracted_metadata = {}
-    extracted_tables = []
-    extracted_code_blocks = []
-    extracted_content = []
-    extraxted_blob_data = []
-
-    for element in markdown_elements:
-        if element['type'] == 'yaml':
-            extracted_metadata.update(parse_yaml_metadata(element['content']))
-        elif element['type'] == 'table':
-            extracted_tables.append(parse_table(element['content']))
-        elif element['type'] == 'code' and element['language'] == 'python':
-            extracted_code_blocks.append(parse_python_code_block(element['content']))
-        else:
-            extracted_content.append(element['content'])
 
-    return MarkdownDocument(
-        metadata=extracted_metadata,
-        tables=extracted_tables,
-        code_blocks=extracted_code_blocks,
-        content="\\n".join(extracted_content)
-    )
-    
+# The agent layer: LangChain tools, prompt templates and the agent executor.
+# The models and parsers live in models.py/parsers.py and are re-exported here
+# under their original names; importing them from there avoids loading
+# LangChain at all. The LLM and agent executor are built on first access.
+from .models import SourceCode, Table, Blob, MarkdownDocument
+from .parsers import (
+    PARSER_VERSION,
+    parse_yaml_metadata,
+    parse_table,
+    parse_python_script,
+    parse_markdown_content,
+    parse_markdown_content_unstructured
+)
+from .prompt_budget import BudgetedPrompt, PromptBudgetStats, build_prompt
+
+def tracing_enabled() -> bool:
+    # LangSmith tracing sends every tool call to an external service, so it is opt-in
+    return os.getenv("LANGCHAIN_TRACING_V2", "").lower() in ("1", "true", "yes")
+
+def configure_tracing():
+    # Load environment variables from .env file
+    load_dotenv()
+    if not tracing_enabled():
+        return
+
+    # Set LangChain and LangSmith environment variables
+    os.environ["LANGCHAIN_PROJECT"] = os.getenv("LANGCHAIN_PROJECT", "cda")
+    if os.getenv("LANGCHAIN_ENDPOINT"):
+        os.environ["LANGCHAIN_ENDPOINT"] = os.getenv("LANGCHAIN_ENDPOINT")
+    if os.getenv("LANGSMITH_API_KEY"):
+        os.environ["LANGCHAIN_API_KEY"] = os.getenv("LANGSMITH_API_KEY")
+
+configure_tracing()
+
+def traced(func, run_type: str = "chain"):
+    # Wrap with LangSmith's @traceable only when tracing is enabled; otherwise
+    # the tool calls the parser directly
+    if not tracing_enabled():
+        return func
+    from langsmith.run_helpers import traceable
+    return traceable(run_type=run_type)(func)
 
 parse_yaml_metadata_tool = Tool.from_function(
-    func=parse_yaml_metadata,
+    func=traced(parse_yaml_metadata),
     name="parse_yaml_metadata",
     description="Parses YAML metadata from a string"
-),
+)
 
 parse_table_tool = Tool.from_function(
-    func=parse_table,
+    func=traced(parse_table),
     name="parse_table",
     description="Parses table content into a Table object"
-),
+)
 
 parse_python_script_tool = Tool.from_function(
-    func=parse_python_script,
+    func=traced(parse_python_script),
     name="parse_python_script",
     description="Parses a Python script into a SourceCode object"
-),
+)
 
 parse_markdown_content_tool = Tool.from_function(
-    func=parse_markdown_content,
+    func=traced(parse_markdown_content, run_type="llm"),
     name="parse_markdown_content",
     description="Parses Markdown content into a MarkdownDocument object"
 )
@@ -212,15 +140,47 @@ Analyze the Python script and extract its components, mapping them to a new Sour
 ---
 """
 
+## Prompt Budgeting
+
+# Content beyond the budget is compressed (Python skeletons, Markdown digests)
+# before it is truncated; the default leaves room for the completion within a
+# 4k-token context
+PROMPT_MAX_TOKENS = int(os.getenv("PROMPT_MAX_TOKENS") or 3500)
+
+prompt_budget_stats = PromptBudgetStats()
+
 class PythonScriptAnalysisPromptTemplate(StringPromptTemplate):
     def format(self, script: str) -> str:
-        return PYTHON_SCRIPT_ANALYSIS_PROMPT.format(script=script)
+        return self.format_budgeted(script).text
+
+    def format_budgeted(self, script: str, max_tokens: Optional[int] = None) -> BudgetedPrompt:
+        return build_prompt(
+            lambda content: PYTHON_SCRIPT_ANALYSIS_PROMPT.format(script=content),
+            "script.py", script, max_tokens or PROMPT_MAX_TOKENS, stats=prompt_budget_stats
+        )
 
 class EnhancedGeneralAnalysisPromptTemplate(StringPromptTemplate):
     def format(self, input_data: dict) -> str:
+        return self.format_budgeted(input_data).text
+
+    def format_budgeted(self, input_data: dict, max_tokens: Optional[int] = None) -> BudgetedPrompt:
         filename = input_data.get("filename", "")
         content = input_data.get("content", "")
 
+        if filename.endswith('.ipynb'):
+            # Cell sources and short text output only; rich outputs become placeholders
+            from .notebook import render_notebook
+            try:
+                content = render_notebook(content)
+            except (OSError, ValueError):
+                pass
+
+        return build_prompt(
+            lambda fitted: self.render(filename, fitted),
+            filename, content, max_tokens or PROMPT_MAX_TOKENS, stats=prompt_budget_stats
+        )
+
+    def render(self, filename: str, content: str) -> str:
         if filename.endswith('.py') or filename.endswith('.ipynb'):
             # For Python script or Jupyter notebook analysis
             return f"""
@@ -282,8 +242,6 @@ Expected Output Format:
 
 enhanced_general_analysis_prompt_template = EnhancedGeneralAnalysisPromptTemplate()
 
-llm = OpenAI(api_key=os.environ.get("OPENAI_API_KEY"))
-
 tools = [
     parse_yaml_metadata_tool,
     parse_table_tool,
@@ -292,35 +250,73 @@ tools = [
 ]
 
 python_script_analysis_prompt_template = PythonScriptPromptTemplate()
-markdown_document_analysis_prompt_template = MarkdownDocumentPromptTemplate()
-enhanced_general_analysis_prompt_template = EnhancedGeneralAnalysisPromptTemplate()
-
-# def agent_logic(input_data: dict):
-#     filename = input_data.get("filename", "")
-#     input_text = input_data.get("content", "")
-#     elif filename.endswith('.py') or filename.endswith('.ipynb'):
-#         return python_script_prompt_template.format(input_text) 
-#     elif filename.endswith('.md'):
-#         if '```python' in input_text:
-#             return python_script_prompt_template.format(input_text)
-#         else:
-#             return markdown_document_analysis_prompt_template.format(input_text)
-#     else:
-#         return input
-# agent = (
-#     {"input": lambda x: x["input"]}  # "input" is the stringified script
-#     | prompt_template
-#     | llm.bind(functions=tools)
-#     | (lambda output: agent_logic(output))
-# )
-# agent_executor = AgentExecutor(agent=agent, tools=tools, verbose=True)
+markdown_document_analysis_prompt_template = MarkdownDocumentAnalysisPromptTemplate()
 
 def agent_logic(input_data: dict):
     return enhanced_general_analysis_prompt_template.format(input_data)
 
-agent = (
-    {"input": lambda x: x["input"]}  # "input" is the input data dictionary
-    | (lambda output: agent_logic(output))
-    | llm.bind(functions=tools)
-)
-agent_executor = AgentExecutor(agent=agent, tools=tools, verbose=True)
+def budgeted_agent_logic(input_data: dict) -> BudgetedPrompt:
+    # agent_logic with the budgeting report (strategy, tokens used and saved)
+    return enhanced_general_analysis_prompt_template.format_budgeted(input_data)
+
+_llm = None
+_cached_llm = None
+_agent_executor = None
+
+def get_llm(api_key: Optional[str] = None):
+    global _llm
+    if _llm is None:
+        from langchain.llms import OpenAI
+
+        _llm = OpenAI(api_key=api_key or os.environ.get("OPENAI_API_KEY"))
+    return _llm
+
+def get_cached_llm():
+    # Identical prompts (vendored copies, templated notes) are answered from the
+    # prompt cache; LLM_CACHE_PATH persists it and LLM_OFFLINE=1 serves only hits
+    global _cached_llm
+    if _cached_llm is None:
+        from .llm_cache import CachedLLM, PromptCache
+
+        llm = get_llm()
+        _cached_llm = CachedLLM(
+            llm.bind(functions=tools),
+            PromptCache(os.getenv("LLM_CACHE_PATH", ":memory:")),
+            model_name=getattr(llm, "model_name", None),
+            tools=tools
+        )
+    return _cached_llm
+
+def get_agent_runner(**kwargs):
+    """An ``AgentRunner`` over ``agent_logic`` and the cached LLM, for analyzing
+    many ``{"filename", "content"}`` inputs concurrently. Keyword arguments
+    (concurrency, requests_per_minute, tokens_per_minute, ...) go to the runner;
+    the AGENT_CONCURRENCY, AGENT_RPM and AGENT_TPM settings are the defaults."""
+    from .agent_runner import AgentRunner
+
+    kwargs.setdefault("concurrency", int(os.getenv("AGENT_CONCURRENCY") or 8))
+    kwargs.setdefault("requests_per_minute", float(os.getenv("AGENT_RPM") or 0) or None)
+    kwargs.setdefault("tokens_per_minute", float(os.getenv("AGENT_TPM") or 0) or None)
+    return AgentRunner(get_cached_llm(), budgeted_agent_logic, **kwargs)
+
+def get_agent_executor():
+    global _agent_executor
+    if _agent_executor is None:
+        agent = (
+            {"input": lambda x: x["input"]}  # "input" is the input data dictionary
+            | (lambda output: agent_logic(output))
+            | get_cached_llm()
+        )
+        _agent_executor = AgentExecutor(agent=agent, tools=tools, verbose=True)
+    return _agent_executor
+
+def __getattr__(name):
+    # PEP 562: ``main.llm``, ``main.agent`` and ``main.agent_executor`` keep
+    # working but are only built when something actually uses them
+    if name == "llm":
+        return get_llm()
+    if name == "agent_executor":
+        return get_agent_executor()
+    if name == "agent":
+        return get_agent_executor().agent
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
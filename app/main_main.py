@@ -0,0 +1,72 @@
+import os
+from itertools import islice
+
+from .manifest import ObjectManifest
+from .minio_main import connect_to_minio, process_bucket_results, sink_manifest_path
+from .weaviate_sink import BatchIngester, connect_to_weaviate, define_schema, failed_objects, ingest_bucket_results, ingest_chunk_updates
+from .chunking import ChunkStore, changed_chunks, parse_markdown_chunks_bytes
+from .embeddings import EmbeddingCache, EmbeddingStage, get_embedder
+
+# Run as a package module: python -m app.main_main
+
+def main():
+    # Connect to MinIO
+    minio_client = connect_to_minio()
+    bucket_name = "your-bucket-name"
+
+    # Connect to Weaviate and define schema
+    weaviate_client = connect_to_weaviate()
+    define_schema(weaviate_client)
+    # One ingester for the whole run, so dynamic batch sizing and vector
+    # dimension checks carry across the document batches below
+    ingester = BatchIngester(weaviate_client)
+
+    # Chunks are embedded once per (model, content hash); the vector cache
+    # survives across runs so unchanged text is never re-embedded
+    chunk_store = ChunkStore("chunks.sqlite")
+    embedding_cache = EmbeddingCache(os.getenv("EMBEDDING_CACHE_DIR", ".embedding-cache"))
+    embedding_stage = EmbeddingStage(get_embedder(), embedding_cache)
+
+    # Retrieve and parse data from MinIO; documents are streamed, not collected,
+    # and objects unchanged since the last run are skipped via the manifest.
+    # Each document is chunked from its event stream while it is parsed, so
+    # chunks split at headings and carry their section path
+    manifest = ObjectManifest(sink_manifest_path("weaviate-chunks"))
+    processed_data = process_bucket_results(
+        minio_client,
+        bucket_name,
+        manifest=manifest,
+        parser=parse_markdown_chunks_bytes
+    )
+
+    try:
+        while True:
+            results = list(islice(processed_data, 100))
+            if not results:
+                break
+            # Upsert documents keyed by object name; tombstones for deleted
+            # objects are purged
+            stats = ingest_bucket_results(weaviate_client, results, ingester=ingester)
+            # Only chunks new to the store are embedded and sent
+            updates = embedding_stage.embed_chunk_updates(changed_chunks(results, chunk_store))
+            stats += ingest_chunk_updates(weaviate_client, updates, ingester=ingester)
+            # Send the batch's remainder before acknowledging its objects, so
+            # nothing still pending in the ingester is skipped by the next run
+            stats += ingester.flush()
+            for batch_stats in stats:
+                print(batch_stats)
+            # Objects that still failed after the retries stay unrecorded in
+            # both stores, so the next run fetches and chunks them again
+            failed = chunk_store.commit(failed_objects(stats))
+            for result in results:
+                if result.object_name not in failed:
+                    manifest.acknowledge(bucket_name, result)
+        print(embedding_stage.stats, f"hit rate {embedding_stage.stats.hit_rate:.1%}")
+    finally:
+        processed_data.close()
+        manifest.close()
+        chunk_store.close()
+        embedding_cache.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+import sqlite3
+import threading
+from typing import Any, Iterator, Optional
+
+from .parsers import PARSER_VERSION
+
+# Persistent record of what has already been ingested from each bucket, so
+# repeated runs only fetch and parse new or changed objects.
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS objects (
+    bucket TEXT NOT NULL,
+    object_name TEXT NOT NULL,
+    etag TEXT,
+    size INTEGER,
+    last_modified TEXT,
+    parser_version TEXT,
+    PRIMARY KEY (bucket, object_name)
+)
+"""
+
+class ObjectManifest:
+    """SQLite-backed manifest of ingested objects keyed by (bucket, object name).
+
+    An object is considered current when its ETag, size and last-modified time
+    match the recorded values and it was parsed by the same parser version.
+    Objects seen during a listing are tracked in a temporary table so deleted
+    objects can be detected without holding the bucket listing in memory.
+    """
+
+    def __init__(self, path: str, parser_version: str = PARSER_VERSION, commit_every: int = 500):
+        self.path = path
+        self.parser_version = parser_version
+        self.commit_every = commit_every
+        self._pending = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(_SCHEMA)
+        self._conn.execute("CREATE TEMP TABLE IF NOT EXISTS seen (bucket TEXT, object_name TEXT, PRIMARY KEY (bucket, object_name))")
+        self._conn.commit()
+
+    def _changed(self):
+        self._pending += 1
+        if self._pending >= self.commit_every:
+            self._conn.commit()
+            self._pending = 0
+
+    @staticmethod
+    def _last_modified(value: Any) -> Optional[str]:
+        if value is None:
+            return None
+        return value.isoformat() if hasattr(value, "isoformat") else str(value)
+
+    def is_current(self, bucket: str, obj) -> bool:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT etag, size, last_modified, parser_version FROM objects WHERE bucket = ? AND object_name = ?",
+                (bucket, obj.object_name),
+            ).fetchone()
+        if row is None:
+            return False
+        return row == (
+            getattr(obj, "etag", None),
+            getattr(obj, "size", None),
+            self._last_modified(getattr(obj, "last_modified", None)),
+            self.parser_version,
+        )
+
+    def mark_seen(self, bucket: str, object_name: str):
+        with self._lock:
+            self._conn.execute("INSERT OR IGNORE INTO seen VALUES (?, ?)", (bucket, object_name))
+
+    def record(self, bucket: str, object_name: str, etag: Optional[str], size: Optional[int], last_modified: Any = None):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO objects VALUES (?, ?, ?, ?, ?, ?)",
+                (bucket, object_name, etag, size, self._last_modified(last_modified), self.parser_version),
+            )
+            self._changed()
+
+    def acknowledge(self, bucket: str, result):
+        """Record that a sink has durably handled an ingest ``IngestResult``:
+        a tombstone forgets the object, a parsed object is recorded and a
+        failed one is left unrecorded so the next run fetches it again."""
+        if result.deleted:
+            self.remove(bucket, result.object_name)
+        elif result.error is None:
+            self.record(bucket, result.object_name, result.etag, result.size, result.last_modified)
+
+    def remove(self, bucket: str, object_name: str):
+        with self._lock:
+            self._conn.execute("DELETE FROM objects WHERE bucket = ? AND object_name = ?", (bucket, object_name))
+            self._changed()
+
+    def unseen(self, bucket: str, prefix: Optional[str] = None) -> Iterator[str]:
+        """Yield recorded objects that were not seen since the last ``reset_seen``."""
+        query = (
+            "SELECT object_name FROM objects o WHERE bucket = ? AND object_name >= ? "
+            "AND NOT EXISTS (SELECT 1 FROM seen s WHERE s.bucket = o.bucket AND s.object_name = o.object_name) "
+            "ORDER BY object_name"
+        )
+        with self._lock:
+            names = [row[0] for row in self._conn.execute(query, (bucket, prefix or ""))]
+        for name in names:
+            if prefix and not name.startswith(prefix):
+                break
+            yield name
+
+    def reset_seen(self, bucket: str):
+        with self._lock:
+            self._conn.execute("DELETE FROM seen WHERE bucket = ?", (bucket,))
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM objects").fetchone()[0]
+
+    def commit(self):
+        with self._lock:
+            self._conn.commit()
+            self._pending = 0
+
+    def close(self):
+        self.commit()
+        self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
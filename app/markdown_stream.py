@@ -0,0 +1,159 @@
+import io
+import os
+import re
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Union
+
+from .metrics import timed
+from .models import Blob, MarkdownDocument, SourceCode, Table
+from .parsers import parse_table, parse_yaml_metadata
+from .markdown_tokenizer import CODE, FRONT_MATTER, HEADING, TABLE, TEXT, tokenize_markdown
+from .parse_cache import cached_parse_python_script
+
+# Streaming Markdown reader. Lines are tokenized one at a time and typed events
+# are yielded as soon as each element is complete, so peak memory is bounded by
+# the largest single element rather than by the whole document.
+
+PYTHON_LANGUAGES = {"python", "py", "python3"}
+
+_MARKDOWN_MEDIA = re.compile(r"!\[([^\]]*)\]\(\s*<?([^)\s>]+)>?(?:\s+\"[^\"]*\")?\s*\)")
+_HTML_MEDIA = re.compile(r"<(img|video|source|audio)\b[^>]*?\bsrc=[\"']([^\"']+)[\"'][^>]*>", re.IGNORECASE)
+_HTML_ALT = re.compile(r"\balt=[\"']([^\"']*)[\"']", re.IGNORECASE)
+
+_VIDEO_EXTENSIONS = {".mp4", ".mov", ".webm", ".mkv", ".avi", ".m4v"}
+_AUDIO_EXTENSIONS = {".mp3", ".wav", ".ogg", ".flac", ".m4a"}
+
+@dataclass
+class FrontMatter:
+    metadata: Dict[str, Any]
+
+@dataclass
+class TableBlock:
+    table: Table
+    text: str
+
+@dataclass
+class CodeBlock:
+    language: str
+    text: str
+    source_code: Optional[SourceCode] = None
+
+@dataclass
+class TextChunk:
+    text: str
+    heading: bool = False
+    section: List[str] = field(default_factory=list)
+
+@dataclass
+class BlobReference:
+    blob: Blob
+
+MarkdownEvent = Union[FrontMatter, TableBlock, CodeBlock, TextChunk, BlobReference]
+
+def _iter_lines(source) -> Iterator[str]:
+    if isinstance(source, bytes):
+        source = io.BytesIO(source)
+    elif isinstance(source, str):
+        # Always content: guessing paths from strings would let a bucket object
+        # whose body names a local file read that file. Use stream_markdown_file.
+        source = io.StringIO(source)
+    for line in source:
+        yield line.decode("utf-8") if isinstance(line, bytes) else line
+
+def media_kind(uri: str, tag: str = "") -> str:
+    tag = tag.lower()
+    if tag in ("video", "audio"):
+        return tag
+    extension = os.path.splitext(uri.split("?", 1)[0])[1].lower()
+    if extension in _VIDEO_EXTENSIONS:
+        return "video"
+    if extension in _AUDIO_EXTENSIONS:
+        return "audio"
+    return "image"
+
+def find_blob_references(text: str) -> Iterator[Blob]:
+    for match in _MARKDOWN_MEDIA.finditer(text):
+        yield Blob(kind=media_kind(match.group(2)), uri=match.group(2), alt=match.group(1))
+    for match in _HTML_MEDIA.finditer(text):
+        alt = _HTML_ALT.search(match.group(0))
+        yield Blob(kind=media_kind(match.group(2), match.group(1)), uri=match.group(2),
+                   alt=alt.group(1) if alt else "")
+
+def iter_markdown_events(source, max_chunk_chars: int = 64 * 1024, table_parser: Callable = parse_table,
+                         python_parser: Callable = cached_parse_python_script) -> Iterator[MarkdownEvent]:
+    """Yield typed events from a Markdown string, bytes or (binary) file object.
+
+    Paragraphs longer than ``max_chunk_chars`` are split so a single run-on
+    block such as a pasted log does not have to be held in memory at once.
+    ``table_parser`` and ``python_parser`` build ``TableBlock.table`` and
+    ``CodeBlock.source_code``; records.py swaps in its record parsers.
+    """
+    section = []
+    for token in tokenize_markdown(_iter_lines(source), max_chunk_chars):
+        if token.kind == TEXT:
+            yield TextChunk(text=token.text, section=list(section))
+            for blob in find_blob_references(token.text):
+                yield BlobReference(blob=blob)
+        elif token.kind == HEADING:
+            level = token.level
+            section = section[:level - 1] + [""] * (level - 1 - len(section)) + [token.text]
+            yield TextChunk(text="#" * level + " " + token.text, heading=True, section=list(section))
+        elif token.kind == CODE:
+            source_code = python_parser(token.text) if token.language in PYTHON_LANGUAGES else None
+            yield CodeBlock(language=token.language, text=token.text, source_code=source_code)
+        elif token.kind == TABLE:
+            yield TableBlock(table=table_parser(token.text), text=token.text)
+        elif token.kind == FRONT_MATTER:
+            yield FrontMatter(metadata=parse_yaml_metadata(token.text))
+
+class MarkdownDocumentBuilder:
+    """Accumulates streamed events into a ``MarkdownDocument``.
+
+    Headings and thematic breaks are structure rather than content, so only
+    paragraph text (and non-Python code) is joined into ``content``.
+    """
+
+    def __init__(self):
+        self.metadata = {}
+        self.tables = []
+        self.code_blocks = []
+        self.content = []
+        self.blob_data = []
+
+    def add(self, event: MarkdownEvent):
+        if isinstance(event, FrontMatter):
+            self.metadata.update(event.metadata)
+        elif isinstance(event, TableBlock):
+            self.tables.append(event.table)
+        elif isinstance(event, CodeBlock):
+            if event.source_code is not None:
+                self.code_blocks.append(event.source_code)
+            else:
+                self.content.append(event.text.rstrip("\n"))
+        elif isinstance(event, TextChunk):
+            if not event.heading:
+                self.content.append(event.text)
+        elif isinstance(event, BlobReference):
+            self.blob_data.append(event.blob)
+
+    def extend(self, events: Iterable[MarkdownEvent]) -> "MarkdownDocumentBuilder":
+        for event in events:
+            self.add(event)
+        return self
+
+    def build(self) -> MarkdownDocument:
+        return MarkdownDocument(
+            metadata=self.metadata,
+            tables=self.tables,
+            code_blocks=self.code_blocks,
+            content="\n".join(self.content),
+            blob_data=self.blob_data
+        )
+
+@timed("markdown")
+def stream_markdown_document(source, max_chunk_chars: int = 64 * 1024) -> MarkdownDocument:
+    return MarkdownDocumentBuilder().extend(iter_markdown_events(source, max_chunk_chars)).build()
+
+def stream_markdown_file(path: str, max_chunk_chars: int = 64 * 1024) -> MarkdownDocument:
+    with open(path, encoding="utf-8") as f:
+        return stream_markdown_document(f, max_chunk_chars)
@@ -0,0 +1,114 @@
+import itertools
+import re
+from typing import Iterable, Iterator, NamedTuple
+
+# Single-pass, dependency-free tokenizer for the Markdown subset our notes use:
+# YAML front matter, pipe tables, fenced code blocks, ATX headings and prose.
+# Tokens carry raw text only; turning them into models is left to the callers
+# (see markdown_stream), so the tokenizer itself never imports a parser.
+
+FRONT_MATTER = "front_matter"
+HEADING = "heading"
+TABLE = "table"
+CODE = "code"
+TEXT = "text"
+
+_FENCE = re.compile(r"^(\s{0,3})(`{3,}|~{3,})\s*([^\s`]*)")
+_TABLE_DELIMITER = re.compile(r"^\s*\|?\s*:?-+:?\s*(\|\s*:?-+:?\s*)*\|?\s*$")
+_HEADING = re.compile(r"^\s{0,3}(#{1,6})(\s|$)")
+_CLOSING_HASHES = re.compile(r"(^|\s+)#+\s*$")
+_THEMATIC_BREAK = re.compile(r"^\s{0,3}([-*_])(\s*\1){2,}\s*$")
+
+class Token(NamedTuple):
+    kind: str
+    text: str
+    language: str = ""
+    level: int = 0
+
+def tokenize_markdown(lines: Iterable[str], max_chunk_chars: int = 64 * 1024) -> Iterator[Token]:
+    """Tokenize an iterable of lines (with line endings) in a single pass.
+
+    Only one element is buffered at a time. Prose longer than
+    ``max_chunk_chars`` is emitted as several ``TEXT`` tokens.
+    """
+    lines = iter(lines)
+    paragraph = []
+    paragraph_chars = 0
+    pending = None
+
+    def flush_paragraph():
+        nonlocal paragraph, paragraph_chars
+        if not paragraph:
+            return
+        text = "".join(paragraph).strip("\n")
+        paragraph = []
+        paragraph_chars = 0
+        if text.strip():
+            yield Token(TEXT, text)
+
+    def next_line():
+        nonlocal pending
+        if pending is not None:
+            line, pending = pending, None
+            return line
+        return next(lines, None)
+
+    # Front matter is only recognised before any other content.
+    line = next_line()
+    while line is not None and not line.strip():
+        line = next_line()
+    if line is not None and line.strip() == "---":
+        front_matter = []
+        for closing in lines:
+            if closing.strip() in ("---", "..."):
+                yield Token(FRONT_MATTER, "".join(front_matter))
+                line = next_line()
+                break
+            front_matter.append(closing)
+        else:
+            # Never closed: the opening line was a thematic break, so replay
+            # everything after it as ordinary content
+            lines = itertools.chain(front_matter, lines)
+
+    while line is not None:
+        stripped = line.strip()
+        fence = _FENCE.match(line)
+        heading = _HEADING.match(line)
+        if fence:
+            yield from flush_paragraph()
+            marker, language = fence.group(2), fence.group(3).lower()
+            code = []
+            for line in lines:
+                closing = line.strip()
+                if closing.startswith(marker) and not closing.strip(marker[0]):
+                    break
+                code.append(line)
+            yield Token(CODE, "".join(code), language=language)
+        elif stripped.startswith("|"):
+            delimiter = next_line()
+            if delimiter is not None and _TABLE_DELIMITER.match(delimiter):
+                yield from flush_paragraph()
+                rows = [line, delimiter]
+                line = next_line()
+                while line is not None and line.strip().startswith("|"):
+                    rows.append(line)
+                    line = next_line()
+                yield Token(TABLE, "".join(rows))
+                continue
+            pending = delimiter
+            paragraph.append(line)
+            paragraph_chars += len(line)
+        elif heading:
+            yield from flush_paragraph()
+            level = len(heading.group(1))
+            title = _CLOSING_HASHES.sub("", stripped[level:]).strip()
+            yield Token(HEADING, title, level=level)
+        elif not stripped or _THEMATIC_BREAK.match(line):
+            yield from flush_paragraph()
+        else:
+            if paragraph_chars + len(line) > max_chunk_chars:
+                yield from flush_paragraph()
+            paragraph.append(line)
+            paragraph_chars += len(line)
+        line = next_line()
+    yield from flush_paragraph()
@@ -0,0 +1,288 @@
+import atexit
+import functools
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+# Lightweight in-process metrics for the hot paths: per-stage latency
+# histograms (fetch, yaml, table, ast, markdown, parse, embed, ingest),
+# counters for bytes and documents processed, and gauges for queue depths and
+# cache hit ratios. Recording is off unless METRICS_ENABLED is set (or
+# ``metrics.enabled`` is switched on); disabled calls return after one
+# attribute check. Snapshots are exported as Prometheus text or JSON, and
+# listeners (such as the OpenTelemetry bridge) see every observation.
+#
+# Metrics are per process: stages that run in a parse worker process are
+# recorded there, so the ingest pipeline also times each parse in the worker
+# and records it in the parent.
+
+# Latency buckets in seconds, 100us to 10s
+DEFAULT_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+                   0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+Labels = Tuple[Tuple[str, str], ...]
+
+def _labels(labels: Dict[str, Any]) -> Labels:
+    return tuple(sorted((name, str(value)) for name, value in labels.items()))
+
+class Histogram:
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = buckets
+        # counts[i] observations fell in (buckets[i - 1], buckets[i]]; the last is +Inf
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def quantile(self, q: float) -> float:
+        """Upper bound of the bucket holding the ``q`` quantile."""
+        if not self.count:
+            return 0.0
+        rank, seen = q * self.count, 0
+        for bound, count in zip(self.buckets, self.counts):
+            seen += count
+            if seen >= rank:
+                return bound
+        return float("inf")
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "sum": self.sum,
+            "buckets": dict(zip([str(bound) for bound in self.buckets] + ["+Inf"], self.counts)),
+        }
+
+class _NullTimer:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+_NULL_TIMER = _NullTimer()
+
+class _Timer:
+    __slots__ = ("registry", "name", "labels", "start")
+
+    def __init__(self, registry: "Metrics", name: str, labels: Dict[str, Any]):
+        self.registry = registry
+        self.name = name
+        self.labels = labels
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.registry.observe(self.name, time.perf_counter() - self.start, **self.labels)
+        return False
+
+class Metrics:
+    """Registry of counters, gauges and histograms keyed by name and labels.
+
+    ``collectors`` are called at export time and return ``(name, value,
+    labels)`` gauges, for values that are cheaper to read than to track (cache
+    stats). ``listeners`` are called as ``listener(kind, name, value, labels)``
+    for every recorded value.
+    """
+
+    def __init__(self, enabled: bool = False):
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self.counters: Dict[Tuple[str, Labels], float] = {}
+        self.gauges: Dict[Tuple[str, Labels], float] = {}
+        self.histograms: Dict[Tuple[str, Labels], Histogram] = {}
+        self.collectors: List[Callable[[], Iterable[Tuple[str, float, Dict[str, Any]]]]] = []
+        self.listeners: List[Callable[[str, str, float, Dict[str, Any]], None]] = []
+
+    def _notify(self, kind: str, name: str, value: float, labels: Dict[str, Any]):
+        for listener in self.listeners:
+            listener(kind, name, value, labels)
+
+    def inc(self, name: str, value: float = 1, **labels):
+        if not self.enabled:
+            return
+        key = (name, _labels(labels))
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+        if self.listeners:
+            self._notify("counter", name, value, labels)
+
+    def set_gauge(self, name: str, value: float, **labels):
+        if not self.enabled:
+            return
+        with self._lock:
+            self.gauges[(name, _labels(labels))] = value
+        if self.listeners:
+            self._notify("gauge", name, value, labels)
+
+    def observe(self, name: str, value: float, **labels):
+        if not self.enabled:
+            return
+        key = (name, _labels(labels))
+        with self._lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = Histogram()
+            histogram.observe(value)
+        if self.listeners:
+            self._notify("histogram", name, value, labels)
+
+    def timer(self, name: str, **labels):
+        """Context manager observing its duration into histogram ``name``."""
+        return _Timer(self, name, labels) if self.enabled else _NULL_TIMER
+
+    def stage(self, stage: str):
+        """Time a pipeline stage into ``stage_seconds{stage=...}``."""
+        return _Timer(self, "stage_seconds", {"stage": stage}) if self.enabled else _NULL_TIMER
+
+    def add_collector(self, collector: Callable[[], Iterable[Tuple[str, float, Dict[str, Any]]]]):
+        self.collectors.append(collector)
+
+    def collected(self) -> Dict[Tuple[str, Labels], float]:
+        gauges = dict(self.gauges)
+        for collector in self.collectors:
+            for name, value, labels in collector():
+                gauges[(name, _labels(labels))] = value
+        return gauges
+
+    def reset(self):
+        with self._lock:
+            self.counters.clear()
+            self.gauges.clear()
+            self.histograms.clear()
+
+    def snapshot(self) -> Dict[str, List[Dict[str, Any]]]:
+        with self._lock:
+            counters = dict(self.counters)
+            histograms = {key: histogram.snapshot() for key, histogram in self.histograms.items()}
+        return {
+            "counters": [{"name": name, "labels": dict(labels), "value": value}
+                         for (name, labels), value in sorted(counters.items())],
+            "gauges": [{"name": name, "labels": dict(labels), "value": value}
+                       for (name, labels), value in sorted(self.collected().items())],
+            "histograms": [{"name": name, "labels": dict(labels), **histogram}
+                           for (name, labels), histogram in sorted(histograms.items())],
+        }
+
+def _enabled_from_env() -> bool:
+    return os.getenv("METRICS_ENABLED", "").lower() in ("1", "true", "yes")
+
+metrics = Metrics(enabled=_enabled_from_env())
+
+def timed(stage: str):
+    """Decorator timing every call into ``stage_seconds{stage=...}`` while metrics are enabled."""
+    def decorate(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not metrics.enabled:
+                return func(*args, **kwargs)
+            with metrics.stage(stage):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate
+
+def _format_labels(labels: Labels, extra: Tuple[Tuple[str, str], ...] = ()) -> str:
+    pairs = labels + extra
+    if not pairs:
+        return ""
+    escaped = (value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, value in pairs)
+    return "{" + ",".join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + "}"
+
+def prometheus_text(registry: Metrics = metrics, namespace: str = "bucket_objects") -> str:
+    """Render the registry in the Prometheus text exposition format."""
+    prefix = f"{namespace}_" if namespace else ""
+    lines = []
+    snapshot = registry.snapshot()
+    for kind, entries in (("counter", snapshot["counters"]), ("gauge", snapshot["gauges"])):
+        typed = set()
+        for entry in entries:
+            name = prefix + entry["name"]
+            if name not in typed:
+                lines.append(f"# TYPE {name} {kind}")
+                typed.add(name)
+            lines.append(f"{name}{_format_labels(_labels(entry['labels']))} {entry['value']}")
+    typed = set()
+    for entry in snapshot["histograms"]:
+        name, labels = prefix + entry["name"], _labels(entry["labels"])
+        if name not in typed:
+            lines.append(f"# TYPE {name} histogram")
+            typed.add(name)
+        cumulative = 0
+        for bound, count in entry["buckets"].items():
+            cumulative += count
+            lines.append(f"{name}_bucket{_format_labels(labels, (('le', bound),))} {cumulative}")
+        lines.append(f"{name}_sum{_format_labels(labels)} {entry['sum']}")
+        lines.append(f"{name}_count{_format_labels(labels)} {entry['count']}")
+    return "\n".join(lines) + "\n"
+
+def json_dump(registry: Metrics = metrics, path: Optional[str] = None) -> str:
+    """Return the registry snapshot as JSON, also writing it to ``path`` if given."""
+    text = json.dumps(registry.snapshot(), indent=2, sort_keys=True)
+    if path is not None:
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    return text
+
+class OpenTelemetryBridge:
+    """Forwards observations to OpenTelemetry instruments (opentelemetry-api
+    must be installed; the SDK and exporter are configured by the application)."""
+
+    def __init__(self, meter=None, namespace: str = "bucket_objects"):
+        from opentelemetry import metrics as otel_metrics
+
+        self.meter = meter or otel_metrics.get_meter(namespace)
+        self.namespace = namespace
+        self.instruments: Dict[Tuple[str, str], Any] = {}
+        self.gauge_values: Dict[Tuple[str, Labels], float] = {}
+        self._lock = threading.Lock()
+
+    def _instrument(self, kind: str, name: str):
+        key = (kind, name)
+        instrument = self.instruments.get(key)
+        if instrument is None:
+            with self._lock:
+                instrument = self.instruments.get(key)
+                if instrument is None:
+                    full_name = f"{self.namespace}.{name}"
+                    if kind == "counter":
+                        instrument = self.meter.create_counter(full_name)
+                    elif kind == "histogram":
+                        instrument = self.meter.create_histogram(full_name, unit="s")
+                    else:
+                        # Gauges are sent as deltas so any OTel version can take them
+                        instrument = self.meter.create_up_down_counter(full_name)
+                    self.instruments[key] = instrument
+        return instrument
+
+    def __call__(self, kind: str, name: str, value: float, labels: Dict[str, Any]):
+        instrument = self._instrument(kind, name)
+        attributes = {key: str(val) for key, val in labels.items()}
+        if kind == "counter":
+            instrument.add(value, attributes)
+        elif kind == "histogram":
+            instrument.record(value, attributes)
+        else:
+            key = (name, _labels(labels))
+            with self._lock:
+                delta = value - self.gauge_values.get(key, 0)
+                self.gauge_values[key] = value
+            instrument.add(delta, attributes)
+
+def enable_opentelemetry(registry: Metrics = metrics, meter=None) -> OpenTelemetryBridge:
+    """Enable ``registry`` and mirror everything it records into OpenTelemetry."""
+    bridge = OpenTelemetryBridge(meter)
+    registry.listeners.append(bridge)
+    registry.enabled = True
+    return bridge
+
+if os.getenv("METRICS_JSON"):
+    # Dump the final snapshot of short-lived runs (CLI ingests, benchmarks)
+    atexit.register(lambda: metrics.enabled and json_dump(metrics, os.environ["METRICS_JSON"]))
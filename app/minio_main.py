@@ -0,0 +1,97 @@
+import os
+from dataclasses import replace
+
+from .ingest import iter_bucket_documents, iter_bucket_results, parse_markdown_bytes
+from .manifest import ObjectManifest
+
+# Run as a package module: python -m app.minio_main
+
+def connect_to_minio():
+    from minio import Minio
+
+    # Connect to MinIO
+    client = Minio(
+        "MINIO_SERVER_URL",
+        access_key="YOUR_ACCESS_KEY",
+        secret_key="YOUR_SECRET_KEY",
+        secure=True  # Set to False if not using https
+    )
+    return client
+
+# A manifest records an object once its sink has acknowledged it and forgets
+# a deleted object once its tombstone has been acknowledged, so every sink
+# keeps its own; sinks sharing one would each miss the changes the others
+# consumed
+EXPORT_MANIFEST = ".ingest-manifest.sqlite"
+
+def sink_manifest_path(sink: str) -> str:
+    return f"ingest-manifest-{sink}.sqlite"
+
+def process_bucket_results(client, bucket_name, fetch_workers=8, parse_workers=None, manifest=None,
+                           parser=parse_markdown_bytes):
+    # Stream an IngestResult per object: objects are listed, fetched
+    # concurrently and parsed on a process pool, joined by bounded queues.
+    # With a manifest (an open ObjectManifest), unchanged objects are skipped
+    # and deleted objects come back as tombstones (deleted=True); the caller
+    # acknowledges each result once its sink has it
+    return iter_bucket_results(
+        client,
+        bucket_name,
+        parser=parser,
+        fetch_workers=fetch_workers,
+        parse_workers=parse_workers,
+        manifest=manifest
+    )
+
+def process_bucket_data(client, bucket_name, on_delete=None, manifest_path=None, **kwargs):
+    # Stream just the parsed MarkdownDocuments, reporting deletions by name;
+    # each is acknowledged when the consumer asks for the next one
+    manifest = ObjectManifest(manifest_path) if manifest_path else None
+    try:
+        yield from iter_bucket_documents(client, bucket_name, on_delete=on_delete, manifest=manifest, **kwargs)
+    finally:
+        if manifest is not None:
+            manifest.close()
+
+def export_bucket_data(client, bucket_name, export_dir, format="parquet", manifest_path=None, **kwargs):
+    # Append this run's results (and deletions) to a Parquet/Arrow corpus
+    # under export_dir; read it back with arrow_sink.read_corpus. Unless
+    # given, the manifest lives in export_dir, so the corpus gets every
+    # change since its own last export whatever other sinks have run
+    from .arrow_sink import export_bucket_results
+    if manifest_path is None:
+        os.makedirs(export_dir, exist_ok=True)
+        manifest_path = os.path.join(export_dir, EXPORT_MANIFEST)
+    with ObjectManifest(manifest_path) as manifest:
+        exported = []
+
+        def results():
+            for result in process_bucket_results(client, bucket_name, manifest=manifest, **kwargs):
+                exported.append(replace(result, document=None, chunks=None))
+                yield result
+
+        stats = export_bucket_results(results(), export_dir, format=format)
+        # Rows are buffered into row groups, so nothing is acknowledged until
+        # the run's files have been closed
+        for result in exported:
+            manifest.acknowledge(bucket_name, result)
+    return stats
+
+def main():
+    client = connect_to_minio()
+    bucket_name = "your-bucket-name"
+    if os.getenv("CORPUS_EXPORT_DIR"):
+        stats = export_bucket_data(client, bucket_name, os.environ["CORPUS_EXPORT_DIR"])
+        print(f"exported run {stats.run}: {stats.documents} documents, {stats.deleted} deleted")
+        return
+    documents = process_bucket_data(
+        client,
+        bucket_name,
+        manifest_path=sink_manifest_path("stdout"),
+        on_delete=lambda object_name: print(f"deleted: {object_name}")
+    )
+    for markdown_document in documents:
+        print(markdown_document)
+
+if __name__ == "__main__":
+    main()
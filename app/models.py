@@ -0,0 +1,30 @@
+from pydantic import BaseModel, Field
+from typing import List, Dict, Any, Optional
+
+class SourceCode(BaseModel):
+    id: str = Field(description="Unique identifier for the source code object.")
+    imports: List[str] = Field(description="List of extracted required packages.")
+    classes: List[str] = Field(description="List of extracted classes from the code.")
+    code: str = Field(description="Source code snippets.")
+    syntax: str = Field(description="The programming language syntax/extension (e.g., Python).")
+    context: str = Field(description="Any extracted text, markdown, comments, or docstrings.")
+    metadata: dict = Field(description="Extracted or generated metadata tags for top-level cataloging and code object management.")
+
+class Table(BaseModel):
+    headers: List[str] = Field(description="Headers of the table")
+    rows: List[Dict[str, Any]] = Field(description="Rows of the table, each row being a dictionary")
+
+class Blob(BaseModel):
+    kind: str = Field(description="The media kind of the blob (e.g., image, video).")
+    uri: str = Field(description="Where the blob lives, as referenced by the document.")
+    alt: str = Field(default="", description="Alternative text or caption of the blob.")
+    sha256: str = Field(default="", description="SHA-256 of the blob bytes, once resolved.")
+    size: Optional[int] = Field(default=None, description="Size of the blob in bytes, once resolved.")
+    object_key: str = Field(default="", description="Content-addressed object key the blob is (or would be) stored under.")
+
+class MarkdownDocument(BaseModel):
+    metadata: Dict[str, Any] = Field(description="Metadata of the document")
+    tables: List[Table] = Field(description="List of tables in the document")
+    code_blocks: List[SourceCode] = Field(description="List of code blocks in the document")
+    content: str = Field(description="The textual content of the document")
+    blob_data: List[Blob] = Field(default_factory=list, description="The image or video content of the document")
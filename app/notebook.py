@@ -0,0 +1,326 @@
+import base64
+import binascii
+import hashlib
+import io
+import json
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
+
+from .blobs import blob_object_key
+from .json_stream import JsonStream
+from .markdown_stream import MarkdownDocumentBuilder, PYTHON_LANGUAGES, iter_markdown_events
+from .models import Blob, MarkdownDocument
+from .parse_cache import cached_parse_python_script
+
+# Jupyter notebook reader. Cells are streamed one at a time with JsonStream, so
+# outputs are never decoded in full: rich output data (plots, HTML, widgets) is
+# hashed while it is read and referenced from ``blob_data`` by JSON pointer,
+# and plain-text output is kept only up to ``text_limit`` characters. Peak
+# memory is bounded by the largest cell source, not by the notebook size.
+
+# Binary output payloads are base64 in the notebook; everything else is text
+_BASE64_PREFIXES = ("image/", "video/", "audio/")
+_TEXT_MIME_TYPES = {"image/svg+xml"}
+_BASE64_MIME_TYPES = {"application/pdf", "application/octet-stream"}
+_PLAIN_TEXT = "text/plain"
+
+@dataclass
+class NotebookOutput:
+    output_type: str
+    mime_type: str
+    pointer: str
+    size: int = 0
+    sha256: str = ""
+    text: Optional[str] = None
+
+@dataclass
+class NotebookCell:
+    index: int
+    cell_type: str
+    source: str
+    execution_count: Optional[int] = None
+    metadata: Dict[str, Any] = field(default_factory=dict)
+    outputs: List[NotebookOutput] = field(default_factory=list)
+    attachments: List[NotebookOutput] = field(default_factory=list)
+
+@dataclass
+class NotebookInfo:
+    metadata: Dict[str, Any]
+    nbformat: Optional[int] = None
+    nbformat_minor: Optional[int] = None
+
+    @property
+    def language(self) -> str:
+        language = (self.metadata.get("kernelspec") or {}).get("language")
+        return (language or (self.metadata.get("language_info") or {}).get("name") or "python").lower()
+
+NotebookEvent = Union[NotebookCell, NotebookInfo]
+
+def _is_base64(mime_type: str) -> bool:
+    if mime_type in _TEXT_MIME_TYPES:
+        return False
+    return mime_type in _BASE64_MIME_TYPES or mime_type.startswith(_BASE64_PREFIXES)
+
+def _pointer_token(token: str) -> str:
+    return token.replace("~", "~0").replace("/", "~1")
+
+class _Digest:
+    # Hashes a value while it streams past; base64 payloads are decoded first
+    # so the hash and size describe the actual blob bytes
+    def __init__(self, base64_encoded: bool):
+        self.base64_encoded = base64_encoded
+        self.sha256 = hashlib.sha256()
+        self.size = 0
+        self._pending = ""
+
+    def update(self, text: str):
+        if not self.base64_encoded:
+            data = text.encode("utf-8")
+        else:
+            text = self._pending + "".join(text.split())
+            usable = len(text) - len(text) % 4
+            self._pending = text[usable:]
+            try:
+                data = base64.b64decode(text[:usable])
+            except binascii.Error:
+                # Not valid base64 after all: hash what is there as text
+                self.base64_encoded = False
+                data = text.encode("utf-8")
+        self.sha256.update(data)
+        self.size += len(data)
+
+    def hexdigest(self) -> str:
+        if self._pending:
+            self.update("=" * (-len(self._pending) % 4))
+        return self.sha256.hexdigest()
+
+def _read_multiline(stream: JsonStream, digest: _Digest, keep: Optional[int], separator: str = "") -> Optional[str]:
+    # nbformat stores multi-line strings either as one string or as a list of lines
+    char = stream.peek()
+    if char == '"':
+        return stream.read_string(sink=digest.update, keep=keep)
+    if char == "[":
+        kept = []
+        length = 0
+        for _ in stream.iter_array():
+            line = stream.read_string(sink=digest.update, keep=None if keep is None else max(0, keep - length))
+            if line is None or kept is None:
+                kept = None
+                continue
+            length += len(line)
+            kept.append(line)
+        return separator.join(kept) if kept is not None else None
+    # application/json and widget state are JSON values rather than strings
+    value = json.dumps(stream.read_value(), sort_keys=True)
+    digest.update(value)
+    return value if keep is None or len(value) <= keep else None
+
+def _read_mime_bundle(stream: JsonStream, output_type: str, pointer: str, text_limit: int) -> List[NotebookOutput]:
+    outputs = []
+    for mime_type in stream.iter_object():
+        digest = _Digest(_is_base64(mime_type))
+        keep = text_limit if mime_type == _PLAIN_TEXT else 0
+        text = _read_multiline(stream, digest, keep)
+        outputs.append(NotebookOutput(output_type, mime_type, f"{pointer}/{_pointer_token(mime_type)}",
+                                      digest.size, digest.hexdigest(), text or None))
+    return outputs
+
+def _read_output(stream: JsonStream, pointer: str, text_limit: int) -> List[NotebookOutput]:
+    output_type = ""
+    outputs = []
+    for key in stream.iter_object():
+        if key == "output_type":
+            output_type = stream.read_value()
+        elif key == "data":
+            outputs.extend(_read_mime_bundle(stream, output_type, f"{pointer}/data", text_limit))
+        elif key in ("text", "traceback"):
+            digest = _Digest(False)
+            text = _read_multiline(stream, digest, text_limit, "\n" if key == "traceback" else "")
+            outputs.append(NotebookOutput(output_type, _PLAIN_TEXT, f"{pointer}/{key}",
+                                          digest.size, digest.hexdigest(), text))
+        else:
+            stream.skip_value()
+    # The output_type key may follow the data it describes
+    for output in outputs:
+        output.output_type = output_type
+    return outputs
+
+def _read_cell(stream: JsonStream, index: int, text_limit: int) -> NotebookCell:
+    cell = NotebookCell(index=index, cell_type="", source="")
+    pointer = f"/cells/{index}"
+    for key in stream.iter_object():
+        if key == "cell_type":
+            cell.cell_type = stream.read_value()
+        elif key == "source":
+            cell.source = _read_multiline(stream, _Digest(False), None) or ""
+        elif key == "execution_count":
+            cell.execution_count = stream.read_value()
+        elif key == "metadata":
+            cell.metadata = stream.read_value() or {}
+        elif key == "outputs":
+            for output_index in stream.iter_array():
+                cell.outputs.extend(_read_output(stream, f"{pointer}/outputs/{output_index}", text_limit))
+        elif key == "attachments":
+            for name in stream.iter_object():
+                attachment_pointer = f"{pointer}/attachments/{_pointer_token(name)}"
+                for attachment in _read_mime_bundle(stream, "attachment", attachment_pointer, 0):
+                    attachment.text = name
+                    cell.attachments.append(attachment)
+        else:
+            stream.skip_value()
+    return cell
+
+def iter_notebook(source, text_limit: int = 4096, chunk_size: int = 64 * 1024) -> Iterator[NotebookEvent]:
+    """Yield a ``NotebookCell`` per cell as soon as it has been read, then a
+    ``NotebookInfo`` with the notebook-level metadata (which nbformat writes
+    after the cells)."""
+    with JsonStream(source, chunk_size) as stream:
+        info = NotebookInfo(metadata={})
+        for key in stream.iter_object():
+            if key == "cells":
+                for index in stream.iter_array():
+                    yield _read_cell(stream, index, text_limit)
+            elif key == "metadata":
+                info.metadata = stream.read_value() or {}
+            elif key in ("nbformat", "nbformat_minor"):
+                setattr(info, key, stream.read_value())
+            else:
+                stream.skip_value()
+        yield info
+
+def _media_kind(mime_type: str) -> str:
+    kind = mime_type.split("/", 1)[0]
+    return kind if kind in ("image", "video", "audio") else "data"
+
+def _scan_line(line: str, quote: Optional[str], depth: int) -> Tuple[Optional[str], int, bool]:
+    # Carries the lexical state across a line: the open string delimiter, the
+    # bracket depth and whether a backslash continues the line
+    i, n = 0, len(line)
+    comment = False
+    while i < n:
+        char = line[i]
+        if quote:
+            if char == "\\":
+                i += 2
+            elif line.startswith(quote, i):
+                i += len(quote)
+                quote = None
+            else:
+                i += 1
+            continue
+        if char == "#":
+            comment = True
+            break
+        if char in "\"'":
+            quote = line[i:i + 3] if line[i:i + 3] in ('"""', "'''") else char
+            i += len(quote)
+            continue
+        if char in "([{":
+            depth += 1
+        elif char in ")]}":
+            depth = max(0, depth - 1)
+        i += 1
+    continued = not comment and line.rstrip("\r").endswith("\\")
+    if quote is not None and len(quote) == 1 and not continued:
+        # An unterminated single-quoted string ends with its line
+        quote = None
+    return quote, depth, continued
+
+def _strip_magics(source: str) -> str:
+    # IPython line magics and shell escapes are not Python; keep them as
+    # comments. Only lines that start a statement can be magics, so lines
+    # inside strings, brackets or backslash continuations are left alone.
+    lines = []
+    quote, depth, continued = None, 0, False
+    for line in source.split("\n"):
+        stripped = line.lstrip()
+        check = stripped.rstrip()
+        if quote is None and depth == 0 and not continued and (
+                check.startswith(("%", "!")) or (check.endswith("?") and not check.startswith("#"))):
+            line = line[:len(line) - len(stripped)] + "# " + stripped
+        else:
+            quote, depth, continued = _scan_line(line, quote, depth)
+        lines.append(line)
+    return "\n".join(lines)
+
+class NotebookDocumentBuilder:
+    """Accumulates notebook events into a ``MarkdownDocument``.
+
+    Markdown cells go through the Markdown event pipeline and code cells through
+    ``parse_python_script`` (when the kernel language is Python). Rich outputs
+    and attachments become ``Blob`` references; output text is left out.
+    """
+
+    def __init__(self, name: str = ""):
+        self.name = name
+        self.markdown = MarkdownDocumentBuilder()
+        # Code cells wait for the kernel language, which comes last
+        self.code_cells: List[NotebookCell] = []
+        self.info = NotebookInfo(metadata={})
+
+    def _blob(self, output: NotebookOutput, alt: str) -> Blob:
+        # Hashed while streaming, so the reference is already resolved
+        return Blob(kind=_media_kind(output.mime_type), uri=f"{self.name}#{output.pointer}", alt=alt,
+                    sha256=output.sha256, size=output.size, object_key=blob_object_key(output.sha256))
+
+    def add(self, event: NotebookEvent):
+        if isinstance(event, NotebookInfo):
+            self.info = event
+            return
+        if event.cell_type == "markdown":
+            self.markdown.extend(iter_markdown_events(io.StringIO(event.source)))
+            for attachment in event.attachments:
+                self.markdown.blob_data.append(self._blob(attachment, attachment.text or ""))
+        elif event.cell_type == "code":
+            self.code_cells.append(NotebookCell(event.index, event.cell_type, event.source, event.execution_count))
+            for output in event.outputs:
+                if output.mime_type != _PLAIN_TEXT:
+                    self.markdown.blob_data.append(self._blob(output, output.mime_type))
+        elif event.source:
+            # raw cells
+            self.markdown.content.append(event.source)
+
+    def build(self) -> MarkdownDocument:
+        python = self.info.language in PYTHON_LANGUAGES
+        for cell in self.code_cells:
+            if python and not cell.source.lstrip().startswith("%%"):
+                source_code = cached_parse_python_script(_strip_magics(cell.source))
+                source_code.metadata["cell"] = cell.index
+                self.markdown.code_blocks.append(source_code)
+            elif cell.source:
+                self.markdown.content.append(cell.source)
+        document = self.markdown.build()
+        metadata = dict(self.info.metadata)
+        metadata.update(document.metadata)
+        metadata["nbformat"] = self.info.nbformat
+        document.metadata = metadata
+        return document
+
+def parse_notebook(source, name: str = "", text_limit: int = 4096) -> MarkdownDocument:
+    """Parse a notebook from a path, a JSON string, bytes or (binary) file object."""
+    if not name and isinstance(source, str) and source.lstrip()[:1] != "{":
+        name = source
+    builder = NotebookDocumentBuilder(name)
+    for event in iter_notebook(source, text_limit):
+        builder.add(event)
+    return builder.build()
+
+def parse_notebook_bytes(data: bytes) -> MarkdownDocument:
+    # Top-level so it can be used as an ``iter_bucket_results`` parser
+    return parse_notebook(data)
+
+def render_notebook(source, text_limit: int = 1000) -> str:
+    """Render a notebook as plain text for prompts: cell sources, truncated text
+    output and a one-line placeholder for each rich output."""
+    parts = []
+    for event in iter_notebook(source, text_limit):
+        if not isinstance(event, NotebookCell):
+            continue
+        header = f"# [{event.cell_type} cell {event.index}]"
+        parts.append(header + "\n" + event.source.rstrip())
+        for output in event.outputs:
+            if output.mime_type == _PLAIN_TEXT and output.text is not None:
+                parts.append("# [output]\n" + output.text.rstrip())
+            else:
+                parts.append(f"# [output {output.mime_type}, {output.size} bytes, sha256 {output.sha256[:12]}]")
+    return "\n\n".join(parts)
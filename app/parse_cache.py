@@ -0,0 +1,147 @@
+import hashlib
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Optional, Type
+
+from pydantic import BaseModel
+
+from .metrics import metrics
+from .parsers import PARSER_VERSION
+
+# Content-addressed cache for parser results. Entries are keyed by a SHA-256 of
+# the parser kind, parser version and input, and stored as serialized models so
+# every hit hands back a fresh object and sizes are known exactly.
+
+class ParseCache:
+    """Two-tier parse cache: an in-process LRU bounded by ``max_bytes`` and an
+    optional on-disk tier under ``directory`` that survives restarts."""
+
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024, directory: Optional[str] = None,
+                 parser_version: str = PARSER_VERSION):
+        self.max_bytes = max_bytes
+        self.directory = directory
+        self.parser_version = parser_version
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._bytes = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def key(self, kind: str, content) -> str:
+        if isinstance(content, str):
+            content = content.encode("utf-8")
+        digest = hashlib.sha256(f"{kind}:{self.parser_version}:".encode())
+        digest.update(content)
+        return digest.hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], key + ".json")
+
+    def _remember(self, key: str, raw: bytes):
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                return
+            if len(raw) > self.max_bytes:
+                return
+            self._entries[key] = raw
+            self._bytes += len(raw)
+            while self._bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= len(evicted)
+                self.evictions += 1
+
+    def _read_disk(self, key: str) -> Optional[bytes]:
+        if not self.directory:
+            return None
+        try:
+            with open(self._path(key), "rb") as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def _write_disk(self, key: str, raw: bytes):
+        if not self.directory:
+            return
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+        with os.fdopen(fd, "wb") as f:
+            f.write(raw)
+        os.replace(tmp_path, path)
+
+    def get(self, key: str, model: Type[BaseModel]) -> Optional[BaseModel]:
+        with self._lock:
+            raw = self._entries.get(key)
+            if raw is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+        if raw is None:
+            raw = self._read_disk(key)
+            if raw is None:
+                with self._lock:
+                    self.misses += 1
+                return None
+            with self._lock:
+                self.hits += 1
+                self.disk_hits += 1
+            self._remember(key, raw)
+        return model.parse_raw(raw)
+
+    def put(self, key: str, value: BaseModel):
+        raw = value.json().encode("utf-8")
+        self._remember(key, raw)
+        self._write_disk(key, raw)
+
+    def get_or_parse(self, kind: str, content, model: Type[BaseModel], parse: Callable) -> BaseModel:
+        key = self.key(kind, content)
+        cached = self.get(key, model)
+        if cached is not None:
+            return cached
+        value = parse(content)
+        self.put(key, value)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+            }
+
+default_cache = ParseCache(directory=os.environ.get("PARSE_CACHE_DIR"))
+
+def _cache_metrics():
+    stats = default_cache.stats()
+    lookups = stats["hits"] + stats["misses"]
+    yield "cache_hit_ratio", stats["hits"] / lookups if lookups else 0.0, {"cache": "parse"}
+    yield "cache_bytes", stats["bytes"], {"cache": "parse"}
+
+metrics.add_collector(_cache_metrics)
+
+def cached_parse_markdown_content(markdown: str, cache: Optional[ParseCache] = None):
+    from .models import MarkdownDocument
+    from .parsers import parse_markdown_content
+    cache = cache or default_cache
+    return cache.get_or_parse("markdown", markdown, MarkdownDocument, parse_markdown_content)
+
+def cached_parse_python_script(script: str, cache: Optional[ParseCache] = None):
+    from .models import SourceCode
+    from .parsers import parse_python_script
+    cache = cache or default_cache
+    return cache.get_or_parse("python", script, SourceCode, parse_python_script)
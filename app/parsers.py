@@ -0,0 +1,122 @@
+import ast
+import os
+import yaml
+
+from .metrics import timed
+from .models import SourceCode, Table, MarkdownDocument
+from .python_ast import extract_python, source_id
+
+# The parsing core. Only pydantic and PyYAML are imported here; pandas and the
+# Unstructured loader are imported on first use so worker processes and CLI
+# invocations that never need them don't pay for them at startup. The LangChain
+# tool wrappers around these functions live in main.py.
+
+# Bump whenever parser output changes so manifests and caches re-parse stale entries
+PARSER_VERSION = "3"
+
+@timed("yaml")
+def parse_yaml_metadata(yaml_content: str) -> dict:
+    try:
+        return yaml.safe_load(yaml_content) or {}
+    except yaml.YAMLError:
+        return {}
+
+@timed("table")
+def parse_table(table_content: str) -> Table:
+    if table_content.lstrip().startswith("<"):
+        # HTML table rows still go through pandas
+        import pandas as pd
+
+        df = pd.read_html("<table>" + table_content + "</table>")[0]
+        return Table(headers=df.columns.tolist(), rows=df.to_dict(orient="records"))
+
+    from .tables import parse_pipe_table
+
+    return parse_pipe_table(table_content, infer_types=True)
+
+def python_fields(script: str) -> dict:
+    # The SourceCode fields for a script; shared with the compact records in records.py
+    try:
+        tree = ast.parse(script)
+    except SyntaxError as e:
+        return dict(
+            id="error",
+            imports=[],
+            classes=[],
+            code=script,
+            syntax="Python",
+            context="Syntax error in provided script",
+            metadata={"error": str(e)}
+        )
+
+    extractor = extract_python(script, tree)
+
+    return dict(
+        id=source_id(script),
+        imports=extractor.import_names(),
+        classes=[cls["name"] for cls in extractor.classes],
+        code=script,
+        syntax="Python",
+        context=extractor.context(),
+        metadata=extractor.metadata()
+    )
+
+@timed("ast")
+def parse_python_script(script: str) -> SourceCode:
+    return SourceCode(**python_fields(script))
+
+def parse_markdown_content_unstructured(markdown_path: str) -> MarkdownDocument:
+    # Fallback for inputs outside the native tokenizer's subset (raw HTML
+    # blocks, setext headings, reStructuredText-ish exports, ...)
+    from langchain.document_loaders import UnstructuredMarkdownLoader
+
+    from .parse_cache import cached_parse_python_script
+
+    loader = UnstructuredMarkdownLoader(markdown_path, mode="elements")
+    markdown_elements = loader.load()
+
+    extracted_metadata = {}
+    extracted_tables = []
+    extracted_code_blocks = []
+    extracted_content = []
+    extraxted_blob_data = []
+
+    for element in markdown_elements:
+        if element['type'] == 'yaml':
+            extracted_metadata.update(parse_yaml_metadata(element['content']))
+        elif element['type'] == 'table':
+            extracted_tables.append(parse_table(element['content']))
+        elif element['type'] == 'code' and element['language'] == 'python':
+            extracted_code_blocks.append(cached_parse_python_script(element['content']))
+        else:
+            extracted_content.append(element['content'])
+
+    return MarkdownDocument(
+        metadata=extracted_metadata,
+        tables=extracted_tables,
+        code_blocks=extracted_code_blocks,
+        content="\\n".join(extracted_content)
+    )
+
+def parse_markdown_content(markdown: str, loader: str = "native") -> MarkdownDocument:
+    # ``markdown`` is always content, never a path; see parse_markdown_file
+    if loader == "unstructured":
+        import tempfile
+
+        with tempfile.TemporaryDirectory() as tmp:
+            markdown_path = os.path.join(tmp, "document.md")
+            with open(markdown_path, "w", encoding="utf-8") as f:
+                f.write(markdown)
+            return parse_markdown_content_unstructured(markdown_path)
+
+    from .markdown_stream import stream_markdown_document
+
+    return stream_markdown_document(markdown)
+
+def parse_markdown_file(markdown_path: str, loader: str = "native") -> MarkdownDocument:
+    if loader == "unstructured":
+        return parse_markdown_content_unstructured(markdown_path)
+
+    from .markdown_stream import stream_markdown_file
+
+    return stream_markdown_file(markdown_path)
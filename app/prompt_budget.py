@@ -0,0 +1,289 @@
+import io
+import os
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional
+
+from .embeddings import estimate_tokens
+from .markdown_tokenizer import CODE, FRONT_MATTER, HEADING, TABLE, TEXT, tokenize_markdown
+from .parse_cache import cached_parse_python_script
+
+# Token budgets for analysis prompts. Content that does not fit is compressed
+# rather than cut: Python files become a skeleton of imports, constants,
+# signatures and docstrings built from parse_python_script metadata, Markdown
+# becomes a digest of headings, tables and code. Each step down in detail is
+# tried until the content fits; whatever still does not is truncated in the
+# middle. Tokens are counted locally (tiktoken when installed).
+
+_PYTHON_EXTENSIONS = (".py", ".pyi")
+_MARKDOWN_EXTENSIONS = (".md", ".markdown")
+# Detail levels, most to least verbose
+DETAIL_LEVELS = (3, 2, 1, 0)
+
+_encoding = None
+
+def count_tokens(text: str) -> int:
+    """Count tokens with tiktoken's cl100k_base encoding if it is installed,
+    otherwise estimate them (about four characters per token)."""
+    global _encoding
+    if _encoding is None:
+        try:
+            import tiktoken
+
+            _encoding = tiktoken.get_encoding(os.getenv("PROMPT_TOKENIZER", "cl100k_base"))
+        except Exception:
+            _encoding = False
+    if _encoding is False:
+        return estimate_tokens(text) if text else 0
+    return len(_encoding.encode(text, disallowed_special=()))
+
+def _first_paragraph(docstring: str) -> str:
+    return docstring.strip().split("\n\n", 1)[0]
+
+def _docstring_lines(docstring: str, indent: str, detail: int) -> List[str]:
+    if not docstring or detail < 2:
+        return []
+    text = docstring if detail >= 3 else _first_paragraph(docstring)
+    lines = text.splitlines()
+    if len(lines) == 1:
+        return [f'{indent}"""{lines[0]}"""']
+    return [f'{indent}"""{lines[0]}'] + [f"{indent}{line}" if line else "" for line in lines[1:]] + [f'{indent}"""']
+
+def _import_lines(imports: List[dict]) -> List[str]:
+    # ``from x import a, b`` on one line, as most modules write them
+    lines: Dict[str, List[str]] = {}
+    for record in imports:
+        name = record["module"] if record["name"] is None else record["name"]
+        if record["alias"]:
+            name += f" as {record['alias']}"
+        if record["name"] is None:
+            lines.setdefault(f"import {name}", [])
+        else:
+            names = lines.setdefault(f"from {'.' * record['level']}{record['module'] or ''} import ", [])
+            if name not in names:
+                names.append(name)
+    return [line + ", ".join(names) for line, names in lines.items()]
+
+def python_skeleton(script: str, detail: int = 3) -> Optional[str]:
+    """Render a Python source as a stub: imports, constants, classes and
+    top-level and class-level functions with their signatures.
+
+    ``detail`` 3 keeps full docstrings, 2 their first paragraph, 1 drops them
+    (and collapses imports to one line), 0 keeps only class and function names.
+    Returns None if the source does not parse.
+    """
+    source_code = cached_parse_python_script(script)
+    if source_code.id == "error":
+        return None
+    metadata = source_code.metadata
+    classes = {cls["qualname"]: cls for cls in metadata["classes"]}
+    if detail <= 0:
+        functions = [f["qualname"] for f in metadata["functions"] if f["qualname"].rpartition(".")[0] in ("", *classes)]
+        return "\n".join(filter(None, [
+            "# imports: " + ", ".join(source_code.imports) if source_code.imports else "",
+            "# classes: " + ", ".join(classes) if classes else "",
+            "# functions: " + ", ".join(functions) if functions else "",
+        ]))
+
+    lines = _docstring_lines(metadata["module_docstring"], "", detail)
+    if detail >= 2:
+        lines.extend(_import_lines(metadata["imports"]))
+    elif source_code.imports:
+        lines.append("# imports: " + ", ".join(source_code.imports))
+    lines.extend(f"{name} = {value}" for name, value in metadata["constants"].items())
+
+    # Classes and the functions defined directly in the module or a class, in
+    # source order; functions nested in functions are implementation detail
+    definitions = [("class", cls) for cls in metadata["classes"]]
+    definitions.extend(("def", function) for function in metadata["functions"])
+    definitions.sort(key=lambda item: item[1]["lineno"])
+    shown_classes = set()
+    for kind, definition in definitions:
+        parent = definition["qualname"].rpartition(".")[0]
+        if parent and parent not in shown_classes:
+            continue
+        if kind == "class":
+            shown_classes.add(definition["qualname"])
+        indent = "    " * definition["qualname"].count(".")
+        if not parent:
+            lines.append("")
+        lines.extend(f"{indent}@{decorator}" for decorator in definition["decorators"])
+        if kind == "class":
+            bases = f"({', '.join(definition['bases'])})" if definition["bases"] else ""
+            lines.append(f"{indent}class {definition['name']}{bases}:")
+        else:
+            prefix = "async def" if definition["async"] else "def"
+            lines.append(f"{indent}{prefix} {definition['signature']}:")
+        body = _docstring_lines(definition["docstring"], indent + "    ", detail)
+        lines.extend(body)
+        if kind == "def" or not body:
+            lines.append(f"{indent}    ...")
+    return "\n".join(lines).strip("\n")
+
+def _table_digest(text: str, detail: int) -> str:
+    rows = [line for line in text.splitlines() if line.strip()]
+    if detail >= 2 or len(rows) <= 4:
+        shown = rows if detail >= 3 else rows[:5]
+    else:
+        shown = rows[:2]
+    omitted = len(rows) - len(shown)
+    return "\n".join(shown + ([f"| ... {omitted} more rows |"] if omitted else []))
+
+def _code_digest(language: str, text: str, detail: int) -> str:
+    if language.lower() in ("python", "py", "python3"):
+        skeleton = python_skeleton(text, min(detail, 1))
+        if skeleton is not None:
+            text = skeleton
+    lines = text.rstrip("\n").splitlines()
+    limit = 20 if detail >= 2 else 5
+    if len(lines) > limit:
+        lines = lines[:limit] + [f"# ... {len(lines) - limit} more lines"]
+    return f"```{language}\n" + "\n".join(lines) + "\n```"
+
+def markdown_digest(content: str, detail: int = 3) -> str:
+    """Summarize Markdown as its front matter, headings, tables and code.
+
+    ``detail`` 3 also keeps the first sentence of every paragraph, 2 shortens
+    tables and code, 1 keeps table headers and code outlines, 0 only headings.
+    """
+    parts = []
+    for token in tokenize_markdown(io.StringIO(content)):
+        if token.kind == HEADING:
+            parts.append("#" * token.level + " " + token.text)
+        elif detail <= 0:
+            continue
+        elif token.kind == FRONT_MATTER:
+            parts.append("---\n" + token.text.strip("\n") + "\n---")
+        elif token.kind == TABLE:
+            parts.append(_table_digest(token.text, detail))
+        elif token.kind == CODE:
+            parts.append(_code_digest(token.language, token.text, detail))
+        elif token.kind == TEXT and detail >= 3:
+            sentence = token.text.strip().split(". ", 1)[0].strip()
+            if sentence:
+                parts.append(sentence if sentence.endswith((".", ":", "!", "?")) else sentence + " ...")
+    return "\n\n".join(parts)
+
+def truncate_middle(text: str, budget: int, counter: Callable[[str], int] = count_tokens) -> str:
+    """Keep the head (two thirds) and tail (one third) of ``text`` within ``budget`` tokens.
+
+    Whole lines are kept where possible; when not even the first line fits,
+    the head and tail are sliced by characters instead.
+    """
+    if counter(text) <= budget:
+        return text
+    lines = text.splitlines()
+    chars = max(0, int(len(text) * budget / max(1, counter(text))))
+    while True:
+        head, tail, size = [], [], 0
+        for line in lines:
+            if size + len(line) + 1 > chars * 2 // 3:
+                break
+            head.append(line)
+            size += len(line) + 1
+        size = 0
+        for line in reversed(lines[len(head):]):
+            if size + len(line) + 1 > chars // 3:
+                break
+            tail.insert(0, line)
+            size += len(line) + 1
+        if head or not lines:
+            omitted = len(lines) - len(head) - len(tail)
+            result = "\n".join(head + [f"... [{omitted} lines omitted] ..."] + tail)
+        else:
+            # Not even the first line fits (a minified file, one huge log
+            # line): cut inside the text instead of dropping it whole
+            head_chars, tail_chars = chars * 2 // 3, chars // 3
+            omitted = len(text) - head_chars - tail_chars
+            result = "\n".join([text[:head_chars], f"... [{omitted} characters omitted] ...",
+                                 text[len(text) - tail_chars:]])
+        if counter(result) <= budget or chars == 0:
+            return result
+        chars = chars * 9 // 10
+
+@dataclass
+class FittedContent:
+    content: str
+    strategy: str
+    tokens: int
+    original_tokens: int
+
+    @property
+    def saved_tokens(self) -> int:
+        return self.original_tokens - self.tokens
+
+def fit_content(filename: str, content: str, budget: int,
+                counter: Callable[[str], int] = count_tokens) -> FittedContent:
+    """Fit ``content`` into ``budget`` tokens.
+
+    Strategies, in order: ``full`` (fits as is), ``skeleton`` (Python),
+    ``digest`` (Markdown), then ``truncated``.
+    """
+    original = counter(content)
+    if original <= budget:
+        return FittedContent(content, "full", original, original)
+    lower = filename.lower()
+    compress, strategy = None, "truncated"
+    if lower.endswith(_PYTHON_EXTENSIONS):
+        compress, strategy = python_skeleton, "skeleton"
+    elif lower.endswith(_MARKDOWN_EXTENSIONS):
+        compress, strategy = markdown_digest, "digest"
+    smallest = content
+    if compress is not None:
+        for detail in DETAIL_LEVELS:
+            compressed = compress(content, detail)
+            if compressed is None:
+                break
+            tokens = counter(compressed)
+            if tokens <= budget:
+                return FittedContent(compressed, strategy, tokens, original)
+            smallest = compressed
+        # Even the least detailed form is too large: truncate that
+        strategy = strategy + "+truncated" if smallest is not content else "truncated"
+    truncated = truncate_middle(smallest, budget, counter)
+    return FittedContent(truncated, strategy, counter(truncated), original)
+
+@dataclass
+class BudgetedPrompt:
+    text: str
+    filename: str
+    strategy: str
+    prompt_tokens: int
+    content_tokens: int
+    original_content_tokens: int
+
+    @property
+    def saved_tokens(self) -> int:
+        return self.original_content_tokens - self.content_tokens
+
+    def __str__(self) -> str:
+        return self.text
+
+@dataclass
+class PromptBudgetStats:
+    requests: int = 0
+    prompt_tokens: int = 0
+    saved_tokens: int = 0
+    strategies: Dict[str, int] = field(default_factory=Counter)
+
+    def add(self, prompt: BudgetedPrompt):
+        self.requests += 1
+        self.prompt_tokens += prompt.prompt_tokens
+        self.saved_tokens += prompt.saved_tokens
+        self.strategies[prompt.strategy] += 1
+
+def build_prompt(render: Callable[[str], str], filename: str, content: str, max_tokens: int,
+                 counter: Callable[[str], int] = count_tokens,
+                 stats: Optional[PromptBudgetStats] = None) -> BudgetedPrompt:
+    """Render a prompt of at most ``max_tokens`` tokens.
+
+    ``render`` places the content into the prompt template; whatever the
+    template itself takes is subtracted from the content's budget.
+    """
+    overhead = counter(render(""))
+    fitted = fit_content(filename, content, max(0, max_tokens - overhead), counter)
+    prompt = BudgetedPrompt(render(fitted.content), filename, fitted.strategy,
+                            overhead + fitted.tokens, fitted.tokens, fitted.original_tokens)
+    if stats is not None:
+        stats.add(prompt)
+    return prompt
@@ -0,0 +1,229 @@
+import ast
+import hashlib
+import re
+from typing import Any, Dict, List, Optional
+
+# Single-pass extractor behind parse_python_script. One NodeVisitor walk
+# collects imports, classes, functions with their signatures, docstrings,
+# top-level constants and the calls each function makes; the call graph is
+# resolved against the module's own definitions once the walk is done.
+
+MODULE_SCOPE = "<module>"
+
+# ast line numbers count only \n, \r\n and \r; str.splitlines also breaks on
+# form feeds, \x1c-\x1e, \x85 and U+2028/U+2029, which would shift segments
+_LINE = re.compile(r"[^\r\n]*(?:\r\n|\r|\n)|[^\r\n]+\Z")
+
+def source_id(script: str) -> str:
+    return hashlib.sha256(script.encode("utf-8")).hexdigest()[:32]
+
+def import_name(module: Optional[str], level: int = 0) -> str:
+    # ``from ..pkg import x`` -> "..pkg", ``from . import x`` -> "."
+    return "." * level + (module or "")
+
+class _Scope:
+    __slots__ = ("kind", "qualname")
+
+    def __init__(self, kind: str, qualname: str):
+        self.kind = kind
+        self.qualname = qualname
+
+class PythonExtractor(ast.NodeVisitor):
+    """Collects everything parse_python_script reports in one traversal."""
+
+    def __init__(self, source: str):
+        self.source = source
+        self._lines = _LINE.findall(source)
+        self._scopes: List[_Scope] = []
+        self.module_docstring = ""
+        self.imports: List[Dict[str, Any]] = []
+        self.classes: List[Dict[str, Any]] = []
+        self.functions: List[Dict[str, Any]] = []
+        self.constants: Dict[str, str] = {}
+        self._calls: Dict[str, List[str]] = {}
+
+    # ast.get_source_segment re-splits the whole source on every call, which is
+    # quadratic on large files; slicing the pre-split lines is not
+    def segment(self, node: Optional[ast.AST]) -> str:
+        if node is None or getattr(node, "end_lineno", None) is None:
+            return ""
+        first, last = node.lineno - 1, node.end_lineno - 1
+        if first == last:
+            return self._lines[first].encode("utf-8")[node.col_offset:node.end_col_offset].decode("utf-8")
+        parts = [self._lines[first].encode("utf-8")[node.col_offset:].decode("utf-8")]
+        parts.extend(self._lines[first + 1:last])
+        parts.append(self._lines[last].encode("utf-8")[:node.end_col_offset].decode("utf-8"))
+        return "".join(parts)
+
+    def _qualname(self, name: str) -> str:
+        return f"{self._scopes[-1].qualname}.{name}" if self._scopes else name
+
+    def _function_scope(self) -> str:
+        for scope in reversed(self._scopes):
+            if scope.kind == "function":
+                return scope.qualname
+        return MODULE_SCOPE
+
+    def _class_scope(self) -> Optional[str]:
+        # The class whose methods ``self.x()`` refers to: the nearest class
+        # directly enclosing the current method
+        if len(self._scopes) >= 2 and self._scopes[-1].kind == "function" and self._scopes[-2].kind == "class":
+            return self._scopes[-2].qualname
+        return None
+
+    def visit_Module(self, node: ast.Module):
+        self.module_docstring = ast.get_docstring(node) or ""
+        for statement in node.body:
+            if isinstance(statement, (ast.Assign, ast.AnnAssign)):
+                self._constant(statement)
+        self.generic_visit(node)
+
+    def _constant(self, node):
+        targets = node.targets if isinstance(node, ast.Assign) else [node.target]
+        if node.value is None:
+            return
+        for target in targets:
+            if isinstance(target, ast.Name) and target.id.isupper():
+                self.constants[target.id] = self.segment(node.value)
+
+    def visit_Import(self, node: ast.Import):
+        for alias in node.names:
+            self.imports.append({"module": alias.name, "name": None, "alias": alias.asname, "level": 0})
+
+    def visit_ImportFrom(self, node: ast.ImportFrom):
+        for alias in node.names:
+            self.imports.append({"module": node.module, "name": alias.name, "alias": alias.asname,
+                                 "level": node.level or 0})
+
+    def visit_ClassDef(self, node: ast.ClassDef):
+        qualname = self._qualname(node.name)
+        self.classes.append({
+            "name": node.name,
+            "qualname": qualname,
+            "bases": [self.segment(base) for base in node.bases],
+            "decorators": [self.segment(decorator) for decorator in node.decorator_list],
+            "docstring": ast.get_docstring(node) or "",
+            "lineno": node.lineno,
+        })
+        self._scopes.append(_Scope("class", qualname))
+        self.generic_visit(node)
+        self._scopes.pop()
+
+    def _visit_function(self, node):
+        qualname = self._qualname(node.name)
+        self.functions.append({
+            "name": node.name,
+            "qualname": qualname,
+            "signature": self.signature(node),
+            "async": isinstance(node, ast.AsyncFunctionDef),
+            "method": bool(self._scopes) and self._scopes[-1].kind == "class",
+            "decorators": [self.segment(decorator) for decorator in node.decorator_list],
+            "docstring": ast.get_docstring(node) or "",
+            "lineno": node.lineno,
+        })
+        self._calls.setdefault(qualname, [])
+        self._scopes.append(_Scope("function", qualname))
+        self.generic_visit(node)
+        self._scopes.pop()
+
+    visit_FunctionDef = _visit_function
+    visit_AsyncFunctionDef = _visit_function
+
+    def visit_Call(self, node: ast.Call):
+        func = node.func
+        callee = None
+        if isinstance(func, ast.Name):
+            callee = func.id
+        elif isinstance(func, ast.Attribute) and isinstance(func.value, ast.Name) and func.value.id in ("self", "cls"):
+            owner = self._class_scope()
+            if owner is not None:
+                callee = f"{owner}.{func.attr}"
+        if callee is not None:
+            self._calls.setdefault(self._function_scope(), []).append(callee)
+        self.generic_visit(node)
+
+    def signature(self, node) -> str:
+        args = node.args
+        positional = list(getattr(args, "posonlyargs", [])) + list(args.args)
+        defaults = [None] * (len(positional) - len(args.defaults)) + list(args.defaults)
+        parts = []
+        for index, (arg, default) in enumerate(zip(positional, defaults)):
+            parts.append(self._argument(arg, default))
+            if getattr(args, "posonlyargs", None) and index == len(args.posonlyargs) - 1:
+                parts.append("/")
+        if args.vararg is not None:
+            parts.append("*" + self._argument(args.vararg))
+        elif args.kwonlyargs:
+            parts.append("*")
+        for arg, default in zip(args.kwonlyargs, args.kw_defaults):
+            parts.append(self._argument(arg, default))
+        if args.kwarg is not None:
+            parts.append("**" + self._argument(args.kwarg))
+        returns = f" -> {self.segment(node.returns)}" if node.returns is not None else ""
+        return f"{node.name}({', '.join(parts)}){returns}"
+
+    def _argument(self, arg: ast.arg, default: Optional[ast.AST] = None) -> str:
+        text = arg.arg
+        if arg.annotation is not None:
+            text += f": {self.segment(arg.annotation)}"
+        if default is not None:
+            text += f" = {self.segment(default)}" if arg.annotation is not None else f"={self.segment(default)}"
+        return text
+
+    def call_graph(self) -> Dict[str, List[str]]:
+        """Map each function (and ``<module>``) to the module-level functions,
+        methods and classes it calls, resolving nested and enclosing scopes."""
+        defined = {function["qualname"] for function in self.functions}
+        defined.update(cls["qualname"] for cls in self.classes)
+        graph = {}
+        for caller, callees in self._calls.items():
+            resolved = []
+            for callee in callees:
+                target = self._resolve(caller, callee, defined)
+                if target is not None and target not in resolved:
+                    resolved.append(target)
+            graph[caller] = resolved
+        return graph
+
+    @staticmethod
+    def _resolve(caller: str, callee: str, defined) -> Optional[str]:
+        if "." in callee:
+            return callee if callee in defined else None
+        # Look in the caller's own scope first, then each enclosing one
+        prefix = caller if caller != MODULE_SCOPE else ""
+        while True:
+            candidate = f"{prefix}.{callee}" if prefix else callee
+            if candidate in defined:
+                return candidate
+            if not prefix:
+                return None
+            prefix = prefix.rpartition(".")[0]
+
+    def context(self) -> str:
+        docstrings = [self.module_docstring]
+        docstrings.extend(cls["docstring"] for cls in self.classes)
+        docstrings.extend(function["docstring"] for function in self.functions)
+        return "\n\n".join(docstring for docstring in docstrings if docstring)
+
+    def import_names(self) -> List[str]:
+        names = []
+        for record in self.imports:
+            name = import_name(record["module"], record["level"])
+            if name not in names:
+                names.append(name)
+        return names
+
+    def metadata(self) -> Dict[str, Any]:
+        return {
+            "module_docstring": self.module_docstring,
+            "imports": self.imports,
+            "classes": self.classes,
+            "functions": self.functions,
+            "constants": self.constants,
+            "call_graph": self.call_graph(),
+        }
+
+def extract_python(script: str, tree: Optional[ast.Module] = None) -> PythonExtractor:
+    extractor = PythonExtractor(script)
+    extractor.visit(tree if tree is not None else ast.parse(script))
+    return extractor
@@ -0,0 +1,207 @@
+import mmap
+import os
+import time
+import tokenize
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Iterable, Iterator, List, Optional, Tuple, Union
+
+from .models import SourceCode
+from .parsers import parse_python_script
+from .records import SourceRecord, parse_python_record
+
+# Bulk parse_python_script over whole repositories. Inputs are grouped into
+# chunks and each chunk is parsed by one worker process, so the per-task IPC
+# overhead is paid per chunk rather than per file. Paths are sent to the
+# workers as names and memory-mapped there; the parent never reads the files.
+# At most ``workers * 2`` chunks are in flight, so a generator of paths is
+# consumed lazily and memory stays bounded however many files there are.
+
+_SKIP_DIRS = {".git", ".hg", ".svn", ".tox", ".venv", "venv", "__pycache__", "node_modules", "build", "dist"}
+
+@dataclass
+class ParsedScript:
+    index: int
+    name: str
+    size: int
+    # A SourceRecord instead when parsed with compact=True
+    source_code: SourceCode
+
+    @property
+    def error(self) -> Optional[str]:
+        if self.source_code.id == "error":
+            return self.source_code.metadata.get("error", self.source_code.context)
+        return None
+
+@dataclass
+class BulkParseStats:
+    files: int = 0
+    bytes: int = 0
+    errors: int = 0
+    seconds: float = 0.0
+
+    @property
+    def files_per_second(self) -> float:
+        return self.files / self.seconds if self.seconds else 0.0
+
+    @property
+    def bytes_per_second(self) -> float:
+        return self.bytes / self.seconds if self.seconds else 0.0
+
+def find_python_files(root: str) -> Iterator[str]:
+    """Yield the ``.py`` files under ``root``, skipping VCS, virtualenv and build directories."""
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = sorted(d for d in dirnames if d not in _SKIP_DIRS and not d.startswith("."))
+        for filename in sorted(filenames):
+            if filename.endswith(".py"):
+                yield os.path.join(dirpath, filename)
+
+def read_source(path: str) -> str:
+    with open(path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        if size == 0:
+            return ""
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            # Honour PEP 263 coding cookies; a UTF-8 BOM gives "utf-8-sig",
+            # which drops it. Undecodable first lines make detect_encoding
+            # raise SyntaxError; decoding as UTF-8 reports the actual bytes
+            try:
+                encoding, _ = tokenize.detect_encoding(mapped.readline)
+            except SyntaxError:
+                encoding = "utf-8"
+            return str(mapped, encoding)
+
+def _read_error(path: str, error: Exception) -> SourceCode:
+    return SourceCode(
+        id="error",
+        imports=[],
+        classes=[],
+        code="",
+        syntax="Python",
+        context="Could not read source file",
+        metadata={"error": f"{type(error).__name__}: {error}", "path": path}
+    )
+
+def _is_path(item) -> bool:
+    if isinstance(item, os.PathLike):
+        return True
+    return isinstance(item, str) and "\n" not in item and os.path.isfile(item)
+
+# Work items are (index, name, path or None, source or None)
+_Item = Tuple[int, str, Optional[str], Optional[str]]
+
+def _parse_item(item: _Item, compact: bool = False) -> ParsedScript:
+    index, name, path, source = item
+    if path is not None:
+        try:
+            source = read_source(path)
+        except (OSError, ValueError) as e:
+            error = _read_error(path, e)
+            return ParsedScript(index, name, 0, SourceRecord.from_model(error) if compact else error)
+    parse = parse_python_record if compact else parse_python_script
+    return ParsedScript(index, name, len(source.encode("utf-8")), parse(source))
+
+def _parse_chunk(chunk: List[_Item], compact: bool = False) -> List[ParsedScript]:
+    return [_parse_item(item, compact) for item in chunk]
+
+def _items(paths_or_sources: Iterable[Union[str, os.PathLike]]) -> Iterator[_Item]:
+    for index, item in enumerate(paths_or_sources):
+        if _is_path(item):
+            path = os.fspath(item)
+            yield index, path, path, None
+        else:
+            yield index, f"<source {index}>", None, item
+
+def _chunks(items: Iterator[_Item], chunksize: int) -> Iterator[List[_Item]]:
+    chunk = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) >= chunksize:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+def _failed_chunk(chunk: List[_Item], error: Exception, compact: bool = False) -> List[ParsedScript]:
+    # A worker died (or the pool broke) mid-chunk: report every file in it
+    wrap = SourceRecord.from_model if compact else (lambda source_code: source_code)
+    return [ParsedScript(index, name, 0, wrap(_read_error(path or name, error))) for index, name, path, _ in chunk]
+
+def parse_python_scripts(
+    paths_or_sources: Iterable[Union[str, os.PathLike]],
+    workers: Optional[int] = None,
+    chunksize: int = 32,
+    ordered: bool = True,
+    stats: Optional[BulkParseStats] = None,
+    compact: bool = False,
+) -> Iterator[ParsedScript]:
+    """Parse many Python files or source strings, yielding a ``ParsedScript`` each.
+
+    Items that are ``os.PathLike`` or name an existing file are read from disk;
+    any other string is parsed as source. Read and syntax errors are reported
+    inline as ``id="error"`` results. With ``ordered=False`` results come back
+    as chunks complete. ``workers=None`` uses one process per CPU and ``0``
+    parses in the calling process. Pass a ``BulkParseStats`` to get throughput.
+    ``compact=True`` yields ``SourceRecord``s instead of ``SourceCode`` models,
+    which are smaller to hold and to send back from the workers.
+    """
+    stats = stats if stats is not None else BulkParseStats()
+    start = time.perf_counter()
+
+    def account(results: List[ParsedScript]) -> List[ParsedScript]:
+        for result in results:
+            stats.files += 1
+            stats.bytes += result.size
+            stats.errors += result.error is not None
+        stats.seconds = time.perf_counter() - start
+        return results
+
+    chunks = _chunks(_items(paths_or_sources), max(1, chunksize))
+    if workers == 0:
+        for chunk in chunks:
+            yield from account(_parse_chunk(chunk, compact))
+        return
+
+    workers = workers or os.cpu_count() or 1
+    executor = ProcessPoolExecutor(max_workers=workers)
+    max_in_flight = workers * 2
+    in_flight = deque()
+
+    def submit(chunk: List[_Item]):
+        try:
+            future = executor.submit(_parse_chunk, chunk, compact)
+        except Exception as e:
+            future = Future()
+            future.set_exception(e)
+        in_flight.append((future, chunk))
+
+    def collect(future: Future, chunk: List[_Item]) -> List[ParsedScript]:
+        try:
+            return account(future.result())
+        except Exception as e:
+            return account(_failed_chunk(chunk, e, compact))
+
+    try:
+        for chunk in chunks:
+            submit(chunk)
+            while len(in_flight) >= max_in_flight:
+                if ordered:
+                    yield from collect(*in_flight.popleft())
+                else:
+                    yield from _collect_completed(in_flight, collect)
+        while in_flight:
+            if ordered:
+                yield from collect(*in_flight.popleft())
+            else:
+                yield from _collect_completed(in_flight, collect)
+    finally:
+        for future, _ in in_flight:
+            future.cancel()
+        executor.shutdown(wait=True)
+
+def _collect_completed(in_flight: deque, collect) -> Iterator[ParsedScript]:
+    done, _ = wait([future for future, _ in in_flight], return_when=FIRST_COMPLETED)
+    for entry in [entry for entry in in_flight if entry[0] in done]:
+        in_flight.remove(entry)
+        yield from collect(*entry)
@@ -0,0 +1,211 @@
+import sys
+from array import array
+from typing import Any, Dict, Iterable, Iterator, List, Sequence, Tuple, Union
+
+from .metrics import timed
+from .models import Blob, MarkdownDocument, SourceCode, Table
+from .parsers import python_fields
+from .tables import parse_pipe_table_columns
+
+# Compact in-memory forms of SourceCode, Table and MarkdownDocument for code
+# that holds parse results at corpus scale. Records use __slots__ instead of
+# pydantic's per-instance dicts, import and class names are interned and kept
+# in tuples, and tables are stored by column: headers once, integer and float
+# columns as arrays, repeated strings shared within a column. ``to_model()``
+# turns a record back into the pydantic model for API boundaries, and
+# ``compact()`` goes the other way.
+
+_INT64 = (-2 ** 63, 2 ** 63 - 1)
+
+def _interned(names: Iterable[str]) -> Tuple[str, ...]:
+    return tuple(sys.intern(name) for name in names)
+
+class SourceRecord:
+    """Slotted counterpart of ``SourceCode``; fields are the same."""
+
+    __slots__ = ("id", "imports", "classes", "code", "syntax", "context", "metadata")
+
+    def __init__(self, id: str, imports: Sequence[str], classes: Sequence[str], code: str,
+                 syntax: str, context: str, metadata: dict):
+        self.id = id
+        self.imports = _interned(imports)
+        self.classes = _interned(classes)
+        self.code = code
+        self.syntax = sys.intern(syntax)
+        self.context = context
+        self.metadata = metadata
+
+    def __getstate__(self):
+        return tuple(getattr(self, name) for name in self.__slots__)
+
+    def __setstate__(self, state):
+        # Unpickled strings are new objects; intern them again in this process
+        self.__init__(*state)
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, SourceRecord) and self.__getstate__() == other.__getstate__()
+
+    def __repr__(self) -> str:
+        return f"SourceRecord(id={self.id!r}, imports={self.imports!r}, classes={self.classes!r})"
+
+    @classmethod
+    def from_model(cls, source_code: SourceCode) -> "SourceRecord":
+        return cls(source_code.id, source_code.imports, source_code.classes, source_code.code,
+                   source_code.syntax, source_code.context, source_code.metadata)
+
+    def to_model(self) -> SourceCode:
+        return SourceCode(id=self.id, imports=list(self.imports), classes=list(self.classes), code=self.code,
+                          syntax=self.syntax, context=self.context, metadata=self.metadata)
+
+def _pack_column(values: List[Any]) -> Union[array, List[Any]]:
+    if values:
+        types = set(map(type, values))
+        if types == {int} and _INT64[0] <= min(values) and max(values) <= _INT64[1]:
+            return array("q", values)
+        if types == {float}:
+            return array("d", values)
+    # Share repeated values (statuses, tags, ...) within the column
+    shared: Dict[Any, Any] = {}
+    packed = []
+    for value in values:
+        try:
+            packed.append(shared.setdefault(value, value))
+        except TypeError:  # unhashable
+            packed.append(value)
+    return packed
+
+class ColumnarTable:
+    """A table stored as ``headers`` plus one column per header.
+
+    Integer and float columns are ``array`` objects (8 bytes per value, no
+    per-value objects); other columns are lists. Rows are materialized as
+    dicts only on access.
+    """
+
+    __slots__ = ("headers", "columns")
+
+    def __init__(self, headers: Sequence[str], columns: Sequence[Sequence[Any]]):
+        if len(headers) != len(columns):
+            raise ValueError(f"{len(headers)} headers but {len(columns)} columns")
+        self.headers = _interned(str(header) for header in headers)
+        self.columns = tuple(column if isinstance(column, array) else _pack_column(list(column))
+                             for column in columns)
+        lengths = {len(column) for column in self.columns}
+        if len(lengths) > 1:
+            raise ValueError(f"columns have different lengths: {sorted(lengths)}")
+
+    def __getstate__(self):
+        return self.headers, self.columns
+
+    def __setstate__(self, state):
+        self.headers = _interned(state[0])
+        self.columns = state[1]
+
+    def __len__(self) -> int:
+        return len(self.columns[0]) if self.columns else 0
+
+    def __eq__(self, other) -> bool:
+        return (isinstance(other, ColumnarTable) and self.headers == other.headers
+                and [list(column) for column in self.columns] == [list(column) for column in other.columns])
+
+    def __repr__(self) -> str:
+        return f"ColumnarTable(headers={list(self.headers)!r}, rows={len(self)})"
+
+    @classmethod
+    def from_rows(cls, headers: Sequence[str], rows: Iterable[Dict[str, Any]]) -> "ColumnarTable":
+        columns = [[] for _ in headers]
+        for row in rows:
+            for column, header in zip(columns, headers):
+                column.append(row.get(header))
+        return cls(headers, columns)
+
+    @classmethod
+    def from_model(cls, table: Table) -> "ColumnarTable":
+        return cls.from_rows(table.headers, table.rows)
+
+    def column(self, header: str) -> Sequence[Any]:
+        return self.columns[self.headers.index(header)]
+
+    def row(self, index: int) -> Dict[str, Any]:
+        return {header: column[index] for header, column in zip(self.headers, self.columns)}
+
+    def iter_rows(self) -> Iterator[Dict[str, Any]]:
+        headers = self.headers
+        for values in zip(*self.columns):
+            yield dict(zip(headers, values))
+
+    def to_model(self) -> Table:
+        return Table(headers=list(self.headers), rows=list(self.iter_rows()))
+
+class DocumentRecord:
+    """Slotted counterpart of ``MarkdownDocument`` with columnar tables and
+    ``SourceRecord`` code blocks."""
+
+    __slots__ = ("metadata", "tables", "code_blocks", "content", "blob_data")
+
+    def __init__(self, metadata: Dict[str, Any], tables: Sequence[ColumnarTable],
+                 code_blocks: Sequence[SourceRecord], content: str, blob_data: Sequence[Blob] = ()):
+        self.metadata = metadata
+        self.tables = tuple(tables)
+        self.code_blocks = tuple(code_blocks)
+        self.content = content
+        self.blob_data = tuple(blob_data)
+
+    def __getstate__(self):
+        return tuple(getattr(self, name) for name in self.__slots__)
+
+    def __setstate__(self, state):
+        self.__init__(*state)
+
+    def __repr__(self) -> str:
+        return f"DocumentRecord(tables={len(self.tables)}, code_blocks={len(self.code_blocks)})"
+
+    @classmethod
+    def from_model(cls, document: MarkdownDocument) -> "DocumentRecord":
+        return cls(document.metadata, [ColumnarTable.from_model(table) for table in document.tables],
+                   [SourceRecord.from_model(block) for block in document.code_blocks],
+                   document.content, document.blob_data)
+
+    def to_model(self) -> MarkdownDocument:
+        return MarkdownDocument(metadata=self.metadata, tables=[table.to_model() for table in self.tables],
+                                code_blocks=[block.to_model() for block in self.code_blocks],
+                                content=self.content, blob_data=list(self.blob_data))
+
+Record = Union[SourceRecord, ColumnarTable, DocumentRecord]
+
+def compact(model) -> Record:
+    """Convert a ``SourceCode``, ``Table`` or ``MarkdownDocument`` to its record."""
+    if isinstance(model, SourceCode):
+        return SourceRecord.from_model(model)
+    if isinstance(model, Table):
+        return ColumnarTable.from_model(model)
+    if isinstance(model, MarkdownDocument):
+        return DocumentRecord.from_model(model)
+    raise TypeError(f"cannot compact {type(model).__name__}")
+
+def to_model(record):
+    """Convert a record back to its pydantic model; models pass through."""
+    return record.to_model() if hasattr(record, "to_model") else record
+
+@timed("ast")
+def parse_python_record(script: str) -> SourceRecord:
+    """``parse_python_script`` without building the pydantic model."""
+    return SourceRecord(**python_fields(script))
+
+@timed("table")
+def parse_table_record(table_content: str, infer_types: bool = True) -> ColumnarTable:
+    """Parse a Markdown pipe table straight into columns."""
+    headers, columns = parse_pipe_table_columns(table_content, infer_types)
+    return ColumnarTable(headers, [columns[header] for header in headers])
+
+@timed("markdown")
+def parse_markdown_record(source, max_chunk_chars: int = 64 * 1024) -> DocumentRecord:
+    """Parse Markdown (a path, file or string, as ``stream_markdown_document``)
+    straight into a record; tables and code blocks never become models."""
+    from .markdown_stream import MarkdownDocumentBuilder, iter_markdown_events
+
+    builder = MarkdownDocumentBuilder().extend(iter_markdown_events(
+        source, max_chunk_chars, table_parser=parse_table_record, python_parser=parse_python_record
+    ))
+    return DocumentRecord(builder.metadata, builder.tables, builder.code_blocks,
+                          "\n".join(builder.content), builder.blob_data)
@@ -0,0 +1,198 @@
+import argparse
+import json
+import os
+from typing import Optional
+
+from aiohttp import web
+
+from .metrics import json_dump, metrics, prometheus_text
+from .service import ENDPOINT_FIELDS, ParseService, PayloadTooLarge, RequestError, ServiceBusy, ndjson_line
+
+# aiohttp front end for the endpoints in .well-known/openapi.yaml, plus
+# ``/<endpoint>/batch`` variants and ``/parse-bucket``, which stream NDJSON.
+# Batch bodies are a JSON array (or {"items": [...]}) or, for batches too
+# large to buffer, NDJSON read line by line as the results go out.
+
+NDJSON = "application/x-ndjson"
+OPENAPI_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".well-known", "openapi.yaml")
+
+SERVICE_KEY = web.AppKey("service", ParseService)
+MAX_BODY_BYTES_KEY = web.AppKey("max_body_bytes", int)
+MAX_STREAM_BYTES_KEY = web.AppKey("max_stream_bytes", int)
+
+def _error(status: int, detail: str, **headers) -> web.Response:
+    return web.json_response({"detail": detail}, status=status, headers=headers or None)
+
+@web.middleware
+async def errors_middleware(request: web.Request, handler):
+    try:
+        return await handler(request)
+    except PayloadTooLarge as e:
+        return _error(413, str(e))
+    except RequestError as e:
+        return _error(400, str(e))
+    except ServiceBusy as e:
+        return _error(503, str(e), **{"Retry-After": "1"})
+    except web.HTTPException:
+        raise
+    except Exception as e:
+        return _error(500, f"{type(e).__name__}: {e}")
+
+async def _json_body(request: web.Request):
+    try:
+        return await request.json()
+    except web.HTTPRequestEntityTooLarge:
+        raise PayloadTooLarge(f"request bodies are limited to {request.app[MAX_BODY_BYTES_KEY]} bytes")
+    except ValueError:
+        raise RequestError("request body is not valid JSON")
+
+async def _ndjson_items(request: web.Request):
+    # Bodies streamed as NDJSON bypass client_max_size, so count bytes here
+    limit = request.app[MAX_STREAM_BYTES_KEY]
+    received = 0
+    try:
+        async for line in request.content:
+            received += len(line)
+            if received > limit:
+                raise PayloadTooLarge(f"streamed bodies are limited to {limit} bytes")
+            if line.strip():
+                yield json.loads(line)
+    except ValueError as e:
+        if isinstance(e, RequestError):
+            raise
+        raise RequestError(f"invalid NDJSON line: {e}")
+
+async def _stream(request: web.Request, lines) -> web.StreamResponse:
+    response = web.StreamResponse(headers={"Content-Type": NDJSON})
+    await response.prepare(request)
+    try:
+        async for line in lines:
+            # write() waits for the transport to drain, so a slow reader slows
+            # the producer down instead of results piling up in memory
+            await response.write(line.encode("utf-8"))
+    except (RequestError, ServiceBusy) as e:
+        # Headers are gone; report the failure as the last line
+        await response.write((json.dumps({"error": str(e)}) + "\n").encode("utf-8"))
+    await response.write_eof()
+    return response
+
+def _parse_handler(endpoint: str):
+    async def handle(request: web.Request) -> web.Response:
+        body = await request.app[SERVICE_KEY].parse(endpoint, await _json_body(request))
+        return web.Response(text=body, content_type="application/json")
+    return handle
+
+def _batch_handler(endpoint: str):
+    async def handle(request: web.Request) -> web.StreamResponse:
+        service = request.app[SERVICE_KEY]
+        if request.content_type == NDJSON:
+            items = _ndjson_items(request)
+        else:
+            body = await _json_body(request)
+            items = body.get("items") if isinstance(body, dict) else body
+            if not isinstance(items, list):
+                raise RequestError("expected a JSON array of items")
+            if len(items) > service.max_batch_items:
+                raise PayloadTooLarge(f"batches are limited to {service.max_batch_items} items")
+
+        async def lines():
+            async for index, ok, result in service.parse_stream(endpoint, items):
+                yield ndjson_line(index, ok, result)
+
+        return await _stream(request, lines())
+    return handle
+
+async def parse_bucket(request: web.Request) -> web.StreamResponse:
+    body = await _json_body(request)
+    if not isinstance(body, dict) or not body.get("bucket_name"):
+        raise RequestError("missing bucket_name")
+    service = request.app[SERVICE_KEY]
+    if service.minio_client is None:
+        raise RequestError("no MinIO client is configured")
+    # Checked again when the stream starts; this one gets a proper 503
+    service.check_bucket_capacity()
+    return await _stream(request, service.parse_bucket(body["bucket_name"], body.get("prefix")))
+
+async def minio_action(request: web.Request) -> web.Response:
+    return web.json_response(await request.app[SERVICE_KEY].minio_action(await _json_body(request)))
+
+async def weaviate_action(request: web.Request) -> web.Response:
+    return web.json_response(await request.app[SERVICE_KEY].weaviate_action(await _json_body(request)))
+
+async def health(request: web.Request) -> web.Response:
+    return web.json_response(request.app[SERVICE_KEY].stats())
+
+async def metrics_endpoint(request: web.Request) -> web.Response:
+    # Prometheus text by default, the JSON snapshot with ?format=json
+    if request.query.get("format") == "json":
+        return web.Response(text=json_dump(metrics), content_type="application/json")
+    return web.Response(text=prometheus_text(metrics), content_type="text/plain", charset="utf-8",
+                        headers={"X-Metrics-Enabled": str(metrics.enabled).lower()})
+
+async def openapi(request: web.Request) -> web.FileResponse:
+    return web.FileResponse(OPENAPI_PATH, headers={"Content-Type": "application/yaml"})
+
+def create_app(service: Optional[ParseService] = None, max_body_bytes: int = 8 * 1024 * 1024,
+               max_stream_bytes: int = 512 * 1024 * 1024) -> web.Application:
+    """Build the aiohttp application around ``service`` (a default ParseService if None).
+
+    JSON bodies over ``max_body_bytes`` and streamed NDJSON bodies over
+    ``max_stream_bytes`` are rejected with 413.
+    """
+    app = web.Application(client_max_size=max_body_bytes, middlewares=[errors_middleware])
+    app[SERVICE_KEY] = service if service is not None else ParseService()
+    app[MAX_BODY_BYTES_KEY] = max_body_bytes
+    app[MAX_STREAM_BYTES_KEY] = max_stream_bytes
+    for endpoint in ENDPOINT_FIELDS:
+        app.router.add_post(f"/{endpoint}", _parse_handler(endpoint))
+        app.router.add_post(f"/{endpoint}/batch", _batch_handler(endpoint))
+    app.router.add_post("/parse-bucket", parse_bucket)
+    app.router.add_post("/minio-action", minio_action)
+    app.router.add_post("/weaviate-action", weaviate_action)
+    app.router.add_get("/health", health)
+    app.router.add_get("/metrics", metrics_endpoint)
+    app.router.add_get("/.well-known/openapi.yaml", openapi)
+
+    async def close_service(app: web.Application):
+        app[SERVICE_KEY].close()
+
+    app.on_cleanup.append(close_service)
+    return app
+
+def _clients():
+    # Bucket and vector store access are optional; both are configured from the environment
+    minio_client = weaviate_client = None
+    if os.getenv("MINIO_ENDPOINT"):
+        from minio import Minio
+
+        minio_client = Minio(
+            os.environ["MINIO_ENDPOINT"],
+            access_key=os.getenv("MINIO_ACCESS_KEY"),
+            secret_key=os.getenv("MINIO_SECRET_KEY"),
+            secure=os.getenv("MINIO_SECURE", "true").lower() in ("1", "true", "yes")
+        )
+    if os.getenv("WEAVIATE_URL"):
+        from .weaviate_sink import connect_to_weaviate
+
+        weaviate_client = connect_to_weaviate()
+    return minio_client, weaviate_client
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve the Custom Bucket Objects API")
+    parser.add_argument("--host", default=os.getenv("HOST", "0.0.0.0"))
+    parser.add_argument("--port", type=int, default=int(os.getenv("PORT", "5000")))
+    parser.add_argument("--workers", type=int, default=int(os.getenv("PARSE_WORKERS") or -1),
+                        help="Parser processes; 0 parses on threads, the default is one per CPU")
+    parser.add_argument("--max-pending", type=int, default=256)
+    parser.add_argument("--max-body-mb", type=float, default=8)
+    parser.add_argument("--markdown-root", default=os.getenv("MARKDOWN_ROOT"))
+    args = parser.parse_args()
+
+    minio_client, weaviate_client = _clients()
+    service = ParseService(workers=args.workers if args.workers >= 0 else None, max_pending=args.max_pending, markdown_root=args.markdown_root,
+                           minio_client=minio_client, weaviate_client=weaviate_client)
+    web.run_app(create_app(service, max_body_bytes=int(args.max_body_mb * 1024 * 1024)),
+                host=args.host, port=args.port)
+
+if __name__ == "__main__":
+    main()
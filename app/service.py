@@ -0,0 +1,323 @@
+import asyncio
+import json
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, List, Optional, Tuple
+
+from .markdown_stream import stream_markdown_document, stream_markdown_file
+from .metrics import metrics
+from .models import MarkdownDocument
+from .parsers import parse_python_script, parse_table, parse_yaml_metadata
+
+# Transport-independent core of the HTTP service (see server.py). Parser calls
+# run on a process pool in chunks, and results are serialized to JSON in the
+# workers, so the event loop only moves strings. Backpressure works in four
+# places:
+# - single requests are shed with ServiceBusy once ``max_pending`` items are
+#   queued or running;
+# - a batch stream checks the same limit before each chunk, waiting on its
+#   own chunks while the service is saturated, and keeps at most
+#   ``max_in_flight`` chunks outstanding;
+# - at most ``max_bucket_streams`` bucket streams run at once, all parsing on
+#   the service's pool;
+# - a stream produces the next result only after the previous one has been
+#   written to the client.
+
+class RequestError(ValueError):
+    """The request is malformed (HTTP 400)."""
+
+class PayloadTooLarge(RequestError):
+    """The request exceeds a size or item limit (HTTP 413)."""
+
+class ServiceBusy(Exception):
+    """Too much work is pending; the client should retry later (HTTP 503)."""
+
+# endpoint -> the request field holding the parser input
+ENDPOINT_FIELDS = {
+    "parse-yaml-metadata": "yaml_content",
+    "parse-table": "table_content",
+    "parse-python-script": "script",
+    "parse-markdown-content": "markdown_content",
+}
+
+def _parse_markdown(payload: Dict[str, Any], markdown_root: Optional[str]) -> MarkdownDocument:
+    if isinstance(payload.get("markdown_content"), str):
+        return stream_markdown_document(payload["markdown_content"])
+    path = payload.get("markdown_path")
+    if not isinstance(path, str):
+        raise RequestError("expected a markdown_content or markdown_path string")
+    if markdown_root is None:
+        raise RequestError("markdown_path is not enabled on this server; send markdown_content")
+    root = os.path.realpath(markdown_root)
+    full = os.path.realpath(os.path.join(root, path))
+    if os.path.commonpath([root, full]) != root or not os.path.isfile(full):
+        raise RequestError(f"markdown_path {path!r} not found")
+    return stream_markdown_file(full)
+
+def parse_payload(endpoint: str, payload: Any, markdown_root: Optional[str] = None) -> Any:
+    """Run the parser behind ``endpoint`` on a request payload and return a JSON-able value."""
+    if not isinstance(payload, dict):
+        raise RequestError("expected a JSON object")
+    if endpoint == "parse-markdown-content":
+        return _parse_markdown(payload, markdown_root).dict()
+    field = ENDPOINT_FIELDS.get(endpoint)
+    if field is None:
+        raise RequestError(f"unknown endpoint {endpoint!r}")
+    value = payload.get(field)
+    if not isinstance(value, str):
+        raise RequestError(f"expected a {field} string")
+    if endpoint == "parse-yaml-metadata":
+        return parse_yaml_metadata(value)
+    if endpoint == "parse-table":
+        return parse_table(value).dict()
+    return parse_python_script(value).dict()
+
+# A parsed item: (index, ok, JSON text of the result or of the error message)
+Parsed = Tuple[int, bool, str]
+
+def _dumps(value: Any) -> str:
+    return json.dumps(value, default=str, separators=(",", ":"))
+
+def _parse_chunk(endpoint: str, chunk: List[Tuple[int, Any]], markdown_root: Optional[str]) -> List[Parsed]:
+    parsed = []
+    for index, payload in chunk:
+        try:
+            parsed.append((index, True, _dumps(parse_payload(endpoint, payload, markdown_root))))
+        except Exception as e:
+            parsed.append((index, False, _dumps(f"{type(e).__name__}: {e}")))
+    return parsed
+
+def ndjson_line(index: int, ok: bool, body: str) -> str:
+    # Results are pre-serialized, so lines are assembled without re-encoding
+    return f'{{"index":{index},"{"result" if ok else "error"}":{body}}}\n'
+
+class ParseService:
+    """Runs parser requests on a process pool with admission control.
+
+    ``workers=0`` parses on the default thread pool instead, which is enough
+    for tests and small deployments. ``markdown_root`` enables
+    ``markdown_path`` requests for files below it.
+    """
+
+    def __init__(self, workers: Optional[int] = None, max_pending: int = 256, chunksize: int = 16,
+                 max_in_flight: Optional[int] = None, max_batch_items: int = 10000,
+                 markdown_root: Optional[str] = None, minio_client=None, weaviate_client=None,
+                 max_bucket_streams: int = 2):
+        self.workers = workers if workers is not None else (os.cpu_count() or 1)
+        self.executor = ProcessPoolExecutor(max_workers=self.workers) if self.workers else None
+        self.max_pending = max_pending
+        self.chunksize = max(1, chunksize)
+        self.max_in_flight = max_in_flight or max(2, self.workers * 2)
+        self.max_batch_items = max_batch_items
+        self.markdown_root = markdown_root
+        self.minio_client = minio_client
+        self.weaviate_client = weaviate_client
+        self.max_bucket_streams = max_bucket_streams
+        self.bucket_streams = 0
+        self.pending = 0
+        self.requests = 0
+        self.items = 0
+        self.rejected = 0
+
+    def close(self):
+        if self.executor is not None:
+            self.executor.shutdown(wait=False)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "workers": self.workers,
+            "pending": self.pending,
+            "max_pending": self.max_pending,
+            "bucket_streams": self.bucket_streams,
+            "requests": self.requests,
+            "items": self.items,
+            "rejected": self.rejected,
+        }
+
+    async def _run_chunk(self, endpoint: str, chunk: List[Tuple[int, Any]]) -> List[Parsed]:
+        loop = asyncio.get_running_loop()
+        self.pending += len(chunk)
+        metrics.set_gauge("pending_items", self.pending)
+        try:
+            # Parser stages run in the worker processes; the parent sees whole chunks
+            with metrics.timer("chunk_seconds", endpoint=endpoint):
+                return await loop.run_in_executor(self.executor, _parse_chunk, endpoint, chunk, self.markdown_root)
+        finally:
+            self.pending -= len(chunk)
+            self.items += len(chunk)
+            metrics.inc("items_total", len(chunk), endpoint=endpoint)
+
+    def _check_pending(self):
+        if self.pending >= self.max_pending:
+            self.rejected += 1
+            raise ServiceBusy(f"{self.pending} items pending")
+
+    def check_bucket_capacity(self):
+        """Raise ``ServiceBusy`` if ``max_bucket_streams`` bucket streams are running."""
+        if self.bucket_streams >= self.max_bucket_streams:
+            self.rejected += 1
+            raise ServiceBusy(f"{self.bucket_streams} bucket streams running")
+
+    def _check_endpoint(self, endpoint: str):
+        if endpoint not in ENDPOINT_FIELDS:
+            raise RequestError(f"unknown endpoint {endpoint!r}")
+
+    async def parse(self, endpoint: str, payload: Any) -> str:
+        """Parse one payload and return the result as JSON text.
+
+        Invalid payloads raise ``RequestError``; ``ServiceBusy`` is raised
+        instead of queueing when ``max_pending`` items are already pending.
+        """
+        self._check_endpoint(endpoint)
+        self._check_pending()
+        self.requests += 1
+        [(_, ok, body)] = await self._run_chunk(endpoint, [(0, payload)])
+        if not ok:
+            raise RequestError(json.loads(body))
+        return body
+
+    async def parse_stream(self, endpoint: str, payloads) -> AsyncIterator[Parsed]:
+        """Parse a (possibly async) iterable of payloads, yielding ``(index, ok,
+        json)`` per item as chunks complete; errors are reported inline."""
+        self._check_endpoint(endpoint)
+        self.requests += 1
+        in_flight = deque()
+        chunk: List[Tuple[int, Any]] = []
+
+        async def admit():
+            # While the service is saturated, wait on this stream's own chunks;
+            # with none left to wait on the stream is shed like a single request
+            while self.pending >= self.max_pending and in_flight:
+                for parsed in await in_flight.popleft():
+                    yield parsed
+            self._check_pending()
+
+        def submit():
+            nonlocal chunk
+            in_flight.append(asyncio.ensure_future(self._run_chunk(endpoint, chunk)))
+            chunk = []
+
+        try:
+            index = 0
+            async for payload in _aiter(payloads):
+                if index >= self.max_batch_items:
+                    raise PayloadTooLarge(f"batches are limited to {self.max_batch_items} items")
+                chunk.append((index, payload))
+                index += 1
+                if len(chunk) >= self.chunksize:
+                    async for parsed in admit():
+                        yield parsed
+                    submit()
+                    # Harvest whatever is done; wait only when the window is full
+                    while in_flight and (in_flight[0].done() or len(in_flight) >= self.max_in_flight):
+                        for parsed in await in_flight.popleft():
+                            yield parsed
+            if chunk:
+                async for parsed in admit():
+                    yield parsed
+                submit()
+            while in_flight:
+                for parsed in await in_flight.popleft():
+                    yield parsed
+        finally:
+            for future in in_flight:
+                future.cancel()
+
+    async def iterate_in_thread(self, factory: Callable[[], Iterator[Any]]) -> AsyncIterator[Any]:
+        """Drive a blocking iterator from the default thread pool, one item at a time."""
+        loop = asyncio.get_running_loop()
+        iterator = await loop.run_in_executor(None, factory)
+        done = object()
+        try:
+            while True:
+                item = await loop.run_in_executor(None, next, iterator, done)
+                if item is done:
+                    return
+                yield item
+        finally:
+            close = getattr(iterator, "close", None)
+            if close is not None:
+                await loop.run_in_executor(None, close)
+
+    async def parse_bucket(self, bucket_name: str, prefix: Optional[str] = None) -> AsyncIterator[str]:
+        """Stream NDJSON lines for every object in a bucket, parsed by the ingest
+        pipeline on the service's pool. ``ServiceBusy`` is raised when
+        ``max_bucket_streams`` streams are already running."""
+        from .ingest import iter_bucket_results
+
+        if self.minio_client is None:
+            raise RequestError("no MinIO client is configured")
+        self.check_bucket_capacity()
+        self.bucket_streams += 1
+        self.requests += 1
+
+        def results():
+            return iter_bucket_results(self.minio_client, bucket_name, prefix=prefix,
+                                       executor=self.executor, parse_workers=self.workers,
+                                       queue_size=self.max_in_flight * self.chunksize)
+
+        try:
+            async for result in self.iterate_in_thread(results):
+                line = {"object_name": result.object_name, "etag": result.etag, "size": result.size}
+                if result.error is not None:
+                    line["error"] = result.error
+                elif result.deleted:
+                    line["deleted"] = True
+                else:
+                    line["result"] = result.document.dict() if hasattr(result.document, "dict") else result.document
+                self.items += 1
+                yield _dumps(line) + "\n"
+        finally:
+            self.bucket_streams -= 1
+
+    async def minio_action(self, payload: Any, max_bytes: int = 16 * 1024 * 1024) -> Dict[str, Any]:
+        """Fetch an object (``bucket_name``, ``object_name``) and return it as text."""
+        if self.minio_client is None:
+            raise RequestError("no MinIO client is configured")
+        bucket_name, object_name = _required(payload, "bucket_name", "object_name")
+
+        def fetch() -> bytes:
+            if self.minio_client.stat_object(bucket_name, object_name).size > max_bytes:
+                raise PayloadTooLarge(f"{object_name} is larger than {max_bytes} bytes")
+            response = self.minio_client.get_object(bucket_name, object_name)
+            try:
+                return response.read()
+            finally:
+                response.close()
+                response.release_conn()
+
+        data = await asyncio.get_running_loop().run_in_executor(None, fetch)
+        return {"message": f"fetched {bucket_name}/{object_name}", "data": data.decode("utf-8", "replace")}
+
+    async def weaviate_action(self, payload: Any) -> Dict[str, Any]:
+        """Upsert an object (``class_name``, ``properties``) into Weaviate."""
+        from .weaviate_sink import WeaviateObject, _content_key, ingest_data, object_uuid
+
+        if self.weaviate_client is None:
+            raise RequestError("no Weaviate client is configured")
+        class_name, properties = _required(payload, "class_name", "properties")
+        if not isinstance(properties, dict):
+            raise RequestError("expected properties to be an object")
+        uuid = object_uuid(class_name, _content_key(properties))
+        obj = WeaviateObject(class_name, properties, uuid)
+        stats = await asyncio.get_running_loop().run_in_executor(None, ingest_data, self.weaviate_client, obj)
+        if any(batch.failed for batch in stats):
+            raise RequestError("; ".join(error for batch in stats for error in batch.errors))
+        return {"message": f"stored {class_name} {uuid}"}
+
+def _required(payload: Any, *names: str) -> List[Any]:
+    if not isinstance(payload, dict):
+        raise RequestError("expected a JSON object")
+    missing = [name for name in names if not payload.get(name)]
+    if missing:
+        raise RequestError(f"missing {', '.join(missing)}")
+    return [payload[name] for name in names]
+
+async def _aiter(items) -> AsyncIterator[Any]:
+    if hasattr(items, "__aiter__"):
+        async for item in items:
+            yield item
+    else:
+        for item in items:
+            yield item
@@ -1,41 +1,66 @@
+from functools import lru_cache
 from pydantic import BaseModel, create_model
-from typing import List, Dict, Any
-import pandas as pd
-import os
+from typing import List, Dict, Any, Optional, Tuple, Type
+
+try:
+    from pydantic import TypeAdapter
+except ImportError:  # pydantic < 2
+    TypeAdapter = None
+
+from .file_index import FileIndex, get_file_index
+from .tables import find_pipe_table, parse_pipe_table
 
 # Assume the bucket_path is known
 bucket_path = "/path/to/your/bucket"
 
-def find_file(bucket_path: str, row_name: str) -> str:
+def find_file(bucket_path: str, row_name: str, case_sensitive: bool = True, index: FileIndex = None) -> str:
     # Define the target file name
     target_file_name = f"{row_name}.md"
-    
-    # Traverse the bucket
-    for root, dirs, files in os.walk(bucket_path):
-        if target_file_name in files:
-            # Return the full path of the file if found
-            return os.path.join(root, target_file_name)
-    
-    # Return None if the file is not found
-    return None
-    
+
+    # Resolve through the bucket's filename index instead of walking the tree
+    index = index or get_file_index(bucket_path)
+
+    # Return the full path of the file if found, None otherwise
+    return index.lookup(target_file_name, case_sensitive=case_sensitive)
+
+# Every row shares the same field set, so one model serves the whole table
+SCHEMA_FIELDS = (
+    ("id", int),
+    ("name", str),
+    ("properties", List[str]),
+    ("file_path", Optional[str]),
+)
+
+@lru_cache(maxsize=None)
+def schema_model(fields: Tuple[Tuple[str, Any], ...] = SCHEMA_FIELDS, model_name: str = "Schema") -> Type[BaseModel]:
+    # Models are cached by their field signature instead of created per row
+    return create_model(model_name, **{name: (field_type, ...) for name, field_type in fields})
+
+@lru_cache(maxsize=None)
+def _list_adapter(model: Type[BaseModel]):
+    return TypeAdapter(List[model])
+
+def validate_rows(model: Type[BaseModel], records: List[Dict[str, Any]]) -> List[BaseModel]:
+    # Validate all rows in one call where pydantic supports it
+    if TypeAdapter is not None:
+        return _list_adapter(model).validate_python(records)
+    return [model(**record) for record in records]
+
 def create_schema(table_data: List[Dict[str, Any]]) -> List[BaseModel]:
-    schemas = []
-    for row in table_data:
-        # Dynamically create a Pydantic model based on the row data
-        model_name = f"Schema_{row['ID']}"
-        file_path = find_file(bucket_path, row['Name'])
-        model = create_model(
-            model_name,
-            id=(int, ...),
-            name=(str, ...),
-            properties=(List[str], ...),
-            file_path=(str, file_path)  # Set default value to the file path
-        )
-        # Populate the model with data
-        schema_instance = model(id=row['ID'], name=row['Name'], properties=row['Properties'].split(', '))
-        schemas.append(schema_instance)
-    return schemas
+    # Build (or bring up to date) the filename index once for all rows
+    index = get_file_index(bucket_path, refresh=True)
+    model = schema_model()
+    records = [
+        {
+            "id": row['ID'],
+            "name": row['Name'],
+            "properties": row['Properties'].split(', '),
+            "file_path": find_file(bucket_path, row['Name'], index=index)
+        }
+        for row in table_data
+    ]
+    # Populate the shared model with all rows at once
+    return validate_rows(model, records)
 
 # Assume markdown_data is your Markdown string containing your table
 markdown_data = """
@@ -47,9 +72,10 @@ markdown_data = """
 
 def extract_table_data(markdown: str) -> List[Dict[str, Any]]:
     # Assuming there's one table in the markdown data
-    tables = pd.read_html(markdown, header=0)
-    table_data = tables[0].to_dict(orient='records')
-    return table_data
+    table_content = find_pipe_table(markdown)
+    if table_content is None:
+        return []
+    return parse_pipe_table(table_content, infer_types=True).rows
 
 # Extract table data
 table_data = extract_table_data(markdown_data)
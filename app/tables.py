@@ -0,0 +1,87 @@
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+from .models import Table
+from .markdown_tokenizer import TABLE, tokenize_markdown
+
+# Direct Markdown pipe-table parsing. Builds headers and rows (or one list per
+# column) straight from the text, without an HTML round trip or a DataFrame.
+
+_CELL_SPLIT = re.compile(r"(?<!\\)\|")
+_INT = re.compile(r"^[+-]?\d+$")
+_FLOAT = re.compile(r"^[+-]?(\d+\.\d*|\.\d+|\d+)([eE][+-]?\d+)?$")
+
+def split_row(line: str) -> List[str]:
+    line = line.strip()
+    if line.startswith("|"):
+        line = line[1:]
+    if line.endswith("|") and not line.endswith("\\|"):
+        line = line[:-1]
+    return [cell.strip().replace("\\|", "|") for cell in _CELL_SPLIT.split(line)]
+
+def infer_value(cell: str) -> Any:
+    if cell == "":
+        return None
+    if _INT.match(cell):
+        return int(cell)
+    if _FLOAT.match(cell):
+        return float(cell)
+    lowered = cell.lower()
+    if lowered in ("true", "false"):
+        return lowered == "true"
+    return cell
+
+def _unique_headers(headers: List[str]) -> List[str]:
+    # Same convention as pandas for repeated column names: "Name", "Name.1", ...
+    seen = {}
+    unique = []
+    for header in headers:
+        count = seen.get(header, 0)
+        seen[header] = count + 1
+        unique.append(header if count == 0 else f"{header}.{count}")
+    return unique
+
+def _iter_table_rows(table_content: str, infer_types: bool):
+    lines = [line for line in table_content.strip().splitlines() if line.strip()]
+    if not lines:
+        return [], iter(())
+    headers = _unique_headers(split_row(lines[0]))
+    width = len(headers)
+
+    def rows():
+        # lines[1] is the delimiter row
+        for line in lines[2:]:
+            cells = split_row(line)[:width]
+            cells += [""] * (width - len(cells))
+            yield [infer_value(cell) for cell in cells] if infer_types else cells
+
+    return headers, rows()
+
+def parse_pipe_table(table_content: str, infer_types: bool = False) -> Table:
+    """Parse a Markdown pipe table into a ``Table``.
+
+    With ``infer_types`` cells become ``int``/``float``/``bool``/``None``
+    where they look like one, as ``pd.read_html`` used to do.
+    """
+    headers, rows = _iter_table_rows(table_content, infer_types)
+    return Table(headers=headers, rows=[dict(zip(headers, row)) for row in rows])
+
+def parse_pipe_table_columns(table_content: str, infer_types: bool = False) -> Tuple[List[str], Dict[str, List[Any]]]:
+    """Parse a Markdown pipe table into ``(headers, {header: column values})``.
+
+    Large tables are far cheaper to hold this way than as one dict per row.
+    """
+    headers, rows = _iter_table_rows(table_content, infer_types)
+    columns = [[] for _ in headers]
+    appends = [column.append for column in columns]
+    for row in rows:
+        for append, value in zip(appends, row):
+            append(value)
+    return headers, dict(zip(headers, columns))
+
+def find_pipe_table(markdown: str) -> Optional[str]:
+    """Return the text of the first pipe table in ``markdown``, if any."""
+    for token in tokenize_markdown(markdown.splitlines(keepends=True)):
+        if token.kind == TABLE:
+            return token.text
+    return None
@@ -0,0 +1,382 @@
+import argparse
+import os
+import re
+import sqlite3
+import sys
+import threading
+import time
+from typing import Any, Dict, FrozenSet, Iterable, Iterator, List, Optional, Set, Tuple
+
+# Persistent inverted index over parsed objects, for questions like "which
+# notes import weaviate" or "which documents are tagged RAG and Done" without
+# re-parsing the bucket. Every object is indexed under lowercase terms:
+#
+#   import:<module>      SourceCode.imports of the object or its code blocks
+#   class:<name>         SourceCode.classes
+#   has:<key>            a front-matter key is present
+#   <key>:<value>        a front-matter value (one term per list element;
+#                        nested keys are dotted, e.g. owner.name:ada)
+#   kind:document|code
+#
+# Queries combine terms with AND (or juxtaposition), OR, NOT and parentheses;
+# a trailing * matches a prefix (import:weaviate*), and values with spaces are
+# quoted (status:"in progress"). Postings live in SQLite; postings per term and
+# the result of each query are cached in memory until the next update, so
+# repeated lookups are dict hits.
+
+_SCHEMA = [
+    "CREATE TABLE IF NOT EXISTS objects (id INTEGER PRIMARY KEY, name TEXT NOT NULL UNIQUE)",
+    "CREATE TABLE IF NOT EXISTS terms (id INTEGER PRIMARY KEY, term TEXT NOT NULL UNIQUE)",
+    "CREATE TABLE IF NOT EXISTS postings (term INTEGER NOT NULL, object INTEGER NOT NULL, "
+    "PRIMARY KEY (term, object)) WITHOUT ROWID",
+    "CREATE INDEX IF NOT EXISTS postings_by_object ON postings (object)",
+]
+
+# Front-matter values longer than this are prose, not tags
+MAX_VALUE_LENGTH = 200
+
+class QuerySyntaxError(ValueError):
+    """The query string could not be parsed."""
+
+def normalize(text: Any) -> str:
+    return " ".join(str(text).split()).lower()
+
+def _metadata_terms(metadata: Dict[str, Any], prefix: str = "") -> Iterator[str]:
+    for key, value in (metadata or {}).items():
+        name = prefix + normalize(key)
+        yield f"has:{name}"
+        if isinstance(value, dict):
+            yield from _metadata_terms(value, name + ".")
+            continue
+        values = value if isinstance(value, (list, tuple, set)) else [value]
+        for item in values:
+            if item is None or isinstance(item, (dict, list)):
+                continue
+            text = normalize(item)
+            if text and len(text) <= MAX_VALUE_LENGTH:
+                yield f"{name}:{text}"
+
+def extract_terms(item) -> Set[str]:
+    """The index terms of a ``MarkdownDocument`` or ``SourceCode`` (or their
+    compact records)."""
+    terms = set()
+    if hasattr(item, "code_blocks"):
+        terms.add("kind:document")
+        terms.update(_metadata_terms(item.metadata))
+        sources = item.code_blocks
+    elif hasattr(item, "imports") and hasattr(item, "classes"):
+        terms.add("kind:code")
+        sources = [item]
+    else:
+        raise TypeError(f"cannot index {type(item).__name__}")
+    for source in sources:
+        terms.update(f"import:{normalize(name)}" for name in source.imports)
+        terms.update(f"class:{normalize(name)}" for name in source.classes)
+    return terms
+
+_TOKEN = re.compile(r'\s*(?:(\()|(\))|((?:[^\s()"]|"[^"]*")+))')
+
+def _tokenize(query: str) -> List[str]:
+    tokens, position = [], 0
+    query = query.strip()
+    while position < len(query):
+        match = _TOKEN.match(query, position)
+        if match is None or match.end() == position:
+            raise QuerySyntaxError(f"unexpected character at {position}: {query[position:]!r}")
+        tokens.append(match.group(match.lastindex))
+        position = match.end()
+    return tokens
+
+class _Parser:
+    # or := and (OR and)* ; and := not ([AND] not)* ; not := NOT not | atom ;
+    # atom := "(" or ")" | term
+    def __init__(self, tokens: List[str]):
+        self.tokens = tokens
+        self.position = 0
+
+    def peek(self) -> Optional[str]:
+        return self.tokens[self.position] if self.position < len(self.tokens) else None
+
+    def take(self) -> str:
+        token = self.peek()
+        if token is None:
+            raise QuerySyntaxError("unexpected end of query")
+        self.position += 1
+        return token
+
+    def parse(self) -> tuple:
+        if not self.tokens:
+            raise QuerySyntaxError("empty query")
+        node = self.parse_or()
+        if self.peek() is not None:
+            raise QuerySyntaxError(f"unexpected {self.peek()!r}")
+        return node
+
+    def parse_or(self) -> tuple:
+        nodes = [self.parse_and()]
+        while self.peek() == "OR":
+            self.take()
+            nodes.append(self.parse_and())
+        return nodes[0] if len(nodes) == 1 else ("or", nodes)
+
+    def parse_and(self) -> tuple:
+        nodes = [self.parse_not()]
+        while self.peek() not in (None, "OR", ")"):
+            if self.peek() == "AND":
+                self.take()
+            nodes.append(self.parse_not())
+        return nodes[0] if len(nodes) == 1 else ("and", nodes)
+
+    def parse_not(self) -> tuple:
+        if self.peek() == "NOT":
+            self.take()
+            return ("not", self.parse_not())
+        return self.parse_atom()
+
+    def parse_atom(self) -> tuple:
+        token = self.take()
+        if token == "(":
+            node = self.parse_or()
+            if self.take() != ")":
+                raise QuerySyntaxError("missing )")
+            return node
+        if token in (")", "AND", "OR"):
+            raise QuerySyntaxError(f"unexpected {token!r}")
+        term = normalize(token.replace('"', ""))
+        if term.endswith("*"):
+            return ("prefix", term[:-1])
+        return ("term", term)
+
+def parse_query(query: str) -> tuple:
+    """Parse a query into a tree of ``("and"|"or", [nodes])``, ``("not", node)``,
+    ``("term", term)`` and ``("prefix", prefix)`` tuples."""
+    return _Parser(_tokenize(query)).parse()
+
+class TermIndex:
+    """SQLite-backed inverted index from terms to object names.
+
+    ``add`` replaces everything indexed for an object, so re-indexing a changed
+    object is one call; ``remove`` drops it. Writes are committed every
+    ``commit_every`` changes and on ``commit``/``close``.
+    """
+
+    def __init__(self, path: str = ":memory:", commit_every: int = 500):
+        self.path = path
+        self.commit_every = commit_every
+        self._pending = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        if path != ":memory:":
+            self._conn.execute("PRAGMA journal_mode=WAL")
+        for statement in _SCHEMA:
+            self._conn.execute(statement)
+        self._conn.commit()
+        self._term_ids: Dict[str, int] = {}
+        self._postings: Dict[Tuple[str, str], FrozenSet[int]] = {}
+        self._results: Dict[str, FrozenSet[int]] = {}
+        self._names: Dict[int, str] = {}
+        # Bumped by every write; a query stores its result only if no write
+        # happened while it was being evaluated
+        self._generation = 0
+
+    def _changed(self):
+        self._generation += 1
+        self._postings.clear()
+        self._results.clear()
+        self._pending += 1
+        if self._pending >= self.commit_every:
+            self._conn.commit()
+            self._pending = 0
+
+    def _term_id(self, term: str) -> int:
+        term_id = self._term_ids.get(term)
+        if term_id is None:
+            self._conn.execute("INSERT OR IGNORE INTO terms (term) VALUES (?)", (term,))
+            term_id = self._conn.execute("SELECT id FROM terms WHERE term = ?", (term,)).fetchone()[0]
+            self._term_ids[term] = term_id
+        return term_id
+
+    def add(self, name: str, item=None, terms: Optional[Iterable[str]] = None):
+        """Index ``item`` (or an explicit set of ``terms``) under ``name``."""
+        terms = set(terms) if terms is not None else extract_terms(item)
+        with self._lock:
+            self._conn.execute("INSERT OR IGNORE INTO objects (name) VALUES (?)", (name,))
+            object_id = self._conn.execute("SELECT id FROM objects WHERE name = ?", (name,)).fetchone()[0]
+            self._conn.execute("DELETE FROM postings WHERE object = ?", (object_id,))
+            self._conn.executemany("INSERT OR IGNORE INTO postings VALUES (?, ?)",
+                                   [(self._term_id(term), object_id) for term in terms])
+            self._names[object_id] = name
+            self._changed()
+
+    def remove(self, name: str):
+        with self._lock:
+            row = self._conn.execute("SELECT id FROM objects WHERE name = ?", (name,)).fetchone()
+            if row is None:
+                return
+            self._conn.execute("DELETE FROM postings WHERE object = ?", (row[0],))
+            self._conn.execute("DELETE FROM objects WHERE id = ?", (row[0],))
+            self._names.pop(row[0], None)
+            self._changed()
+
+    def index_result(self, result):
+        """Apply an ingest ``IngestResult``: index documents, drop tombstones."""
+        if result.deleted:
+            self.remove(result.object_name)
+        elif result.error is None and result.document is not None:
+            self.add(result.object_name, result.document)
+
+    def _lookup(self, kind: str, text: str) -> FrozenSet[int]:
+        key = (kind, text)
+        with self._lock:
+            postings = self._postings.get(key)
+            if postings is None:
+                if kind == "term":
+                    rows = self._conn.execute(
+                        "SELECT p.object FROM terms t JOIN postings p ON p.term = t.id WHERE t.term = ?", (text,))
+                elif kind == "prefix":
+                    # Range scan over the term index: [prefix, prefix + U+10FFFF)
+                    rows = self._conn.execute(
+                        "SELECT p.object FROM terms t JOIN postings p ON p.term = t.id "
+                        "WHERE t.term >= ? AND t.term < ?", (text, text + "\U0010ffff"))
+                else:
+                    rows = self._conn.execute("SELECT id FROM objects")
+                postings = self._postings[key] = frozenset(row[0] for row in rows)
+        return postings
+
+    def _evaluate(self, node: tuple) -> FrozenSet[int]:
+        kind = node[0]
+        if kind in ("term", "prefix"):
+            return self._lookup(kind, node[1])
+        if kind == "not":
+            return self._lookup("all", "") - self._evaluate(node[1])
+        # Intersect smallest first; NOT operands are subtracted at the end
+        children = node[1]
+        if kind == "or":
+            return frozenset().union(*(self._evaluate(child) for child in children))
+        positive = [self._evaluate(child) for child in children if child[0] != "not"]
+        negative = [self._evaluate(child[1]) for child in children if child[0] == "not"]
+        if not positive:
+            positive = [self._lookup("all", "")]
+        result = min(positive, key=len)
+        for postings in positive:
+            if postings is not result:
+                result = result & postings
+        for postings in negative:
+            result = result - postings
+        return result
+
+    def _name(self, object_id: int) -> Optional[str]:
+        # None when the object was removed while the query ran
+        with self._lock:
+            name = self._names.get(object_id)
+            if name is None:
+                row = self._conn.execute("SELECT name FROM objects WHERE id = ?", (object_id,)).fetchone()
+                if row is not None:
+                    name = self._names[object_id] = row[0]
+        return name
+
+    def match(self, query: str) -> FrozenSet[int]:
+        """Object ids matching ``query``."""
+        tree = parse_query(query)
+        key = repr(tree)
+        with self._lock:
+            result = self._results.get(key)
+            generation = self._generation
+        if result is None:
+            result = self._evaluate(tree)
+            with self._lock:
+                if self._generation == generation:
+                    self._results[key] = result
+        return result
+
+    def search(self, query: str, limit: Optional[int] = None) -> List[str]:
+        """Object names matching ``query``, sorted."""
+        names = sorted(name for name in map(self._name, self.match(query)) if name is not None)
+        return names[:limit] if limit is not None else names
+
+    def count(self, query: str) -> int:
+        return len(self.match(query))
+
+    def terms(self, prefix: str = "") -> List[Tuple[str, int]]:
+        """``(term, object count)`` for every term starting with ``prefix``."""
+        prefix = normalize(prefix) if prefix else ""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT t.term, COUNT(*) FROM terms t JOIN postings p ON p.term = t.id "
+                "WHERE t.term >= ? AND t.term < ? GROUP BY t.term ORDER BY t.term",
+                (prefix, prefix + "\U0010ffff")).fetchall()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM objects").fetchone()[0]
+
+    def commit(self):
+        with self._lock:
+            self._conn.commit()
+            self._pending = 0
+
+    def close(self):
+        self.commit()
+        self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def _parse_file(path: str):
+    from .parse_cache import cached_parse_markdown_content, cached_parse_python_script
+
+    with open(path, encoding="utf-8") as f:
+        text = f.read()
+    return cached_parse_python_script(text) if path.endswith(".py") else cached_parse_markdown_content(text)
+
+def index_directory(index: TermIndex, root: str) -> int:
+    """Index the ``.md`` and ``.py`` files under ``root`` by relative path."""
+    count = 0
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = sorted(d for d in dirnames if not d.startswith("."))
+        for filename in sorted(filenames):
+            if filename.endswith((".md", ".markdown", ".py")):
+                path = os.path.join(dirpath, filename)
+                index.add(os.path.relpath(path, root).replace(os.sep, "/"), _parse_file(path))
+                count += 1
+    index.commit()
+    return count
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Query the inverted index of parsed objects")
+    parser.add_argument("index", help="Path of the SQLite index file")
+    commands = parser.add_subparsers(dest="command", required=True)
+    build = commands.add_parser("build", help="Index the .md and .py files under a directory")
+    build.add_argument("root")
+    query = commands.add_parser("query", help='Search, e.g. "import:weaviate AND tags:rag"')
+    query.add_argument("query")
+    query.add_argument("--limit", type=int)
+    query.add_argument("--count", action="store_true", help="Print only the number of matches")
+    terms = commands.add_parser("terms", help="List terms and their object counts")
+    terms.add_argument("prefix", nargs="?", default="")
+    args = parser.parse_args(argv)
+
+    with TermIndex(args.index) as index:
+        if args.command == "build":
+            start = time.perf_counter()
+            count = index_directory(index, args.root)
+            print(f"indexed {count} files in {time.perf_counter() - start:.2f}s ({len(index)} objects)")
+        elif args.command == "query":
+            start = time.perf_counter()
+            try:
+                matches = [str(index.count(args.query))] if args.count else index.search(args.query, args.limit)
+            except QuerySyntaxError as e:
+                print(f"invalid query: {e}", file=sys.stderr)
+                return 2
+            print("\n".join(matches))
+            print(f"{time.perf_counter() - start:.6f}s", file=sys.stderr)
+        else:
+            for term, count in index.terms(args.prefix):
+                print(f"{count:8d}  {term}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
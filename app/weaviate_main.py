@@ -0,0 +1,38 @@
+from itertools import islice
+
+from .ingest import iter_bucket_results
+from .manifest import ObjectManifest
+from .minio_main import connect_to_minio, sink_manifest_path
+from .weaviate_sink import BatchIngester, connect_to_weaviate, define_schema, failed_objects, ingest_bucket_results
+
+# Run as a package module: python -m app.weaviate_main
+
+def main():
+    minio_client = connect_to_minio()
+    bucket_name = "your-bucket-name"
+
+    weaviate_client = connect_to_weaviate()
+    define_schema(weaviate_client)
+    ingester = BatchIngester(weaviate_client)
+
+    # Parsed documents are upserted in batches keyed by object name, and
+    # objects deleted from the bucket are purged from Weaviate. Each batch is
+    # flushed before its objects are acknowledged in the manifest, so nothing
+    # still pending in the ingester is skipped by the next run
+    with ObjectManifest(sink_manifest_path("weaviate")) as manifest:
+        processed_data = iter_bucket_results(minio_client, bucket_name, manifest=manifest)
+        while True:
+            results = list(islice(processed_data, 100))
+            if not results:
+                break
+            stats = ingest_bucket_results(weaviate_client, results, ingester=ingester) + ingester.flush()
+            for batch_stats in stats:
+                print(batch_stats)
+            # Objects that still failed after the retries stay unrecorded
+            failed = failed_objects(stats)
+            for result in results:
+                if result.object_name not in failed:
+                    manifest.acknowledge(bucket_name, result)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,365 @@
+import hashlib
+import json
+import os
+import random
+import time
+import uuid
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from .chunking import Chunk
+from .metrics import metrics
+from .models import MarkdownDocument, SourceCode
+
+# Batched Weaviate sink. Objects are grouped into batches bounded by count and
+# serialized size, sent through the client's batch API, and objects that fail
+# are retried with exponential backoff. Batch size adapts to observed latency.
+
+MARKDOWN_DOCUMENT_CLASS = "MarkdownDocument"
+SOURCE_CODE_CLASS = "SourceCode"
+CHUNK_CLASS = "Chunk"
+
+# Stable namespace so the same key always maps to the same Weaviate UUID
+_UUID_NAMESPACE = uuid.UUID("6f0c5c1e-4a53-4c9b-9a53-2f1d4e6b7c10")
+
+SCHEMA = {
+    "classes": [
+        {
+            "class": MARKDOWN_DOCUMENT_CLASS,
+            "description": "A parsed Markdown document",
+            "vectorizer": "none",
+            "properties": [
+                {"name": "objectName", "dataType": ["text"]},
+                {"name": "content", "dataType": ["text"]},
+                {"name": "metadata", "dataType": ["text"]},
+                {"name": "tables", "dataType": ["text"]},
+                {"name": "imports", "dataType": ["text[]"]},
+                {"name": "classes", "dataType": ["text[]"]},
+            ],
+        },
+        {
+            "class": SOURCE_CODE_CLASS,
+            "description": "A parsed source code object",
+            "vectorizer": "none",
+            "properties": [
+                {"name": "objectName", "dataType": ["text"]},
+                {"name": "sourceId", "dataType": ["text"]},
+                {"name": "imports", "dataType": ["text[]"]},
+                {"name": "classes", "dataType": ["text[]"]},
+                {"name": "code", "dataType": ["text"]},
+                {"name": "syntax", "dataType": ["text"]},
+                {"name": "context", "dataType": ["text"]},
+                {"name": "metadata", "dataType": ["text"]},
+            ],
+        },
+        {
+            "class": CHUNK_CLASS,
+            "description": "A content-addressed chunk of a parsed document",
+            "vectorizer": "none",
+            "properties": [
+                {"name": "chunkId", "dataType": ["text"]},
+                {"name": "documentId", "dataType": ["text"]},
+                {"name": "kind", "dataType": ["text"]},
+                {"name": "section", "dataType": ["text[]"]},
+                {"name": "text", "dataType": ["text"]},
+            ],
+        },
+    ]
+}
+
+@dataclass
+class WeaviateObject:
+    class_name: str
+    properties: Dict[str, Any]
+    uuid: str
+    vector: Optional[List[float]] = None
+
+    def size(self) -> int:
+        size = len(json.dumps(self.properties, default=str))
+        return size + (len(self.vector) * 8 if self.vector is not None else 0)
+
+@dataclass
+class BatchStats:
+    objects: int = 0
+    bytes: int = 0
+    seconds: float = 0.0
+    attempts: int = 0
+    retried: int = 0
+    failed: int = 0
+    errors: List[str] = field(default_factory=list)
+    # Bucket object names of the failed objects (a chunk's document), so the
+    # caller can leave them unrecorded and have them fetched again
+    failed_objects: List[str] = field(default_factory=list)
+
+def failed_objects(stats: Iterable[BatchStats]) -> Set[str]:
+    return {name for batch_stats in stats for name in batch_stats.failed_objects}
+
+def connect_to_weaviate(url: Optional[str] = None, api_key: Optional[str] = None):
+    import weaviate
+
+    url = url or os.getenv("WEAVIATE_URL", "http://localhost:8080")
+    api_key = api_key or os.getenv("WEAVIATE_API_KEY")
+    auth = weaviate.AuthApiKey(api_key=api_key) if api_key else None
+    return weaviate.Client(url, auth_client_secret=auth)
+
+def define_schema(client, schema: Dict[str, Any] = SCHEMA):
+    for class_definition in schema["classes"]:
+        if not client.schema.exists(class_definition["class"]):
+            client.schema.create_class(class_definition)
+
+def object_uuid(class_name: str, key: str) -> str:
+    return str(uuid.uuid5(_UUID_NAMESPACE, f"{class_name}:{key}"))
+
+def _content_key(properties: Dict[str, Any]) -> str:
+    return hashlib.sha256(json.dumps(properties, sort_keys=True, default=str).encode()).hexdigest()
+
+def to_weaviate_object(item, vector: Optional[List[float]] = None, key: Optional[str] = None) -> WeaviateObject:
+    """Map a ``MarkdownDocument``, ``SourceCode`` or ``Chunk`` to a Weaviate object.
+
+    ``key`` (typically the bucket object name) makes the UUID stable across
+    content changes so re-ingesting an object replaces it; without a key the
+    UUID is derived from the content.
+    """
+    if isinstance(item, WeaviateObject):
+        return item
+    if isinstance(item, Chunk):
+        # Chunks are content addressed already
+        properties = {
+            "chunkId": item.id,
+            "documentId": item.document_id,
+            "kind": item.kind,
+            "section": list(item.section),
+            "text": item.text,
+        }
+        return WeaviateObject(CHUNK_CLASS, properties, object_uuid(CHUNK_CLASS, item.id),
+                              list(vector) if vector is not None else None)
+    if isinstance(item, MarkdownDocument):
+        class_name = MARKDOWN_DOCUMENT_CLASS
+        properties = {
+            "content": item.content,
+            "metadata": json.dumps(item.metadata, default=str),
+            "tables": json.dumps([table.dict() for table in item.tables], default=str),
+            "imports": sorted({name for block in item.code_blocks for name in block.imports if name}),
+            "classes": sorted({name for block in item.code_blocks for name in block.classes}),
+        }
+    elif isinstance(item, SourceCode):
+        class_name = SOURCE_CODE_CLASS
+        properties = {
+            "sourceId": item.id,
+            "imports": [name for name in item.imports if name],
+            "classes": list(item.classes),
+            "code": item.code,
+            "syntax": item.syntax,
+            "context": item.context,
+            "metadata": json.dumps(item.metadata, default=str),
+        }
+    else:
+        raise TypeError(f"Cannot ingest {type(item).__name__} into Weaviate")
+    if key is not None:
+        properties["objectName"] = key
+    return WeaviateObject(
+        class_name=class_name,
+        properties=properties,
+        uuid=object_uuid(class_name, key if key is not None else _content_key(properties)),
+        vector=list(vector) if vector is not None else None,
+    )
+
+def _iter_objects(data: Iterable) -> Iterator[WeaviateObject]:
+    for item in data:
+        if isinstance(item, tuple):
+            yield to_weaviate_object(*item)
+        else:
+            yield to_weaviate_object(item)
+
+def _send(client, objects: List[WeaviateObject]) -> Dict[str, str]:
+    # Returns {uuid: error message} for the objects Weaviate rejected
+    for obj in objects:
+        client.batch.add_data_object(obj.properties, obj.class_name, uuid=obj.uuid, vector=obj.vector)
+    results = client.batch.create_objects() or []
+    failures = {}
+    for result in results:
+        errors = (result.get("result") or {}).get("errors")
+        if errors:
+            messages = [error.get("message", str(error)) for error in errors.get("error", [])]
+            failures[str(result.get("id"))] = "; ".join(messages) or json.dumps(errors)
+    return failures
+
+class BatchIngester:
+    """Sends objects to Weaviate in size- and byte-bounded batches.
+
+    With ``dynamic`` the batch size halves when a batch takes longer than
+    ``target_seconds`` and doubles (up to ``max_batch_size``) when it takes
+    less than half of it. Vectors must have the same dimension within a class;
+    mismatching objects are rejected before they are sent.
+    """
+
+    def __init__(self, client, batch_size: int = 100, max_batch_size: int = 1000,
+                 max_batch_bytes: int = 8 * 1024 * 1024, dynamic: bool = True,
+                 target_seconds: float = 1.0, max_retries: int = 3, backoff: float = 0.5):
+        self.client = client
+        self.batch_size = batch_size
+        self.max_batch_size = max_batch_size
+        self.max_batch_bytes = max_batch_bytes
+        self.dynamic = dynamic
+        self.target_seconds = target_seconds
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.dimensions: Dict[str, int] = {}
+        self.stats: List[BatchStats] = []
+        self._batch: List[WeaviateObject] = []
+        self._batch_bytes = 0
+        self._rejected: List[Tuple[WeaviateObject, str]] = []
+
+    def _check_vector(self, obj: WeaviateObject) -> Optional[str]:
+        if obj.vector is None:
+            return None
+        expected = self.dimensions.setdefault(obj.class_name, len(obj.vector))
+        if len(obj.vector) != expected:
+            return f"vector dimension {len(obj.vector)} != {expected} for class {obj.class_name}"
+        return None
+
+    @staticmethod
+    def _object_name(obj: WeaviateObject) -> Optional[str]:
+        return obj.properties.get("objectName") or obj.properties.get("documentId")
+
+    def _failed(self, stats: BatchStats, failures: List[Tuple[WeaviateObject, str]]):
+        stats.failed += len(failures)
+        for obj, message in failures:
+            stats.errors.append(f"{obj.uuid}: {message}")
+            name = self._object_name(obj)
+            if name and name not in stats.failed_objects:
+                stats.failed_objects.append(name)
+
+    def _flush(self, batch: List[WeaviateObject], batch_bytes: int,
+               rejected: List[Tuple[WeaviateObject, str]]) -> BatchStats:
+        stats = BatchStats(objects=len(batch), bytes=batch_bytes)
+        self._failed(stats, rejected)
+        pending = batch
+        start = time.perf_counter()
+        while pending:
+            stats.attempts += 1
+            try:
+                failures = _send(self.client, pending)
+            except Exception as e:
+                failures = {obj.uuid: str(e) for obj in pending}
+            if not failures:
+                break
+            if stats.attempts > self.max_retries:
+                self._failed(stats, [(obj, failures[obj.uuid]) for obj in pending if obj.uuid in failures])
+                break
+            pending = [obj for obj in pending if obj.uuid in failures]
+            stats.retried += len(pending)
+            time.sleep(self.backoff * 2 ** (stats.attempts - 1) * (1 + random.random()))
+        stats.seconds = time.perf_counter() - start
+        metrics.observe("stage_seconds", stats.seconds, stage="ingest")
+        metrics.inc("documents_total", stats.objects - stats.failed, stage="ingest")
+        metrics.inc("bytes_total", stats.bytes, stage="ingest")
+        if stats.failed:
+            metrics.inc("errors_total", stats.failed, stage="ingest")
+
+        if self.dynamic and stats.attempts == 1:
+            if stats.seconds > self.target_seconds:
+                self.batch_size = max(1, self.batch_size // 2)
+            elif stats.seconds < self.target_seconds / 2:
+                self.batch_size = min(self.max_batch_size, self.batch_size * 2)
+        self.stats.append(stats)
+        return stats
+
+    def add(self, data: Iterable) -> List[BatchStats]:
+        """Queue objects, sending every batch that fills up; the remainder stays
+        pending across calls so one ingester can serve a whole run. Returns the
+        stats of the batches sent by this call."""
+        sent = []
+        for obj in _iter_objects(data):
+            error = self._check_vector(obj)
+            if error is not None:
+                self._rejected.append((obj, error))
+                continue
+            size = obj.size()
+            if self._batch and (len(self._batch) >= self.batch_size
+                                or self._batch_bytes + size > self.max_batch_bytes):
+                sent.extend(self.flush())
+            self._batch.append(obj)
+            self._batch_bytes += size
+        return sent
+
+    def discard(self, object_uuid: str):
+        # Drop a pending object so a delete issued now is not undone by a
+        # later flush
+        kept = [obj for obj in self._batch if obj.uuid != object_uuid]
+        if len(kept) != len(self._batch):
+            self._batch = kept
+            self._batch_bytes = sum(obj.size() for obj in kept)
+
+    def flush(self) -> List[BatchStats]:
+        """Send the pending partial batch, if any."""
+        if not (self._batch or self._rejected):
+            return []
+        batch, batch_bytes, rejected = self._batch, self._batch_bytes, self._rejected
+        self._batch, self._batch_bytes, self._rejected = [], 0, []
+        return [self._flush(batch, batch_bytes, rejected)]
+
+    def ingest(self, data: Iterable) -> List[BatchStats]:
+        self.add(data)
+        self.flush()
+        return self.stats
+
+def _ingest(client, data, ingester: Optional[BatchIngester], **kwargs) -> List[BatchStats]:
+    if ingester is None:
+        return BatchIngester(client, **kwargs).ingest(data)
+    return ingester.add(data)
+
+def ingest_data(client, data, ingester: Optional[BatchIngester] = None, **kwargs) -> List[BatchStats]:
+    """Ingest an iterable of ``MarkdownDocument``/``SourceCode`` objects (or
+    ``(item, vector)`` / ``(item, vector, key)`` tuples) and return per-batch stats.
+    A single document is accepted too.
+
+    With a long-lived ``ingester`` the objects are added to it and only full
+    batches are sent; call ``ingester.flush()`` at the end of the run."""
+    if isinstance(data, (MarkdownDocument, SourceCode, Chunk, WeaviateObject)):
+        data = [data]
+    return _ingest(client, data, ingester, **kwargs)
+
+def delete_data(client, object_name: str, class_name: str = MARKDOWN_DOCUMENT_CLASS,
+                ingester: Optional[BatchIngester] = None):
+    uuid_ = object_uuid(class_name, object_name)
+    if ingester is not None:
+        ingester.discard(uuid_)
+    try:
+        client.data_object.delete(uuid_, class_name=class_name)
+    except Exception as e:
+        # Unacknowledged deletes are replayed on the next run
+        if getattr(e, "status_code", None) != 404:
+            raise
+
+def ingest_chunk_updates(client, updates: Iterable, ingester: Optional[BatchIngester] = None,
+                         **kwargs) -> List[BatchStats]:
+    """Ingest ``(object name, new chunks, removed chunk ids[, moved chunks])``
+    updates from ``chunking.changed_chunks``: only new chunks are sent,
+    unreferenced ones purged and moved ones re-pointed at their new document."""
+    def chunks():
+        for _, new_chunks, removed, *moved in updates:
+            for chunk_id in removed:
+                delete_data(client, chunk_id, CHUNK_CLASS, ingester=ingester)
+            for chunk_id, document_id in (moved[0] if moved else ()):
+                client.data_object.update({"documentId": document_id}, CHUNK_CLASS,
+                                          object_uuid(CHUNK_CLASS, chunk_id))
+            yield from new_chunks
+
+    return _ingest(client, chunks(), ingester, **kwargs)
+
+def ingest_bucket_results(client, results: Iterable, ingester: Optional[BatchIngester] = None,
+                          **kwargs) -> List[BatchStats]:
+    """Upsert parsed bucket objects keyed by object name and purge tombstones.
+
+    Objects that still fail after the retries are named in each batch's
+    ``failed_objects`` (see ``failed_objects``); leave those unacknowledged
+    in the manifest so the next run fetches them again."""
+    def documents():
+        for result in results:
+            if result.deleted:
+                delete_data(client, result.object_name, ingester=ingester)
+            elif result.error is None:
+                yield (result.document, None, result.object_name)
+
+    return _ingest(client, documents(), ingester, **kwargs)
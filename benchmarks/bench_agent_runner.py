@@ -0,0 +1,49 @@
+"""Sequential agent calls vs. AgentRunner against a fake LLM with injected latency.
+
+    python benchmarks/bench_agent_runner.py --files 500 --latency 0.2 --concurrency 32
+    python benchmarks/bench_agent_runner.py --rpm 3000 --tpm 400000
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from app.agent_runner import AgentRunner
+from app.fakes import FakeLLM
+
+def make_inputs(files: int):
+    for i in range(files):
+        yield {"filename": f"module{i}.py", "content": f"def handler_{i}():\n    return {i}\n" * 20}
+
+def prompt(item: dict) -> str:
+    return f"Analyze {item['filename']}:\n{item['content']}"
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--files", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--rpm", type=float, default=None)
+    parser.add_argument("--tpm", type=float, default=None)
+    parser.add_argument("--skip-sequential", action="store_true")
+    args = parser.parse_args()
+
+    if not args.skip_sequential:
+        llm = FakeLLM(latency=args.latency)
+        start = time.perf_counter()
+        for item in make_inputs(args.files):
+            llm.invoke(prompt(item))
+        elapsed = time.perf_counter() - start
+        print(f"sequential: {elapsed:.2f}s ({args.files / elapsed:,.1f} files/s)")
+
+    runner = AgentRunner(FakeLLM(latency=args.latency), prompt, concurrency=args.concurrency,
+                         requests_per_minute=args.rpm, tokens_per_minute=args.tpm)
+    start = time.perf_counter()
+    results = runner.run(make_inputs(args.files))
+    elapsed = time.perf_counter() - start
+    print(f"    runner: {elapsed:.2f}s ({len(results) / elapsed:,.1f} files/s) {runner.metrics.summary()}")
+
+if __name__ == "__main__":
+    main()
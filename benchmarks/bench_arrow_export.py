@@ -0,0 +1,58 @@
+"""Export throughput and read-back time of the Parquet/Arrow corpus sink.
+
+Writes ``--documents`` parsed documents (a few real parses under different
+object names) as one run, appends a second run that updates and deletes a
+fraction of them, then times reading the latest corpus back::
+
+    python benchmarks/bench_arrow_export.py --documents 1000000 --format parquet
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from corpus import markdown_document
+
+from app.arrow_sink import CorpusWriter, read_corpus
+from app.markdown_stream import stream_markdown_document
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--documents", type=int, default=100000)
+    parser.add_argument("--rows", type=int, default=5, help="Table rows per document")
+    parser.add_argument("--format", choices=["parquet", "arrow"], default="parquet")
+    parser.add_argument("--changed", type=float, default=0.05, help="Fraction updated in the second run")
+    args = parser.parse_args()
+    templates = [stream_markdown_document(markdown_document(i, args.rows, code_blocks=1)) for i in range(50)]
+
+    with tempfile.TemporaryDirectory() as root:
+        with CorpusWriter(root, format=args.format) as writer:
+            for i in range(args.documents):
+                writer.write(templates[i % len(templates)], f"notes/note{i}.md")
+        stats = writer.stats
+        print(f"export: {stats.seconds:.1f}s ({stats.documents / stats.seconds:,.0f} documents/s), "
+              f"{stats.table_rows:,} table rows, {stats.row_groups} row groups, {stats.bytes / 2**20:.1f} MiB")
+
+        changed = max(1, int(args.documents * args.changed))
+        with CorpusWriter(root, format=args.format) as writer:
+            for i in range(0, changed * 2, 2):
+                writer.write(templates[(i + 1) % len(templates)], f"notes/note{i}.md")
+                writer.delete(f"notes/note{i + 1}.md")
+        print(f"append: {writer.stats.seconds:.2f}s ({changed:,} updated, {changed:,} deleted)")
+
+        for columns in (["object_name", "tags", "imports", "classes"], None):
+            start = time.perf_counter()
+            table = read_corpus(root, columns=columns)
+            elapsed = time.perf_counter() - start
+            label = ", ".join(columns) if columns else "all columns"
+            print(f"read latest ({label}): {elapsed:.2f}s, {table.num_rows:,} documents")
+        start = time.perf_counter()
+        rows = read_corpus(root, "table_rows", columns=["object_name", "cells"])
+        print(f"read latest table rows: {time.perf_counter() - start:.2f}s, {rows.num_rows:,} rows")
+
+if __name__ == "__main__":
+    main()
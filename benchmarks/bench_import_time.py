@@ -0,0 +1,62 @@
+"""Import time of the parsing core, measured with ``python -X importtime``.
+
+    python benchmarks/bench_import_time.py --module app --budget-ms 500
+
+Exits non-zero when the median exceeds ``--budget-ms`` or when one of the
+agent-layer dependencies (LangChain, pandas, ...) is imported.
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+from typing import Dict, List, Tuple
+
+REPO_ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+HEAVY_MODULES = ["langchain", "langsmith", "openai", "pandas", "markdown2", "unstructured", "minio", "weaviate"]
+
+def import_times(module: str) -> List[Tuple[str, int, int]]:
+    # Returns (module, self us, cumulative us) for every import, in a fresh interpreter
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=REPO_ROOT, capture_output=True, text=True, check=True
+    )
+    times = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        times.append((name.strip(), int(self_us), int(cumulative_us)))
+    return times
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--module", default="app")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--budget-ms", type=float, default=None)
+    args = parser.parse_args()
+
+    totals = []
+    self_times: Dict[str, int] = {}
+    for _ in range(args.runs):
+        times = import_times(args.module)
+        totals.append(next(cumulative for name, _, cumulative in times if name == args.module) / 1000)
+        for name, self_us, _ in times:
+            self_times[name] = min(self_times.get(name, self_us), self_us)
+
+    median = statistics.median(totals)
+    print(f"import {args.module}: median {median:.1f} ms, min {min(totals):.1f} ms over {args.runs} runs")
+    print(f"{len(self_times)} modules imported; slowest by self time:")
+    for name, self_us in sorted(self_times.items(), key=lambda item: -item[1])[:args.top]:
+        print(f"  {self_us / 1000:8.1f} ms  {name}")
+
+    heavy = sorted(name for name in self_times if name.split(".")[0] in HEAVY_MODULES)
+    if heavy:
+        print(f"heavy modules imported: {', '.join(heavy[:args.top])}")
+    if heavy or (args.budget_ms is not None and median > args.budget_ms):
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
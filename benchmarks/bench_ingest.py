@@ -0,0 +1,103 @@
+"""Serial bucket loop vs. the bounded ingest pipeline.
+
+Builds a synthetic bucket on disk, serves it through ``FilesystemMinioClient``
+with a simulated per-request latency and reports objects per second for both
+paths::
+
+    python benchmarks/bench_ingest.py --objects 2000 --latency 0.005
+"""
+import argparse
+import ast
+import os
+import sys
+import tempfile
+import time
+
+import yaml
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from app.fakes import FilesystemMinioClient
+from app.ingest import iter_bucket_documents
+
+NOTE = """---
+Tags:
+  - Python
+  - RAG
+Status: Done
+Index: {index}
+---
+
+# Note {index}
+
+Some prose about note {index}.
+
+```python
+import os
+
+class Note{index}:
+    def run(self):
+        return os.getcwd()
+```
+"""
+
+def cpu_parse(data: bytes) -> dict:
+    # Stand-in for parse_markdown_content with a similar mix of YAML and AST work.
+    text = data.decode("utf-8")
+    _, front_matter, body = text.split("---\n", 2)
+    code = body.split("```python\n", 1)[1].split("```", 1)[0]
+    tree = ast.parse(code)
+    return {
+        "metadata": yaml.safe_load(front_matter),
+        "classes": [n.name for n in ast.walk(tree) if isinstance(n, ast.ClassDef)],
+    }
+
+def build_bucket(root: str, bucket_name: str, objects: int):
+    bucket_path = os.path.join(root, bucket_name)
+    for i in range(objects):
+        subdir = os.path.join(bucket_path, f"dir{i % 16:02d}")
+        os.makedirs(subdir, exist_ok=True)
+        with open(os.path.join(subdir, f"note{i}.md"), "w") as f:
+            f.write(NOTE.format(index=i))
+
+def run_serial(client, bucket_name: str) -> int:
+    count = 0
+    for obj in client.list_objects(bucket_name, recursive=True):
+        response = client.get_object(bucket_name, obj.object_name)
+        try:
+            cpu_parse(response.read())
+        finally:
+            response.close()
+        count += 1
+    return count
+
+def run_pipeline(client, bucket_name: str, fetch_workers: int, parse_workers: int) -> int:
+    count = 0
+    for _ in iter_bucket_documents(client, bucket_name, parser=cpu_parse,
+                                   fetch_workers=fetch_workers, parse_workers=parse_workers):
+        count += 1
+    return count
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--objects", type=int, default=1000)
+    parser.add_argument("--latency", type=float, default=0.005, help="Simulated seconds per GET")
+    parser.add_argument("--fetch-workers", type=int, default=16)
+    parser.add_argument("--parse-workers", type=int, default=os.cpu_count())
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as root:
+        build_bucket(root, "bench", args.objects)
+        client = FilesystemMinioClient(root, latency=args.latency)
+
+        for name, run in (
+            ("serial", lambda: run_serial(client, "bench")),
+            ("pipeline", lambda: run_pipeline(client, "bench", args.fetch_workers, args.parse_workers)),
+        ):
+            start = time.perf_counter()
+            count = run()
+            elapsed = time.perf_counter() - start
+            print(f"{name:>8}: {count} objects in {elapsed:.2f}s ({count / elapsed:.0f} objects/s)")
+
+if __name__ == "__main__":
+    main()
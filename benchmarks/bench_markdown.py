@@ -0,0 +1,94 @@
+"""Native tokenizer vs. Unstructured loader for parse_markdown_content.
+
+Parses a fixed synthetic corpus with both paths and reports documents per
+second::
+
+    python benchmarks/bench_markdown.py --documents 200
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from app.markdown_stream import stream_markdown_document
+from app.markdown_tokenizer import tokenize_markdown
+from app.parse_cache import default_cache
+
+DOCUMENT = """---
+Tags:
+  - Python
+  - Weaviate
+Status: Done
+Index: {index}
+---
+
+# Note {index}
+
+Some prose about note {index}, with a [link](https://example.com) and an
+image ![diagram](images/{index}.png).
+
+## Code
+
+```python
+import os
+from typing import List
+
+class Note{index}:
+    def paths(self) -> List[str]:
+        return os.listdir(".")
+```
+
+## Table
+
+| Name | Status | Owner |
+|------|--------|-------|
+{rows}
+"""
+
+def build_corpus(documents: int, rows: int):
+    return [
+        DOCUMENT.format(
+            index=i,
+            rows="\n".join(f"| item{i}-{r} | Done | owner{r % 7} |" for r in range(rows)),
+        )
+        for i in range(documents)
+    ]
+
+def bench(name: str, parse, corpus):
+    start = time.perf_counter()
+    for document in corpus:
+        parse(document)
+    elapsed = time.perf_counter() - start
+    print(f"{name:>12}: {len(corpus)} documents in {elapsed:.2f}s ({len(corpus) / elapsed:.1f} documents/s)")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--documents", type=int, default=200)
+    parser.add_argument("--rows", type=int, default=20)
+    args = parser.parse_args()
+    corpus = build_corpus(args.documents, args.rows)
+
+    bench("tokenize", lambda doc: list(tokenize_markdown(doc.splitlines(keepends=True))), corpus)
+    # Every code block in the corpus is distinct, but clear the cache anyway so
+    # the native path is measured cold.
+    default_cache.clear()
+    bench("native", stream_markdown_document, corpus)
+
+    try:
+        from app.parsers import parse_markdown_content_unstructured
+        with tempfile.TemporaryDirectory() as directory:
+            paths = []
+            for i, document in enumerate(corpus):
+                path = os.path.join(directory, f"note{i}.md")
+                with open(path, "w") as f:
+                    f.write(document)
+                paths.append(path)
+            bench("unstructured", parse_markdown_content_unstructured, paths)
+    except Exception as e:
+        print(f"unstructured: skipped ({e})")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""Peak memory and time of parse_notebook vs. json.load on notebooks with large outputs.
+
+    python benchmarks/bench_notebook.py --cells 200 --image-kib 2048
+"""
+import argparse
+import base64
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from app.notebook import parse_notebook
+
+def make_notebook(path: str, cells: int, image_kib: int):
+    image = base64.encodebytes(os.urandom(image_kib * 1024)).decode("ascii")
+    notebook = {"cells": [], "metadata": {"kernelspec": {"language": "python"}}, "nbformat": 4, "nbformat_minor": 5}
+    for i in range(cells):
+        notebook["cells"].append({"cell_type": "markdown", "metadata": {}, "source": [f"## Step {i}\n", "Notes.\n"]})
+        notebook["cells"].append({
+            "cell_type": "code", "execution_count": i, "metadata": {},
+            "source": ["import numpy as np\n", f"plot_{i} = np.arange({i})\n"],
+            "outputs": [{"output_type": "display_data", "metadata": {},
+                         "data": {"image/png": image if i % 10 == 0 else image[:4096], "text/plain": ["<Figure>"]}}],
+        })
+    with open(path, "w") as f:
+        json.dump(notebook, f)
+
+def bench(name: str, load, path: str):
+    tracemalloc.start()
+    start = time.perf_counter()
+    load(path)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{name:>10}: {elapsed:.2f}s, peak {peak / 2**20:.1f} MiB")
+
+def json_load(path: str):
+    with open(path) as f:
+        return json.load(f)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--cells", type=int, default=200)
+    parser.add_argument("--image-kib", type=int, default=2048)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.ipynb")
+        make_notebook(path, args.cells, args.image_kib)
+        print(f"notebook: {os.path.getsize(path) / 2**20:.1f} MiB, {args.cells * 2} cells")
+        bench("json.load", json_load, path)
+        bench("streaming", parse_notebook, path)
+
+if __name__ == "__main__":
+    main()
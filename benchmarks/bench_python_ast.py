@@ -0,0 +1,87 @@
+"""Single-pass AST extractor vs. the ast.walk + get_source_segment approach.
+
+    python benchmarks/bench_python_ast.py --sizes 100 1000 5000
+
+``ast.get_source_segment`` re-splits the source on every call, so the
+multi-pass variant is quadratic and skipped above ``--max-multi`` functions.
+"""
+import argparse
+import ast
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from app.parsers import parse_python_script
+
+def make_module(functions: int) -> str:
+    lines = ['"""Generated module."""', "import os", "from .util import helper as h", "", "LIMIT = 10", ""]
+    for i in range(functions):
+        if i % 10 == 0:
+            lines += [f"class Service{i}(Base):", f'    """Service {i}."""', ""]
+        indent = "    " if i % 10 else ""
+        lines += [
+            f"{indent}def handler_{i}(self, value: int = {i}, *args, **kwargs) -> int:",
+            f'{indent}    """Handle {i}."""',
+            f"{indent}    total = helper(value) + os.getpid()",
+            f"{indent}    return total",
+            "",
+        ]
+        if i % 10 == 9:
+            lines.append("")
+    return "\n".join(lines)
+
+def walk_only(script: str):
+    # The previous parse_python_script: imports and class names only
+    tree = ast.parse(script)
+    imports, classes = [], []
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            imports.extend(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom):
+            imports.append(node.module)
+        elif isinstance(node, ast.ClassDef):
+            classes.append(node.name)
+    return imports, classes
+
+def multi_pass(script: str):
+    # What callers did before: one walk per kind of information, source
+    # segments through ast.get_source_segment
+    tree = ast.parse(script)
+    imports = [n.module for n in ast.walk(tree) if isinstance(n, ast.ImportFrom)]
+    imports += [a.name for n in ast.walk(tree) if isinstance(n, ast.Import) for a in n.names]
+    classes = [n.name for n in ast.walk(tree) if isinstance(n, ast.ClassDef)]
+    functions = [n for n in ast.walk(tree) if isinstance(n, (ast.FunctionDef, ast.AsyncFunctionDef))]
+    docstrings = [ast.get_docstring(n) for n in functions]
+    returns = [ast.get_source_segment(script, n.returns) for n in functions if n.returns is not None]
+    calls = [n for n in ast.walk(tree) if isinstance(n, ast.Call)]
+    return imports, classes, docstrings, returns, calls
+
+def bench(name: str, parse, script: str, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        parse(script)
+    return (time.perf_counter() - start) / repeat
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 5000])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--max-multi", type=int, default=500)
+    args = parser.parse_args()
+
+    for size in args.sizes:
+        script = make_module(size)
+        lines = script.count("\n") + 1
+        single = bench("single", parse_python_script, script, args.repeat)
+        walk = bench("walk", walk_only, script, args.repeat)
+        line = (f"{size:>6} functions, {lines:>7} lines: single-pass {single * 1000:8.1f} ms "
+                f"({lines / single:,.0f} lines/s), imports+classes walk {walk * 1000:8.1f} ms")
+        if size <= args.max_multi:
+            multi = bench("multi", multi_pass, script, args.repeat)
+            line += f", multi-pass {multi * 1000:8.1f} ms"
+        print(line)
+
+if __name__ == "__main__":
+    main()
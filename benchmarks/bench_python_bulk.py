@@ -0,0 +1,64 @@
+"""Per-file parse_python_script vs. parse_python_scripts on a process pool.
+
+    python benchmarks/bench_python_bulk.py --files 5000 --workers 8
+    python benchmarks/bench_python_bulk.py --root /path/to/monorepo
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from app.parsers import parse_python_script
+from app.python_bulk import BulkParseStats, find_python_files, parse_python_scripts
+
+def make_repository(root: str, files: int, functions: int):
+    for i in range(files):
+        package = os.path.join(root, f"pkg{i // 100}")
+        os.makedirs(package, exist_ok=True)
+        lines = ['"""Generated module."""', "import os", "from . import sibling", ""]
+        for j in range(functions):
+            lines += [f"def handler_{j}(value: int = {j}) -> int:", f'    """Handle {j}."""',
+                      "    return sibling.helper(value) + os.getpid()", ""]
+        with open(os.path.join(package, f"module{i}.py"), "w") as f:
+            f.write("\n".join(lines))
+
+def serial(paths):
+    for path in paths:
+        with open(path, encoding="utf-8") as f:
+            parse_python_script(f.read())
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--root", help="Parse an existing tree instead of a generated one")
+    parser.add_argument("--files", type=int, default=2000)
+    parser.add_argument("--functions", type=int, default=40)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--chunksize", type=int, default=32)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        root = args.root or tmp
+        if not args.root:
+            make_repository(root, args.files, args.functions)
+        paths = list(find_python_files(root))
+        size = sum(os.path.getsize(path) for path in paths)
+
+        start = time.perf_counter()
+        serial(paths)
+        elapsed = time.perf_counter() - start
+        print(f"  serial: {elapsed:.2f}s ({len(paths) / elapsed:,.0f} files/s, {size / elapsed / 2**20:.1f} MiB/s)")
+
+        for ordered in (True, False):
+            stats = BulkParseStats()
+            for _ in parse_python_scripts(paths, workers=args.workers, chunksize=args.chunksize,
+                                          ordered=ordered, stats=stats):
+                pass
+            label = "ordered" if ordered else "as-completed"
+            print(f"{label:>12}: {stats.seconds:.2f}s ({stats.files_per_second:,.0f} files/s, "
+                  f"{stats.bytes_per_second / 2**20:.1f} MiB/s), {stats.errors} errors")
+
+if __name__ == "__main__":
+    main()
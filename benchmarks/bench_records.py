@@ -0,0 +1,75 @@
+"""Memory and construction time of pydantic models vs. the compact records.
+
+Parses ``--objects`` Python modules to SourceCode/SourceRecord, ``--tables``
+tables of ``--rows`` rows and ``--documents`` Markdown documents, holding the
+results in memory, and reports parse time and the retained tracemalloc size,
+scaled to one million objects::
+
+    python benchmarks/bench_records.py --objects 2000 --tables 2000 --rows 50
+
+Only the source text exists before measuring starts: everything the result
+keeps alive (including metadata dicts a record shares with the parser) is
+allocated inside the window, so models and records are compared like for like.
+"""
+import argparse
+import gc
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from corpus import markdown_document, pipe_table, python_module
+
+from app.markdown_stream import stream_markdown_document
+from app.parse_cache import default_cache
+from app.parsers import parse_python_script, parse_table
+from app.records import parse_markdown_record, parse_python_record, parse_table_record
+
+def python_sources(objects: int):
+    # A few generated modules, made distinct so every parse has its own id
+    templates = [python_module(5, seed=i) for i in range(20)]
+    return [f"{templates[i % len(templates)]}\n# {i}\n" for i in range(objects)]
+
+def parse_documents(documents):
+    held = [stream_markdown_document(d) for d in documents]
+    # Code blocks go through the parse cache, which would count as retained
+    default_cache.clear()
+    return held
+
+def measure(name: str, build, count: int, per: str):
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    held = build()
+    elapsed = time.perf_counter() - start
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{name:>22}: {elapsed:6.2f}s ({count / elapsed:10,.0f} {per}/s)  "
+          f"{current / count:8,.0f} B/{per[:-1]}  {current / count * 1e6 / 2**20:9,.0f} MiB per million")
+    del held
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--objects", type=int, default=2000)
+    parser.add_argument("--tables", type=int, default=2000)
+    parser.add_argument("--rows", type=int, default=50)
+    parser.add_argument("--documents", type=int, default=500)
+    args = parser.parse_args()
+
+    sources = python_sources(args.objects)
+    measure("SourceCode", lambda: [parse_python_script(s) for s in sources], args.objects, "objects")
+    measure("SourceRecord", lambda: [parse_python_record(s) for s in sources], args.objects, "objects")
+
+    tables = [pipe_table(args.rows, seed=i) for i in range(args.tables)]
+    measure("Table (parse_table)", lambda: [parse_table(t) for t in tables], args.tables, "tables")
+    measure("ColumnarTable", lambda: [parse_table_record(t) for t in tables], args.tables, "tables")
+
+    documents = [markdown_document(i) for i in range(args.documents)]
+    measure("MarkdownDocument", lambda: parse_documents(documents), args.documents, "documents")
+    measure("DocumentRecord", lambda: [parse_markdown_record(d) for d in documents], args.documents, "documents")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""Per-row ``create_model`` vs. the cached shared model in create_schema.
+
+    python benchmarks/bench_schema.py --rows 20000
+"""
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+from typing import List
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from pydantic import create_model
+
+from app.table_schema_builder import create_schema
+
+def create_schema_per_row(table_data):
+    # The previous implementation: one model class per row
+    schemas = []
+    for row in table_data:
+        model = create_model(
+            f"Schema_{row['ID']}",
+            id=(int, ...),
+            name=(str, ...),
+            properties=(List[str], ...),
+            file_path=(str, None)
+        )
+        schemas.append(model(id=row['ID'], name=row['Name'], properties=row['Properties'].split(', ')))
+    return schemas
+
+def bench(name: str, build, table_data):
+    tracemalloc.start()
+    start = time.perf_counter()
+    build(table_data)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    rows = len(table_data)
+    print(f"{name:>8}: {elapsed:.2f}s ({rows / elapsed:,.0f} rows/s), peak {peak / 2**20:.1f} MiB")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=20000)
+    args = parser.parse_args()
+    table_data = [{"ID": i, "Name": f"Item{i}", "Properties": "prop1, prop2"} for i in range(args.rows)]
+
+    bench("cached", create_schema, table_data)
+    bench("per-row", create_schema_per_row, table_data)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""Load test for the API server: request latency percentiles and throughput.
+
+    python benchmarks/bench_service.py --requests 2000 --concurrency 64
+    python benchmarks/bench_service.py --batch 100 --requests 50
+    python benchmarks/bench_service.py --url http://localhost:5000
+"""
+import argparse
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+from collections import Counter
+
+import aiohttp
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+def make_script(i: int, functions: int) -> str:
+    lines = ['"""Generated module."""', "import os", ""]
+    for j in range(functions):
+        lines += [f"def handler_{i}_{j}(value: int = {j}) -> int:", f'    """Handle {j}."""', "    return value", ""]
+    return "\n".join(lines)
+
+def percentile(values, p: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(p / 100 * (len(ordered) - 1))))] if ordered else 0.0
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+async def wait_until_up(url: str, timeout: float = 30.0):
+    deadline = time.monotonic() + timeout
+    async with aiohttp.ClientSession() as session:
+        while True:
+            try:
+                async with session.get(f"{url}/health") as response:
+                    if response.status == 200:
+                        return
+            except aiohttp.ClientError:
+                pass
+            if time.monotonic() > deadline:
+                raise RuntimeError(f"server at {url} did not come up")
+            await asyncio.sleep(0.1)
+
+async def run(url: str, args) -> None:
+    payloads = [{"script": make_script(i, args.functions)} for i in range(min(args.requests, 256))]
+    statuses = Counter()
+    latencies = []
+    items = 0
+    queue = asyncio.Queue()
+    for i in range(args.requests):
+        queue.put_nowait(i)
+
+    async def client(session: aiohttp.ClientSession):
+        nonlocal items
+        while not queue.empty():
+            i = queue.get_nowait()
+            start = time.perf_counter()
+            if args.batch:
+                batch = [payloads[(i * args.batch + j) % len(payloads)] for j in range(args.batch)]
+                async with session.post(f"{url}/parse-python-script/batch", json=batch) as response:
+                    async for _ in response.content:
+                        items += 1
+                    statuses[response.status] += 1
+            else:
+                async with session.post(f"{url}/parse-python-script", json=payloads[i % len(payloads)]) as response:
+                    await response.read()
+                    statuses[response.status] += 1
+                    items += response.status == 200
+            latencies.append(time.perf_counter() - start)
+
+    connector = aiohttp.TCPConnector(limit=args.concurrency)
+    async with aiohttp.ClientSession(connector=connector) as session:
+        start = time.perf_counter()
+        await asyncio.gather(*(client(session) for _ in range(args.concurrency)))
+        elapsed = time.perf_counter() - start
+
+    print(f"{args.requests} requests in {elapsed:.2f}s: {args.requests / elapsed:,.0f} req/s, "
+          f"{items / elapsed:,.0f} items/s")
+    print(f"latency p50 {percentile(latencies, 50) * 1000:.1f}ms, p99 {percentile(latencies, 99) * 1000:.1f}ms, "
+          f"max {max(latencies) * 1000:.1f}ms")
+    print("statuses:", json.dumps(dict(statuses)))
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", help="Load an already running server instead of starting one")
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--batch", type=int, default=0, help="Items per request on the batch endpoint")
+    parser.add_argument("--functions", type=int, default=20, help="Functions per generated script")
+    parser.add_argument("--workers", type=int, default=None, help="Parser processes for the started server")
+    args = parser.parse_args()
+
+    server = None
+    url = args.url
+    if url is None:
+        port = free_port()
+        command = [sys.executable, "-m", "app.server", "--host", "127.0.0.1", "--port", str(port)]
+        if args.workers is not None:
+            command += ["--workers", str(args.workers)]
+        server = subprocess.Popen(command, cwd=ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        url = f"http://127.0.0.1:{port}"
+    try:
+        asyncio.run(wait_until_up(url))
+        asyncio.run(run(url, args))
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+if __name__ == "__main__":
+    main()
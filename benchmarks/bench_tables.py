@@ -0,0 +1,61 @@
+"""Direct pipe-table parsing vs. the previous ``pd.read_html`` path.
+
+    python benchmarks/bench_tables.py --rows 5000 --repeat 5
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from app.tables import parse_pipe_table, parse_pipe_table_columns
+
+HEADERS = ["ID", "Name", "Properties", "Status", "Score"]
+
+def build_tables(rows: int):
+    values = [[str(i), f"Item{i}", f"prop{i % 5}, prop{i % 11}", "Done" if i % 3 else "Todo", f"{i / 7:.3f}"]
+              for i in range(rows)]
+    markdown = "\n".join(
+        ["| " + " | ".join(HEADERS) + " |", "|" + "---|" * len(HEADERS)]
+        + ["| " + " | ".join(row) + " |" for row in values]
+    )
+    html = "".join(
+        ["<tr>" + "".join(f"<th>{h}</th>" for h in HEADERS) + "</tr>"]
+        + ["<tr>" + "".join(f"<td>{v}</td>" for v in row) + "</tr>" for row in values]
+    )
+    return markdown, html
+
+def bench(name: str, parse, content, repeat: int, rows: int):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        parse(content)
+    elapsed = (time.perf_counter() - start) / repeat
+    print(f"{name:>18}: {elapsed * 1000:8.1f} ms/table ({rows / elapsed:,.0f} rows/s)")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    markdown, html = build_tables(args.rows)
+
+    bench("pipe", parse_pipe_table, markdown, args.repeat, args.rows)
+    bench("pipe (typed)", lambda t: parse_pipe_table(t, infer_types=True), markdown, args.repeat, args.rows)
+    bench("pipe (columnar)", lambda t: parse_pipe_table_columns(t, infer_types=True), markdown, args.repeat, args.rows)
+
+    try:
+        import pandas as pd
+        from io import StringIO
+    except ImportError:
+        print("         read_html: skipped (pandas not installed)")
+        return
+
+    def read_html(content):
+        df = pd.read_html(StringIO("<table>" + content + "</table>"))[0]
+        return df.columns.tolist(), df.to_dict(orient="records")
+
+    bench("read_html", read_html, html, args.repeat, args.rows)
+
+if __name__ == "__main__":
+    main()
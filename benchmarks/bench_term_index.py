@@ -0,0 +1,63 @@
+"""Build time and query latency of the inverted term index.
+
+Indexes ``--documents`` parsed documents (a few real parses under different
+object names) into a SQLite index, then times each query cold (first lookup
+after an update) and warm (postings cached)::
+
+    python benchmarks/bench_term_index.py --documents 100000
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from corpus import markdown_document
+
+from app.markdown_stream import stream_markdown_document
+from app.term_index import TermIndex, extract_terms
+
+QUERIES = [
+    "tags:rag",
+    "import:os AND tags:python",
+    "import:json* OR class:service0",
+    "kind:document AND NOT tags:rag",
+    "has:status AND (import:re OR import:typing*)",
+]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--documents", type=int, default=20000)
+    parser.add_argument("--repeat", type=int, default=1000, help="Warm lookups per query")
+    args = parser.parse_args()
+    templates = [extract_terms(stream_markdown_document(markdown_document(i, 3, code_blocks=2))) for i in range(50)]
+
+    with tempfile.TemporaryDirectory() as root:
+        with TermIndex(os.path.join(root, "terms.sqlite")) as index:
+            start = time.perf_counter()
+            for i in range(args.documents):
+                index.add(f"notes/note{i}.md", terms=templates[i % len(templates)])
+            index.commit()
+            elapsed = time.perf_counter() - start
+            print(f"build: {elapsed:.2f}s ({args.documents / elapsed:,.0f} documents/s), "
+                  f"{len(index.terms()):,} terms, {os.path.getsize(index.path) / 2**20:.1f} MiB")
+
+            start = time.perf_counter()
+            index.add("notes/note0.md", terms=templates[1])
+            print(f"update one document: {(time.perf_counter() - start) * 1e6:,.0f}us")
+
+            for query in QUERIES:
+                start = time.perf_counter()
+                matches = index.count(query)
+                cold = time.perf_counter() - start
+                start = time.perf_counter()
+                for _ in range(args.repeat):
+                    index.count(query)
+                warm = (time.perf_counter() - start) / args.repeat
+                print(f"{query!r}: {matches:,} matches, cold {cold * 1e3:.2f}ms, warm {warm * 1e6:.1f}us")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""Deterministic synthetic corpus for the benchmarks: Markdown notes and Python files.
+
+    python benchmarks/corpus.py /tmp/corpus --documents 500 --rows 50 --python-files 200
+
+Markdown notes carry YAML front matter, prose with links and images, fenced
+Python blocks and a pipe table of ``rows`` rows; Python files have
+``functions`` functions spread over classes. The same arguments always
+produce the same bytes, so results are comparable across runs.
+"""
+import argparse
+import os
+import random
+from typing import Dict, List
+
+TAGS = ["Python", "RAG", "Weaviate", "MinIO", "LangChain", "Docker"]
+STATUSES = ["Done", "Todo", "Doing"]
+WORDS = ("bucket object parse vector schema chunk index stream table note agent model "
+         "query embed cache batch ingest token pipeline worker").split()
+
+def sentence(rng: random.Random, words: int = 12) -> str:
+    text = " ".join(rng.choice(WORDS) for _ in range(words))
+    return text[0].upper() + text[1:] + "."
+
+def pipe_table(rows: int, columns: int = 5, seed: int = 0) -> str:
+    rng = random.Random(seed)
+    headers = ["ID", "Name", "Properties", "Status", "Score", "Owner", "Updated"][:max(2, min(columns, 7))]
+    lines = ["| " + " | ".join(headers) + " |", "|" + "---|" * len(headers)]
+    for i in range(rows):
+        values = [str(i), f"Item{i}", f"prop{i % 5}, prop{i % 11}", rng.choice(STATUSES),
+                  f"{rng.random() * 100:.2f}", f"owner{i % 7}", f"2024-01-{i % 28 + 1:02d}"]
+        lines.append("| " + " | ".join(values[:len(headers)]) + " |")
+    return "\n".join(lines)
+
+def python_module(functions: int, seed: int = 0, class_every: int = 10) -> str:
+    rng = random.Random(seed)
+    lines = [f'"""Generated module {seed}."""', "import os", "import json",
+             "from typing import Dict, List, Optional", "from .util import helper as h", "",
+             f"LIMIT = {rng.randint(1, 100)}", ""]
+    for i in range(functions):
+        method = class_every and i % class_every
+        if class_every and i % class_every == 0:
+            lines += ["", f"class Service{seed}_{i}(object):", f'    """{sentence(rng, 8)}"""', ""]
+        indent = "    " if method else ""
+        self_arg = "self, " if method else ""
+        lines += [
+            f"{indent}def handler_{i}({self_arg}value: int = {i}, *args, **kwargs) -> Optional[List[int]]:",
+            f'{indent}    """{sentence(rng, 10)}"""',
+            f"{indent}    total = h(value) + os.getpid()",
+            f"{indent}    for item in range(value % 7):",
+            f"{indent}        total += json.loads(str(item))",
+            f"{indent}    return [total]",
+            "",
+        ]
+    return "\n".join(lines) + "\n"
+
+def markdown_document(index: int, rows: int = 20, code_blocks: int = 2, paragraphs: int = 4,
+                      functions: int = 3) -> str:
+    rng = random.Random(index)
+    parts = [
+        "---",
+        "Tags:",
+        *(f"  - {tag}" for tag in rng.sample(TAGS, 3)),
+        f"Status: {rng.choice(STATUSES)}",
+        f"Index: {index}",
+        "---",
+        "",
+        f"# Note {index}",
+        "",
+    ]
+    for p in range(paragraphs):
+        parts += [f"## Section {p}", "",
+                  " ".join(sentence(rng) for _ in range(4)) +
+                  f" See [the docs](https://example.com/{index}/{p}) and ![diagram](images/{index}-{p}.png).", ""]
+    for c in range(code_blocks):
+        parts += ["```python", python_module(functions, seed=index * 100 + c, class_every=0).rstrip("\n"), "```", ""]
+    if rows:
+        parts += ["## Table", "", pipe_table(rows, seed=index), ""]
+    return "\n".join(parts)
+
+def schema_rows(rows: int) -> List[Dict[str, object]]:
+    return [{"ID": i, "Name": f"Item{i}", "Properties": "prop1, prop2"} for i in range(rows)]
+
+def write_corpus(root: str, documents: int = 200, rows: int = 20, python_files: int = 50,
+                 functions: int = 40, directories: int = 16) -> List[str]:
+    """Write the corpus below ``root`` (one bucket-like tree) and return the relative paths."""
+    paths = []
+    for i in range(documents):
+        paths.append(os.path.join(f"notes{i % directories:02d}", f"note{i}.md"))
+        _write(root, paths[-1], markdown_document(i, rows))
+    for i in range(python_files):
+        paths.append(os.path.join(f"pkg{i % directories:02d}", f"module{i}.py"))
+        _write(root, paths[-1], python_module(functions, seed=i))
+    return paths
+
+def _write(root: str, relative: str, content: str):
+    path = os.path.join(root, relative)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(content)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("root")
+    parser.add_argument("--documents", type=int, default=200)
+    parser.add_argument("--rows", type=int, default=20)
+    parser.add_argument("--python-files", type=int, default=50)
+    parser.add_argument("--functions", type=int, default=40)
+    args = parser.parse_args()
+    paths = write_corpus(args.root, args.documents, args.rows, args.python_files, args.functions)
+    size = sum(os.path.getsize(os.path.join(args.root, path)) for path in paths)
+    print(f"{len(paths)} files, {size / 2**20:.1f} MiB in {args.root}")
+
+if __name__ == "__main__":
+    main()
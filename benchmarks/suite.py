@@ -0,0 +1,263 @@
+"""Benchmark suite for the parsers and the bucket pipeline, with baseline comparison.
+
+Generates a synthetic corpus (see corpus.py), times every case (median of
+``--repeat`` runs after a warm-up), measures its tracemalloc peak in a
+separate run and writes the results as JSON::
+
+    python benchmarks/suite.py --output results.json
+    python benchmarks/suite.py --save-baseline benchmarks/baseline.json
+    python benchmarks/suite.py --baseline benchmarks/baseline.json
+
+With ``--baseline`` every case is compared per item against the saved results
+and the exit status is 1 if one is slower than ``--time-threshold`` or peaks
+higher than ``--memory-threshold``. Timings only compare on the same machine;
+memory peaks are far more stable. ``--quick`` shrinks the corpus for CI.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from corpus import markdown_document, pipe_table, python_module, schema_rows, write_corpus
+
+FORMAT_VERSION = 1
+BUCKET = "bench"
+
+SIZES = {
+    "default": {"documents": 200, "rows": 50, "table_rows": 5000, "functions": 200, "schema_rows": 20000},
+    "quick": {"documents": 20, "rows": 10, "table_rows": 500, "functions": 20, "schema_rows": 1000},
+}
+
+@dataclass
+class CaseResult:
+    items: int
+    unit: str
+    seconds: List[float] = field(default_factory=list)
+    peak_bytes: int = 0
+
+    @property
+    def median(self) -> float:
+        return statistics.median(self.seconds)
+
+    def summary(self) -> Dict[str, Any]:
+        summary = asdict(self)
+        summary["median"] = self.median
+        summary["per_second"] = self.items / self.median if self.median else None
+        return summary
+
+# A case prepares its input once and returns (items, unit, run, reset); ``run``
+# does the measured work, ``reset`` (optional) clears caches between runs
+Case = Tuple[int, str, Callable[[], Any], Optional[Callable[[], None]]]
+CASES: Dict[str, Callable[[dict, str], Case]] = {}
+
+def case(name: str):
+    def register(setup):
+        CASES[name] = setup
+        return setup
+    return register
+
+@case("parse_markdown_content")
+def _markdown(sizes: dict, workdir: str) -> Case:
+    from app.parsers import parse_markdown_file
+
+    paths = []
+    for i in range(sizes["documents"]):
+        paths.append(os.path.join(workdir, f"note{i}.md"))
+        with open(paths[-1], "w", encoding="utf-8") as f:
+            f.write(markdown_document(i, sizes["rows"]))
+    return len(paths), "documents", lambda: [parse_markdown_file(path) for path in paths], None
+
+@case("parse_table")
+def _table(sizes: dict, workdir: str) -> Case:
+    from app.parsers import parse_table
+
+    table = pipe_table(sizes["table_rows"])
+    return sizes["table_rows"], "rows", lambda: parse_table(table), None
+
+@case("parse_python_script")
+def _python(sizes: dict, workdir: str) -> Case:
+    from app.parsers import parse_python_script
+
+    scripts = [python_module(sizes["functions"], seed=i) for i in range(10)]
+    return sizes["functions"] * len(scripts), "functions", lambda: [parse_python_script(s) for s in scripts], None
+
+@case("create_schema")
+def _schema(sizes: dict, workdir: str) -> Case:
+    from app import table_schema_builder
+
+    # Rows resolve their file_path against a small bucket tree
+    root = os.path.join(workdir, "schema")
+    for i in range(0, sizes["schema_rows"], 10):
+        os.makedirs(os.path.join(root, f"dir{i % 16:02d}"), exist_ok=True)
+        open(os.path.join(root, f"dir{i % 16:02d}", f"Item{i}.md"), "w").close()
+    table_schema_builder.bucket_path = root
+    rows = schema_rows(sizes["schema_rows"])
+    return len(rows), "rows", lambda: table_schema_builder.create_schema(rows), None
+
+def _bucket_case(sizes: dict, workdir: str, parse_workers: Optional[int]) -> Case:
+    from app.fakes import FilesystemMinioClient
+    from app.ingest import iter_bucket_results
+    from app.parse_cache import default_cache
+
+    root = os.path.join(workdir, "buckets")
+    if not os.path.isdir(root):
+        write_corpus(os.path.join(root, BUCKET), sizes["documents"], sizes["rows"], python_files=0)
+    client = FilesystemMinioClient(root)
+
+    def run():
+        results = list(iter_bucket_results(client, BUCKET, parse_workers=parse_workers))
+        errors = [result.error for result in results if result.error]
+        if errors:
+            raise RuntimeError(f"{len(errors)} objects failed: {errors[0]}")
+
+    return sizes["documents"], "objects", run, default_cache.clear
+
+@case("bucket_pipeline")
+def _bucket_inline(sizes: dict, workdir: str) -> Case:
+    # Parsing on the pipeline thread keeps all the work visible to tracemalloc
+    return _bucket_case(sizes, workdir, parse_workers=0)
+
+@case("bucket_pipeline_pool")
+def _bucket_pool(sizes: dict, workdir: str) -> Case:
+    # Worker processes' memory is not traced; the peak covers the parent only
+    return _bucket_case(sizes, workdir, parse_workers=None)
+
+def run_case(setup: Callable[[dict, str], Case], sizes: dict, workdir: str, repeat: int) -> CaseResult:
+    items, unit, run, reset = setup(sizes, workdir)
+    result = CaseResult(items, unit)
+    for i in range(repeat + 1):
+        if reset is not None:
+            reset()
+        start = time.perf_counter()
+        run()
+        elapsed = time.perf_counter() - start
+        if i:  # the first run is a warm-up
+            result.seconds.append(elapsed)
+    if reset is not None:
+        reset()
+    tracemalloc.start()
+    try:
+        run()
+        result.peak_bytes = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return result
+
+def _git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)), timeout=10).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+def run_suite(profile: str = "default", only: Optional[List[str]] = None, repeat: int = 5,
+              log: Callable[[str], None] = print) -> Dict[str, Any]:
+    """Run the selected cases and return the JSON-able results document."""
+    sizes = SIZES[profile]
+    results = {}
+    with tempfile.TemporaryDirectory() as workdir:
+        for name, setup in CASES.items():
+            if only and name not in only:
+                continue
+            os.makedirs(os.path.join(workdir, name))
+            result = run_case(setup, sizes, os.path.join(workdir, name), repeat)
+            results[name] = result.summary()
+            log(f"{name:>22}: {result.median * 1000:9.1f} ms  {result.items / result.median:12,.0f} {result.unit}/s"
+                f"  peak {result.peak_bytes / 2**20:7.1f} MiB")
+    return {
+        "version": FORMAT_VERSION,
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "revision": _git_revision(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        },
+        "profile": profile,
+        "sizes": sizes,
+        "repeat": repeat,
+        "cases": results,
+    }
+
+@dataclass
+class Comparison:
+    name: str
+    time_change: float
+    memory_change: float
+    regressions: List[str] = field(default_factory=list)
+
+def _change(current: float, baseline: float) -> float:
+    return current / baseline - 1 if baseline else 0.0
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], time_threshold: float = 0.2,
+            memory_threshold: float = 0.2, min_seconds: float = 0.001,
+            min_bytes: int = 64 * 1024) -> List[Comparison]:
+    """Compare two results documents case by case.
+
+    Time is compared per item, so profiles of different sizes can still be
+    compared; differences under ``min_seconds`` or ``min_bytes`` are noise
+    and never count as regressions.
+    """
+    comparisons = []
+    for name, now in current["cases"].items():
+        before = baseline["cases"].get(name)
+        if before is None:
+            continue
+        now_per_item = now["median"] / max(1, now["items"])
+        before_per_item = before["median"] / max(1, before["items"])
+        comparison = Comparison(name, _change(now_per_item, before_per_item),
+                                _change(now["peak_bytes"], before["peak_bytes"]))
+        if comparison.time_change > time_threshold and now["median"] - before_per_item * now["items"] > min_seconds:
+            comparison.regressions.append(f"time +{comparison.time_change:.0%}")
+        if comparison.memory_change > memory_threshold and now["peak_bytes"] - before["peak_bytes"] > min_bytes:
+            comparison.regressions.append(f"memory +{comparison.memory_change:.0%}")
+        comparisons.append(comparison)
+    return comparisons
+
+def _write_json(path: str, document: Dict[str, Any]):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(document, f, indent=2, sort_keys=True)
+        f.write("\n")
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--quick", action="store_true", help="Use the small corpus")
+    parser.add_argument("--only", nargs="+", choices=sorted(CASES), help="Run only these cases")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", help="Write the results as JSON")
+    parser.add_argument("--save-baseline", help="Write the results as the new baseline")
+    parser.add_argument("--baseline", help="Compare against these saved results")
+    parser.add_argument("--time-threshold", type=float, default=0.2)
+    parser.add_argument("--memory-threshold", type=float, default=0.2)
+    args = parser.parse_args(argv)
+
+    results = run_suite("quick" if args.quick else "default", args.only, max(1, args.repeat))
+    for path in filter(None, [args.output, args.save_baseline]):
+        _write_json(path, results)
+    if not args.baseline:
+        return 0
+
+    with open(args.baseline, encoding="utf-8") as f:
+        baseline = json.load(f)
+    if baseline.get("profile") != results["profile"]:
+        print(f"warning: baseline profile {baseline.get('profile')!r} differs; memory peaks are not comparable")
+    failed = False
+    for comparison in compare(results, baseline, args.time_threshold, args.memory_threshold):
+        status = ", ".join(comparison.regressions) or "ok"
+        failed = failed or bool(comparison.regressions)
+        print(f"{comparison.name:>22}: time {comparison.time_change:+7.1%}  memory {comparison.memory_change:+7.1%}  {status}")
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
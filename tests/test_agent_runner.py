@@ -0,0 +1,125 @@
+import asyncio
+import random
+import time
+import unittest
+from ..app.agent_runner import AgentRunner, RateLimiter
+from ..app.fakes import FakeLLM
+from ..app.llm_cache import CacheMissError
+
+def inputs(count):
+    return ({"filename": f"file{i}.py", "content": f"print({i})"} for i in range(count))
+
+def prompt(item):
+    return f"Analyze {item['filename']}:\n{item['content']}"
+
+class FlakyLLM:
+    # Fails the first ``failures`` calls for each prompt
+    def __init__(self, failures, error=RuntimeError):
+        self.failures = failures
+        self.error = error
+        self.seen = {}
+
+    async def ainvoke(self, prompt):
+        self.seen[prompt] = self.seen.get(prompt, 0) + 1
+        if self.seen[prompt] <= self.failures:
+            raise self.error("rate limited")
+        return prompt.upper()
+
+class TestRateLimiter(unittest.TestCase):
+
+    def test_reservations_are_spaced_by_the_rate(self):
+        now = [0.0]
+        limiter = RateLimiter(600, clock=lambda: now[0])
+        delays = [limiter.reserve() for _ in range(12)]
+        self.assertEqual(delays[:10], [0.0] * 10)
+        self.assertAlmostEqual(delays[11], 0.2)
+        now[0] += 10
+        self.assertEqual(limiter.reserve(), 0.0)
+
+    def test_oversized_costs_go_into_debt(self):
+        limiter = RateLimiter(60, clock=lambda: 0.0)
+        self.assertEqual(limiter.reserve(1), 0.0)
+        self.assertAlmostEqual(limiter.reserve(5), 5.0)
+
+class TestAgentRunner(unittest.TestCase):
+
+    def test_results_cover_every_input_in_order(self):
+        llm = FakeLLM(latency=0.01)
+        runner = AgentRunner(llm, prompt, concurrency=4)
+        results = runner.run(inputs(20))
+        self.assertEqual([r.index for r in results], list(range(20)))
+        self.assertEqual(results[3].filename, "file3.py")
+        self.assertEqual(results[3].output, llm.invoke(prompt({"filename": "file3.py", "content": "print(3)"})))
+        self.assertTrue(all(r.error is None and r.attempts == 1 for r in results))
+
+    def test_concurrency_is_capped_and_faster_than_sequential(self):
+        runner = AgentRunner(FakeLLM(latency=0.05), prompt, concurrency=5)
+        start = time.perf_counter()
+        runner.run(inputs(20))
+        self.assertLess(time.perf_counter() - start, 0.05 * 20 / 2)
+        self.assertEqual(runner.metrics.max_in_flight, 5)
+        self.assertLessEqual(max(runner.metrics.queue_depths), 10)
+
+    def test_results_stream_as_they_complete(self):
+        class SlowFirst:
+            async def ainvoke(self, prompt):
+                await asyncio.sleep(0.1 if "file0" in prompt else 0.0)
+                return prompt
+
+        async def first():
+            async for result in AgentRunner(SlowFirst(), prompt, concurrency=4).stream(inputs(4)):
+                return result.index
+
+        self.assertNotEqual(asyncio.run(first()), 0)
+
+    def test_failures_are_retried_with_backoff(self):
+        runner = AgentRunner(FlakyLLM(2), prompt, max_retries=3, backoff=0.001, rng=random.Random(0))
+        results = runner.run(inputs(3))
+        self.assertEqual([r.attempts for r in results], [3, 3, 3])
+        self.assertTrue(all(r.error is None for r in results))
+        self.assertEqual(runner.metrics.retries, 6)
+
+    def test_errors_are_reported_inline(self):
+        runner = AgentRunner(FlakyLLM(10), prompt, max_retries=1, backoff=0.001)
+        results = runner.run(inputs(2))
+        self.assertEqual(results[0].attempts, 2)
+        self.assertEqual(results[0].error, "RuntimeError: rate limited")
+        self.assertEqual(runner.metrics.failed, 2)
+
+        runner = AgentRunner(FlakyLLM(1, CacheMissError), prompt, backoff=0.001)
+        self.assertEqual(runner.run(inputs(1))[0].attempts, 1)
+
+        runner = AgentRunner(FakeLLM(), lambda item: item["missing"])
+        self.assertEqual(runner.run(inputs(1))[0].error, "KeyError: 'missing'")
+
+    def test_backoff_is_jittered_and_capped(self):
+        runner = AgentRunner(FakeLLM(), backoff=1.0, max_backoff=4.0, rng=random.Random(1))
+        delays = [runner.backoff_delay(attempt) for attempt in range(1, 10)]
+        self.assertTrue(all(0 <= delay <= 4.0 for delay in delays))
+        self.assertGreater(len(set(delays)), 1)
+
+    def test_request_rate_limit(self):
+        runner = AgentRunner(FakeLLM(), prompt, concurrency=8, requests_per_minute=600)
+        start = time.perf_counter()
+        runner.run(inputs(14))
+        # A burst of 10, then one request every 0.1s
+        self.assertGreaterEqual(time.perf_counter() - start, 0.35)
+        self.assertGreater(runner.metrics.throttled_seconds, 0)
+
+    def test_timeout_counts_as_a_failed_attempt(self):
+        runner = AgentRunner(FakeLLM(latency=0.2), prompt, timeout=0.01, max_retries=0)
+        self.assertTrue(runner.run(inputs(1))[0].error.startswith("TimeoutError"))
+
+    def test_sync_llms_run_in_threads(self):
+        runner = AgentRunner(lambda text: text[::-1], concurrency=2)
+        self.assertEqual(runner.run(["abc"])[0].output, "cba")
+
+    def test_metrics_summary(self):
+        runner = AgentRunner(FakeLLM(latency=0.001), prompt, concurrency=2)
+        runner.run(inputs(10))
+        summary = runner.metrics.summary()
+        self.assertEqual((summary["submitted"], summary["completed"], summary["failed"]), (10, 10, 0))
+        self.assertLessEqual(summary["p50"], summary["p99"])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,118 @@
+import os
+import tempfile
+import unittest
+from ..app.fakes import FilesystemMinioClient
+from ..app.ingest import IngestResult, iter_bucket_results
+from ..app.markdown_stream import stream_markdown_document
+from ..app.parsers import parse_python_script, parse_table
+from ..app.records import compact
+
+try:
+    import pyarrow
+except ImportError:  # optional dependency
+    pyarrow = None
+
+if pyarrow is not None:
+    from ..app.arrow_sink import CorpusWriter, export_bucket_results, flatten_metadata, read_corpus
+
+NOTE = """---
+Tags:
+  - Python
+  - RAG
+Status: Done
+owner:
+  name: ada
+---
+
+# Note {index}
+
+Text {index}.
+
+| ID | Name |
+|----|------|
+| 1  | a    |
+| 2  | b    |
+
+```python
+import os
+
+class Note{index}:
+    pass
+```
+"""
+
+@unittest.skipIf(pyarrow is None, "pyarrow is not installed")
+class TestArrowSink(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = self.tmp.name
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def document(self, index: int):
+        return stream_markdown_document(NOTE.format(index=index))
+
+    def test_flatten_metadata(self):
+        pairs = dict(flatten_metadata({"Tags": ["a"], "owner": {"name": "ada"}, "n": 3, "s": "x", "none": None}))
+        self.assertEqual(pairs, {"Tags": '["a"]', "owner.name": "ada", "n": "3", "s": "x", "none": None})
+
+    def test_round_trip(self):
+        for format in ("parquet", "arrow"):
+            root = os.path.join(self.root, format)
+            with CorpusWriter(root, format=format, row_group_size=2) as writer:
+                for i in range(3):
+                    writer.write(self.document(i), f"note{i}.md")
+                writer.write(parse_python_script("import json\nclass Tool: pass"), "tool.py")
+                writer.write(compact(parse_table("| a |\n|---|\n| 1 |")), "table.md")
+            self.assertEqual(writer.stats.documents, 3)
+            self.assertEqual(writer.stats.table_rows, 7)
+            self.assertGreater(writer.stats.row_groups, 3)
+
+            documents = read_corpus(root).to_pylist()
+            self.assertEqual([row["object_name"] for row in documents], ["note0.md", "note1.md", "note2.md"])
+            self.assertEqual(documents[0]["tags"], ["Python", "RAG"])
+            self.assertIn(("owner.name", "ada"), documents[0]["metadata"])
+            self.assertEqual(documents[0]["imports"], ["os"])
+            self.assertEqual(documents[0]["classes"], ["Note0"])
+
+            code = read_corpus(root, "code", columns=["object_name", "classes", "functions"]).to_pylist()
+            self.assertEqual(code[-1], {"object_name": "tool.py", "classes": ["Tool"], "functions": []})
+            rows = read_corpus(root, "table_rows", columns=["object_name", "cells"]).to_pylist()
+            self.assertEqual(len(rows), 7)
+            self.assertEqual(rows[-1], {"object_name": "table.md", "cells": [("a", "1")]})
+
+    def test_incremental_runs_keep_latest_and_drop_deleted(self):
+        with CorpusWriter(self.root, run="20240101T000000-a") as writer:
+            for i in range(3):
+                writer.write(self.document(i), f"note{i}.md")
+        with CorpusWriter(self.root, run="20240102T000000-b") as writer:
+            writer.write(self.document(9), "note1.md")
+            writer.delete("note2.md")
+        documents = read_corpus(self.root, columns=["object_name", "run", "classes"]).to_pylist()
+        self.assertEqual(sorted((row["object_name"], row["run"], row["classes"][0]) for row in documents), [
+            ("note0.md", "20240101T000000-a", "Note0"),
+            ("note1.md", "20240102T000000-b", "Note9"),
+        ])
+        self.assertEqual(read_corpus(self.root, latest=False).num_rows, 4)
+        self.assertEqual(read_corpus(self.root, "table_rows").num_rows, 4)
+        with self.assertRaises(ValueError):
+            CorpusWriter(self.root, run="20240101T000000-a")
+
+    def test_export_bucket_results(self):
+        os.makedirs(os.path.join(self.root, "bucket", "notes"))
+        for i in range(4):
+            with open(os.path.join(self.root, "bucket", "notes", f"note{i}.md"), "w") as f:
+                f.write(NOTE.format(index=i))
+        results = iter_bucket_results(FilesystemMinioClient(os.path.join(self.root, "bucket")), "notes", parse_workers=0)
+        export = os.path.join(self.root, "export")
+        stats = export_bucket_results(results, export)
+        self.assertEqual(stats.documents, 4)
+        stats = export_bucket_results([IngestResult("note3.md", deleted=True), IngestResult("bad.md", error="x")], export)
+        self.assertEqual((stats.documents, stats.deleted), (0, 1))
+        self.assertEqual(sorted(read_corpus(export, columns=["object_name"])["object_name"].to_pylist()),
+                         ["note0.md", "note1.md", "note2.md"])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,43 @@
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+
+REPO_ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+SUITE = os.path.join(REPO_ROOT, "benchmarks", "suite.py")
+
+class TestBenchSuite(unittest.TestCase):
+
+    def run_suite(self, *args):
+        return subprocess.run(
+            [sys.executable, SUITE, "--quick", "--repeat", "1", "--only", "parse_table", "bucket_pipeline", *args],
+            cwd=REPO_ROOT, capture_output=True, text=True, timeout=300
+        )
+
+    def test_results_compare_against_baseline(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            baseline = os.path.join(tmp, "baseline.json")
+            first = self.run_suite("--save-baseline", baseline)
+            self.assertEqual(first.returncode, 0, first.stderr)
+            with open(baseline) as f:
+                results = json.load(f)
+            self.assertEqual(sorted(results["cases"]), ["bucket_pipeline", "parse_table"])
+            table = results["cases"]["parse_table"]
+            self.assertEqual(table["items"], 500)
+            self.assertGreater(table["peak_bytes"], 0)
+            self.assertGreater(table["median"], 0)
+
+            # A baseline ten times faster and leaner than reality is a regression
+            for case in results["cases"].values():
+                case["median"] /= 10
+                case["peak_bytes"] //= 10
+            with open(baseline, "w") as f:
+                json.dump(results, f)
+            second = self.run_suite("--baseline", baseline)
+            self.assertEqual(second.returncode, 1, second.stderr)
+            self.assertIn("memory +", second.stdout)
+
+if __name__ == '__main__':
+    unittest.main()
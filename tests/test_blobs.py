@@ -0,0 +1,96 @@
+import base64
+import hashlib
+import os
+import tempfile
+import unittest
+from ..app.blobs import BlobResolver, BlobStore, blob_object_key, resolve_document_blobs
+from ..app.fakes import FilesystemMinioClient
+from ..app.markdown_stream import stream_markdown_document
+from ..app.models import Blob
+
+IMAGE = os.urandom(200000)
+
+class TestBlobs(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.bucket_dir = os.path.join(self.tmp.name, "notes")
+        os.makedirs(os.path.join(self.bucket_dir, "docs", "img"))
+        with open(os.path.join(self.bucket_dir, "docs", "img", "plot.png"), "wb") as f:
+            f.write(IMAGE)
+        self.client = FilesystemMinioClient(self.tmp.name)
+        self.sha256 = hashlib.sha256(IMAGE).hexdigest()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_local_files_are_hashed_through_mmap(self):
+        resolver = BlobResolver(base_dir=self.bucket_dir, chunk_size=4096).relative_to("docs/page.md")
+        self.assertEqual(resolver.locate("img/plot.png")[0], "file")
+        blob = resolver.resolve(Blob(kind="image", uri="img/plot.png"))
+        self.assertEqual((blob.sha256, blob.size), (self.sha256, len(IMAGE)))
+        self.assertEqual(blob.object_key, blob_object_key(self.sha256))
+
+    def test_bucket_objects_are_streamed(self):
+        resolver = BlobResolver(client=self.client, bucket_name="notes").relative_to("docs/page.md")
+        self.assertEqual(resolver.locate("./img/../img/plot.png"), ("object", "docs/img/plot.png"))
+        self.assertEqual(resolver.resolve(Blob(kind="image", uri="img/plot.png")).sha256, self.sha256)
+
+    def test_unresolvable_blobs_are_left_alone(self):
+        resolver = BlobResolver(client=self.client, bucket_name="notes")
+        for uri in ("https://example.com/a.png", "missing.png", "#/cells/0"):
+            blob = Blob(kind="image", uri=uri)
+            self.assertEqual(resolver.resolve(blob), blob)
+
+    def test_data_uris_are_replaced_by_their_key(self):
+        uri = "data:image/png;base64," + base64.b64encode(IMAGE).decode()
+        blob = BlobResolver(chunk_size=1000).resolve(Blob(kind="image", uri=uri))
+        self.assertEqual(blob.sha256, self.sha256)
+        self.assertEqual(blob.uri, blob.object_key)
+
+    def test_document_blobs(self):
+        document = stream_markdown_document("# Page\n\n![Plot](img/plot.png)\n")
+        resolver = BlobResolver(base_dir=self.bucket_dir).relative_to("docs/page.md")
+        resolved = resolve_document_blobs(document, resolver)
+        self.assertEqual(resolved.blob_data[0].sha256, self.sha256)
+        self.assertEqual(document.blob_data[0].sha256, "")
+
+    def test_store_uploads_each_hash_once(self):
+        resolver = BlobResolver(client=self.client, bucket_name="notes").relative_to("docs/page.md")
+        store = BlobStore(self.client, "notes")
+        blob = store.put(Blob(kind="image", uri="img/plot.png"), resolver)
+        self.assertTrue(store.exists(blob.object_key))
+        with open(os.path.join(self.bucket_dir, *blob.object_key.split("/")), "rb") as f:
+            self.assertEqual(f.read(), IMAGE)
+        uploaded = os.path.getmtime(os.path.join(self.bucket_dir, *blob.object_key.split("/")))
+        store.put(Blob(kind="image", uri="docs/img/plot.png"), BlobResolver(client=self.client, bucket_name="notes"))
+        self.assertEqual(os.path.getmtime(os.path.join(self.bucket_dir, *blob.object_key.split("/"))), uploaded)
+
+    def test_uris_cannot_leave_base_dir(self):
+        secret = os.path.join(self.tmp.name, "secret.txt")
+        with open(secret, "w") as f:
+            f.write("secret")
+        os.symlink(secret, os.path.join(self.bucket_dir, "docs", "link.txt"))
+        resolver = BlobResolver(base_dir=self.bucket_dir).relative_to("docs/page.md")
+        for uri in ("../../secret.txt", "/../secret.txt", "link.txt", "file://" + secret):
+            self.assertIsNone(resolver.locate(uri), uri)
+            blob = Blob(kind="image", uri=uri)
+            self.assertEqual(resolver.resolve(blob), blob)
+            with self.assertRaises(FileNotFoundError):
+                with resolver.open(blob):
+                    pass
+        store = BlobStore(self.client, "notes")
+        self.assertEqual(store.put(Blob(kind="image", uri="../../secret.txt"), resolver).sha256, "")
+        self.assertFalse(os.path.exists(os.path.join(self.bucket_dir, "blobs")))
+        bucket = BlobResolver(client=self.client, bucket_name="notes").relative_to("docs/page.md")
+        self.assertIsNone(bucket.locate("../.."))
+        self.assertIsNone(bucket.locate("../../other/key"))
+
+    def test_file_uris_are_opt_in(self):
+        uri = "file://" + os.path.join(self.bucket_dir, "docs", "img", "plot.png")
+        self.assertIsNone(BlobResolver().locate(uri))
+        blob = BlobResolver(allow_file_uris=True).relative_to("docs/page.md").resolve(Blob(kind="image", uri=uri))
+        self.assertEqual(blob.sha256, self.sha256)
+
+if __name__ == '__main__':
+    unittest.main()
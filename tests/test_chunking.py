@@ -0,0 +1,146 @@
+import os
+import tempfile
+import unittest
+from ..app.chunking import (
+    ChunkStore,
+    changed_chunks,
+    chunk_markdown,
+    chunk_markdown_document,
+    parse_markdown_chunks_bytes,
+    split_text
+)
+from ..app.fakes import FilesystemMinioClient, InMemoryWeaviateClient
+from ..app.ingest import iter_bucket_results
+from ..app.models import MarkdownDocument, SourceCode, Table
+from ..app.weaviate_sink import CHUNK_CLASS, define_schema, ingest_chunk_updates, object_uuid
+
+MARKDOWN = """# Intro
+
+First paragraph.
+
+## Details
+
+Second paragraph.
+
+```python
+import os
+```
+"""
+
+def make_document(content, code="x = 1"):
+    return MarkdownDocument(
+        metadata={},
+        tables=[Table(headers=["a", "b"], rows=[{"a": 1, "b": None}])],
+        code_blocks=[SourceCode(id="c", imports=[], classes=[], code=code, syntax="Python", context="", metadata={})],
+        content=content
+    )
+
+class TestChunking(unittest.TestCase):
+
+    def test_split_text_respects_size_and_overlap(self):
+        text = " ".join(f"word{i}" for i in range(400))
+        pieces = split_text(text, max_chars=200, overlap=40)
+        self.assertTrue(all(len(p) <= 200 for p in pieces))
+        self.assertEqual(pieces[0].split()[0], "word0")
+        self.assertEqual(pieces[-1].split()[-1], "word399")
+        self.assertIn(pieces[0].split()[-1], pieces[1])
+
+    def test_document_chunks(self):
+        chunks = chunk_markdown_document(make_document("Para one.\n\nPara two."), "doc.md")
+        self.assertEqual([c.kind for c in chunks], ["text", "table", "code"])
+        self.assertEqual(chunks[1].text, "| a | b |\n|---|---|\n| 1 |  |")
+        self.assertEqual([c.index for c in chunks], [0, 1, 2])
+        self.assertTrue(all(c.document_id == "doc.md" for c in chunks))
+
+    def test_ids_are_content_addressed(self):
+        first = chunk_markdown_document(make_document("Same text."), "a.md")
+        second = chunk_markdown_document(make_document("Same text."), "b.md")
+        self.assertEqual([c.id for c in first], [c.id for c in second])
+
+    def test_stream_chunks_split_at_headings(self):
+        chunks = list(chunk_markdown(MARKDOWN, "doc.md"))
+        self.assertEqual([c.text for c in chunks], ["First paragraph.", "Second paragraph.", "import os"])
+        self.assertEqual(chunks[1].section, ["Intro", "Details"])
+        self.assertEqual(chunks[2].kind, "code")
+
+    def test_store_reports_only_new_and_unreferenced(self):
+        store = ChunkStore()
+        new, removed = store.update("a.md", chunk_markdown_document(make_document("Shared."), "a.md"))
+        self.assertEqual(len(new), 3)
+        new, removed = store.update("b.md", chunk_markdown_document(make_document("Shared.", code="y = 2"), "b.md"))
+        self.assertEqual([c.kind for c in new], ["code"])
+        new, removed = store.update("a.md", chunk_markdown_document(make_document("Edited."), "a.md"))
+        self.assertEqual([c.text for c in new], ["Edited."])
+        # "Shared." is still referenced by b.md and the "x = 1" code only by a.md
+        self.assertEqual(removed, [])
+        removed = store.remove("a.md")
+        self.assertEqual(len(removed), 2)
+
+    def test_ingest_only_new_chunks(self):
+        client = InMemoryWeaviateClient()
+        define_schema(client)
+        store = ChunkStore()
+        chunks = chunk_markdown_document(make_document("Text."), "a.md")
+        ingest_chunk_updates(client, [("a.md",) + store.update("a.md", chunks)])
+        self.assertEqual(len(client.objects[CHUNK_CLASS]), 3)
+        self.assertEqual(ingest_chunk_updates(client, [("a.md",) + store.update("a.md", chunks)]), [])
+        ingest_chunk_updates(client, [("a.md", [], store.remove("a.md"))])
+        self.assertEqual(client.objects[CHUNK_CLASS], {})
+
+    def test_ingest_chunks_follow_headings(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            os.makedirs(os.path.join(tmp, "notes"))
+            with open(os.path.join(tmp, "notes", "doc.md"), "w") as f:
+                f.write(MARKDOWN)
+            results = list(iter_bucket_results(FilesystemMinioClient(tmp), "notes",
+                                               parser=parse_markdown_chunks_bytes, parse_workers=0))
+        self.assertEqual(results[0].document.content, "First paragraph.\nSecond paragraph.")
+        (object_name, new, removed, moved), = changed_chunks(results, ChunkStore())
+        self.assertEqual([c.text for c in new], ["First paragraph.", "Second paragraph.", "import os"])
+        self.assertEqual([c.section for c in new], [["Intro"], ["Intro", "Details"], ["Intro", "Details"]])
+        self.assertTrue(all(c.document_id == "doc.md" for c in new))
+
+    def test_shared_chunk_moves_to_remaining_document(self):
+        client = InMemoryWeaviateClient()
+        define_schema(client)
+        store = ChunkStore()
+        shared = chunk_markdown_document(make_document("Shared."), "a.md")
+        ingest_chunk_updates(client, [("a.md",) + store.change("a.md", shared)])
+        ingest_chunk_updates(client, [("b.md",) + store.change("b.md", chunk_markdown_document(make_document("Shared."), "b.md"))])
+        text_chunk = shared[0]
+        self.assertEqual(store.owner(text_chunk.id), "a.md")
+        new, removed, moved = store.change("a.md", [])
+        self.assertEqual((new, removed), ([], []))
+        self.assertEqual(sorted(moved), sorted((c.id, "b.md") for c in shared))
+        ingest_chunk_updates(client, [("a.md", new, removed, moved)])
+        stored = client.objects[CHUNK_CLASS][object_uuid(CHUNK_CLASS, text_chunk.id)]
+        self.assertEqual(stored["properties"]["documentId"], "b.md")
+        # Dropping a chunk that is owned elsewhere moves nothing
+        self.assertEqual(store.change("c.md", shared), ([], [], []))
+        self.assertEqual(store.change("c.md", []), ([], [], []))
+
+    def test_changes_persist_only_on_commit(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "chunks.sqlite")
+            store = ChunkStore(path)
+            a, b, c, d = (list(chunk_markdown(text, document_id)) for text, document_id in (
+                ("Only in a.", "a.md"), ("Shared.", "b.md"), ("Shared.", "c.md"), ("Only in d.", "d.md")))
+            for document_id, chunks in (("a.md", a), ("b.md", b), ("c.md", c), ("d.md", d)):
+                store.change(document_id, chunks)
+            store.close()
+            store = ChunkStore(path)
+            self.assertNotIn(a[0].id, store)
+            for document_id, chunks in (("a.md", a), ("b.md", b), ("c.md", c), ("d.md", d)):
+                store.change(document_id, chunks)
+            # c.md shares chunks with the failed b.md, so it is left out too
+            self.assertEqual(store.commit(["b.md"]), {"b.md", "c.md"})
+            store.close()
+            store = ChunkStore(path)
+            self.assertIn(a[0].id, store)
+            self.assertNotIn(b[0].id, store)
+            self.assertEqual([len(part) for part in store.change("c.md", c)], [len(c), 0, 0])
+            self.assertEqual(store.change("d.md", d), ([], [], []))
+            store.close()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,73 @@
+import os
+import tempfile
+import unittest
+from ..app.chunking import ChunkStore, chunk_markdown_document
+from ..app.embeddings import EmbeddingCache, EmbeddingStage, HashingEmbedder, get_embedder
+from ..app.fakes import InMemoryWeaviateClient
+from ..app.models import MarkdownDocument
+from ..app.weaviate_sink import CHUNK_CLASS, define_schema, ingest_chunk_updates
+
+class CountingEmbedder(HashingEmbedder):
+
+    def __init__(self):
+        super().__init__(dimension=16)
+        self.batches = []
+
+    def embed(self, texts):
+        self.batches.append(list(texts))
+        return super().embed(texts)
+
+class TestEmbeddings(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cache_dir = os.path.join(self.tmp.name, "cache")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_hashing_embedder_is_deterministic_and_normalised(self):
+        embedder = HashingEmbedder(dimension=32)
+        first, second = embedder.embed(["parse the table", "parse the table"])
+        self.assertEqual(list(first), list(second))
+        self.assertAlmostEqual(sum(v * v for v in first), 1.0, places=5)
+        self.assertEqual(get_embedder("hashing-32").model_name, "hashing-32")
+
+    def test_batches_respect_item_and_token_limits(self):
+        embedder = CountingEmbedder()
+        stage = EmbeddingStage(embedder, max_batch_items=3, max_batch_tokens=10)
+        stage.embed([f"text {i}" for i in range(7)] + ["x" * 80])
+        self.assertEqual([len(batch) for batch in embedder.batches], [3, 3, 1, 1])
+
+    def test_cache_hits_across_runs(self):
+        texts = ["alpha", "beta", "alpha", "gamma"]
+        embedder = CountingEmbedder()
+        cache = EmbeddingCache(self.cache_dir)
+        stage = EmbeddingStage(embedder, cache)
+        vectors = stage.embed(texts)
+        self.assertEqual(stage.stats.misses, 3)
+        self.assertEqual(list(vectors[0]), list(vectors[2]))
+        cache.close()
+
+        cache = EmbeddingCache(self.cache_dir)
+        second = EmbeddingStage(CountingEmbedder(), cache)
+        again = second.embed(texts + ["delta"])
+        self.assertEqual((second.stats.hits, second.stats.misses), (4, 1))
+        self.assertAlmostEqual(second.stats.hit_rate, 0.8)
+        self.assertEqual([list(v) for v in again[:4]], [list(v) for v in vectors])
+        self.assertEqual(os.path.getsize(os.path.join(self.cache_dir, "vectors.f32")), 4 * 16 * 4)
+        cache.close()
+
+    def test_chunk_updates_are_ingested_with_vectors(self):
+        client = InMemoryWeaviateClient()
+        define_schema(client)
+        document = MarkdownDocument(metadata={}, tables=[], code_blocks=[], content="One.\n\nTwo.")
+        store = ChunkStore()
+        chunks = chunk_markdown_document(document, "a.md")
+        stage = EmbeddingStage(HashingEmbedder(dimension=8))
+        ingest_chunk_updates(client, stage.embed_chunk_updates([("a.md",) + store.update("a.md", chunks)]))
+        stored = list(client.objects[CHUNK_CLASS].values())
+        self.assertEqual(len(stored[0]["vector"]), 8)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,64 @@
+import os
+import tempfile
+import time
+import unittest
+from ..app.file_index import FileIndex
+
+class TestFileIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = self.tmp.name
+        self.touch("Item1.md")
+        self.touch("notes", "Item2.md")
+        self.touch("archive", "2023", "Item2.md")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def touch(self, *parts):
+        path = os.path.join(self.root, *parts)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            f.write("")
+        return path
+
+    def bump_mtime(self, *parts):
+        # Make sure the directory mtime differs even on coarse-grained filesystems
+        path = os.path.join(self.root, *parts)
+        future = time.time() + 10
+        os.utime(path, (future, future))
+
+    def test_lookup(self):
+        index = FileIndex(self.root)
+        self.assertEqual(index.lookup("Item1.md"), os.path.join(self.root, "Item1.md"))
+        self.assertIsNone(index.lookup("item1.md"))
+        self.assertEqual(index.lookup("item1.md", case_sensitive=False), os.path.join(self.root, "Item1.md"))
+        self.assertIsNone(index.lookup("Missing.md"))
+
+    def test_duplicates(self):
+        duplicates = FileIndex(self.root).duplicates()
+        self.assertEqual(list(duplicates), ["Item2.md"])
+        self.assertEqual(len(duplicates["Item2.md"]), 2)
+
+    def test_incremental_refresh(self):
+        index = FileIndex(self.root)
+        self.touch("notes", "Item3.md")
+        os.remove(os.path.join(self.root, "Item1.md"))
+        self.bump_mtime("notes")
+        self.bump_mtime()
+        index.refresh()
+        self.assertIn("Item3.md", index)
+        self.assertNotIn("Item1.md", index)
+        self.assertEqual(len(index), 3)
+
+    def test_removed_directories_are_forgotten(self):
+        index = FileIndex(self.root)
+        os.remove(os.path.join(self.root, "archive", "2023", "Item2.md"))
+        os.rmdir(os.path.join(self.root, "archive", "2023"))
+        self.bump_mtime("archive")
+        index.refresh()
+        self.assertEqual(index.duplicates(), {})
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,67 @@
+import os
+import tempfile
+import unittest
+from ..app.fakes import FilesystemMinioClient
+from ..app.ingest import iter_bucket_results, iter_bucket_documents, ingest_bucket
+
+def upper_parse(data: bytes) -> str:
+    return data.decode("utf-8").upper()
+
+def failing_parse(data: bytes) -> str:
+    if b"bad" in data:
+        raise ValueError("cannot parse")
+    return data.decode("utf-8")
+
+class TestIngestPipeline(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        bucket_path = os.path.join(self.tmp.name, "notes")
+        os.makedirs(os.path.join(bucket_path, "sub"))
+        for i in range(25):
+            with open(os.path.join(bucket_path, f"note{i}.md"), "w") as f:
+                f.write(f"note {i}")
+        with open(os.path.join(bucket_path, "sub", "bad.md"), "w") as f:
+            f.write("bad note")
+        self.client = FilesystemMinioClient(self.tmp.name)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_yields_every_document(self):
+        documents = list(iter_bucket_documents(
+            self.client, "notes", parser=upper_parse, fetch_workers=4, parse_workers=0, queue_size=2
+        ))
+        self.assertEqual(len(documents), 26)
+        self.assertIn("NOTE 7", documents)
+
+    def test_process_pool_parsing(self):
+        documents = list(iter_bucket_documents(
+            self.client, "notes", parser=upper_parse, fetch_workers=2, parse_workers=2
+        ))
+        self.assertEqual(sorted(documents)[0], "BAD NOTE")
+        self.assertEqual(len(documents), 26)
+
+    def test_parse_errors_are_reported_inline(self):
+        results = list(iter_bucket_results(self.client, "notes", parser=failing_parse, parse_workers=0))
+        errors = [r for r in results if r.error]
+        self.assertEqual(len(errors), 1)
+        self.assertEqual(errors[0].object_name, "sub/bad.md")
+        self.assertIn("cannot parse", errors[0].error)
+        self.assertEqual(len(list(iter_bucket_documents(
+            self.client, "notes", parser=failing_parse, parse_workers=0
+        ))), 25)
+
+    def test_early_close_stops_pipeline(self):
+        results = iter_bucket_results(self.client, "notes", parser=upper_parse, parse_workers=0, queue_size=1)
+        next(results)
+        results.close()
+
+    def test_ingest_bucket_sink(self):
+        seen = []
+        count = ingest_bucket(self.client, "notes", seen.append, parser=upper_parse, parse_workers=0)
+        self.assertEqual(count, 26)
+        self.assertEqual({r.object_name for r in seen if r.object_name.startswith("sub/")}, {"sub/bad.md"})
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,32 @@
+import os
+import subprocess
+import sys
+import unittest
+
+REPO_ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+HEAVY_MODULES = ["langchain", "langsmith", "openai", "pandas", "markdown2", "unstructured", "minio", "weaviate"]
+
+SCRIPT = """
+import sys
+import app
+from app.parsers import parse_markdown_content, parse_python_script, parse_table
+parse_python_script("import os")
+parse_table("| a | b |\\n|---|---|\\n| 1 | 2 |")
+parse_markdown_content("# Title\\n\\nText.")
+heavy = {heavy!r}
+print(",".join(sorted(name for name in sys.modules if name.split(".")[0] in heavy)))
+"""
+
+class TestLazyImports(unittest.TestCase):
+
+    def test_core_does_not_load_agent_dependencies(self):
+        # Run in a fresh interpreter so modules imported by other tests don't count
+        output = subprocess.run(
+            [sys.executable, "-c", SCRIPT.format(heavy=HEAVY_MODULES)],
+            cwd=REPO_ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+        self.assertEqual(output, "")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,111 @@
+import asyncio
+import threading
+import unittest
+from ..app.fakes import FakeLLM
+from ..app.llm_cache import CacheMissError, CachedLLM, PromptCache, prompt_key
+
+class Clock:
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+class TestPromptCache(unittest.TestCase):
+
+    def test_key_covers_model_prompt_and_tools(self):
+        base = prompt_key("model", "prompt", "tool:desc")
+        self.assertNotEqual(base, prompt_key("other", "prompt", "tool:desc"))
+        self.assertNotEqual(base, prompt_key("model", "prompt!", "tool:desc"))
+        self.assertNotEqual(base, prompt_key("model", "prompt", ""))
+
+    def test_ttl_expiry(self):
+        clock = Clock()
+        cache = PromptCache(ttl=60, clock=clock)
+        cache.put("k", "v")
+        clock.now += 30
+        self.assertEqual(cache.get("k"), "v")
+        clock.now += 31
+        self.assertIsNone(cache.get("k"))
+        self.assertEqual(cache.stats()["expired"], 1)
+
+    def test_lru_eviction_by_count_and_size(self):
+        clock = Clock()
+        cache = PromptCache(max_entries=2, clock=clock)
+        for key in ("a", "b"):
+            cache.put(key, key)
+            clock.now += 1
+        cache.get("a")
+        clock.now += 1
+        cache.put("c", "c")
+        self.assertEqual((cache.get("a"), cache.get("b"), cache.get("c")), ("a", None, "c"))
+
+        cache = PromptCache(max_bytes=10, clock=clock)
+        cache.put("x", "12345")
+        clock.now += 1
+        cache.put("y", "1234567")
+        self.assertEqual(len(cache), 1)
+        self.assertEqual(cache.evictions, 1)
+
+    def test_non_text_responses_round_trip(self):
+        cache = PromptCache()
+        cache.put("k", {"content": "", "function_call": {"name": "parse_table"}})
+        self.assertEqual(cache.get("k")["function_call"]["name"], "parse_table")
+
+class TestCachedLLM(unittest.TestCase):
+
+    def test_identical_prompts_call_the_model_once(self):
+        llm = FakeLLM()
+        cached = CachedLLM(llm, tools=[{"name": "parse_table", "description": "tables"}])
+        self.assertEqual(cached.invoke("same prompt"), cached("same prompt"))
+        self.assertEqual(llm.calls, 1)
+        self.assertEqual(cached.stats()["hits"], 1)
+
+    def test_concurrent_requests_are_coalesced(self):
+        llm = FakeLLM(latency=0.05)
+        cached = CachedLLM(llm)
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(cached.invoke("prompt"))) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(llm.calls, 1)
+        self.assertEqual(len(set(results)), 1)
+        self.assertEqual(cached.coalesced + cached.cache.hits, 7)
+
+    def test_async_requests_are_coalesced(self):
+        llm = FakeLLM(latency=0.05)
+        cached = CachedLLM(llm)
+
+        async def run():
+            return await asyncio.gather(*(cached.ainvoke("prompt") for _ in range(5)))
+
+        self.assertEqual(len(set(asyncio.run(run()))), 1)
+        self.assertEqual(llm.calls, 1)
+
+    def test_offline_mode_serves_only_cached_responses(self):
+        cache = PromptCache()
+        CachedLLM(FakeLLM(), cache).invoke("known")
+        offline = CachedLLM(FakeLLM(), cache, offline=True)
+        self.assertTrue(offline.invoke("known").startswith("response:"))
+        with self.assertRaises(CacheMissError):
+            offline.invoke("unknown")
+
+    def test_failures_are_not_cached(self):
+        calls = []
+
+        def flaky(prompt):
+            calls.append(prompt)
+            if len(calls) == 1:
+                raise RuntimeError("rate limited")
+            return "ok"
+
+        cached = CachedLLM(FakeLLM(responses=flaky))
+        with self.assertRaises(RuntimeError):
+            cached.invoke("p")
+        self.assertEqual(cached.invoke("p"), "ok")
+
+if __name__ == '__main__':
+    unittest.main()
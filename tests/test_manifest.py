@@ -0,0 +1,97 @@
+import os
+import tempfile
+import unittest
+from ..app.fakes import FilesystemMinioClient
+from ..app.ingest import iter_bucket_results, iter_bucket_documents
+from ..app.manifest import ObjectManifest
+
+def identity_parse(data: bytes) -> str:
+    return data.decode("utf-8")
+
+class TestIncrementalIngest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.bucket_path = os.path.join(self.tmp.name, "notes")
+        os.makedirs(self.bucket_path)
+        for i in range(5):
+            self.write(f"note{i}.md", f"note {i}")
+        self.client = FilesystemMinioClient(self.tmp.name)
+        self.manifest = ObjectManifest(os.path.join(self.tmp.name, "manifest.sqlite"))
+
+    def tearDown(self):
+        self.manifest.close()
+        self.tmp.cleanup()
+
+    def write(self, name, content):
+        with open(os.path.join(self.bucket_path, name), "w") as f:
+            f.write(content)
+
+    def run_ingest(self, acknowledge=True):
+        results = []
+        for result in iter_bucket_results(
+            self.client, "notes", parser=identity_parse, parse_workers=0, manifest=self.manifest
+        ):
+            results.append(result)
+            if acknowledge:
+                self.manifest.acknowledge("notes", result)
+        return results
+
+    def test_first_run_records_everything(self):
+        results = self.run_ingest()
+        self.assertEqual(len(results), 5)
+        self.assertEqual(len(self.manifest), 5)
+
+    def test_unchanged_objects_are_skipped(self):
+        self.run_ingest()
+        self.assertEqual(self.run_ingest(), [])
+
+    def test_changed_and_new_objects_are_reparsed(self):
+        self.run_ingest()
+        self.write("note1.md", "note 1, edited")
+        self.write("note9.md", "note 9")
+        results = self.run_ingest()
+        self.assertEqual(sorted(r.object_name for r in results), ["note1.md", "note9.md"])
+        self.assertIn("note 1, edited", [r.document for r in results])
+
+    def test_deleted_objects_emit_tombstones(self):
+        self.run_ingest()
+        os.remove(os.path.join(self.bucket_path, "note3.md"))
+        deleted = []
+        documents = list(iter_bucket_documents(
+            self.client, "notes", on_delete=deleted.append,
+            parser=identity_parse, parse_workers=0, manifest=self.manifest
+        ))
+        self.assertEqual(documents, [])
+        self.assertEqual(deleted, ["note3.md"])
+        self.assertEqual(len(self.manifest), 4)
+        self.assertEqual(self.run_ingest(), [])
+
+    def test_unacknowledged_results_are_fetched_again(self):
+        self.assertEqual(len(self.run_ingest(acknowledge=False)), 5)
+        self.assertEqual(len(self.manifest), 0)
+        self.assertEqual(len(self.run_ingest()), 5)
+        os.remove(os.path.join(self.bucket_path, "note3.md"))
+        tombstones = self.run_ingest(acknowledge=False)
+        self.assertEqual([(r.object_name, r.deleted) for r in tombstones], [("note3.md", True)])
+        self.assertEqual([(r.object_name, r.deleted) for r in self.run_ingest()], [("note3.md", True)])
+        self.assertEqual(self.run_ingest(), [])
+
+    def test_parser_version_change_forces_reparse(self):
+        self.run_ingest()
+        self.manifest.parser_version = "next"
+        self.assertEqual(len(self.run_ingest()), 5)
+
+    def test_failed_objects_are_retried(self):
+        self.write("bad.md", "bad")
+        results = list(iter_bucket_results(
+            self.client, "notes", parser=lambda data: 1 / 0 if data == b"bad" else data,
+            parse_workers=0, manifest=self.manifest
+        ))
+        for result in results:
+            self.manifest.acknowledge("notes", result)
+        self.assertEqual(len([r for r in results if r.error]), 1)
+        self.assertEqual([r.object_name for r in self.run_ingest()], ["bad.md"])
+
+if __name__ == '__main__':
+    unittest.main()
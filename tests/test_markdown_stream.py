@@ -0,0 +1,101 @@
+import io
+import os
+import tempfile
+import unittest
+from ..app.models import MarkdownDocument
+from ..app.markdown_stream import (
+    BlobReference,
+    CodeBlock,
+    FrontMatter,
+    TableBlock,
+    TextChunk,
+    iter_markdown_events,
+    stream_markdown_document,
+    stream_markdown_file
+)
+from ..app.ingest import parse_markdown_bytes
+
+MARKDOWN = """
+---
+Tags:
+  - RAG
+Status: Done
+---
+
+# Test Document
+
+This is a test document.
+![diagram](images/pipeline.png)
+
+---
+
+```python
+import weaviate
+print("Hello, world!")
+```
+
+## Table Database
+
+|  Title  | Tags |
+|---------|------|
+| Prompts |  AI  |
+
+<video src="media/demo.mp4"></video>
+"""
+
+class TestMarkdownStream(unittest.TestCase):
+
+    def test_event_order_and_types(self):
+        events = list(iter_markdown_events(MARKDOWN))
+        kinds = [type(event) for event in events]
+        self.assertEqual(kinds[0], FrontMatter)
+        self.assertEqual(events[0].metadata, {"Tags": ["RAG"], "Status": "Done"})
+        self.assertIn(CodeBlock, kinds)
+        self.assertIn(TableBlock, kinds)
+        self.assertLess(kinds.index(CodeBlock), kinds.index(TableBlock))
+
+    def test_headings_carry_sections(self):
+        chunks = [e for e in iter_markdown_events(MARKDOWN) if isinstance(e, TextChunk)]
+        self.assertEqual(chunks[0].text, "# Test Document")
+        self.assertTrue(chunks[0].heading)
+        self.assertEqual(chunks[1].section, ["Test Document"])
+        table_heading = [c for c in chunks if c.text == "## Table Database"][0]
+        self.assertEqual(table_heading.section, ["Test Document", "Table Database"])
+
+    def test_blob_references(self):
+        blobs = [e.blob for e in iter_markdown_events(MARKDOWN) if isinstance(e, BlobReference)]
+        self.assertEqual([(b.kind, b.uri) for b in blobs], [("image", "images/pipeline.png"), ("video", "media/demo.mp4")])
+        self.assertEqual(blobs[0].alt, "diagram")
+
+    def test_binary_stream_input(self):
+        events = list(iter_markdown_events(io.BytesIO(MARKDOWN.encode("utf-8"))))
+        self.assertEqual(len(events), len(list(iter_markdown_events(MARKDOWN))))
+
+    def test_long_paragraphs_are_split(self):
+        log = "".join(f"line {i}\n" for i in range(1000))
+        chunks = list(iter_markdown_events(log, max_chunk_chars=1024))
+        self.assertGreater(len(chunks), 1)
+        self.assertTrue(all(len(c.text) <= 1024 for c in chunks))
+
+    def test_document_builder(self):
+        document = stream_markdown_document(MARKDOWN)
+        self.assertIsInstance(document, MarkdownDocument)
+        self.assertEqual(document.metadata["Status"], "Done")
+        self.assertTrue(document.content.startswith("This is a test document."))
+        self.assertEqual(len(document.code_blocks), 1)
+        self.assertIn("weaviate", document.code_blocks[0].imports)
+        self.assertEqual(len(document.tables), 1)
+        self.assertEqual(document.tables[0].headers, ["Title", "Tags"])
+        self.assertEqual(len(document.blob_data), 2)
+
+    def test_strings_are_content_not_paths(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "secret.md")
+            with open(path, "w", encoding="utf-8") as f:
+                f.write("# Secret\n\nhunter2\n")
+            self.assertEqual(stream_markdown_document(path).content, path)
+            self.assertEqual(parse_markdown_bytes(path.encode("utf-8")).content, path)
+            self.assertEqual(stream_markdown_file(path).content, "hunter2")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,46 @@
+import unittest
+from ..app.markdown_tokenizer import CODE, FRONT_MATTER, HEADING, TABLE, TEXT, tokenize_markdown
+
+def tokenize(text, **kwargs):
+    return list(tokenize_markdown(text.splitlines(keepends=True), **kwargs))
+
+class TestMarkdownTokenizer(unittest.TestCase):
+
+    def test_front_matter_only_at_start(self):
+        tokens = tokenize("\n---\nStatus: Done\n---\nBody\n\n---\nnot: yaml\n")
+        self.assertEqual(tokens[0].kind, FRONT_MATTER)
+        self.assertEqual(tokens[0].text, "Status: Done\n")
+        self.assertEqual([t.kind for t in tokens[1:]], [TEXT, TEXT])
+
+    def test_unclosed_front_matter_is_content(self):
+        tokens = tokenize("---\nStatus: [Done\n# Title\nBody\n")
+        self.assertEqual(tokens, [(TEXT, "Status: [Done", "", 0), (HEADING, "Title", "", 1), (TEXT, "Body", "", 0)])
+
+    def test_fenced_code_blocks(self):
+        tokens = tokenize("````python\nprint('```')\n```\n````\ntail\n")
+        self.assertEqual(tokens[0], (CODE, "print('```')\n```\n", "python", 0))
+        self.assertEqual(tokens[1], (TEXT, "tail", "", 0))
+
+    def test_pipe_tables(self):
+        tokens = tokenize("| a | b |\n|---|:-:|\n| 1 | 2 |\nafter\n")
+        self.assertEqual(tokens[0].kind, TABLE)
+        self.assertEqual(tokens[0].text, "| a | b |\n|---|:-:|\n| 1 | 2 |\n")
+        self.assertEqual(tokens[1].text, "after")
+
+    def test_pipe_line_without_delimiter_is_text(self):
+        tokens = tokenize("| not a table\nstill text\n")
+        self.assertEqual(tokens, [(TEXT, "| not a table\nstill text", "", 0)])
+
+    def test_headings_and_breaks(self):
+        tokens = tokenize("# Title\n#hashtag\n***\n### Deep ###\n")
+        self.assertEqual(tokens[0], (HEADING, "Title", "", 1))
+        self.assertEqual(tokens[1], (TEXT, "#hashtag", "", 0))
+        self.assertEqual(tokens[2], (HEADING, "Deep", "", 3))
+
+    def test_long_prose_is_split(self):
+        tokens = tokenize("".join(f"line {i}\n" for i in range(500)), max_chunk_chars=256)
+        self.assertTrue(all(t.kind == TEXT and len(t.text) <= 256 for t in tokens))
+        self.assertEqual(sum(t.text.count("line") for t in tokens), 500)
+
+if __name__ == '__main__':
+    unittest.main()
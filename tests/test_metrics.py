@@ -0,0 +1,99 @@
+import json
+import os
+import tempfile
+import unittest
+from ..app.fakes import FilesystemMinioClient
+from ..app.ingest import iter_bucket_results
+from ..app.metrics import Histogram, Metrics, json_dump, metrics, prometheus_text, timed
+from ..app.parsers import parse_table
+
+def upper_parse(data: bytes) -> str:
+    return data.decode("utf-8").upper()
+
+class TestMetrics(unittest.TestCase):
+
+    def setUp(self):
+        self.registry = Metrics(enabled=True)
+
+    def tearDown(self):
+        metrics.enabled = False
+        metrics.reset()
+
+    def test_disabled_registry_records_nothing(self):
+        registry = Metrics()
+        registry.inc("documents_total")
+        registry.observe("stage_seconds", 0.1, stage="fetch")
+        with registry.stage("yaml"):
+            pass
+        self.assertEqual(registry.snapshot(), {"counters": [], "gauges": [], "histograms": []})
+
+    def test_histogram_buckets_and_quantile(self):
+        histogram = Histogram(buckets=(0.1, 1.0))
+        for value in (0.05, 0.1, 0.5, 2.0):
+            histogram.observe(value)
+        self.assertEqual(histogram.counts, [2, 1, 1])
+        self.assertEqual(histogram.quantile(0.5), 0.1)
+        self.assertEqual(histogram.quantile(1.0), float("inf"))
+        self.assertAlmostEqual(histogram.sum, 2.65)
+
+    def test_prometheus_text(self):
+        self.registry.inc("bytes_total", 10, stage="fetch")
+        self.registry.inc("bytes_total", 5, stage="fetch")
+        self.registry.set_gauge("queue_depth", 3, queue="parsed")
+        self.registry.observe("stage_seconds", 0.002, stage="yaml")
+        self.registry.add_collector(lambda: [("cache_hit_ratio", 0.5, {"cache": "parse"})])
+        text = prometheus_text(self.registry, namespace="test")
+        self.assertIn("# TYPE test_bytes_total counter", text)
+        self.assertIn('test_bytes_total{stage="fetch"} 15', text)
+        self.assertIn('test_queue_depth{queue="parsed"} 3', text)
+        self.assertIn('test_cache_hit_ratio{cache="parse"} 0.5', text)
+        self.assertIn('test_stage_seconds_bucket{stage="yaml",le="0.0025"} 1', text)
+        self.assertIn('test_stage_seconds_bucket{stage="yaml",le="+Inf"} 1', text)
+        self.assertIn('test_stage_seconds_count{stage="yaml"} 1', text)
+
+    def test_json_dump_and_listeners(self):
+        seen = []
+        self.registry.listeners.append(lambda *args: seen.append(args))
+        self.registry.inc("documents_total", stage="parse")
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "metrics.json")
+            json_dump(self.registry, path)
+            with open(path) as f:
+                snapshot = json.load(f)
+        self.assertEqual(snapshot["counters"], [{"name": "documents_total", "labels": {"stage": "parse"}, "value": 1}])
+        self.assertEqual(seen, [("counter", "documents_total", 1, {"stage": "parse"})])
+
+    def test_timed_parsers(self):
+        metrics.enabled = True
+        parse_table("| a | b |\n|---|---|\n| 1 | 2 |")
+        stages = {entry["labels"]["stage"]: entry["count"] for entry in metrics.snapshot()["histograms"]}
+        self.assertEqual(stages.get("table"), 1)
+
+        @timed("custom")
+        def work():
+            return 42
+
+        metrics.enabled = False
+        self.assertEqual(work(), 42)
+        self.assertNotIn("custom", [entry["labels"]["stage"] for entry in metrics.snapshot()["histograms"]])
+
+    def test_ingest_stages(self):
+        metrics.enabled = True
+        with tempfile.TemporaryDirectory() as tmp:
+            os.makedirs(os.path.join(tmp, "notes"))
+            for i in range(5):
+                with open(os.path.join(tmp, "notes", f"note{i}.md"), "w") as f:
+                    f.write(f"note {i}")
+            results = list(iter_bucket_results(FilesystemMinioClient(tmp), "notes", parser=upper_parse, parse_workers=0))
+        self.assertEqual(len(results), 5)
+        snapshot = metrics.snapshot()
+        counters = {(entry["name"], entry["labels"].get("stage")): entry["value"] for entry in snapshot["counters"]}
+        self.assertEqual(counters[("bytes_total", "fetch")], 30)
+        self.assertEqual(counters[("documents_total", "parse")], 5)
+        stages = {entry["labels"]["stage"]: entry["count"] for entry in snapshot["histograms"]}
+        self.assertEqual(stages["fetch"], 5)
+        self.assertEqual(stages["parse"], 5)
+        self.assertIn("queue_depth", [entry["name"] for entry in snapshot["gauges"]])
+
+if __name__ == '__main__':
+    unittest.main()
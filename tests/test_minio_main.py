@@ -0,0 +1,72 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+from ..app import arrow_sink
+from ..app.fakes import FilesystemMinioClient
+from ..app.minio_main import EXPORT_MANIFEST, export_bucket_data, process_bucket_data
+from ..app.models import MarkdownDocument
+
+NOTE = """---
+title: Note {i}
+---
+# Note {i}
+
+```python
+import os
+```
+"""
+
+class TestProcessBucketData(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.bucket_path = os.path.join(self.tmp.name, "notes")
+        os.makedirs(self.bucket_path)
+        for i in range(3):
+            with open(os.path.join(self.bucket_path, f"note{i}.md"), "w") as f:
+                f.write(NOTE.format(i=i))
+        self.client = FilesystemMinioClient(self.tmp.name)
+        self.manifest_path = os.path.join(self.tmp.name, "manifest.sqlite")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_parses_on_process_pool(self):
+        # The default parser runs in worker processes, which must be able to
+        # import the package-relative parsing modules
+        documents = list(process_bucket_data(self.client, "notes", parse_workers=1))
+        self.assertEqual(len(documents), 3)
+        self.assertTrue(all(isinstance(d, MarkdownDocument) for d in documents))
+        self.assertEqual(sorted(d.metadata["title"] for d in documents), ["Note 0", "Note 1", "Note 2"])
+
+    def test_manifest_skips_unchanged_and_reports_deletions(self):
+        kwargs = dict(parse_workers=0, manifest_path=self.manifest_path)
+        self.assertEqual(len(list(process_bucket_data(self.client, "notes", **kwargs))), 3)
+        os.remove(os.path.join(self.bucket_path, "note1.md"))
+        deleted = []
+        documents = list(process_bucket_data(self.client, "notes", on_delete=deleted.append, **kwargs))
+        self.assertEqual(documents, [])
+        self.assertEqual(deleted, ["note1.md"])
+
+    def test_export_keeps_its_own_manifest(self):
+        exported = []
+
+        def export(results, root, **kwargs):
+            exported.append(sorted((r.object_name, r.deleted) for r in results))
+
+        export_dir = os.path.join(self.tmp.name, "corpus")
+        with mock.patch.object(arrow_sink, "export_bucket_results", export):
+            # Another sink consuming changes and deletions first must not hide
+            # them from the export
+            list(process_bucket_data(self.client, "notes", parse_workers=0, manifest_path=self.manifest_path))
+            export_bucket_data(self.client, "notes", export_dir, parse_workers=0)
+            os.remove(os.path.join(self.bucket_path, "note2.md"))
+            list(process_bucket_data(self.client, "notes", parse_workers=0, manifest_path=self.manifest_path))
+            export_bucket_data(self.client, "notes", export_dir, parse_workers=0)
+        self.assertEqual(exported[0], [("note0.md", False), ("note1.md", False), ("note2.md", False)])
+        self.assertEqual(exported[1], [("note2.md", True)])
+        self.assertTrue(os.path.isfile(os.path.join(export_dir, EXPORT_MANIFEST)))
+
+if __name__ == '__main__':
+    unittest.main()
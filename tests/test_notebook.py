@@ -0,0 +1,114 @@
+import base64
+import hashlib
+import io
+import json
+import unittest
+from ..app.json_stream import JsonStream
+from ..app.notebook import _strip_magics, iter_notebook, parse_notebook, render_notebook
+
+PNG = bytes(range(256)) * 40
+
+NOTEBOOK = {
+    "cells": [
+        {"cell_type": "markdown", "metadata": {}, "source": ["# Analysis\n", "\n", "Some *text*.\n"]},
+        {
+            "cell_type": "code",
+            "execution_count": 1,
+            "metadata": {},
+            "outputs": [
+                {"output_type": "stream", "name": "stdout", "text": ["hello\n"]},
+                {
+                    "data": {"image/png": base64.encodebytes(PNG).decode("ascii"), "text/plain": ["<Figure>"]},
+                    "metadata": {},
+                    "output_type": "display_data",
+                },
+            ],
+            "source": ["%matplotlib inline\n", "import pandas as pd\n", "class Model:\n", "    pass"],
+        },
+        {"cell_type": "code", "execution_count": 2, "metadata": {}, "outputs": [], "source": "%%bash\nls"},
+    ],
+    "metadata": {"kernelspec": {"language": "python", "name": "python3"}},
+    "nbformat": 4,
+    "nbformat_minor": 5,
+}
+
+class TestJsonStream(unittest.TestCase):
+
+    def walk(self, stream):
+        char = stream.peek()
+        if char == "{":
+            return {key: self.walk(stream) for key in stream.iter_object()}
+        if char == "[":
+            return [self.walk(stream) for _ in stream.iter_array()]
+        return stream.read_value()
+
+    def test_round_trip_with_tiny_buffers(self):
+        value = {"a": [1, -2.5e10, True, None, "q\"\\é\U0001F600\n"], "b": {"c": 12345678901234}}
+        for text in (json.dumps(value), json.dumps(value, ensure_ascii=False, indent=1)):
+            for chunk_size in (1, 2, 5, 64):
+                self.assertEqual(self.walk(JsonStream(io.StringIO(text), chunk_size)), value)
+
+    def test_large_strings_are_streamed(self):
+        stream = JsonStream(json.dumps({"blob": "x" * 100000}).encode(), chunk_size=1000)
+        pieces = []
+        for _ in stream.iter_object():
+            self.assertIsNone(stream.read_string(sink=pieces.append, keep=10))
+        self.assertEqual(sum(map(len, pieces)), 100000)
+        self.assertLess(max(map(len, pieces)), 1100)
+
+class TestNotebook(unittest.TestCase):
+
+    def setUp(self):
+        self.data = json.dumps(NOTEBOOK, indent=1).encode()
+
+    def test_cells_stream_before_notebook_metadata(self):
+        events = list(iter_notebook(io.BytesIO(self.data), chunk_size=256))
+        self.assertEqual([type(e).__name__ for e in events], ["NotebookCell"] * 3 + ["NotebookInfo"])
+        image = events[1].outputs[1]
+        self.assertEqual(image.mime_type, "image/png")
+        self.assertEqual(image.size, len(PNG))
+        self.assertEqual(image.sha256, hashlib.sha256(PNG).hexdigest())
+        self.assertIsNone(image.text)
+        self.assertEqual(events[1].outputs[0].text, "hello\n")
+
+    def test_parse_notebook(self):
+        document = parse_notebook(self.data, name="nb.ipynb")
+        self.assertEqual(document.content, "Some *text*.\n%%bash\nls")
+        self.assertEqual(len(document.code_blocks), 1)
+        self.assertEqual(document.code_blocks[0].imports, ["pandas"])
+        self.assertEqual(document.code_blocks[0].classes, ["Model"])
+        self.assertEqual(document.metadata["nbformat"], 4)
+        self.assertEqual([(b.kind, b.uri) for b in document.blob_data],
+                         [("image", "nb.ipynb#/cells/1/outputs/1/data/image~1png")])
+        self.assertEqual(document.blob_data[0].sha256, hashlib.sha256(PNG).hexdigest())
+        self.assertEqual(document.blob_data[0].size, len(PNG))
+
+    def test_magics_are_only_stripped_outside_strings(self):
+        cell = (
+            "%matplotlib inline\n"
+            "!pip install pandas\n"
+            "HELP = \"\"\"\n"
+            "%d items\n"
+            "!important\n"
+            "what?\n"
+            "\"\"\"\n"
+            "x = (10\n"
+            "     % 3)\n"
+            "y = 'it' \\\n"
+            "    '?'\n"
+            "pd.read_csv?"
+        )
+        stripped = _strip_magics(cell)
+        self.assertEqual(stripped.split("\n")[:2], ["# %matplotlib inline", "# !pip install pandas"])
+        self.assertEqual(stripped.split("\n")[2:-1], cell.split("\n")[2:-1])
+        self.assertEqual(stripped.split("\n")[-1], "# pd.read_csv?")
+        compile(stripped, "<cell>", "exec")
+
+    def test_render_notebook_leaves_out_payloads(self):
+        text = render_notebook(self.data)
+        self.assertIn("import pandas as pd", text)
+        self.assertIn(f"[output image/png, {len(PNG)} bytes", text)
+        self.assertNotIn(base64.b64encode(PNG[:30]).decode(), text)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,68 @@
+import tempfile
+import unittest
+from ..app.models import SourceCode
+from ..app.parse_cache import ParseCache
+
+def make_source_code(script: str) -> SourceCode:
+    return SourceCode(
+        id="test_id",
+        imports=[],
+        classes=[],
+        code=script,
+        syntax="Python",
+        context="",
+        metadata={}
+    )
+
+class TestParseCache(unittest.TestCase):
+
+    def setUp(self):
+        self.calls = 0
+
+    def parse(self, script):
+        self.calls += 1
+        return make_source_code(script)
+
+    def test_duplicate_content_parses_once(self):
+        cache = ParseCache()
+        for _ in range(3):
+            result = cache.get_or_parse("python", "x = 1", SourceCode, self.parse)
+        self.assertEqual(self.calls, 1)
+        self.assertEqual(result.code, "x = 1")
+        self.assertEqual(cache.stats()["hits"], 2)
+        self.assertEqual(cache.stats()["misses"], 1)
+
+    def test_hits_return_independent_objects(self):
+        cache = ParseCache()
+        first = cache.get_or_parse("python", "x = 1", SourceCode, self.parse)
+        first.imports.append("mutated")
+        second = cache.get_or_parse("python", "x = 1", SourceCode, self.parse)
+        self.assertEqual(second.imports, [])
+
+    def test_key_includes_kind_and_parser_version(self):
+        cache = ParseCache(parser_version="1")
+        self.assertNotEqual(cache.key("python", "x"), cache.key("markdown", "x"))
+        self.assertNotEqual(cache.key("python", "x"), ParseCache(parser_version="2").key("python", "x"))
+
+    def test_size_based_eviction(self):
+        entry_size = len(make_source_code("a = 0").json())
+        cache = ParseCache(max_bytes=entry_size * 2)
+        for script in ("a = 0", "b = 0", "c = 0"):
+            cache.get_or_parse("python", script, SourceCode, self.parse)
+        stats = cache.stats()
+        self.assertEqual(stats["evictions"], 1)
+        self.assertEqual(stats["entries"], 2)
+        cache.get_or_parse("python", "a = 0", SourceCode, self.parse)
+        self.assertEqual(self.calls, 4)
+
+    def test_disk_tier_survives_restart(self):
+        with tempfile.TemporaryDirectory() as directory:
+            ParseCache(directory=directory).get_or_parse("python", "x = 1", SourceCode, self.parse)
+            restarted = ParseCache(directory=directory)
+            result = restarted.get_or_parse("python", "x = 1", SourceCode, self.parse)
+            self.assertEqual(self.calls, 1)
+            self.assertEqual(result.code, "x = 1")
+            self.assertEqual(restarted.stats()["disk_hits"], 1)
+
+if __name__ == '__main__':
+    unittest.main()
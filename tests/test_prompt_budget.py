@@ -0,0 +1,135 @@
+import unittest
+from ..app.agent_runner import AgentRunner
+from ..app.fakes import FakeLLM
+from ..app.prompt_budget import (
+    PromptBudgetStats,
+    build_prompt,
+    count_tokens,
+    fit_content,
+    markdown_digest,
+    python_skeleton,
+    truncate_middle
+)
+
+def make_module(functions):
+    lines = ['"""Generated module.\n\nWith a longer description."""', "import os", "from typing import List, Optional", "",
+             "LIMIT = 10", ""]
+    lines += ["class Store(object):", '    """Keeps things."""', "",
+              "    def get(self, key: str) -> Optional[str]:", '        """Fetch a value."""',
+              "        def helper():", "            return key", "        return os.environ.get(helper())", ""]
+    for i in range(functions):
+        lines += [f"def handler_{i}(value: int = {i}) -> List[int]:",
+                  f'    """Handle {i}.\n\n    Details that only matter at full detail."""',
+                  "    total = 0", "    for n in range(value):", "        total += n * value", "    return [total]", ""]
+    return "\n".join(lines)
+
+def make_markdown(sections):
+    parts = ["---\ntitle: Notes\n---"]
+    for i in range(sections):
+        parts += [f"## Section {i}", "Lorem ipsum dolor sit amet. " * 20,
+                  "| a | b |\n|---|---|\n" + "\n".join(f"| {r} | {r * 2} |" for r in range(10)),
+                  "```python\ndef f(x):\n    return x\n```"]
+    return "\n\n".join(parts) + "\n"
+
+class TestPythonSkeleton(unittest.TestCase):
+
+    def test_skeleton_keeps_signatures_and_docstrings(self):
+        skeleton = python_skeleton(make_module(3))
+        self.assertIn("from typing import List, Optional", skeleton)
+        self.assertIn("LIMIT = 10", skeleton)
+        self.assertIn("class Store(object):", skeleton)
+        self.assertIn("    def get(self, key: str) -> Optional[str]:", skeleton)
+        self.assertIn("def handler_2(value: int = 2) -> List[int]:", skeleton)
+        self.assertIn("Details that only matter", skeleton)
+        self.assertNotIn("total +=", skeleton)
+        self.assertNotIn("helper", skeleton)
+
+    def test_detail_levels_shrink(self):
+        source = make_module(20)
+        sizes = [count_tokens(python_skeleton(source, detail)) for detail in (3, 2, 1, 0)]
+        self.assertEqual(sizes, sorted(sizes, reverse=True))
+        self.assertNotIn("Details that only matter", python_skeleton(source, 2))
+        self.assertNotIn('"""', python_skeleton(source, 1))
+        self.assertIn("# functions: Store.get, handler_0", python_skeleton(source, 0))
+
+    def test_unparseable_source(self):
+        self.assertIsNone(python_skeleton("def broken(:\n"))
+
+class TestMarkdownDigest(unittest.TestCase):
+
+    def test_digest_keeps_structure(self):
+        digest = markdown_digest(make_markdown(3), 2)
+        self.assertIn("title: Notes", digest)
+        self.assertIn("## Section 2", digest)
+        self.assertIn("| a | b |", digest)
+        self.assertIn("def f(x):", digest)
+        self.assertNotIn("Lorem", digest)
+        self.assertEqual(markdown_digest(make_markdown(2), 0), "## Section 0\n\n## Section 1")
+
+class TestFitContent(unittest.TestCase):
+
+    def test_small_content_is_untouched(self):
+        fitted = fit_content("small.py", "print('hi')\n", 100)
+        self.assertEqual((fitted.strategy, fitted.saved_tokens), ("full", 0))
+
+    def test_python_and_markdown_are_compressed_within_budget(self):
+        fitted = fit_content("big.py", make_module(200), 2000)
+        self.assertEqual(fitted.strategy, "skeleton")
+        self.assertLessEqual(fitted.tokens, 2000)
+        self.assertGreater(fitted.saved_tokens, 0)
+
+        fitted = fit_content("notes.md", make_markdown(30), 800)
+        self.assertEqual(fitted.strategy, "digest")
+        self.assertLessEqual(fitted.tokens, 800)
+
+    def test_fallback_truncation(self):
+        fitted = fit_content("log.txt", "\n".join(f"line {i}" for i in range(5000)), 200)
+        self.assertEqual(fitted.strategy, "truncated")
+        self.assertLessEqual(fitted.tokens, 200)
+        self.assertIn("line 0", fitted.content)
+        self.assertIn("line 4999", fitted.content)
+        self.assertIn("lines omitted", fitted.content)
+
+        fitted = fit_content("big.py", make_module(2000), 100)
+        self.assertEqual(fitted.strategy, "skeleton+truncated")
+        self.assertLessEqual(fitted.tokens, 100)
+
+    def test_single_oversize_line_is_sliced(self):
+        content = "start " + "word " * 20000 + "finish"
+        fitted = fit_content("data.txt", content, 100)
+        self.assertEqual(fitted.strategy, "truncated")
+        self.assertLessEqual(fitted.tokens, 100)
+        self.assertTrue(fitted.content.startswith("start word"))
+        self.assertTrue(fitted.content.endswith("word finish"))
+        self.assertIn("characters omitted", fitted.content)
+
+    def test_truncate_middle_never_exceeds_budget(self):
+        text = "x" * 10000
+        self.assertLessEqual(count_tokens(truncate_middle(text, 50)), 50)
+
+class TestBuildPrompt(unittest.TestCase):
+
+    def test_template_overhead_counts_against_the_budget(self):
+        stats = PromptBudgetStats()
+        preamble = "Analyze this file carefully and list imports and classes.\n" * 20
+        prompt = build_prompt(lambda content: preamble + content, "big.py", make_module(200), 1500, stats=stats)
+        self.assertLessEqual(prompt.prompt_tokens, 1500)
+        self.assertEqual(prompt.prompt_tokens, count_tokens(prompt.text))
+        self.assertEqual(stats.requests, 1)
+        self.assertEqual(stats.saved_tokens, prompt.saved_tokens)
+        self.assertEqual(stats.strategies["skeleton"], 1)
+
+    def test_runner_reports_saved_tokens(self):
+        def prompt(item):
+            return build_prompt("Analyze:\n{}".format, item["filename"], item["content"], 1000)
+
+        runner = AgentRunner(FakeLLM(), prompt)
+        results = runner.run([{"filename": "big.py", "content": make_module(200)},
+                              {"filename": "small.py", "content": "x = 1\n"}])
+        self.assertGreater(results[0].saved_tokens, 0)
+        self.assertEqual(results[1].saved_tokens, 0)
+        self.assertLessEqual(results[0].prompt_tokens, 1000)
+        self.assertEqual(runner.metrics.saved_tokens, results[0].saved_tokens)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,84 @@
+import unittest
+from ..app.parsers import parse_python_script
+from ..app.python_ast import extract_python
+
+SCRIPT = '''"""Module docstring."""
+import os, numpy as np
+from . import sibling
+from ..pkg.util import helper as h
+
+MAX_SIZE = 10
+name = "not a constant"
+
+def top(a, b: int = 1, *args, key=None, **kwargs) -> str:
+    """Top-level function."""
+    return helper()
+
+def helper():
+    return Widget()
+
+class Widget(Base):
+    """A widget."""
+
+    def run(self, x, /, y, *, z):
+        self.step()
+        top(1)
+
+        def inner():
+            return inner()
+
+        return inner()
+
+    async def step(self):
+        pass
+'''
+
+class TestPythonAst(unittest.TestCase):
+
+    def setUp(self):
+        self.result = parse_python_script(SCRIPT)
+        self.functions = {f["qualname"]: f for f in self.result.metadata["functions"]}
+
+    def test_imports_keep_levels_and_aliases(self):
+        self.assertEqual(self.result.imports, ["os", "numpy", ".", "..pkg.util"])
+        aliased = self.result.metadata["imports"][3]
+        self.assertEqual((aliased["name"], aliased["alias"], aliased["level"]), ("helper", "h", 2))
+
+    def test_signatures(self):
+        self.assertEqual(self.functions["top"]["signature"], "top(a, b: int = 1, *args, key=None, **kwargs) -> str")
+        self.assertEqual(self.functions["Widget.run"]["signature"], "run(self, x, /, y, *, z)")
+        self.assertTrue(self.functions["Widget.step"]["async"])
+        self.assertTrue(self.functions["Widget.run"]["method"])
+
+    def test_docstrings_and_constants(self):
+        self.assertEqual(self.result.context, "Module docstring.\n\nA widget.\n\nTop-level function.")
+        self.assertEqual(self.result.metadata["constants"], {"MAX_SIZE": "10"})
+        self.assertEqual(self.result.classes, ["Widget"])
+        self.assertEqual(self.result.metadata["classes"][0]["bases"], ["Base"])
+
+    def test_call_graph(self):
+        graph = self.result.metadata["call_graph"]
+        self.assertEqual(graph["top"], ["helper"])
+        self.assertEqual(graph["helper"], ["Widget"])
+        self.assertEqual(graph["Widget.run"], ["Widget.step", "top", "Widget.run.inner"])
+        self.assertEqual(graph["Widget.run.inner"], ["Widget.run.inner"])
+
+    def test_id_is_a_content_hash(self):
+        self.assertEqual(self.result.id, parse_python_script(SCRIPT).id)
+        self.assertNotEqual(self.result.id, parse_python_script(SCRIPT + "\n# edit").id)
+
+    def test_segments_handle_multibyte_and_multiline(self):
+        extractor = extract_python('LABEL = "héllo"\nDATA = {\n    "a": 1,\n}\n')
+        self.assertEqual(extractor.constants, {"LABEL": '"héllo"', "DATA": '{\n    "a": 1,\n}'})
+
+    def test_segments_after_form_feed(self):
+        extractor = extract_python('X = 1\n\x0c\ndef f(a: int = 1):\n    pass\nY = "p"\n')
+        self.assertEqual(extractor.functions[0]["signature"], "f(a: int = 1)")
+        self.assertEqual(extractor.constants, {"X": "1", "Y": '"p"'})
+
+    def test_segments_with_unicode_line_separators(self):
+        extractor = extract_python('A = "\u2028\x85\x1c"\nLONG = "LONG"\r\nB = 2\r')
+        self.assertEqual(extractor.constants, {"A": '"\u2028\x85\x1c"', "LONG": '"LONG"', "B": "2"})
+
+if __name__ == '__main__':
+    unittest.main()
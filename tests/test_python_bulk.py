@@ -0,0 +1,70 @@
+import os
+import tempfile
+import unittest
+from ..app.python_bulk import BulkParseStats, find_python_files, parse_python_scripts, read_source
+
+class TestPythonBulk(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = self.tmp.name
+        os.makedirs(os.path.join(self.root, "pkg"))
+        os.makedirs(os.path.join(self.root, ".venv"))
+        for i in range(10):
+            self.write(f"pkg/module{i}.py", f"import os\n\nclass Model{i}:\n    pass\n")
+        self.write("pkg/broken.py", "def broken(:\n")
+        self.write(".venv/ignored.py", "import sys\n")
+        with open(os.path.join(self.root, "pkg", "latin1.py"), "wb") as f:
+            f.write("NAME = 'caf\xe9'\n".encode("latin-1"))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, name, content):
+        with open(os.path.join(self.root, name), "w") as f:
+            f.write(content)
+
+    def test_find_python_files_skips_virtualenvs(self):
+        files = list(find_python_files(self.root))
+        self.assertEqual(len(files), 12)
+        self.assertFalse(any(".venv" in path for path in files))
+
+    def test_results_are_ordered_with_inline_errors(self):
+        files = list(find_python_files(self.root))
+        stats = BulkParseStats()
+        results = list(parse_python_scripts(files, workers=2, chunksize=3, stats=stats))
+        self.assertEqual([r.name for r in results], files)
+        errors = {os.path.basename(r.name): r for r in results if r.error}
+        self.assertEqual(set(errors), {"broken.py", "latin1.py"})
+        self.assertIn("Syntax error", errors["broken.py"].source_code.context)
+        self.assertIn("UnicodeDecodeError", errors["latin1.py"].error)
+        self.assertEqual(stats.files, 12)
+        self.assertEqual(stats.errors, 2)
+        self.assertGreater(stats.bytes_per_second, 0)
+
+    def test_sources_and_unordered_results(self):
+        sources = [f"class C{i}:\n    pass\n" for i in range(20)]
+        results = list(parse_python_scripts(sources, workers=2, chunksize=4, ordered=False))
+        self.assertEqual(sorted(r.index for r in results), list(range(20)))
+        self.assertEqual({r.source_code.classes[0] for r in results}, {f"C{i}" for i in range(20)})
+
+    def test_inline_parsing(self):
+        results = list(parse_python_scripts(["import os\n", "x ="], workers=0))
+        self.assertEqual(results[0].source_code.imports, ["os"])
+        self.assertEqual(results[1].source_code.id, "error")
+
+    def test_read_source_honours_coding_cookies(self):
+        cookie = os.path.join(self.root, "cookie.py")
+        with open(cookie, "wb") as f:
+            f.write("# -*- coding: latin-1 -*-\nNAME = 'caf\xe9'\n".encode("latin-1"))
+        bom = os.path.join(self.root, "bom.py")
+        with open(bom, "wb") as f:
+            f.write(b"\xef\xbb\xbfNAME = 'caf\xc3\xa9'\n")
+        self.assertTrue(read_source(cookie).endswith("NAME = 'caf\xe9'\n"))
+        self.assertEqual(read_source(bom), "NAME = 'caf\xe9'\n")
+        result, = parse_python_scripts([cookie], workers=0)
+        self.assertIsNone(result.error)
+        self.assertEqual(result.source_code.metadata["constants"], {"NAME": "'caf\xe9'"})
+
+if __name__ == '__main__':
+    unittest.main()
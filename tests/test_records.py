@@ -0,0 +1,109 @@
+import pickle
+import unittest
+from array import array
+from ..app.ingest import parse_markdown_record_bytes
+from ..app.markdown_stream import stream_markdown_document
+from ..app.parsers import parse_python_script, parse_table
+from ..app.python_bulk import parse_python_scripts
+from ..app.records import (
+    ColumnarTable,
+    DocumentRecord,
+    SourceRecord,
+    compact,
+    parse_markdown_record,
+    parse_python_record,
+    parse_table_record,
+    to_model
+)
+
+SCRIPT = '''"""Module."""
+import os
+from .util import helper
+
+class Service:
+    def run(self):
+        return helper(os.getcwd())
+'''
+
+TABLE = """
+| ID | Name  | Score | Status |
+|----|-------|-------|--------|
+| 1  | Item1 | 0.5   | Done   |
+| 2  | Item2 | 1.5   | Done   |
+| 3  |       | 2.5   | Todo   |
+"""
+
+MARKDOWN = """---
+Tags: [Python]
+---
+
+# Title
+
+Text.
+
+""" + TABLE + """
+```python
+""" + SCRIPT + """```
+"""
+
+class TestRecords(unittest.TestCase):
+
+    def test_source_record_round_trip(self):
+        record = parse_python_record(SCRIPT)
+        self.assertEqual(record.imports, ("os", ".util"))
+        self.assertEqual(record.classes, ("Service",))
+        self.assertFalse(hasattr(record, "__dict__"))
+        self.assertEqual(record.to_model(), parse_python_script(SCRIPT))
+        self.assertEqual(SourceRecord.from_model(parse_python_script(SCRIPT)), record)
+
+    def test_names_are_interned_after_unpickling(self):
+        record = pickle.loads(pickle.dumps(parse_python_record(SCRIPT)))
+        other = parse_python_record(SCRIPT.replace("Module", "Other"))
+        self.assertIs(record.imports[1], other.imports[1])
+        self.assertEqual(record.to_model(), parse_python_script(SCRIPT))
+
+    def test_columnar_table(self):
+        table = parse_table_record(TABLE)
+        self.assertEqual(table.headers, ("ID", "Name", "Score", "Status"))
+        self.assertEqual(len(table), 3)
+        self.assertIsInstance(table.column("ID"), array)
+        self.assertIsInstance(table.column("Score"), array)
+        self.assertIsInstance(table.column("Name"), list)
+        self.assertIs(table.column("Status")[0], table.column("Status")[1])
+        self.assertEqual(table.row(2), {"ID": 3, "Name": None, "Score": 2.5, "Status": "Todo"})
+        self.assertEqual(table.to_model(), parse_table(TABLE))
+        self.assertEqual(ColumnarTable.from_model(parse_table(TABLE)), table)
+        self.assertEqual(pickle.loads(pickle.dumps(table)), table)
+
+    def test_columns_must_match_headers(self):
+        with self.assertRaises(ValueError):
+            ColumnarTable(["a", "b"], [[1]])
+        with self.assertRaises(ValueError):
+            ColumnarTable(["a", "b"], [[1], [1, 2]])
+
+    def test_document_record(self):
+        document = stream_markdown_document(MARKDOWN)
+        record = compact(document)
+        self.assertIsInstance(record, DocumentRecord)
+        self.assertIsInstance(record.tables[0], ColumnarTable)
+        self.assertIsInstance(record.code_blocks[0], SourceRecord)
+        self.assertEqual(to_model(record), document)
+        self.assertIs(to_model(document), document)
+        with self.assertRaises(TypeError):
+            compact({"not": "a model"})
+
+    def test_markdown_parsed_straight_to_records(self):
+        for record in (parse_markdown_record(MARKDOWN), parse_markdown_record_bytes(MARKDOWN.encode("utf-8"))):
+            self.assertIsInstance(record, DocumentRecord)
+            self.assertIsInstance(record.tables[0], ColumnarTable)
+            self.assertIsInstance(record.code_blocks[0], SourceRecord)
+            self.assertEqual(record.to_model(), stream_markdown_document(MARKDOWN))
+
+    def test_bulk_parse_compact(self):
+        results = list(parse_python_scripts([SCRIPT, "def broken(:"], workers=0, compact=True))
+        self.assertIsInstance(results[0].source_code, SourceRecord)
+        self.assertIsNone(results[0].error)
+        self.assertIsNotNone(results[1].error)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,81 @@
+import json
+import unittest
+from aiohttp.test_utils import TestClient, TestServer
+from ..app.server import create_app
+from ..app.service import ParseService
+
+class TestHttpService(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        self.service = ParseService(workers=0, chunksize=2, max_batch_items=20)
+        self.client = TestClient(TestServer(create_app(self.service, max_body_bytes=4096,
+                                                       max_stream_bytes=8192)))
+        await self.client.start_server()
+
+    async def asyncTearDown(self):
+        await self.client.close()
+
+    async def test_single_endpoints(self):
+        response = await self.client.post("/parse-yaml-metadata", json={"yaml_content": "title: Notes"})
+        self.assertEqual(response.status, 200)
+        self.assertEqual(await response.json(), {"title": "Notes"})
+
+        response = await self.client.post("/parse-python-script", json={"script": "import os\n"})
+        self.assertEqual((await response.json())["imports"], ["os"])
+
+    async def test_errors(self):
+        response = await self.client.post("/parse-table", json={"script": "x"})
+        self.assertEqual(response.status, 400)
+        self.assertIn("table_content", (await response.json())["detail"])
+
+        response = await self.client.post("/parse-table", data="not json")
+        self.assertEqual(response.status, 400)
+
+        response = await self.client.post("/parse-python-script", json={"script": "x" * 8192})
+        self.assertEqual(response.status, 413)
+
+        response = await self.client.post("/minio-action", json={"bucket_name": "b", "object_name": "o"})
+        self.assertEqual(response.status, 400)
+
+    async def test_busy_service_returns_503(self):
+        self.service.max_pending = 0
+        response = await self.client.post("/parse-yaml-metadata", json={"yaml_content": "a: 1"})
+        self.assertEqual(response.status, 503)
+        self.assertEqual(response.headers["Retry-After"], "1")
+
+    async def test_batch_streams_ndjson(self):
+        items = [{"yaml_content": f"n: {i}"} for i in range(5)] + [{"yaml_content": 5}]
+        response = await self.client.post("/parse-yaml-metadata/batch", json=items)
+        self.assertEqual(response.headers["Content-Type"], "application/x-ndjson")
+        lines = [json.loads(line) for line in (await response.text()).splitlines()]
+        self.assertEqual([line["index"] for line in lines], list(range(6)))
+        self.assertEqual(lines[2]["result"], {"n": 2})
+        self.assertIn("error", lines[5])
+
+        response = await self.client.post("/parse-yaml-metadata/batch", json={"items": items[:2]})
+        self.assertEqual(len((await response.text()).splitlines()), 2)
+
+        response = await self.client.post("/parse-yaml-metadata/batch", json=[{}] * 21)
+        self.assertEqual(response.status, 413)
+
+    async def test_batch_accepts_ndjson_bodies(self):
+        body = "".join(json.dumps({"script": f"import m{i}\n"}) + "\n" for i in range(4))
+        response = await self.client.post("/parse-python-script/batch", data=body,
+                                          headers={"Content-Type": "application/x-ndjson"})
+        lines = [json.loads(line) for line in (await response.text()).splitlines()]
+        self.assertEqual([line["result"]["imports"] for line in lines], [[f"m{i}"] for i in range(4)])
+
+        body = json.dumps({"script": "x" * 1000}) + "\n"
+        response = await self.client.post("/parse-python-script/batch", data=body * 10,
+                                          headers={"Content-Type": "application/x-ndjson"})
+        lines = (await response.text()).splitlines()
+        self.assertIn("limited", json.loads(lines[-1])["error"])
+
+    async def test_health_and_openapi(self):
+        response = await self.client.get("/health")
+        self.assertEqual((await response.json())["workers"], 0)
+        response = await self.client.get("/.well-known/openapi.yaml")
+        self.assertIn("/parse-yaml-metadata", await response.text())
+
+if __name__ == '__main__':
+    unittest.main()
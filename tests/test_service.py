@@ -0,0 +1,152 @@
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+from ..app import ingest
+from ..app.fakes import FilesystemMinioClient, InMemoryWeaviateClient
+from ..app.service import ParseService, PayloadTooLarge, RequestError, ServiceBusy, ndjson_line, parse_payload
+
+TABLE = "| name | size |\n|------|------|\n| a | 1 |\n| b | 2 |\n"
+
+class TestParsePayload(unittest.TestCase):
+
+    def test_endpoints(self):
+        self.assertEqual(parse_payload("parse-yaml-metadata", {"yaml_content": "title: x"}), {"title": "x"})
+        self.assertEqual(parse_payload("parse-table", {"table_content": TABLE})["headers"], ["name", "size"])
+        self.assertEqual(parse_payload("parse-python-script", {"script": "import os\n"})["imports"], ["os"])
+        document = parse_payload("parse-markdown-content", {"markdown_content": "# T\n\nText\n\n" + TABLE})
+        self.assertEqual(len(document["tables"]), 1)
+
+    def test_invalid_payloads(self):
+        with self.assertRaises(RequestError):
+            parse_payload("parse-table", {"yaml_content": "x"})
+        with self.assertRaises(RequestError):
+            parse_payload("parse-table", ["not", "an", "object"])
+
+    def test_markdown_paths_stay_below_the_root(self):
+        with tempfile.TemporaryDirectory() as root:
+            with open(os.path.join(root, "notes.md"), "w") as f:
+                f.write("Some notes\n")
+            document = parse_payload("parse-markdown-content", {"markdown_path": "notes.md"}, root)
+            self.assertEqual(document["content"], "Some notes")
+            with self.assertRaises(RequestError):
+                parse_payload("parse-markdown-content", {"markdown_path": "../etc/passwd"}, root)
+            with self.assertRaises(RequestError):
+                parse_payload("parse-markdown-content", {"markdown_path": "notes.md"})
+
+    def test_ndjson_line(self):
+        self.assertEqual(json.loads(ndjson_line(3, True, '{"a":1}')), {"index": 3, "result": {"a": 1}})
+        self.assertEqual(json.loads(ndjson_line(4, False, '"boom"')), {"index": 4, "error": "boom"})
+
+class TestParseService(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.service = ParseService(workers=0, chunksize=4, max_batch_items=50)
+
+    def tearDown(self):
+        self.service.close()
+
+    async def test_single_parse_returns_json(self):
+        body = await self.service.parse("parse-python-script", {"script": "class A:\n    pass\n"})
+        self.assertEqual(json.loads(body)["classes"], ["A"])
+        with self.assertRaises(RequestError):
+            await self.service.parse("parse-python-script", {"script": 1})
+        with self.assertRaises(RequestError):
+            await self.service.parse("no-such-endpoint", {})
+
+    async def test_stream_covers_every_item_with_inline_errors(self):
+        payloads = [{"script": f"import m{i}\n"} for i in range(10)] + [{"script": None}]
+        results = [item async for item in self.service.parse_stream("parse-python-script", payloads)]
+        self.assertEqual([index for index, _, _ in results], list(range(11)))
+        self.assertEqual(json.loads(results[3][2])["imports"], ["m3"])
+        self.assertFalse(results[10][1])
+        self.assertEqual(self.service.pending, 0)
+
+    async def test_stream_accepts_async_iterables_and_limits_items(self):
+        async def payloads(count):
+            for i in range(count):
+                yield {"yaml_content": f"n: {i}"}
+
+        results = [item async for item in self.service.parse_stream("parse-yaml-metadata", payloads(5))]
+        self.assertEqual(json.loads(results[4][2]), {"n": 4})
+        with self.assertRaises(PayloadTooLarge):
+            async for _ in self.service.parse_stream("parse-yaml-metadata", payloads(60)):
+                pass
+
+    async def test_single_requests_are_shed_when_busy(self):
+        self.service.max_pending = 0
+        with self.assertRaises(ServiceBusy):
+            await self.service.parse("parse-yaml-metadata", {"yaml_content": "a: 1"})
+        self.assertEqual(self.service.rejected, 1)
+
+    async def test_streams_are_admitted_per_chunk(self):
+        self.service.max_pending = 4
+        payloads = [{"yaml_content": f"n: {i}"} for i in range(20)]
+        results = [item async for item in self.service.parse_stream("parse-yaml-metadata", payloads)]
+        self.assertEqual(len(results), 20)
+        self.service.max_pending = 0
+        with self.assertRaises(ServiceBusy):
+            async for _ in self.service.parse_stream("parse-yaml-metadata", payloads):
+                pass
+        self.assertEqual(self.service.rejected, 1)
+
+    async def test_process_pool(self):
+        service = ParseService(workers=2, chunksize=2)
+        try:
+            payloads = [{"table_content": TABLE}] * 7
+            results = [item async for item in service.parse_stream("parse-table", payloads)]
+            self.assertEqual(len(results), 7)
+            self.assertTrue(all(ok for _, ok, _ in results))
+        finally:
+            service.close()
+
+    async def test_bucket_and_actions(self):
+        with tempfile.TemporaryDirectory() as root:
+            os.makedirs(os.path.join(root, "notes"))
+            for i in range(3):
+                with open(os.path.join(root, "notes", f"n{i}.md"), "w") as f:
+                    f.write(f"# Note {i}\n\nBody {i}\n")
+            self.service.minio_client = FilesystemMinioClient(root)
+            lines = [json.loads(line) async for line in self.service.parse_bucket("notes")]
+            self.assertEqual(sorted(line["object_name"] for line in lines), ["n0.md", "n1.md", "n2.md"])
+            self.assertIn("Body", lines[0]["result"]["content"])
+
+            fetched = await self.service.minio_action({"bucket_name": "notes", "object_name": "n1.md"})
+            self.assertEqual(fetched["data"], "# Note 1\n\nBody 1\n")
+            with self.assertRaises(PayloadTooLarge):
+                await self.service.minio_action({"bucket_name": "notes", "object_name": "n1.md"}, max_bytes=4)
+
+        client = InMemoryWeaviateClient()
+        client.schema.create_class({"class": "Note"})
+        self.service.weaviate_client = client
+        response = await self.service.weaviate_action({"class_name": "Note", "properties": {"title": "x"}})
+        self.assertTrue(response["message"].startswith("stored Note"))
+        self.assertEqual(len(client.objects["Note"]), 1)
+        with self.assertRaises(RequestError):
+            await self.service.weaviate_action({"class_name": "Note"})
+
+    async def test_bucket_streams_share_the_pool_and_are_capped(self):
+        with tempfile.TemporaryDirectory() as root:
+            os.makedirs(os.path.join(root, "notes"))
+            for i in range(3):
+                with open(os.path.join(root, "notes", f"n{i}.md"), "w") as f:
+                    f.write(f"Body {i}\n")
+            service = ParseService(workers=1, max_bucket_streams=1, minio_client=FilesystemMinioClient(root))
+            try:
+                with mock.patch.object(ingest, "ProcessPoolExecutor", side_effect=AssertionError("new pool")):
+                    first = service.parse_bucket("notes")
+                    self.assertNotIn("error", json.loads(await first.__anext__()))
+                    with self.assertRaises(ServiceBusy):
+                        service.check_bucket_capacity()
+                    with self.assertRaises(ServiceBusy):
+                        await service.parse_bucket("notes").__anext__()
+                    lines = [json.loads(line) async for line in first]
+                    self.assertEqual(len(lines), 2)
+                    self.assertTrue(all("result" in line for line in lines))
+                self.assertEqual(service.bucket_streams, 0)
+            finally:
+                service.close()
+
+if __name__ == '__main__':
+    unittest.main()
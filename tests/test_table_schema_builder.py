@@ -0,0 +1,39 @@
+import unittest
+from ..app.table_schema_builder import create_schema, extract_table_data, schema_model, validate_rows
+
+MARKDOWN = """
+| ID | Name  | Properties   |
+|----|-------|--------------|
+| 1  | Item1 | prop1, prop2 |
+| 2  | Item2 | prop3, prop4 |
+"""
+
+class TestCreateSchema(unittest.TestCase):
+
+    def test_rows_share_one_model(self):
+        schemas = create_schema(extract_table_data(MARKDOWN))
+        self.assertEqual(len(schemas), 2)
+        self.assertIs(type(schemas[0]), type(schemas[1]))
+        self.assertIs(type(schemas[0]), schema_model())
+
+    def test_row_values(self):
+        schemas = create_schema(extract_table_data(MARKDOWN))
+        self.assertEqual(schemas[1].id, 2)
+        self.assertEqual(schemas[1].name, "Item2")
+        self.assertEqual(schemas[1].properties, ["prop3", "prop4"])
+        self.assertIsNone(schemas[1].file_path)
+
+    def test_models_are_cached_by_signature(self):
+        fields = (("title", str),)
+        self.assertIs(schema_model(fields), schema_model(fields))
+        self.assertIsNot(schema_model(fields), schema_model())
+
+    def test_validate_rows(self):
+        model = schema_model((("title", str), ("count", int)))
+        rows = validate_rows(model, [{"title": "a", "count": "3"}])
+        self.assertEqual(rows[0].count, 3)
+        with self.assertRaises(Exception):
+            validate_rows(model, [{"title": "a"}])
+
+if __name__ == '__main__':
+    unittest.main()
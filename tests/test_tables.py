@@ -0,0 +1,48 @@
+import unittest
+from ..app.tables import find_pipe_table, parse_pipe_table, parse_pipe_table_columns, split_row
+
+TABLE = """
+| ID | Name  | Properties   | Score | Active |
+|----|:------|-------------:|-------|--------|
+| 1  | Item1 | prop1, prop2 | 0.5   | true   |
+| 2  | Item2 | a \\| b      |       | False  |
+"""
+
+class TestPipeTables(unittest.TestCase):
+
+    def test_headers_and_rows(self):
+        table = parse_pipe_table(TABLE)
+        self.assertEqual(table.headers, ["ID", "Name", "Properties", "Score", "Active"])
+        self.assertEqual(table.rows[0], {"ID": "1", "Name": "Item1", "Properties": "prop1, prop2", "Score": "0.5", "Active": "true"})
+        self.assertEqual(table.rows[1]["Properties"], "a | b")
+
+    def test_type_inference(self):
+        rows = parse_pipe_table(TABLE, infer_types=True).rows
+        self.assertEqual(rows[0]["ID"], 1)
+        self.assertEqual(rows[0]["Score"], 0.5)
+        self.assertIs(rows[0]["Active"], True)
+        self.assertIsNone(rows[1]["Score"])
+        self.assertIs(rows[1]["Active"], False)
+
+    def test_columnar_output(self):
+        headers, columns = parse_pipe_table_columns(TABLE, infer_types=True)
+        self.assertEqual(headers[0], "ID")
+        self.assertEqual(columns["ID"], [1, 2])
+        self.assertEqual(columns["Name"], ["Item1", "Item2"])
+
+    def test_ragged_rows_and_duplicate_headers(self):
+        table = parse_pipe_table("| a | a | b |\n|---|---|---|\n| 1 |\n| 1 | 2 | 3 | 4 |\n")
+        self.assertEqual(table.headers, ["a", "a.1", "b"])
+        self.assertEqual(table.rows[0], {"a": "1", "a.1": "", "b": ""})
+        self.assertEqual(table.rows[1], {"a": "1", "a.1": "2", "b": "3"})
+
+    def test_rows_without_outer_pipes(self):
+        self.assertEqual(split_row("a | b"), ["a", "b"])
+
+    def test_find_pipe_table(self):
+        markdown = "Intro text\n" + TABLE + "\nOutro"
+        self.assertEqual(parse_pipe_table(find_pipe_table(markdown)).headers[0], "ID")
+        self.assertIsNone(find_pipe_table("no tables here"))
+
+if __name__ == '__main__':
+    unittest.main()
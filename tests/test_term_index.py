@@ -0,0 +1,151 @@
+import os
+import tempfile
+import unittest
+from ..app.fakes import FilesystemMinioClient
+from ..app.ingest import iter_bucket_results
+from ..app.manifest import ObjectManifest
+from ..app.markdown_stream import stream_markdown_document
+from ..app.parsers import parse_python_script
+from ..app.records import compact
+from ..app.term_index import QuerySyntaxError, TermIndex, extract_terms, index_directory, main, parse_query
+
+NOTE = """---
+Tags:
+  - Python
+  - {tag}
+Status: {status}
+owner:
+  name: ada
+---
+
+# Note
+
+```python
+import {module}
+
+class {cls}:
+    pass
+```
+"""
+
+def note(tag="RAG", status="Done", module="os", cls="Note"):
+    return NOTE.format(tag=tag, status=status, module=module, cls=cls)
+
+class TestTermIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.index = TermIndex()
+        self.index.add("a.md", stream_markdown_document(note()))
+        self.index.add("b.md", stream_markdown_document(note(tag="Agents", status="In Progress", module="weaviate")))
+        self.index.add("c.md", stream_markdown_document(note(module="weaviate.classes", cls="Store")))
+        self.index.add("tool.py", parse_python_script("import json\nclass Tool: pass"))
+
+    def tearDown(self):
+        self.index.close()
+
+    def test_extract_terms(self):
+        document = stream_markdown_document(note())
+        terms = extract_terms(document)
+        self.assertTrue({"kind:document", "tags:python", "tags:rag", "status:done", "has:tags",
+                         "owner.name:ada", "import:os", "class:note"} <= terms)
+        self.assertEqual(extract_terms(compact(document)), terms)
+        self.assertEqual(extract_terms(parse_python_script("import json")), {"kind:code", "import:json"})
+        with self.assertRaises(TypeError):
+            extract_terms("text")
+
+    def test_boolean_and_prefix_queries(self):
+        search = self.index.search
+        self.assertEqual(search("tags:rag"), ["a.md", "c.md"])
+        self.assertEqual(search("tags:rag AND import:weaviate*"), ["c.md"])
+        self.assertEqual(search("tags:rag import:os"), ["a.md"])
+        self.assertEqual(search("tags:agents OR class:tool"), ["b.md", "tool.py"])
+        self.assertEqual(search("import:weaviate* AND NOT tags:agents"), ["c.md"])
+        self.assertEqual(search("NOT kind:document"), ["tool.py"])
+        self.assertEqual(search('status:"in progress"'), ["b.md"])
+        self.assertEqual(search("(tags:agents OR class:store) AND has:owner"), ["b.md", "c.md"])
+        self.assertEqual(search("TAGS:Python", limit=1), ["a.md"])
+        self.assertEqual(search("tags:missing"), [])
+        self.assertEqual(self.index.count("kind:*"), 4)
+
+    def test_results_evaluated_across_a_write_are_not_cached(self):
+        evaluate = self.index._evaluate
+
+        def evaluate_then_write(node):
+            # A write landing while the query is being evaluated
+            result = evaluate(node)
+            self.index.add("d.md", stream_markdown_document(note()))
+            return result
+
+        self.index._evaluate = evaluate_then_write
+        self.assertEqual(self.index.search("tags:rag"), ["a.md", "c.md"])
+        self.index._evaluate = evaluate
+        self.assertEqual(self.index.search("tags:rag"), ["a.md", "c.md", "d.md"])
+        self.index.remove("d.md")
+        self.assertEqual(self.index._name(max(self.index._names) + 1), None)
+
+    def test_query_syntax_errors(self):
+        self.assertEqual(parse_query("a OR b c"), ("or", [("term", "a"), ("and", [("term", "b"), ("term", "c")])]))
+        for query in ("", "(tags:rag", "tags:rag)", "AND tags:rag", "tags:rag OR", 'x:"open'):
+            with self.assertRaises(QuerySyntaxError):
+                self.index.search(query)
+
+    def test_updates_replace_and_remove_postings(self):
+        self.assertEqual(self.index.search("tags:rag"), ["a.md", "c.md"])
+        self.index.add("a.md", stream_markdown_document(note(tag="Agents")))
+        self.assertEqual(self.index.search("tags:rag"), ["c.md"])
+        self.index.remove("c.md")
+        self.index.remove("missing.md")
+        self.assertEqual(self.index.search("tags:rag"), [])
+        self.assertEqual(len(self.index), 3)
+        self.assertEqual(self.index.terms("tags:"), [("tags:agents", 2), ("tags:python", 2)])
+
+class TestTermIndexPersistence(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.bucket_path = os.path.join(self.tmp.name, "bucket", "notes")
+        os.makedirs(self.bucket_path)
+        self.path = os.path.join(self.tmp.name, "terms.sqlite")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, name, content):
+        with open(os.path.join(self.bucket_path, name), "w") as f:
+            f.write(content)
+
+    def test_ingest_keeps_index_current(self):
+        self.write("a.md", note())
+        self.write("b.md", note(module="weaviate"))
+        client = FilesystemMinioClient(os.path.join(self.tmp.name, "bucket"))
+        with ObjectManifest(os.path.join(self.tmp.name, "manifest.sqlite")) as manifest:
+            def ingest():
+                with TermIndex(self.path) as index:
+                    for result in iter_bucket_results(client, "notes", parse_workers=0, manifest=manifest,
+                                                      term_index=index):
+                        manifest.acknowledge("notes", result)
+            ingest()
+            with TermIndex(self.path) as index:
+                self.assertEqual(index.search("import:weaviate"), ["b.md"])
+
+            os.remove(os.path.join(self.bucket_path, "b.md"))
+            self.write("a.md", note(module="weaviate"))
+            ingest()
+            with TermIndex(self.path) as index:
+                self.assertEqual(index.search("import:weaviate"), ["a.md"])
+                self.assertEqual(len(index), 1)
+
+    def test_cli(self):
+        self.write("a.md", note())
+        with open(os.path.join(self.bucket_path, "tool.py"), "w") as f:
+            f.write("import json\n")
+        self.assertEqual(main([self.path, "build", self.bucket_path]), 0)
+        with TermIndex(self.path) as index:
+            self.assertEqual(index.search("import:json OR tags:rag"), ["a.md", "tool.py"])
+        self.assertEqual(main([self.path, "query", "(tags:rag"]), 2)
+        with TermIndex(self.path) as index:
+            self.assertEqual(index_directory(index, self.bucket_path), 2)
+            self.assertEqual(len(index), 2)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,125 @@
+import unittest
+from ..app.chunking import Chunk
+from ..app.fakes import InMemoryWeaviateClient
+from ..app.ingest import IngestResult
+from ..app.models import MarkdownDocument, SourceCode
+from ..app.weaviate_sink import (
+    CHUNK_CLASS,
+    BatchIngester,
+    MARKDOWN_DOCUMENT_CLASS,
+    SOURCE_CODE_CLASS,
+    define_schema,
+    failed_objects,
+    ingest_bucket_results,
+    ingest_data,
+    object_uuid,
+    to_weaviate_object
+)
+
+def make_document(i):
+    return MarkdownDocument(metadata={"Index": i}, tables=[], code_blocks=[], content=f"document {i}")
+
+def make_source_code(i):
+    return SourceCode(id=f"code{i}", imports=["os"], classes=[], code=f"x = {i}", syntax="Python", context="", metadata={})
+
+class TestWeaviateSink(unittest.TestCase):
+
+    def setUp(self):
+        self.client = InMemoryWeaviateClient()
+        define_schema(self.client)
+
+    def test_define_schema_is_idempotent(self):
+        define_schema(self.client)
+        self.assertEqual(set(self.client.schema.classes), {MARKDOWN_DOCUMENT_CLASS, SOURCE_CODE_CLASS, CHUNK_CLASS})
+
+    def test_batches_are_bounded_by_count(self):
+        stats = ingest_data(self.client, (make_document(i) for i in range(25)), batch_size=10, dynamic=False)
+        self.assertEqual([s.objects for s in stats], [10, 10, 5])
+        self.assertEqual(self.client.batches, [10, 10, 5])
+        self.assertEqual(len(self.client.objects[MARKDOWN_DOCUMENT_CLASS]), 25)
+
+    def test_batches_are_bounded_by_bytes(self):
+        size = to_weaviate_object(make_document(0)).size()
+        stats = ingest_data(self.client, [make_document(i) for i in range(6)],
+                            batch_size=100, max_batch_bytes=size * 2 + 1, dynamic=False)
+        self.assertEqual([s.objects for s in stats], [2, 2, 2])
+
+    def test_mixed_classes(self):
+        ingest_data(self.client, [make_document(1), make_source_code(1)])
+        self.assertEqual(len(self.client.objects[SOURCE_CODE_CLASS]), 1)
+
+    def test_partial_failures_are_retried(self):
+        flaky = to_weaviate_object(make_document(3)).uuid
+        client = InMemoryWeaviateClient(failures={flaky: 2})
+        define_schema(client)
+        stats = ingest_data(client, [make_document(i) for i in range(5)], backoff=0)
+        self.assertEqual(stats[0].attempts, 3)
+        self.assertEqual(stats[0].retried, 2)
+        self.assertEqual(stats[0].failed, 0)
+        self.assertEqual(client.batches, [5, 1, 1])
+        self.assertIn(flaky, client.objects[MARKDOWN_DOCUMENT_CLASS])
+
+    def test_persistent_failures_are_reported(self):
+        broken = to_weaviate_object(make_document(0)).uuid
+        client = InMemoryWeaviateClient(failures={broken: 100})
+        define_schema(client)
+        stats = ingest_data(client, [make_document(0)], max_retries=2, backoff=0)
+        self.assertEqual(stats[0].failed, 1)
+        self.assertIn("injected failure", stats[0].errors[0])
+
+    def test_failed_object_names_are_reported(self):
+        broken = object_uuid(MARKDOWN_DOCUMENT_CLASS, "b.md")
+        client = InMemoryWeaviateClient(failures={broken: 100})
+        define_schema(client)
+        results = [IngestResult(f"{name}.md", document=make_document(i)) for i, name in enumerate("abc")]
+        stats = ingest_bucket_results(client, results, max_retries=1, backoff=0)
+        self.assertEqual(stats[0].failed_objects, ["b.md"])
+        self.assertEqual(failed_objects(stats), {"b.md"})
+
+        # A chunk with the wrong vector dimension fails its document
+        chunks = [Chunk(id=f"c{i}", document_id=name, kind="text", text="text", index=0)
+                  for i, name in enumerate(["d.md", "e.md"])]
+        stats = ingest_data(self.client, [(chunks[0], [0.1]), (chunks[1], [0.1, 0.2])])
+        self.assertEqual(failed_objects(stats), {"e.md"})
+
+    def test_vector_dimension_mismatch_is_rejected(self):
+        data = [(make_document(0), [0.1, 0.2]), (make_document(1), [0.1, 0.2, 0.3])]
+        stats = ingest_data(self.client, data)
+        self.assertEqual(stats[0].failed, 1)
+        self.assertIn("vector dimension", stats[0].errors[0])
+        self.assertEqual(len(self.client.objects[MARKDOWN_DOCUMENT_CLASS]), 1)
+
+    def test_dynamic_batch_sizing_shrinks_on_slow_batches(self):
+        client = InMemoryWeaviateClient(latency=0.002)
+        define_schema(client)
+        ingest_data(client, [make_document(i) for i in range(60)], batch_size=32, target_seconds=0.02)
+        self.assertLess(client.batches[-1], 32)
+
+    def test_bucket_results_upsert_and_purge(self):
+        ingest_bucket_results(self.client, [IngestResult("a.md", document=make_document(1))])
+        ingest_bucket_results(self.client, [IngestResult("a.md", document=make_document(2))])
+        objects = self.client.objects[MARKDOWN_DOCUMENT_CLASS]
+        self.assertEqual(len(objects), 1)
+        self.assertEqual(objects[object_uuid(MARKDOWN_DOCUMENT_CLASS, "a.md")]["properties"]["content"], "document 2")
+        ingest_bucket_results(self.client, [IngestResult("a.md", deleted=True)])
+        self.assertEqual(objects, {})
+
+    def test_shared_ingester_batches_across_calls(self):
+        ingester = BatchIngester(self.client, batch_size=10, dynamic=False)
+        for start in range(0, 25, 6):
+            ingest_bucket_results(self.client, [IngestResult(f"{i}.md", document=make_document(i))
+                                                for i in range(start, min(start + 6, 25))], ingester=ingester)
+        self.assertEqual(self.client.batches, [10, 10])
+        ingester.flush()
+        self.assertEqual(self.client.batches, [10, 10, 5])
+        self.assertEqual(len(self.client.objects[MARKDOWN_DOCUMENT_CLASS]), 25)
+
+    def test_shared_ingester_delete_discards_pending_upsert(self):
+        ingester = BatchIngester(self.client, batch_size=10)
+        ingest_bucket_results(self.client, [IngestResult("a.md", document=make_document(1))], ingester=ingester)
+        ingest_bucket_results(self.client, [IngestResult("a.md", deleted=True)], ingester=ingester)
+        ingester.flush()
+        self.assertEqual(self.client.objects.get(MARKDOWN_DOCUMENT_CLASS, {}), {})
+
+if __name__ == '__main__':
+    unittest.main()